@@ -9,7 +9,15 @@ __version__ = "0.1.0"
 __author__ = "TATA Project Team"
 __email__ = "team@tata-project.com"
 
-from .core import AICopilot
 from .config import CopilotConfig
 
 __all__ = ["AICopilot", "CopilotConfig"]
+
+
+def __getattr__(name):
+    # The core pulls in the model stack; the stdlib demo servers only need
+    # light submodules such as metrics and retrieval
+    if name == "AICopilot":
+        from .core import AICopilot
+        return AICopilot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,270 @@
+"""
+Persistent, project-local cache of analysis results
+
+Results are stored in SQLite per (content hash, analysis version). The
+version changes with the analyzer, the rule set and the project's rule
+selection, so a stale result is never returned; it just stops being used
+and ages out under the size cap, least recently used first. A table of
+file stat signatures lets files whose size and modification time are
+unchanged skip reading and hashing altogether.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from embedded_integration import Finding
+
+
+DEFAULT_CACHE_DIR = Path(".ai_copilot") / "cache"
+CACHE_FILE = "analysis.sqlite3"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    content_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (content_hash, version)
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class CacheEntry:
+    """Lookup result for one source file"""
+    path: Path
+    content_hash: str
+    payload: Optional[Any]  # cached result; None on a miss
+    code: Optional[str] = None  # source text, read on a miss
+
+
+def dump_findings(findings: Iterable[Finding]) -> List[List[Any]]:
+    """Findings as JSON-compatible rows"""
+    return [[finding.rule_id, finding.line, finding.column, list(finding.args)] for finding in findings]
+
+
+def load_findings(rows: Iterable[List[Any]]) -> List[Finding]:
+    """Findings from rows written by dump_findings"""
+    return [Finding(rule_id, line, column, tuple(args)) for rule_id, line, column, args in rows]
+
+
+class AnalysisCache:
+    """
+    SQLite store of analysis results with LRU eviction
+
+    Lookups and stores are batched in one transaction until flush() (or
+    close()), which also records recency and evicts down to the size cap.
+
+    Args:
+        directory: Cache directory (default: .ai_copilot/cache)
+        max_bytes: Cap on the total payload size
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CACHE_DIR, max_bytes: int = 64 << 20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / CACHE_FILE
+        self.max_bytes = max_bytes
+        self._db = sqlite3.connect(str(self.path))
+        self._db.executescript(_SCHEMA)
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM files")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Time of the last hit per key, written to last_used on flush
+        self._used: Dict[Tuple[str, str], float] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "AnalysisCache":
+        """Cache at the configured directory and size cap"""
+        return cls(config.analysis_cache_dir, int(config.analysis_cache_max_mb * (1 << 20)))
+
+    def __enter__(self) -> "AnalysisCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def content_hash(self, path: Path) -> Tuple[str, Optional[str]]:
+        """
+        Hash of a file's content, from its stat signature when unchanged
+
+        Returns:
+            (hash, source text or None if the file was not read)
+        """
+        stat = path.stat()
+        key = str(path.resolve())
+        row = self._db.execute(
+            "SELECT mtime_ns, size, content_hash FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2], None
+
+        content = path.read_bytes()
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        self._db.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)",
+            (key, stat.st_mtime_ns, stat.st_size, digest)
+        )
+        return digest, content.decode("utf-8", errors="replace")
+
+    def lookup(self, path: Union[str, Path], version: str) -> CacheEntry:
+        """
+        Cached result of a file for an analysis version
+
+        On a miss the entry carries the source text for the analysis.
+        """
+        path = Path(path)
+        digest, code = self.content_hash(path)
+        payload = self.get(digest, version)
+        if payload is None and code is None:
+            code = path.read_text(errors="replace")
+        return CacheEntry(path, digest, payload, code)
+
+    def get(self, content_hash: str, version: str) -> Optional[Any]:
+        row = self._db.execute(
+            "SELECT payload FROM entries WHERE content_hash = ? AND version = ?", (content_hash, version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used[(content_hash, version)] = time.time()
+        return json.loads(row[0])
+
+    def store(self, entry: CacheEntry, version: str, payload: Any) -> None:
+        """Store the result of a file looked up with lookup()"""
+        self.put(entry.content_hash, version, payload)
+
+    def put(self, content_hash: str, version: str, payload: Any) -> None:
+        text = json.dumps(payload, separators=(",", ":"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (content_hash, version, payload, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (content_hash, version, text, len(text.encode("utf-8")), time.time())
+        )
+        self._used.pop((content_hash, version), None)
+
+    def invalidate(self, paths: Optional[Iterable[Union[str, Path]]] = None) -> int:
+        """
+        Drop cached results
+
+        Args:
+            paths: Files whose results to drop, by current and last seen
+                content (default: everything)
+
+        Returns:
+            Number of entries removed
+        """
+        if paths is None:
+            removed = self._db.execute("DELETE FROM entries").rowcount
+            self._db.execute("DELETE FROM files")
+        else:
+            hashes = set()
+            for path in map(Path, paths):
+                key = str(path.resolve())
+                row = self._db.execute("SELECT content_hash FROM files WHERE path = ?", (key,)).fetchone()
+                if row:
+                    hashes.add(row[0])
+                if path.is_file():
+                    hashes.add(hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest())
+                self._db.execute("DELETE FROM files WHERE path = ?", (key,))
+            removed = sum(
+                self._db.execute("DELETE FROM entries WHERE content_hash = ?", (digest,)).rowcount
+                for digest in hashes
+            )
+        self._used.clear()
+        self._db.commit()
+        return removed
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits max_bytes
+
+        Returns:
+            Number of entries removed
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        victims = []
+        for rowid, size in self._db.execute("SELECT rowid, size FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            victims.append((rowid,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+        self.evictions += len(victims)
+        return len(victims)
+
+    def flush(self) -> None:
+        """Record recency of hits, evict over the cap and commit"""
+        if self._used:
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE content_hash = ? AND version = ?",
+                [(used, content_hash, version) for (content_hash, version), used in self._used.items()]
+            )
+            self._used.clear()
+        self.evict()
+        self._db.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [("hits", self.hits), ("misses", self.misses), ("evictions", self.evictions)]
+        )
+        self.hits = self.misses = self.evictions = 0
+        self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size and lifetime hit/miss/eviction counts"""
+        entries, size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        counters = dict(self._db.execute("SELECT name, value FROM counters"))
+        hits = counters.get("hits", 0) + self.hits
+        misses = counters.get("misses", 0) + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "files": self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": counters.get("evictions", 0) + self.evictions,
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+
+def open_analysis_cache(config) -> Optional[AnalysisCache]:
+    """The project's analysis cache, or None if caching is disabled"""
+    if not config.cache_enabled:
+        return None
+    return AnalysisCache.from_config(config)
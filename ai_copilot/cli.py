@@ -7,7 +7,7 @@ Provides a user-friendly CLI for interacting with the AI co-pilot system.
 import asyncio
 import sys
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import click
 from rich.console import Console
 from rich.panel import Panel
@@ -15,8 +15,11 @@ from rich.syntax import Syntax
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from .core import AICopilot, CodeRequest
+from .core import AICopilot, CodeRequest, iter_source_files
 from .config import CopilotConfig
+from .analysis_cache import AnalysisCache, open_analysis_cache
+from embedded_integration.reporting import get_encoder, encode_findings
+from embedded_integration.rule_engine import ASIL_LEVELS, RuleProfile, rule_set_for_config
 
 
 console = Console()
@@ -131,17 +134,42 @@ def generate(ctx, description: str, language: str, platform: Optional[str],
 
 
 @main.command()
-@click.argument('file_path', type=click.Path(exists=True))
-@click.option('--language', '-l', default='c', help='Programming language')
+@click.argument('description')
+@click.option('--platform', '-p', help='Target platform/ECU type')
+@click.option('--output', '-o', type=click.Path(), help='Archive path (default: <module>.<format>)')
+@click.option('--format', 'archive_format', default='tar.gz', type=click.Choice(['tar.gz', 'tar', 'zip']),
+              help='Archive format')
+@click.option('--constraints', help='Additional constraints (JSON format), e.g. dbc, ports, module_name')
+@click.option('--tests/--no-tests', default=None, help='Include unit tests (default: generate_tests setting)')
 @click.pass_context
-def analyze(ctx, file_path: str, language: str):
-    """Analyze existing code file"""
+def project(ctx, description: str, platform: Optional[str], output: Optional[str], archive_format: str,
+            constraints: Optional[str], tests: Optional[bool]):
+    """Generate a multi-file ECU module project archive"""
     
     config = ctx.obj['config']
     
-    async def _analyze():
-        copilot = AICopilot(config)
+    async def _project():
+        from code_generation.project import ProjectGenerator
+        
+        constraint_dict = {}
+        if constraints:
+            import json
+            try:
+                constraint_dict = json.loads(constraints)
+            except json.JSONDecodeError:
+                console.print("[red]Error: Invalid JSON format for constraints[/red]")
+                return
+        if tests is not None:
+            constraint_dict["generate_tests"] = tests
+        
+        request = CodeRequest(
+            description=description,
+            target_platform=platform,
+            constraints=constraint_dict or None
+        )
+        output_path = Path(output or f"{ProjectGenerator.module_name(request)}.{archive_format}")
         
+        copilot = AICopilot(config)
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -150,44 +178,178 @@ def analyze(ctx, file_path: str, language: str):
             task = progress.add_task("Initializing AI Co-pilot...", total=None)
             await copilot.initialize()
             
-            progress.update(task, description="Analyzing code...")
+            progress.update(task, description="Generating project...")
+            size = 0
+            with open(output_path, "wb") as f:
+                async for chunk in copilot.generate_project(request, archive_format):
+                    f.write(chunk)
+                    size += len(chunk)
             
-            # Read file
-            code = Path(file_path).read_text()
-            
-            # Analyze code
-            analysis = await copilot.analyze_existing_code(code, language)
-            
-            progress.update(task, description="Analysis completed!")
+            progress.update(task, description="Project generation completed!")
         
-        # Display results
-        console.print("\n" + "="*60)
-        console.print(Panel(f"Analysis of: {file_path}", title="[bold blue]Code Analysis[/bold blue]"))
+        console.print(f"\n[green]Project saved to: {output_path} ({size} bytes)[/green]")
+        copilot.shutdown()
+    
+    asyncio.run(_project())
+
+
+@main.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--language', '-l', default='c', help='Programming language')
+@click.option('--format', 'output_format', default='rich', type=click.Choice(['rich', 'jsonl', 'sarif']),
+              help='Rich panels, one JSON object per finding, or a SARIF 2.1.0 log')
+@click.option('--output', '-o', type=click.Path(), help='Write jsonl/sarif output to a file instead of stdout')
+@click.option('--rule-profile', type=click.Choice(ASIL_LEVELS),
+              help='Rule profile (default: configured safety level); e.g. QM pre-merge, ASIL-D nightly')
+@click.option('--profile-rules', is_flag=True, help='Report the evaluation time of each rule (bypasses the cache)')
+@click.option('--no-cache', is_flag=True, help='Analyze every file, ignoring the analysis cache')
+@click.pass_context
+def analyze(ctx, paths: Tuple[str, ...], language: str, output_format: str, output: Optional[str],
+            rule_profile: Optional[str], profile_rules: bool, no_cache: bool):
+    """Analyze existing code files or directories of C/C++ sources"""
+    
+    config = ctx.obj['config']
+    if rule_profile:
+        config.rules.profile = rule_profile
+    profiler = RuleProfile() if profile_rules else None
+    rule_set_for_config(config).set_profiler(profiler)
+    # Cached files would not be evaluated, so profiling always analyzes
+    use_cache = not (no_cache or profile_rules)
+    
+    if output_format != 'rich':
+        asyncio.run(_stream_analysis(config, paths, output_format, output, use_cache))
+        if profiler is not None:
+            # Keep stdout for the findings
+            _display_rule_profile(profiler, Console(stderr=True) if not output else console)
+        return
+    
+    async def _analyze():
+        copilot = AICopilot(config)
+        cache = open_analysis_cache(config) if use_cache else None
         
-        # Show metrics
-        if 'metrics' in analysis:
-            metrics_table = Table(title="Code Metrics")
-            metrics_table.add_column("Metric", style="cyan")
-            metrics_table.add_column("Value", style="green")
+        for file_path in iter_source_files(paths):
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+            ) as progress:
+                task = progress.add_task("Initializing AI Co-pilot...", total=None)
+                await copilot.initialize()
+                
+                progress.update(task, description="Analyzing code...")
+                
+                # Analyze code (unchanged files come from the cache)
+                analysis = await copilot.analyze_file(file_path, language, cache)
+                
+                progress.update(task, description="Analysis completed!")
             
-            for key, value in analysis['metrics'].items():
-                metrics_table.add_row(key.replace('_', ' ').title(), str(value))
+            # Display results
+            console.print("\n" + "="*60)
+            console.print(Panel(f"Analysis of: {file_path}", title="[bold blue]Code Analysis[/bold blue]"))
             
-            console.print(metrics_table)
-        
-        # Show warnings
-        if analysis.get('warnings'):
-            warning_text = "\n".join(f"• {warning}" for warning in analysis['warnings'])
-            console.print(Panel(warning_text, title="[bold red]Warnings[/bold red]"))
-        
-        # Show suggestions
-        if analysis.get('suggestions'):
-            suggestion_text = "\n".join(f"• {suggestion}" for suggestion in analysis['suggestions'])
-            console.print(Panel(suggestion_text, title="[bold cyan]Suggestions[/bold cyan]"))
+            # Show metrics
+            if 'metrics' in analysis:
+                metrics_table = Table(title="Code Metrics")
+                metrics_table.add_column("Metric", style="cyan")
+                metrics_table.add_column("Value", style="green")
+                
+                for key, value in analysis['metrics'].items():
+                    metrics_table.add_row(key.replace('_', ' ').title(), str(value))
+                
+                console.print(metrics_table)
+            
+            # Show warnings
+            if analysis.get('warnings'):
+                warning_text = "\n".join(f"• {warning}" for warning in analysis['warnings'])
+                console.print(Panel(warning_text, title="[bold red]Warnings[/bold red]"))
+            
+            # Show suggestions
+            if analysis.get('suggestions'):
+                suggestion_text = "\n".join(f"• {suggestion}" for suggestion in analysis['suggestions'])
+                console.print(Panel(suggestion_text, title="[bold cyan]Suggestions[/bold cyan]"))
         
+        if cache is not None:
+            cache.close()
         copilot.shutdown()
     
     asyncio.run(_analyze())
+    if profiler is not None:
+        _display_rule_profile(profiler, console)
+
+
+def _display_rule_profile(profiler: RuleProfile, out: Console) -> None:
+    """Table of rule evaluation times, slowest first"""
+    table = Table(title="Rule Evaluation Time")
+    table.add_column("Rule", style="cyan")
+    table.add_column("Category")
+    table.add_column("Total (ms)", justify="right", style="green")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("Share", justify="right")
+    table.add_column("Findings", justify="right")
+    for row in profiler.report():
+        table.add_row(row["rule_id"], row["category"], f"{row['total_ms']:.3f}", f"{row['mean_ms']:.4f}",
+                      f"{row['share']:.1%}", str(row["findings"]))
+    table.caption = (
+        f"{profiler.evaluations} evaluations, {profiler.total_seconds * 1000.0:.3f} ms; "
+        f"shared token walk {profiler.shared_seconds * 1000.0:.3f} ms"
+    )
+    out.print(table)
+
+
+async def _stream_analysis(config: CopilotConfig, paths: Tuple[str, ...], output_format: str,
+                           output: Optional[str], use_cache: bool = True) -> None:
+    """Write findings as JSON lines or SARIF while the files are analyzed"""
+    copilot = AICopilot(config)
+    encoder = get_encoder(output_format)
+    cache = open_analysis_cache(config) if use_cache else None
+    stream = open(output, "w", encoding="utf-8") if output else click.get_text_stream("stdout")
+    try:
+        # Files are read one at a time as the analysis reaches them
+        async for text in encode_findings(encoder, copilot.stream_file_findings(paths, cache)):
+            stream.write(text)
+        stream.flush()
+    finally:
+        if output:
+            stream.close()
+        if cache is not None:
+            cache.close()
+        copilot.shutdown()
+
+
+@main.group()
+def cache():
+    """Manage the project-local analysis cache"""
+
+
+@cache.command('stats')
+@click.pass_context
+def cache_stats(ctx):
+    """Show analysis cache size and hit rate"""
+    config = ctx.obj['config']
+    with AnalysisCache.from_config(config) as store:
+        stats = store.stats()
+    
+    table = Table(title="Analysis Cache")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Location", stats["path"])
+    table.add_row("Entries", str(stats["entries"]))
+    table.add_row("Files Tracked", str(stats["files"]))
+    table.add_row("Size", f"{stats['bytes'] / 1024:.1f} KiB of {stats['max_bytes'] / (1 << 20):.1f} MiB")
+    table.add_row("Hits / Misses", f"{stats['hits']} / {stats['misses']} ({stats['hit_rate']:.1%})")
+    table.add_row("Evictions", str(stats["evictions"]))
+    console.print(table)
+
+
+@cache.command('invalidate')
+@click.argument('paths', nargs=-1, type=click.Path(exists=True))
+@click.pass_context
+def cache_invalidate(ctx, paths: Tuple[str, ...]):
+    """Drop cached results of the given files/directories (default: all)"""
+    config = ctx.obj['config']
+    with AnalysisCache.from_config(config) as store:
+        removed = store.invalidate(list(iter_source_files(paths)) if paths else None)
+    console.print(f"[green]✓[/green] Removed {removed} cached result(s)")
 
 
 @main.command()
@@ -288,6 +450,133 @@ async def handle_interactive_analyze(copilot: AICopilot, file_path: str):
         console.print(f"[red]Analysis failed: {e}[/red]")
 
 
+@main.command('bus-load')
+@click.argument('message_file', type=click.Path(exists=True))
+@click.option('--protocol', '-p', default='CAN', type=click.Choice(['CAN', 'CAN-FD']), help='Bus protocol')
+@click.option('--baudrate', '-b', type=int, help='Nominal bit rate (bit/s)')
+@click.option('--data-baudrate', type=int, help='CAN FD data-phase bit rate (bit/s)')
+@click.pass_context
+def bus_load(ctx, message_file: str, protocol: str, baudrate: Optional[int],
+             data_baudrate: Optional[int]):
+    """Simulate CAN bus load and message response times (.dbc or .json)"""
+
+    from vehicle_context import ProtocolManager
+
+    config = ctx.obj['config']
+
+    # JSON files hold a list of messages or {"messages": [...]}
+    if message_file.lower().endswith('.dbc'):
+        bus_constraints = {"dbc": message_file}
+    else:
+        import json
+        data = json.loads(Path(message_file).read_text())
+        bus_constraints = data if isinstance(data, dict) else {"messages": data}
+
+    bus_constraints = dict(bus_constraints, protocol=protocol)
+    if baudrate:
+        bus_constraints["baudrate"] = baudrate
+    if data_baudrate:
+        bus_constraints["data_baudrate"] = data_baudrate
+
+    try:
+        result = asyncio.run(ProtocolManager(config).check_bus_constraints(bus_constraints))
+    except (ImportError, KeyError, ValueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    if "error" in result:
+        console.print(f"[red]Error: {result['error']}[/red]")
+        sys.exit(1)
+
+    summary = result["bus_load"]
+
+    load_table = Table(title=f"{protocol} Bus Load ({summary['message_count']} messages)")
+    load_table.add_column("Baud Rate", style="cyan")
+    load_table.add_column("Utilization", style="green")
+    for rate, load in summary["utilization_by_baudrate"].items():
+        marker = " *" if rate == summary["baudrate"] else ""
+        load_table.add_row(f"{rate}{marker}", f"{load}%")
+    console.print(load_table)
+
+    if summary["unschedulable_messages"]:
+        late_table = Table(title="Messages Missing Deadlines")
+        late_table.add_column("ID", style="cyan")
+        late_table.add_column("Name")
+        late_table.add_column("Response (ms)", style="red")
+        late_table.add_column("Deadline (ms)", style="green")
+        for message in summary["unschedulable_messages"]:
+            late_table.add_row(
+                message["id"], message["name"],
+                str(message["response_time_ms"]), str(message["deadline_ms"])
+            )
+        console.print(late_table)
+
+    if result["violations"] or result["warnings"]:
+        issue_text = "\n".join(f"• {issue}" for issue in result["violations"] + result["warnings"])
+        console.print(Panel(issue_text, title="[bold red]Issues[/bold red]"))
+    else:
+        console.print("[green]All messages meet their deadlines.[/green]")
+
+    if not result["compliant"]:
+        sys.exit(1)
+
+
+@main.command('log-stats')
+@click.argument('log_file', type=click.Path(exists=True))
+@click.option('--dbc', required=True, type=click.Path(exists=True), help='DBC file for signal decoding')
+@click.option('--format', 'log_format', help='Log format (csv, candump, asc, blf); default from suffix')
+@click.option('--baudrate', '-b', type=int, help='Nominal bit rate (bit/s)')
+@click.option('--window', default=1.0, type=float, help='Bus load window in seconds')
+@click.option('--signal', 'signals', multiple=True, help='Only report these signals')
+@click.pass_context
+def log_stats(ctx, log_file: str, dbc: str, log_format: Optional[str], baudrate: Optional[int],
+              window: float, signals: List[str]):
+    """Decode a CAN trace and report signal statistics and bus load"""
+
+    from vehicle_context import ProtocolManager
+
+    config = ctx.obj['config']
+
+    try:
+        summary = asyncio.run(ProtocolManager(config).analyze_can_log(
+            log_file, dbc, baudrate=baudrate, window_s=window,
+            log_format=log_format, signals=list(signals) or None
+        ))
+    except (ImportError, ValueError, OSError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    load = summary["bus_load_percent"]
+    console.print(Panel(
+        f"Frames: {summary['frame_count']} ({summary['unknown_frame_count']} unknown)\n"
+        f"Duration: {summary['duration_s']} s\n"
+        f"Bus load: mean {load['mean']}%, peak {load['peak']}% ({summary['window_s']} s windows)",
+        title=f"[bold blue]{log_file}[/bold blue]"
+    ))
+
+    signal_table = Table(title="Signal Statistics")
+    signal_table.add_column("Signal", style="cyan")
+    signal_table.add_column("Count", justify="right")
+    signal_table.add_column("Min", justify="right")
+    signal_table.add_column("Max", justify="right")
+    signal_table.add_column("Mean", justify="right")
+    signal_table.add_column("Std", justify="right")
+    signal_table.add_column("Unit")
+    for name, stats in summary["signals"].items():
+        if not stats["count"]:
+            signal_table.add_row(name, "0", "-", "-", "-", "-", stats["unit"])
+            continue
+        signal_table.add_row(
+            name, str(stats["count"]), f"{stats['min']:.6g}", f"{stats['max']:.6g}",
+            f"{stats['mean']:.6g}", f"{stats['std']:.6g}", stats["unit"]
+        )
+    console.print(signal_table)
+
+    if summary["warnings"]:
+        warning_text = "\n".join(f"• {warning}" for warning in summary["warnings"])
+        console.print(Panel(warning_text, title="[bold red]Warnings[/bold red]"))
+
+
 @main.command()
 @click.pass_context
 def config_init(ctx):
@@ -42,6 +42,17 @@ class VehicleConfig(BaseModel):
     compliance_standards: List[str] = ["ISO 26262", "ISO 14229", "ISO 15765"]
 
 
+class RulesConfig(BaseModel):
+    """Per-project selection of standards rules"""
+    standards: Optional[List[str]] = None  # None: every loaded standard
+    enabled: List[str] = []  # rule IDs; empty: all rules of the selected standards
+    disabled: List[str] = []
+    rule_files: List[str] = []  # extra YAML rule sets
+    # Rule profile QM, ASIL-A..ASIL-D (default: embedded.safety_level); lower
+    # profiles skip costlier rules, e.g. QM pre-merge and ASIL-D nightly
+    profile: Optional[str] = None
+
+
 class CopilotConfig(BaseModel):
     """Main configuration class for AI Co-pilot"""
     
@@ -54,11 +65,19 @@ class CopilotConfig(BaseModel):
     # Vehicle-specific configuration
     vehicle: VehicleConfig = Field(default_factory=VehicleConfig)
     
+    # Standards rule selection
+    rules: RulesConfig = Field(default_factory=RulesConfig)
+    
     # General settings
     debug: bool = False
     log_level: str = "INFO"
     output_dir: str = "./output"
     cache_enabled: bool = True
+    # Project-local cache of analysis results (CLI 'analyze')
+    analysis_cache_dir: str = ".ai_copilot/cache"
+    analysis_cache_max_mb: float = 64.0
+    # DBC files named in request constraints are resolved inside this directory
+    dbc_dir: str = "./dbc"
     
     # Code generation settings
     code_style: str = "automotive"  # automotive, embedded, general
@@ -66,6 +85,10 @@ class CopilotConfig(BaseModel):
     generate_tests: bool = True
     validate_syntax: bool = True
     
+    # Generate-validate-repair loop: fix-up passes and time budget per request
+    repair_max_iterations: int = 3
+    repair_budget_ms: float = 250.0
+    
     @classmethod
     def from_file(cls, config_path: str) -> "CopilotConfig":
         """Load configuration from YAML file"""
@@ -6,7 +6,9 @@ analysis, and optimization for embedded software development.
 """
 
 import asyncio
-from typing import Dict, List, Optional, Any, Union
+import hashlib
+import json
+from typing import Dict, List, Optional, Any, AsyncIterator, Iterable, Iterator, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 import logging
@@ -16,8 +18,28 @@ import torch
 
 from .config import CopilotConfig
 from code_generation import CodeGenerator
-from embedded_integration import EmbeddedAnalyzer
-from vehicle_context import VehicleContextManager
+from code_generation.project import ProjectGenerator
+from embedded_integration import EmbeddedAnalyzer, Finding
+from embedded_integration.rule_engine import rule_set_for_config
+from .analysis_cache import AnalysisCache, dump_findings, load_findings
+from vehicle_context import VehicleContextManager, resolve_dbc_path
+
+
+SOURCE_SUFFIXES = (".c", ".h", ".cpp", ".hpp", ".cc")
+
+# Part of the analysis cache version; bump when analysis passes change
+ANALYSIS_VERSION = 1
+
+
+def iter_source_files(paths: Iterable[Union[str, Path]]) -> Iterator[Path]:
+    """Files named directly, then C/C++ sources under named directories in sorted order"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.suffix in SOURCE_SUFFIXES and child.is_file():
+                    yield child
+        else:
+            yield path
 
 
 @dataclass
@@ -140,28 +162,65 @@ class AICopilot:
                 request.description, request.target_platform
             )
             
-            # Generate code using the code generator
-            generated_code = await self.code_generator.generate(
-                request, context_info
-            )
+            # Check generated code against the ECU memory budget as well
+            analysis_constraints = self._build_analysis_constraints(request, context_info)
             
-            # Analyze generated code for embedded constraints
-            analysis_result = await self.embedded_analyzer.analyze_code(
-                generated_code, request.constraints
+            # Generate, validate and repair the code, then analyze it for
+            # embedded constraints
+            report = await self.code_generator.generate_report(
+                request, context_info, self.embedded_analyzer, analysis_constraints
             )
+            generated_code = report.code
+            analysis_result = report.analysis
+            
+            warnings = list(analysis_result.get("warnings", []))
+            suggestions = list(analysis_result.get("suggestions", []))
+            metadata = {
+                "language": request.language,
+                "platform": request.target_platform,
+                "context": context_info,
+                "analysis": analysis_result,
+                "validation": {
+                    "issues": report.validation.issues,
+                    "fixes": [edit.explanation for edit in report.fixes],
+                    "iterations": report.iterations,
+                    "converged": report.converged,
+                    "elapsed_ms": round(report.elapsed_ms, 3),
+                }
+            }
+            
+            # Check the CAN message set against bus load and deadlines
+            bus_constraints = (request.constraints or {}).get("can")
+            if bus_constraints:
+                if bus_constraints.get("dbc"):
+                    bus_constraints = dict(bus_constraints)
+                    bus_constraints["dbc"] = resolve_dbc_path(bus_constraints["dbc"], self.config.dbc_dir)
+                bus_result = await self.vehicle_context.protocol_manager.check_bus_constraints(
+                    bus_constraints
+                )
+                warnings.extend(bus_result.get("violations", []))
+                warnings.extend(bus_result.get("warnings", []))
+                suggestions.extend(bus_result.get("suggestions", []))
+                metadata["bus_analysis"] = bus_result
+            
+            # Check frame IDs and layouts against the request's DBC file
+            dbc_path = (request.constraints or {}).get("dbc")
+            if dbc_path:
+                dbc_result = await self.vehicle_context.protocol_manager.check_dbc_compliance(
+                    generated_code, resolve_dbc_path(dbc_path, self.config.dbc_dir)
+                )
+                warnings.extend(dbc_result.get("violations", []))
+                warnings.extend(dbc_result.get("warnings", []))
+                suggestions.extend(dbc_result.get("suggestions", []))
+                metadata["dbc_validation"] = dbc_result
             
             # Create response
             response = CodeResponse(
                 generated_code=generated_code,
                 explanation=analysis_result.get("explanation", ""),
-                warnings=analysis_result.get("warnings", []),
-                suggestions=analysis_result.get("suggestions", []),
-                metadata={
-                    "language": request.language,
-                    "platform": request.target_platform,
-                    "context": context_info,
-                    "analysis": analysis_result
-                }
+                warnings=warnings,
+                suggestions=suggestions,
+                metadata=metadata
             )
             
             self.logger.info("Code generation completed successfully")
@@ -171,6 +230,48 @@ class AICopilot:
             self.logger.error(f"Code generation failed: {e}")
             raise
     
+    async def generate_project(self, request: CodeRequest,
+                               archive_format: str = "tar.gz") -> AsyncIterator[bytes]:
+        """
+        Generate a multi-file ECU module project as an archive stream
+        
+        Args:
+            request: CodeRequest object; see ProjectGenerator.plan for the
+                constraints it reads
+            archive_format: 'tar.gz', 'tar' or 'zip'
+            
+        Yields:
+            Archive bytes, to be written out in order
+        """
+        if not self.is_initialized:
+            await self.initialize()
+        
+        self.logger.info(f"Generating project for: {request.description}")
+        
+        context_info = await self.vehicle_context.analyze_context(
+            request.description, request.target_platform
+        )
+        async for chunk in ProjectGenerator(self.code_generator).stream_archive(
+            request, context_info, archive_format
+        ):
+            yield chunk
+    
+    def _build_analysis_constraints(self, request: CodeRequest,
+                                    context_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge request constraints with the ECU budget from the vehicle context"""
+        constraints = dict(request.constraints or {})
+        
+        ecu_budget = context_info.get("constraints", {}).get("memory_constraints", {})
+        memory = dict(ecu_budget)
+        memory.update(constraints.get("memory", {}))
+        if memory:
+            constraints["memory"] = memory
+        
+        if request.target_platform:
+            constraints.setdefault("platform", request.target_platform)
+        
+        return constraints
+    
     async def analyze_existing_code(self, code: str, language: str = "c") -> Dict[str, Any]:
         """
         Analyze existing code for improvements and issues
@@ -191,8 +292,11 @@ class AICopilot:
             # Perform embedded systems analysis
             analysis = await self.embedded_analyzer.analyze_code(code)
             
-            # Add vehicle-specific analysis
+            # Add vehicle-specific analysis; its warnings and suggestions
+            # extend the embedded analysis instead of replacing it
             vehicle_analysis = await self.vehicle_context.analyze_code_compliance(code)
+            for key in ("warnings", "suggestions"):
+                analysis[key] = analysis.get(key, []) + vehicle_analysis.pop(key, [])
             analysis.update(vehicle_analysis)
             
             return analysis
@@ -201,6 +305,89 @@ class AICopilot:
             self.logger.error(f"Code analysis failed: {e}")
             raise
     
+    async def stream_findings(self, sources: Iterable[Tuple[str, str]]) -> AsyncIterator[Tuple[str, Finding]]:
+        """
+        Analyze sources one at a time, yielding findings as they are produced
+        
+        Args:
+            sources: (path, code) pairs; may be a lazy generator
+            
+        Yields:
+            (path, Finding) with source locations
+        """
+        if not self.is_initialized:
+            await self.initialize()
+        
+        for path, code in sources:
+            async for finding in self.embedded_analyzer.stream_findings(code):
+                yield path, finding
+    
+    def analysis_version(self, kind: str) -> str:
+        """
+        Cache version of analysis results of one kind
+        
+        Covers the analyzer, the rule set and the project's rule selection
+        and embedded settings, so cached results of other versions are not
+        reused.
+        """
+        fingerprint = json.dumps([
+            ANALYSIS_VERSION, kind, rule_set_for_config(self.config).version,
+            self.config.rules.model_dump(), self.config.embedded.model_dump()
+        ], sort_keys=True)
+        return hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=12).hexdigest()
+    
+    async def analyze_file(self, path: Union[str, Path], language: str = "c",
+                           cache: Optional[AnalysisCache] = None) -> Dict[str, Any]:
+        """
+        analyze_existing_code for a file, through the analysis cache if given
+        """
+        if cache is None:
+            return await self.analyze_existing_code(Path(path).read_text(errors="replace"), language)
+        
+        version = self.analysis_version("report")
+        entry = cache.lookup(path, version)
+        if entry.payload is not None:
+            return entry.payload
+        analysis = await self.analyze_existing_code(entry.code, language)
+        try:
+            cache.store(entry, version, analysis)
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"Analysis of {path} not cached: {e}")
+        return analysis
+    
+    async def stream_file_findings(self, paths: Iterable[Union[str, Path]],
+                                   cache: Optional[AnalysisCache] = None) -> AsyncIterator[Tuple[str, Finding]]:
+        """
+        Findings of source files and directories, through the analysis cache if given
+        
+        Files are read lazily; cached files are not analyzed (or, when their
+        stat signature is unchanged, read) again.
+        
+        Yields:
+            (path, Finding) with source locations
+        """
+        if cache is None:
+            sources = ((str(path), path.read_text(errors="replace")) for path in iter_source_files(paths))
+            async for item in self.stream_findings(sources):
+                yield item
+            return
+        
+        if not self.is_initialized:
+            await self.initialize()
+        
+        version = self.analysis_version("findings")
+        for path in iter_source_files(paths):
+            entry = cache.lookup(path, version)
+            if entry.payload is not None:
+                for finding in load_findings(entry.payload):
+                    yield str(path), finding
+                continue
+            findings = []
+            async for finding in self.embedded_analyzer.stream_findings(entry.code):
+                findings.append(finding)
+                yield str(path), finding
+            cache.store(entry, version, dump_findings(findings))
+    
     async def get_suggestions(self, partial_code: str, cursor_position: int) -> List[str]:
         """
         Get code completion suggestions
@@ -0,0 +1,581 @@
+"""
+In-process metrics registry
+
+Counters, gauges and latency histograms for the HTTP servers, plus process
+RSS/CPU sampling. Updates go to per-thread cells keyed by thread ident, so
+the hot path takes no lock; readers sum the cells when collecting.
+Histograms also keep a sliding window of per-second bucket counts for
+recent quantiles and throughput. Output is a JSON-friendly snapshot or the
+Prometheus text exposition format.
+"""
+
+import bisect
+import os
+import re
+import resource
+import threading
+import time
+from typing import Dict, List, Optional, Any, Callable, Sequence, Tuple
+
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label values for requests that match no route or use an unknown method
+UNMATCHED_ROUTE = "<unmatched>"
+OTHER_METHOD = "OTHER"
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+# Path segments that are identifiers rather than routes
+_ID_SEGMENT = re.compile(r"^(?:\d+|[0-9a-fA-F]{8,}|[0-9a-fA-F-]{32,36})$")
+
+
+def normalize_path(path: str) -> str:
+    """Route-like metric label for a request path (no query, ids collapsed)"""
+    path = path.split("?", 1)[0].split("#", 1)[0] or "/"
+    return "/".join(":id" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter; each thread adds to its own cell"""
+
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells: Dict[int, float] = {}
+
+    def inc(self, amount: float = 1.0) -> None:
+        ident = threading.get_ident()
+        cells = self._cells
+        # Only this thread writes its key, so the read-modify-write is safe
+        cells[ident] = cells.get(ident, 0.0) + amount
+
+    @property
+    def value(self) -> float:
+        return sum(list(self._cells.values()))
+
+
+class Gauge:
+    """Value that goes up and down, or is computed by a callback on read"""
+
+    __slots__ = ("_base", "_cells", "_function")
+
+    def __init__(self):
+        self._base = 0.0
+        self._cells: Dict[int, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._cells.clear()
+        self._base = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        ident = threading.get_ident()
+        cells = self._cells
+        cells[ident] = cells.get(ident, 0.0) + amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._base + sum(list(self._cells.values()))
+
+
+class _HistogramCell:
+    """One thread's lifetime and per-second window bucket counts"""
+
+    __slots__ = ("counts", "total", "window_counts", "window_totals", "window_seconds")
+
+    def __init__(self, buckets: int, window: int):
+        self.counts = [0] * buckets
+        self.total = 0.0
+        self.window_counts = [[0] * buckets for _ in range(window)]
+        self.window_totals = [0.0] * window
+        self.window_seconds = [-1] * window
+
+
+class Histogram:
+    """
+    Bucketed distribution with a sliding window of recent observations
+
+    Args:
+        buckets: Upper bounds (an implicit +Inf bucket is appended)
+        window_seconds: Length of the sliding window used by window()
+    """
+
+    __slots__ = ("bounds", "window_seconds", "_cells")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, window_seconds: int = 60):
+        self.bounds = tuple(sorted(buckets)) + (float("inf"),)
+        self.window_seconds = window_seconds
+        self._cells: Dict[int, _HistogramCell] = {}
+
+    def observe(self, value: float) -> None:
+        ident = threading.get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            cell = self._cells[ident] = _HistogramCell(len(self.bounds), self.window_seconds)
+
+        bucket = bisect.bisect_left(self.bounds, value)
+        cell.counts[bucket] += 1
+        cell.total += value
+
+        second = int(time.monotonic())
+        slot = second % self.window_seconds
+        if cell.window_seconds[slot] != second:
+            cell.window_seconds[slot] = second
+            cell.window_counts[slot] = [0] * len(self.bounds)
+            cell.window_totals[slot] = 0.0
+        cell.window_counts[slot][bucket] += 1
+        cell.window_totals[slot] += value
+
+    def time(self) -> "_Timer":
+        """Context manager observing the elapsed wall time in seconds"""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Lifetime (bucket counts, sum)"""
+        counts = [0] * len(self.bounds)
+        total = 0.0
+        for cell in list(self._cells.values()):
+            counts = [a + b for a, b in zip(counts, cell.counts)]
+            total += cell.total
+        return counts, total
+
+    def window(self, seconds: Optional[int] = None) -> Tuple[List[int], float]:
+        """(bucket counts, sum) over the last ``seconds`` (default: whole window)"""
+        seconds = min(seconds or self.window_seconds, self.window_seconds)
+        oldest = int(time.monotonic()) - seconds + 1
+        counts = [0] * len(self.bounds)
+        total = 0.0
+        for cell in list(self._cells.values()):
+            for slot, second in enumerate(cell.window_seconds):
+                if second >= oldest:
+                    counts = [a + b for a, b in zip(counts, cell.window_counts[slot])]
+                    total += cell.window_totals[slot]
+        return counts, total
+
+    def quantile(self, q: float, counts: Sequence[int]) -> Optional[float]:
+        """Quantile estimate by linear interpolation inside the bucket"""
+        observed = sum(counts)
+        if not observed:
+            return None
+        rank = q * observed
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-2]
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricFamily:
+    """A named metric with optional labels; children are created on first use"""
+
+    def __init__(self, name: str, kind: str, documentation: str,
+                 labelnames: Sequence[str] = (), factory: Callable[[], Any] = Counter):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = factory()
+
+    def labels(self, *values: Any, **kwargs: Any):
+        # Fast path: positional string labels are already the key
+        child = self._children.get(values)
+        if child is not None:
+            return child
+        key = tuple(str(value) for value in values) if values else \
+            tuple(str(kwargs[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        return list(self._children.items())
+
+    # Unlabelled families act as their single child
+    def __getattr__(self, attribute: str):
+        if attribute.startswith("_") or self.labelnames:
+            raise AttributeError(attribute)
+        return getattr(self._children[()], attribute)
+
+
+class MetricsRegistry:
+    """Registry of metric families with JSON and Prometheus output"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, kind: str, documentation: str,
+                  labelnames: Sequence[str], factory: Callable[[], Any]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, kind, documentation, labelnames, factory)
+            elif family.kind != kind or family.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(name, "counter", documentation, labelnames, Counter)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(name, "gauge", documentation, labelnames, Gauge)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+                  window_seconds: int = 60) -> MetricFamily:
+        return self._register(name, "histogram", documentation, labelnames,
+                              lambda: Histogram(buckets, window_seconds))
+
+    def get(self, name: str) -> Optional[MetricFamily]:
+        return self._families.get(name)
+
+    def families(self) -> List[MetricFamily]:
+        return list(self._families.values())
+
+    def collect(self) -> Dict[str, Any]:
+        """JSON-friendly snapshot of every metric"""
+        snapshot = {}
+        for family in self.families():
+            samples = []
+            for key, child in family.children():
+                labels = dict(zip(family.labelnames, key))
+                if family.kind == "histogram":
+                    counts, total = child.snapshot()
+                    samples.append({"labels": labels, "count": sum(counts), "sum": total})
+                else:
+                    samples.append({"labels": labels, "value": child.value})
+            snapshot[family.name] = {"type": family.kind, "help": family.documentation, "samples": samples}
+        return snapshot
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for family in self.families():
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for key, child in family.children():
+                if family.kind == "histogram":
+                    counts, total = child.snapshot()
+                    cumulative = 0
+                    for bound, count in zip(child.bounds, counts):
+                        cumulative += count
+                        labels = _format_labels(family.labelnames, key, f'le="{_format_value(bound)}"')
+                        lines.append(f"{family.name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(family.labelnames, key)
+                    lines.append(f"{family.name}_sum{labels} {_format_value(total)}")
+                    lines.append(f"{family.name}_count{labels} {cumulative}")
+                else:
+                    labels = _format_labels(family.labelnames, key)
+                    lines.append(f"{family.name}{labels} {_format_value(child.value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ProcessMetrics:
+    """
+    Process RSS, CPU time, CPU percent, threads and uptime, sampled on read
+
+    CPU percent is measured between consecutive reads (one core = 100%).
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.started = time.time()
+        self._last_sample = (time.monotonic(), self._cpu_seconds())
+        self._cpu_percent = 0.0
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+        registry.gauge("process_resident_memory_bytes", "Resident memory size in bytes").set_function(self.rss_bytes)
+        registry.gauge("process_cpu_seconds_total", "User and system CPU time in seconds").set_function(self._cpu_seconds)
+        registry.gauge("process_cpu_percent", "CPU usage since the previous sample").set_function(self.cpu_percent)
+        registry.gauge("process_threads", "Number of Python threads").set_function(threading.active_count)
+        registry.gauge("process_uptime_seconds", "Seconds since the metrics were set up").set_function(
+            lambda: time.time() - self.started
+        )
+
+    @staticmethod
+    def _cpu_seconds() -> float:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime + usage.ru_stime
+
+    def rss_bytes(self) -> float:
+        try:
+            with open("/proc/self/statm") as statm:
+                return float(int(statm.read().split()[1]) * self._page_size)
+        except (OSError, IndexError, ValueError):
+            # Peak RSS (kilobytes on Linux) where /proc is unavailable
+            return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+
+    def cpu_percent(self) -> float:
+        now, cpu = time.monotonic(), self._cpu_seconds()
+        last_time, last_cpu = self._last_sample
+        if now - last_time >= 0.1:
+            self._cpu_percent = 100.0 * (cpu - last_cpu) / (now - last_time)
+            self._last_sample = (now, cpu)
+        return self._cpu_percent
+
+
+class HTTPMetrics:
+    """Request counters, latency histogram, in-flight gauge and active clients"""
+
+    ROUTE_CACHE_SIZE = 4096
+    # Distinct route labels; later routes are counted as unmatched
+    MAX_ROUTES = 256
+
+    def __init__(self, registry: MetricsRegistry, client_window_s: float = 300.0):
+        self.registry = registry
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests by method, route and status", ("method", "path", "status")
+        )
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency", ("method", "path")
+        )
+        self.all_latency = registry.histogram("http_request_duration_all_seconds", "Latency of all HTTP requests")
+        self._all_latency = self.all_latency.labels()
+        self.in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being handled")
+        self.active_clients = registry.gauge("http_active_clients", "Distinct clients seen recently")
+        self.active_clients.set_function(self._active_client_count)
+        self.client_window_s = client_window_s
+        self._clients: Dict[str, float] = {}
+        self._routes: Dict[str, str] = {}
+        self._route_labels = set()
+
+    def observe(self, method: str, path: Optional[str], status: int, duration_s: float,
+                client: Optional[str] = None) -> None:
+        """
+        Record one request
+
+        ``path`` is the matched route or request path; None (no route
+        matched) is labelled UNMATCHED_ROUTE, as is any new route once
+        MAX_ROUTES labels exist. Methods outside HTTP_METHODS are labelled
+        OTHER_METHOD, so label cardinality stays bounded.
+        """
+        if method not in HTTP_METHODS:
+            method = OTHER_METHOD
+        route = self._routes.get(path) if path is not None else UNMATCHED_ROUTE
+        if route is None:
+            route = normalize_path(path)
+            if route not in self._route_labels:
+                if len(self._route_labels) < self.MAX_ROUTES:
+                    self._route_labels.add(route)
+                else:
+                    route = UNMATCHED_ROUTE
+            # Raw paths are unbounded (query strings, ids); only cache a few
+            if len(self._routes) < self.ROUTE_CACHE_SIZE:
+                self._routes[path] = route
+        self.requests.labels(method, route, str(status)).inc()
+        self.latency.labels(method, route).observe(duration_s)
+        self._all_latency.observe(duration_s)
+        if client is not None:
+            self._clients[client] = time.monotonic()
+
+    def count(self, path: str, method: Optional[str] = None, successful: bool = True) -> int:
+        """Requests served on a route, optionally only those with a 2xx/3xx status"""
+        route = normalize_path(path)
+        total = 0.0
+        for (child_method, child_path, status), counter in self.requests.children():
+            if child_path == route and method in (None, child_method) and (not successful or status[0] in "23"):
+                total += counter.value
+        return int(total)
+
+    def _active_client_count(self) -> float:
+        cutoff = time.monotonic() - self.client_window_s
+        clients = self._clients
+        for client, seen in list(clients.items()):
+            if seen < cutoff:
+                clients.pop(client, None)
+        return float(len(clients))
+
+    def analytics(self, top: int = 10) -> Dict[str, Any]:
+        """Dashboard summary of request and process metrics"""
+        histogram = self._all_latency
+        window_counts, _ = histogram.window()
+        recent = sum(window_counts)
+        counts, total = histogram.snapshot()
+        requests = sum(counts)
+
+        errors = 0.0
+        routes: Dict[str, float] = {}
+        for (method, path, status), counter in self.requests.children():
+            value = counter.value
+            if status.startswith("5"):
+                errors += value
+            routes[f"{method} {path}"] = routes.get(f"{method} {path}", 0.0) + value
+
+        def milliseconds(q: float, source: Sequence[int]) -> Optional[float]:
+            value = histogram.quantile(q, source)
+            return round(value * 1000.0, 2) if value is not None else None
+
+        process = {family.name: family.value for family in self.registry.families() if family.name.startswith("process_")}
+        memory_total = _memory_total_bytes()
+        rss = process.get("process_resident_memory_bytes", 0.0)
+        uptime = process.get("process_uptime_seconds", 0.0)
+
+        return {
+            "performance_metrics": {
+                "requests_total": int(requests),
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+                "mean_response_time_ms": round(1000.0 * total / requests, 2) if requests else None,
+                "p50_response_time_ms": milliseconds(0.5, window_counts),
+                "p95_response_time_ms": milliseconds(0.95, window_counts),
+                "p99_response_time_ms": milliseconds(0.99, window_counts),
+                "requests_per_second": round(recent / histogram.window_seconds, 3),
+                "window_seconds": histogram.window_seconds,
+                "system_uptime": format_duration(uptime),
+            },
+            "usage_statistics": {
+                "top_endpoints": [
+                    {"endpoint": route, "requests": int(count)}
+                    for route, count in sorted(routes.items(), key=lambda item: -item[1])[:top]
+                ],
+            },
+            "real_time_data": {
+                "current_cpu_usage": f"{process.get('process_cpu_percent', 0.0):.1f}%",
+                "memory_usage": f"{100.0 * rss / memory_total:.1f}%" if memory_total else None,
+                "resident_memory_mb": round(rss / 2 ** 20, 1),
+                "api_response_time": f"{milliseconds(0.5, window_counts) or 0:.1f}ms",
+                "requests_in_flight": int(self.in_flight.value),
+                "concurrent_users": int(self.active_clients.value),
+                "threads": int(process.get("process_threads", 0)),
+                "uptime_seconds": round(uptime, 1),
+            },
+        }
+
+
+def format_duration(seconds: float) -> str:
+    """Human-readable duration, e.g. '2 hours 15 minutes'"""
+    minutes = int(seconds // 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours} hours {minutes} minutes"
+    return f"{minutes} minutes {int(seconds % 60)} seconds"
+
+
+def _memory_total_bytes() -> Optional[float]:
+    try:
+        return float(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class MetricsHandlerMixin:
+    """
+    Instruments http.server request handlers: mix in before the handler base
+
+    Records method, route, status and latency of every request on the
+    handler's ``http_metrics`` (default: the process-wide HTTPMetrics).
+    Requests answered with 404 matched no route and are labelled as
+    unmatched rather than by their path.
+    """
+
+    http_metrics: Optional[HTTPMetrics] = None
+
+    def send_response(self, code, message=None):
+        self._metrics_status = code
+        super().send_response(code, message)
+
+    def handle_one_request(self):
+        metrics = self.http_metrics or get_http_metrics()
+        self._metrics_status = None
+        started = time.perf_counter()
+        metrics.in_flight.inc()
+        try:
+            super().handle_one_request()
+        finally:
+            metrics.in_flight.dec()
+            command = getattr(self, "command", None)
+            if command and self._metrics_status is not None:
+                path = self.path if self._metrics_status != 404 else None
+                metrics.observe(command, path, self._metrics_status,
+                                time.perf_counter() - started, self.client_address[0])
+            self.command = None
+
+    def serve_metrics(self):
+        """Serve the registry in Prometheus text format"""
+        body = (self.http_metrics or get_http_metrics()).registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_default_registry: Optional[MetricsRegistry] = None
+_default_http_metrics: Optional[HTTPMetrics] = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide registry (with process metrics registered)"""
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                registry = MetricsRegistry()
+                ProcessMetrics(registry)
+                _default_registry = registry
+    return _default_registry
+
+
+def get_http_metrics() -> HTTPMetrics:
+    """Process-wide HTTP metrics on the default registry"""
+    global _default_http_metrics
+    if _default_http_metrics is None:
+        registry = get_registry()
+        with _default_lock:
+            if _default_http_metrics is None:
+                _default_http_metrics = HTTPMetrics(registry)
+    return _default_http_metrics
@@ -0,0 +1,573 @@
+"""
+Knowledge retrieval for the Q&A endpoints
+
+Passages from the vehicle knowledge bases (ECUs, protocols, standards,
+software patterns), the code templates, the Markdown docs and any curated
+answers a server registers are indexed once in a BM25 inverted index.
+Postings are stored as flat arrays (CSR layout) holding the finished BM25
+weight of every (term, passage) pair, so a query is a handful of vector
+additions and a partial sort. The index is saved next to the other
+generated output and reused while the corpus is unchanged.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Iterable, Sequence, Tuple, Union
+
+import numpy as np
+
+
+INDEX_VERSION = 1
+
+# Curated answers outrank reference material matching the same terms
+KIND_BOOST = {"answer": 1.6, "knowledge": 1.25, "code": 1.0, "doc": 0.8}
+
+STOPWORDS = frozenset("""
+a about an and any are as at be been being but by can could did do does doing for from had has
+have how i if in into is it its me my of on or our should so than that the their them then there
+these they this those to us using via was we what when where which while who why will with would
+you your tell explain show give need want please use used
+""".split()) - {"can"}  # CAN is a bus here, not a verb
+
+_TOKEN = re.compile(r"[a-z]+|[0-9]+")
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_TITLE_NOISE = re.compile(r"[^\w\s().,:&/+'-]")
+_FENCE = re.compile(r"```(\w*)\n(.*?)```", re.S)
+
+
+def _stem(token: str) -> str:
+    """Fold plural forms ('ecus', 'batteries') onto the singular"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word and number tokens with stopwords removed and plurals folded"""
+    text = _CAMEL.sub(" ", text).lower()
+    return [_stem(token) for token in _TOKEN.findall(text) if token not in STOPWORDS]
+
+
+def normalize_question(question: str) -> str:
+    """Cache key: the question's distinct terms in sorted order"""
+    return _cache_key(tokenize(question))
+
+
+def _cache_key(tokens: List[str]) -> str:
+    return " ".join(sorted(set(tokens)))
+
+
+@dataclass
+class Passage:
+    """
+    One retrievable unit of knowledge
+
+    Args:
+        id: Unique identifier, e.g. 'ecu:brake' or 'doc:README.md#3'
+        title: Short heading shown with the passage
+        text: Answer text
+        source: Where the passage came from
+        kind: 'answer' (curated), 'knowledge', 'code' or 'doc'
+        topics: Related topics offered with the answer
+        code: Code example for the passage, if any
+        explanation: Why the answer or code fits
+        extra: Additional response fields returned verbatim
+    """
+    id: str
+    title: str
+    text: str
+    source: str
+    kind: str = "doc"
+    topics: List[str] = field(default_factory=list)
+    code: str = ""
+    explanation: str = ""
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def index_text(self) -> str:
+        parts = [self.title, self.title, " ".join(self.topics), self.text, self.explanation]
+        if self.kind == "code":
+            parts.append(self.code)
+        return "\n".join(parts)
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a list of passages
+
+    Args:
+        passages: Passages to index
+        k1: Term frequency saturation
+        b: Document length normalization
+    """
+
+    def __init__(self, passages: Sequence[Passage], k1: float = 1.5, b: float = 0.75):
+        self.passages = list(passages)
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(len(self.passages), dtype=np.int32)
+        for doc_id, passage in enumerate(self.passages):
+            tokens = tokenize(passage.index_text())
+            lengths[doc_id] = len(tokens)
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        count = max(len(self.passages), 1)
+        average = float(lengths.mean()) if len(self.passages) else 1.0
+        norm = k1 * (1.0 - b + b * lengths / max(average, 1.0))
+        boost = np.array([KIND_BOOST.get(p.kind, 1.0) for p in self.passages], dtype=np.float64)
+
+        self.terms = sorted(postings)
+        offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        doc_ids: List[np.ndarray] = []
+        weights: List[np.ndarray] = []
+        for term_id, term in enumerate(self.terms):
+            counts = postings[term]
+            ids = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+            tf = np.fromiter((counts[i] for i in ids), dtype=np.float64, count=len(ids))
+            idf = np.log(1.0 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+            doc_ids.append(ids)
+            weights.append(idf * tf * (k1 + 1.0) / (tf + norm[ids]) * boost[ids])
+            offsets[term_id + 1] = offsets[term_id] + len(ids)
+        self._set_arrays(
+            offsets,
+            np.concatenate(doc_ids) if doc_ids else np.zeros(0, dtype=np.int32),
+            np.concatenate(weights).astype(np.float32) if weights else np.zeros(0, dtype=np.float32),
+        )
+
+    def _set_arrays(self, offsets: np.ndarray, doc_ids: np.ndarray, weights: np.ndarray) -> None:
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.vocabulary = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.has_code = np.array([bool(p.code) for p in self.passages], dtype=bool)
+
+    def term_ids(self, tokens: Iterable[str]) -> List[int]:
+        vocabulary = self.vocabulary
+        return [vocabulary[token] for token in dict.fromkeys(tokens) if token in vocabulary]
+
+    def scores(self, term_ids: Sequence[int]) -> np.ndarray:
+        """BM25 score of every passage for the given (distinct) query terms"""
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        offsets, doc_ids, weights = self.offsets, self.doc_ids, self.weights
+        for term_id in term_ids:
+            start, end = offsets[term_id], offsets[term_id + 1]
+            # Doc ids are unique within a posting list, so fancy += is exact
+            scores[doc_ids[start:end]] += weights[start:end]
+        return scores
+
+    def matches(self, term_id: int, doc_id: int) -> bool:
+        ids = self.doc_ids[self.offsets[term_id]:self.offsets[term_id + 1]]
+        position = int(np.searchsorted(ids, doc_id))
+        return position < len(ids) and ids[position] == doc_id
+
+    @staticmethod
+    def top(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """(passage index, score) of the k best passages with a positive score"""
+        if k <= 0 or not len(scores):
+            return []
+        if k < len(scores):
+            candidates = np.argpartition(scores, -k)[-k:]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ranked if scores[i] > 0]
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Passage, float]]:
+        """Top-k passages for a free-text query"""
+        scores = self.scores(self.term_ids(tokenize(query)))
+        return [(self.passages[i], score) for i, score in self.top(scores, k)]
+
+    def save(self, path: Union[str, Path], fingerprint: str = "") -> None:
+        """Write the index to a single .npz file (atomically)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "version": INDEX_VERSION,
+            "fingerprint": fingerprint,
+            "k1": self.k1,
+            "b": self.b,
+            "terms": self.terms,
+            "passages": [asdict(passage) for passage in self.passages],
+        }
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), offsets=self.offsets,
+                     doc_ids=self.doc_ids, weights=self.weights)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Tuple["BM25Index", str]:
+        """
+        Read an index written by save()
+
+        Returns:
+            (index, fingerprint of the corpus it was built from)
+
+        Raises:
+            ValueError: If the file is not a readable index of this version
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                offsets, doc_ids, weights = data["offsets"], data["doc_ids"], data["weights"]
+        except (OSError, KeyError, ValueError) as e:
+            raise ValueError(f"Unreadable index {path}: {e}") from e
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Index {path} has version {meta.get('version')}, expected {INDEX_VERSION}")
+
+        index = cls.__new__(cls)
+        index.passages = [Passage(**passage) for passage in meta["passages"]]
+        index.k1, index.b, index.terms = meta["k1"], meta["b"], meta["terms"]
+        index._set_arrays(offsets, doc_ids, weights)
+        return index, meta["fingerprint"]
+
+
+def corpus_fingerprint(passages: Sequence[Passage], k1: float = 1.5, b: float = 0.75) -> str:
+    digest = hashlib.sha1(f"{INDEX_VERSION}:{k1}:{b}:{sorted(KIND_BOOST.items())}".encode())
+    for passage in passages:
+        digest.update(json.dumps(asdict(passage), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class QAEngine:
+    """
+    Question answering over a BM25Index with a response cache
+
+    Args:
+        index: Index to answer from
+        cache_size: Answers kept, keyed by the normalized question
+    """
+
+    def __init__(self, index: BM25Index, cache_size: int = 1024):
+        self.index = index
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load_or_build(cls, path: Optional[Union[str, Path]], passages: Sequence[Passage],
+                      cache_size: int = 1024) -> "QAEngine":
+        """
+        Reuse the index saved at ``path`` if it was built from the same
+        passages, otherwise build it and save it there
+        """
+        fingerprint = corpus_fingerprint(passages)
+        if path is not None and Path(path).exists():
+            try:
+                index, saved = BM25Index.load(path)
+                if saved == fingerprint:
+                    return cls(index, cache_size)
+            except ValueError:
+                pass
+        index = BM25Index(passages)
+        if path is not None:
+            try:
+                index.save(path, fingerprint)
+            except OSError:
+                # Read-only checkout: serve from memory
+                pass
+        return cls(index, cache_size)
+
+    def answer(self, question: str, k: int = 3) -> Optional[Dict[str, Any]]:
+        """
+        Best answer for a question
+
+        Args:
+            question: Free-text question
+            k: Number of passages returned with the answer
+
+        Returns:
+            Dictionary with answer, code_example, explanation, related_topics,
+            passages, confidence and extra fields of the best passage, or
+            None if no indexed term occurs in the question
+        """
+        started = time.perf_counter()
+        tokens = tokenize(question)
+        key = _cache_key(tokens)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                cached = self._cache[key]
+                if cached is None:
+                    return None
+                return dict(cached, cached=True, took_ms=round(1000.0 * (time.perf_counter() - started), 3))
+            self.misses += 1
+
+        response = self._answer(tokens, k)
+        if response is not None:
+            response["took_ms"] = round(1000.0 * (time.perf_counter() - started), 3)
+        with self._lock:
+            self._cache[key] = response
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    def _answer(self, tokens: List[str], k: int) -> Optional[Dict[str, Any]]:
+        index = self.index
+        term_ids = index.term_ids(tokens)
+        scores = index.scores(term_ids)
+        ranked = index.top(scores, k)
+        if not ranked:
+            return None
+
+        best_id, best_score = ranked[0]
+        best = index.passages[best_id]
+        code = best.code
+        code_source = best.title if code else None
+        if not code:
+            code_scores = np.where(index.has_code, scores, 0.0)
+            code_id = int(np.argmax(code_scores)) if len(code_scores) else 0
+            if len(code_scores) and code_scores[code_id] > 0:
+                code = index.passages[code_id].code
+                code_source = index.passages[code_id].title
+
+        related = list(best.topics)
+        for passage_id, _ in ranked[1:]:
+            related.append(index.passages[passage_id].title)
+        # Share of the question's known terms that the best passage contains
+        coverage = sum(index.matches(term_id, best_id) for term_id in term_ids) / len(term_ids)
+
+        return {
+            "answer": best.text,
+            "title": best.title,
+            "code_example": code,
+            "code_source": code_source,
+            "explanation": best.explanation or f"From {best.source}: {best.title}",
+            "related_topics": list(dict.fromkeys(related))[:6],
+            "passages": [
+                {
+                    "id": index.passages[passage_id].id,
+                    "title": index.passages[passage_id].title,
+                    "source": index.passages[passage_id].source,
+                    "kind": index.passages[passage_id].kind,
+                    "score": round(score, 3),
+                    "text": _snippet(index.passages[passage_id].text),
+                }
+                for passage_id, score in ranked
+            ],
+            "confidence": round(0.5 + 0.49 * float(coverage), 2),
+            "extra": dict(best.extra),
+            "cached": False,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "passages": len(self.index.passages),
+            "terms": len(self.index.terms),
+            "postings": int(len(self.index.doc_ids)),
+            "cache_entries": len(self._cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+class LazyQAEngine:
+    """
+    QAEngine loaded or built on first use
+
+    Lets servers define their engine at import time without building the
+    corpus or writing the index; call get() at startup to warm it.
+
+    Args:
+        path: Index file passed to QAEngine.load_or_build
+        passages: Returns the corpus; called once, on first use
+        cache_size: Answers kept by the engine
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]], passages: Callable[[], Sequence[Passage]],
+                 cache_size: int = 1024):
+        self.path = path
+        self.passages = passages
+        self.cache_size = cache_size
+        self._engine: Optional[QAEngine] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> QAEngine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = QAEngine.load_or_build(self.path, self.passages(), self.cache_size)
+        return self._engine
+
+    def answer(self, question: str, k: int = 3) -> Optional[Dict[str, Any]]:
+        return self.get().answer(question, k)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.get().stats()
+
+
+def _snippet(text: str, limit: int = 400) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit] + " ..."
+
+
+def _humanize(value: Any) -> str:
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, dict):
+        return ", ".join(f"{_humanize(k)} {_humanize(v)}" for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_humanize(item) for item in value)
+    return str(value).replace("_", " ")
+
+
+def _describe(entry: Dict[str, Any], skip: Sequence[str] = ("description", "name")) -> str:
+    """Render a knowledge-base entry as '<Key>: <value>.' sentences"""
+    return " ".join(
+        f"{key.replace('_', ' ').capitalize()}: {_humanize(value)}."
+        for key, value in entry.items() if key not in skip
+    )
+
+
+def markdown_passages(path: Union[str, Path], max_chars: int = 1200) -> List[Passage]:
+    """
+    Split a Markdown file into passages at headings
+
+    Long sections are cut at paragraph boundaries into chunks of about
+    ``max_chars``. A fenced C/C++ block in a section becomes its code example.
+    """
+    path = Path(path)
+    try:
+        content = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return []
+
+    sections: List[Tuple[str, List[str]]] = [(path.stem.replace("_", " ").title(), [])]
+    in_fence = False
+    for line in content.splitlines():
+        if line.startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else _HEADING.match(line)
+        if heading:
+            sections.append((_TITLE_NOISE.sub("", heading.group(2)).strip(" #"), []))
+        else:
+            sections[-1][1].append(line)
+
+    passages = []
+    for title, lines in sections:
+        body = "\n".join(lines).strip()
+        if len(tokenize(body)) < 8:
+            continue
+        code = ""
+        for language, block in _FENCE.findall(body):
+            if language.lower() in ("c", "cpp", "c++", "h"):
+                code = block.strip()
+                break
+        chunks, current = [], ""
+        for paragraph in re.split(r"\n\s*\n", body):
+            if current and len(current) + len(paragraph) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        chunks.append(current)
+        for chunk in chunks:
+            passages.append(Passage(
+                id=f"doc:{path.name}#{len(passages)}",
+                title=title,
+                text=chunk.strip(),
+                source=path.name,
+                kind="doc",
+                code=code,
+            ))
+    return passages
+
+
+def build_knowledge_corpus(config: Optional[Any] = None, docs_dir: Optional[Union[str, Path]] = None,
+                           extra: Iterable[Passage] = ()) -> List[Passage]:
+    """
+    Collect the passages indexed for the Q&A endpoints
+
+    Args:
+        config: CopilotConfig for the knowledge-base classes (default config)
+        docs_dir: Directory whose *.md files are indexed (default: repository root)
+        extra: Curated passages to index as well, e.g. a server's own answers
+
+    Returns:
+        List of passages
+    """
+    from ai_copilot.config import CopilotConfig
+    from vehicle_context import VehicleContextManager, ProtocolManager, StandardsChecker
+    from code_generation import TemplateManager
+
+    config = config or CopilotConfig()
+    passages = list(extra)
+    context = VehicleContextManager(config)
+
+    for name, ecu in context.ecu_knowledge.items():
+        passages.append(Passage(
+            id=f"ecu:{name}",
+            title=ecu.get("description", name),
+            text=f"The {name} ECU ({ecu.get('description', name)}). {_describe(ecu)}",
+            source="vehicle_context.ecu_knowledge",
+            kind="knowledge",
+            topics=[_humanize(function).title() for function in ecu.get("typical_functions", [])],
+        ))
+
+    specs = ProtocolManager(config).protocols
+    for name in dict.fromkeys(list(context.protocol_knowledge) + list(specs)):
+        knowledge, spec = context.protocol_knowledge.get(name, {}), specs.get(name, {})
+        description = knowledge.get("description") or spec.get("name") or name
+        passages.append(Passage(
+            id=f"protocol:{name}",
+            title=f"{name} ({description})",
+            text=f"{name}: {description}. {_describe(knowledge)} {_describe(spec)}".strip(),
+            source="vehicle_context.protocols",
+            kind="knowledge",
+            topics=[_humanize(usage).title() for usage in knowledge.get("typical_usage", [])],
+        ))
+
+    for name, patterns in context.automotive_patterns.items():
+        title = _humanize(name).capitalize()
+        passages.append(Passage(
+            id=f"pattern:{name}",
+            title=title,
+            text=f"{title} used in automotive embedded software: {_humanize(patterns)}.",
+            source="vehicle_context.automotive_patterns",
+            kind="knowledge",
+            topics=[_humanize(pattern).title() for pattern in patterns],
+        ))
+
+    for name, standard in StandardsChecker(config).standards.items():
+        title = f"{name} ({standard['name']})" if "name" in standard else name
+        passages.append(Passage(
+            id=f"standard:{name}",
+            title=title,
+            text=f"{title}. {_describe(standard)}",
+            source="vehicle_context.standards",
+            kind="knowledge",
+        ))
+
+    templates = TemplateManager()
+    for name in templates.list_templates():
+        title = f"{_humanize(name).title()} template"
+        passages.append(Passage(
+            id=f"template:{name}",
+            title=title,
+            text=f"Code template '{name}' for {_humanize(name)} in embedded C.",
+            source="code_generation.templates",
+            kind="code",
+            code=templates.get_template(name).strip(),
+        ))
+
+    docs_dir = Path(docs_dir) if docs_dir is not None else Path(__file__).resolve().parent.parent
+    for path in sorted(docs_dir.glob("*.md")):
+        passages.extend(markdown_passages(path))
+    return passages
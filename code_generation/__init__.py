@@ -5,8 +5,27 @@ This module handles AI-powered code generation for embedded systems,
 with specific focus on automotive and real-time constraints.
 """
 
-from .generator import CodeGenerator
-from .templates import TemplateManager
-from .validators import CodeValidator
+from .generator import CodeGenerator, GenerationReport
+from .templates import TemplateManager, CompiledTemplate, TemplateError
+from .validators import CodeValidator, ValidationResult
+from .fixups import FixupEngine, FixResult
+from .formatter import CodeFormatter
+from .signal_codec import SignalCodecGenerator
+from .project import ProjectGenerator, ProjectFile, ArchiveWriter
 
-__all__ = ["CodeGenerator", "TemplateManager", "CodeValidator"]
+__all__ = [
+    "CodeGenerator",
+    "GenerationReport",
+    "TemplateManager",
+    "CompiledTemplate",
+    "TemplateError",
+    "CodeValidator",
+    "ValidationResult",
+    "FixupEngine",
+    "FixResult",
+    "CodeFormatter",
+    "SignalCodecGenerator",
+    "ProjectGenerator",
+    "ProjectFile",
+    "ArchiveWriter",
+]
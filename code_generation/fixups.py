@@ -0,0 +1,89 @@
+"""
+Fix-ups for issues found by CodeValidator
+
+Each fixer turns the ranges CodeValidator flagged for one kind of issue
+into Edits on the source; the rest of the file is never scanned. All edits
+are applied together in one splice, and each carries an explanation of
+what was changed.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from embedded_integration.source_parser import Edit, apply_edits
+from .validators import ValidationResult
+
+
+@dataclass
+class FixResult:
+    """Code after fix-ups, with the edits that were applied"""
+    code: str
+    edits: List[Edit]
+
+    @property
+    def explanations(self) -> List[str]:
+        return [edit.explanation for edit in self.edits]
+
+
+Fixer = Callable[[str, List[Tuple[int, int]], ValidationResult], List[Edit]]
+
+
+class FixupEngine:
+    """
+    Plans and applies edits for fixable validation issues
+
+    Fixers are registered per range kind of ValidationResult.ranges.
+    """
+
+    def __init__(self):
+        self.fixers: Dict[str, Fixer] = {
+            "missing_includes": self._insert_includes,
+            "missing_semicolon": self._add_semicolons,
+        }
+
+    def plan(self, code: str, validation_result: ValidationResult) -> List[Edit]:
+        """Edits for the flagged ranges, without changing the code"""
+        edits: List[Edit] = []
+        for kind, ranges in validation_result.ranges.items():
+            fixer = self.fixers.get(kind)
+            if fixer is not None and ranges:
+                edits.extend(fixer(code, ranges, validation_result))
+        return edits
+
+    def apply(self, code: str, validation_result: ValidationResult) -> FixResult:
+        """
+        Fix the flagged issues
+
+        Args:
+            code: Code that was validated
+            validation_result: CodeValidator result for exactly this code
+
+        Returns:
+            FixResult with the fixed code and the applied edits
+        """
+        edits = self.plan(code, validation_result)
+        return FixResult(code=apply_edits(code, edits), edits=edits)
+
+    @staticmethod
+    def _insert_includes(code: str, ranges: List[Tuple[int, int]],
+                         validation_result: ValidationResult) -> List[Edit]:
+        position = ranges[0][0]
+        # After an existing #include the insertion starts a new line
+        after_line = position > 0 and code[position - 1] != "\n"
+        return [
+            Edit(position, position,
+                 f"\n#include <{include}>" if after_line else f"#include <{include}>\n",
+                 f"Added #include <{include}> for identifiers it declares")
+            for include in validation_result.issues.get("missing_includes", [])
+        ]
+
+    @staticmethod
+    def _add_semicolons(code: str, ranges: List[Tuple[int, int]],
+                        validation_result: ValidationResult) -> List[Edit]:
+        edits = []
+        line, counted = 1, 0
+        for _, end in sorted(ranges):
+            line += code.count("\n", counted, end)
+            counted = end
+            edits.append(Edit(end, end, ";", f"Added missing semicolon at line {line}"))
+        return edits
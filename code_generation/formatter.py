@@ -0,0 +1,200 @@
+"""
+Streaming formatter for generated C/C++ code
+
+Code is tokenized once, line by line, as it arrives. Only the current
+partial line is buffered, so a module streamed from the model backend
+can be formatted chunk by chunk and the formatted text forwarded before
+generation has finished.
+"""
+
+import re
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Tuple
+
+
+# String and character literals (possibly unterminated), comment openers
+# and braces; everything else on a line is skipped by the search
+_TOKENS = re.compile(r'"(?:\\.|[^"\\])*"?|\'(?:\\.|[^\'\\])*\'?|//|/\*|[{}]')
+_SPECIAL = re.compile(r'["\'/{}]')
+
+
+class CodeFormatter:
+    """
+    Re-indents C-like code by brace depth and collapses blank-line runs
+
+    Braces inside strings, character literals and comments are ignored.
+    Closing braces at the start of a line dedent that line, so
+    ``} else {`` stays at the level of its ``if``. Preprocessor lines and
+    their continuations are left at column 0. Leading and trailing blank
+    lines are dropped and the output has no trailing newline.
+
+    Args:
+        indent: Text for one indentation level
+    """
+
+    def __init__(self, indent: str = "    "):
+        self.indent = indent
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the state of a previous stream"""
+        self._partial = ""
+        self._level = 0
+        self._in_comment = False
+        self._directive = False
+        self._started = False
+        self._blank = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Format the complete lines in a chunk of code
+
+        Args:
+            chunk: Next piece of the input; may end mid-line
+
+        Returns:
+            Formatted text for the lines completed by this chunk
+        """
+        last = chunk.rfind("\n")
+        if last < 0:
+            self._partial += chunk
+            return ""
+        if self._partial:
+            last += len(self._partial)
+            chunk = self._partial + chunk
+        self._partial = chunk[last + 1:]
+        return self._format(chunk, last)
+
+    def finish(self) -> str:
+        """Format the last partial line and reset for the next stream"""
+        text = self._format(self._partial, len(self._partial)) if self._partial else ""
+        self.reset()
+        return text
+
+    def format(self, code: str) -> str:
+        """Format a complete piece of code"""
+        self.reset()
+        return self.feed(code) + self.finish()
+
+    def format_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Format code arriving in chunks, yielding formatted text as lines complete"""
+        self.reset()
+        for chunk in chunks:
+            text = self.feed(chunk)
+            if text:
+                yield text
+        text = self.finish()
+        if text:
+            yield text
+
+    async def format_async(self, chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+        """Async variant of format_stream, e.g. for tokens streamed from a model"""
+        self.reset()
+        async for chunk in chunks:
+            text = self.feed(chunk)
+            if text:
+                yield text
+        text = self.finish()
+        if text:
+            yield text
+
+    def _format(self, text: str, stop: int) -> str:
+        """Format the lines of text[:stop]; the last one ends at stop"""
+        indent = self.indent
+        level = self._level
+        in_comment = self._in_comment
+        directive = self._directive
+        separator = "\n\n" if self._blank else ("\n" if self._started else "")
+        out: List[str] = []
+        append = out.append
+        start = 0
+        while start <= stop:
+            end = text.find("\n", start, stop)
+            if end < 0:
+                end = stop
+            stripped = text[start:end].strip()
+            if not stripped:
+                # Emitted only if more code follows, which drops trailing blanks
+                if separator:
+                    separator = "\n\n"
+                directive = False
+            elif directive or (not in_comment and stripped[0] == "#"):
+                # Preprocessor directive; a trailing backslash continues it
+                line = text[start:end].rstrip() if directive else stripped
+                directive = line[-1] == "\\"
+                append(separator + line)
+                separator = "\n"
+            else:
+                if in_comment or _SPECIAL.search(stripped) is not None:
+                    continuation = in_comment and stripped[0] == "*"
+                    leading, delta, in_comment = _scan(stripped, in_comment)
+                    if continuation:
+                        # Block comment continuation, aligned under the opening "/*"
+                        stripped = " " + stripped
+                    if leading:
+                        append(separator + indent * max(0, level - leading) + stripped)
+                    else:
+                        append(separator + indent * level + stripped)
+                    level = max(0, level + delta)
+                else:
+                    append(separator + indent * level + stripped)
+                separator = "\n"
+            start = end + 1
+
+        self._level = level
+        self._in_comment = in_comment
+        self._directive = directive
+        self._started = bool(separator)
+        self._blank = separator == "\n\n"
+        return "".join(out)
+
+
+def _scan(line: str, in_comment: bool) -> Tuple[int, int, bool]:
+    """
+    Tokenize one stripped line
+
+    Returns:
+        (leading closing braces, net brace depth change, inside a block
+        comment at the end of the line)
+    """
+    if not in_comment and '"' not in line and "'" not in line and "/*" not in line:
+        # No literals or block comments: count the braces before any "//"
+        code = line.partition("//")[0]
+        leading = 0
+        if code[:1] == "}":
+            leading = code[:len(code) - len(code.lstrip("} \t"))].count("}")
+        return leading, code.count("{") - code.count("}"), False
+
+    leading = 0
+    delta = 0
+    code_seen = False
+    position = 0
+    length = len(line)
+    while position < length:
+        if in_comment:
+            end = line.find("*/", position)
+            if end < 0:
+                break
+            in_comment = False
+            position = end + 2
+            continue
+        match = _TOKENS.search(line, position)
+        if match is None:
+            break
+        if not code_seen and line[position:match.start()].strip():
+            code_seen = True
+        token = match.group()
+        position = match.end()
+        if token == "//":
+            break
+        if token == "/*":
+            in_comment = True
+        elif token == "{":
+            delta += 1
+            code_seen = True
+        elif token == "}":
+            delta -= 1
+            if not code_seen:
+                leading += 1
+        else:
+            code_seen = True
+    return leading, delta, in_comment
@@ -3,16 +3,34 @@ AI-powered code generator for embedded systems
 """
 
 import asyncio
+import time
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
-import re
 from pathlib import Path
 
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
 
 from ai_copilot.config import CopilotConfig
-from .templates import TemplateManager
-from .validators import CodeValidator
+from .templates import TemplateManager, CompiledTemplate, TemplateError
+from .formatter import CodeFormatter
+from .validators import CodeValidator, ValidationResult
+from .fixups import FixupEngine
+from .signal_codec import SignalCodecGenerator
+from embedded_integration.source_parser import Edit
+
+
+@dataclass
+class GenerationReport:
+    """Generated code with its final validation, the fixes applied and its analysis"""
+    code: str
+    validation: ValidationResult
+    fixes: List[Edit] = field(default_factory=list)
+    iterations: int = 0
+    # False if the iteration or time budget ran out with fixable issues left
+    converged: bool = True
+    analysis: Optional[Dict[str, Any]] = None
+    elapsed_ms: float = 0.0
 
 
 class CodeGenerator:
@@ -24,6 +42,7 @@ class CodeGenerator:
         self.config = config
         self.template_manager = TemplateManager()
         self.validator = CodeValidator(config)
+        self.fixup_engine = FixupEngine()
         
         # Code generation prompts for different contexts
         self.prompts = {
@@ -78,6 +97,18 @@ Requirements:
 Generated code:
 """
         }
+        
+        # Values for prompt fields that neither the request nor the context sets
+        self.prompt_defaults = {
+            "component_type": "generic_component",
+            "interfaces": "input_port, output_port",
+            "protocol_type": "CAN",
+            "message_id": "0x123",
+            "data_length": "8"
+        }
+        self._compiled_prompts: Dict[str, CompiledTemplate] = {}
+        for key in self.prompts:
+            self._prompt_template(key)
     
     async def generate(self, request, context_info: Dict[str, Any]) -> str:
         """
@@ -90,6 +121,31 @@ Generated code:
         Returns:
             Generated code as string
         """
+        report = await self.generate_report(request, context_info)
+        return report.code
+    
+    async def generate_report(self, request, context_info: Dict[str, Any], analyzer=None,
+                              analysis_constraints: Optional[Dict[str, Any]] = None) -> GenerationReport:
+        """
+        Generate, validate and repair code, then analyze the result once
+        
+        The repair loop applies the validator's fix-ups and re-validates
+        until nothing fixable is left, config.repair_max_iterations passes
+        have run or config.repair_budget_ms has elapsed. Only regions
+        changed by a pass are validated again, and validation and analysis
+        share one parse of each version of the code.
+        
+        Args:
+            request: CodeRequest object
+            context_info: Context information from vehicle context manager
+            analyzer: EmbeddedAnalyzer run on the final code (optional)
+            analysis_constraints: Constraints passed to the analyzer
+            
+        Returns:
+            GenerationReport with the code, its validation and analysis
+        """
+        started = time.perf_counter()
+        
         # Determine the appropriate prompt template
         prompt_key = self._select_prompt_template(request, context_info)
         
@@ -102,14 +158,77 @@ Generated code:
         # Post-process and validate
         processed_code = self._post_process_code(generated_code, request)
         
-        # Validate the generated code
-        validation_result = await self.validator.validate(processed_code, request)
+        # Append pack/unpack code for messages from the request's DBC file
+        dbc_codec = self._generate_dbc_codec(request)
+        if dbc_codec:
+            processed_code = processed_code.rstrip() + "\n\n" + dbc_codec
+        
+        report = await self._repair(processed_code, request)
+        
+        if analyzer is not None:
+            report.analysis = await analyzer.analyze_code(report.code, analysis_constraints)
+        report.elapsed_ms = 1000.0 * (time.perf_counter() - started)
+        return report
+    
+    async def _repair(self, code: str, request) -> GenerationReport:
+        """
+        Validate and fix code until it converges or the budget runs out
+        
+        The budget covers the repair loop only, not model generation, and
+        the first pass always runs so a slow model cannot starve it.
+        """
+        deadline = time.perf_counter() + self.config.repair_budget_ms / 1000.0
+        validation = await self.validator.validate(code, request)
+        report = GenerationReport(code=code, validation=validation)
+        
+        # Issues without ranges are not automatically fixable
+        while validation.ranges:
+            out_of_time = report.iterations > 0 and time.perf_counter() >= deadline
+            if report.iterations >= self.config.repair_max_iterations or out_of_time:
+                report.converged = False
+                break
+            fixed = self.fixup_engine.apply(code, validation)
+            if not fixed.edits:
+                break
+            code = fixed.code
+            report.fixes.extend(fixed.edits)
+            report.iterations += 1
+            validation = await self.validator.validate(code, request)
+        
+        report.code = code
+        report.validation = validation
+        return report
+    
+    def _generate_dbc_codec(self, request) -> str:
+        """Generate signal pack/unpack code when the request names a DBC file"""
+        constraints = request.constraints or {}
+        dbc_path = constraints.get("dbc") or constraints.get("can", {}).get("dbc")
+        if not dbc_path:
+            return ""
+        
+        from vehicle_context.signal_db import load_signal_database, resolve_dbc_path
         
-        if not validation_result.is_valid:
-            # Try to fix common issues
-            processed_code = self._fix_common_issues(processed_code, validation_result)
+        database = load_signal_database(resolve_dbc_path(dbc_path, self.config.dbc_dir))
+        return self.generate_signal_codec(
+            database,
+            messages=constraints.get("dbc_messages"),
+            node=constraints.get("dbc_node")
+        )
+    
+    def generate_signal_codec(self, database, messages: Optional[List[Any]] = None,
+                              node: Optional[str] = None) -> str:
+        """
+        Generate C pack/unpack functions from a signal database
         
-        return processed_code
+        Args:
+            database: SignalDatabase with the message definitions
+            messages: Frame IDs or message names (default: all messages)
+            node: Only messages sent or received by this ECU node
+            
+        Returns:
+            Generated C code
+        """
+        return SignalCodecGenerator(database).generate(messages, node)
     
     def _select_prompt_template(self, request, context_info: Dict[str, Any]) -> str:
         """Select appropriate prompt template based on request context"""
@@ -123,44 +242,43 @@ Generated code:
         else:
             return "embedded_c"
     
+    def _prompt_template(self, prompt_key: str) -> CompiledTemplate:
+        """Compiled prompt, recompiled if its text in self.prompts was replaced"""
+        source = self.prompts[prompt_key]
+        compiled = self._compiled_prompts.get(prompt_key)
+        if compiled is None or compiled.source is not source:
+            compiled = CompiledTemplate(f"prompt:{prompt_key}", source, syntax="format")
+            self._compiled_prompts[prompt_key] = compiled
+        return compiled
+    
     def _build_prompt(self, prompt_key: str, request, context_info: Dict[str, Any]) -> str:
         """Build the complete prompt for code generation"""
         
-        prompt_template = self.prompts[prompt_key]
+        prompt_template = self._prompt_template(prompt_key)
         
-        # Prepare template variables
-        template_vars = {
+        # Only the prompt's own fields are looked up: request constraints
+        # override the context, which overrides the request and configuration
+        embedded = self.config.embedded
+        base_vars = {
             "description": request.description,
             "target_platform": request.target_platform or "ARM Cortex-M",
-            "flash_kb": self.config.embedded.memory_constraints.get("flash_kb", 512),
-            "ram_kb": self.config.embedded.memory_constraints.get("ram_kb", 64),
-            "real_time": "Yes" if self.config.embedded.real_time_requirements else "No",
-            "safety_level": self.config.embedded.safety_level,
+            "flash_kb": embedded.memory_constraints.get("flash_kb", 512),
+            "ram_kb": embedded.memory_constraints.get("ram_kb", 64),
+            "real_time": "Yes" if embedded.real_time_requirements else "No",
+            "safety_level": embedded.safety_level,
         }
+        sources = (request.constraints or {}, context_info or {}, base_vars, self.prompt_defaults)
         
-        # Add context-specific variables
-        if context_info:
-            template_vars.update(context_info)
-
-        # Add request-specific constraints
-        if request.constraints:
-            template_vars.update(request.constraints)
-
-        # Add default values for missing template variables
-        default_values = {
-            "component_type": "generic_component",
-            "interfaces": "input_port, output_port",
-            "protocol_type": "CAN",
-            "message_id": "0x123",
-            "data_length": "8"
-        }
-
-        for key, default_value in default_values.items():
-            if key not in template_vars:
-                template_vars[key] = default_value
+        values = []
+        for slot in prompt_template.slots:
+            for source in sources:
+                if slot in source:
+                    values.append(source[slot])
+                    break
+            else:
+                raise TemplateError(f"Prompt {prompt_key!r} has no value for {slot!r}")
+        return prompt_template.render_values(values)
 
-        return prompt_template.format(**template_vars)
-    
     async def _generate_with_model(self, prompt: str) -> str:
         """Generate code using the AI model"""
         
@@ -311,10 +429,7 @@ void error_handler(uint8_t error_code) {
     def _post_process_code(self, code: str, request) -> str:
         """Post-process generated code"""
         
-        # Remove any unwanted prefixes/suffixes from model output
-        code = code.strip()
-        
-        # Ensure proper formatting
+        # Ensure proper formatting; also drops leading and trailing blank lines
         code = self._format_code(code)
         
         # Add header comments if requested
@@ -324,32 +439,8 @@ void error_handler(uint8_t error_code) {
         return code
     
     def _format_code(self, code: str) -> str:
-        """Basic code formatting"""
-        # Remove extra blank lines
-        code = re.sub(r'\n\s*\n\s*\n', '\n\n', code)
-        
-        # Ensure consistent indentation (basic)
-        lines = code.split('\n')
-        formatted_lines = []
-        indent_level = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                formatted_lines.append('')
-                continue
-                
-            # Adjust indent level
-            if stripped.endswith('{'):
-                formatted_lines.append('    ' * indent_level + stripped)
-                indent_level += 1
-            elif stripped.startswith('}'):
-                indent_level = max(0, indent_level - 1)
-                formatted_lines.append('    ' * indent_level + stripped)
-            else:
-                formatted_lines.append('    ' * indent_level + stripped)
-        
-        return '\n'.join(formatted_lines)
+        """Re-indent code and collapse blank-line runs in a single pass"""
+        return CodeFormatter().format(code)
     
     def _add_header_comment(self, code: str, request) -> str:
         """Add header comment to generated code"""
@@ -366,20 +457,6 @@ void error_handler(uint8_t error_code) {
 '''
         return header + code
     
-    def _fix_common_issues(self, code: str, validation_result) -> str:
-        """Fix common code generation issues"""
-        
-        # Add missing includes
-        if "missing_includes" in validation_result.issues:
-            for include in validation_result.issues["missing_includes"]:
-                if f'#include "{include}"' not in code and f'#include <{include}>' not in code:
-                    code = f'#include <{include}>\n' + code
-        
-        # Fix missing semicolons (basic)
-        code = re.sub(r'(\w+)\s*$', r'\1;', code, flags=re.MULTILINE)
-        
-        return code
-    
     async def get_completions(self, partial_code: str, cursor_position: int) -> List[str]:
         """Get code completion suggestions"""
         
@@ -0,0 +1,365 @@
+"""
+Multi-file ECU module project generation
+
+A project is a module tree: public header and module source, AUTOSAR RTE
+port stubs, the application logic from CodeGenerator, a pack/unpack codec
+when the request names a DBC file, unit tests (when ``generate_tests`` is
+on) and a CMake build. Files are rendered concurrently but written to the
+archive in plan order, with at most ``window`` rendered files waiting, so
+a tar or zip archive is streamed out chunk by chunk instead of being built
+in memory.
+"""
+
+import asyncio
+import dataclasses
+import functools
+import inspect
+import io
+import re
+import tarfile
+import time
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, AsyncIterator, Awaitable, Callable, Tuple, Union
+
+from .templates import TemplateManager
+from .signal_codec import SignalCodecGenerator, _snake_case
+
+
+ARCHIVE_FORMATS = {
+    "tar.gz": "application/gzip",
+    "tar": "application/x-tar",
+    "zip": "application/zip",
+}
+
+# Words that make poor module names
+_FILLER = frozenset(
+    "a an the for of to and with in on using generate create implement write code module "
+    "ecu system function functions that which".split()
+)
+
+
+@dataclass
+class ProjectFile:
+    """
+    One file of a generated project
+
+    Args:
+        path: Path inside the project root
+        kind: 'header', 'source', 'rte', 'codec', 'test' or 'build'
+        render: Returns the file text; may be a coroutine function
+    """
+    path: str
+    kind: str
+    render: Callable[[], Union[str, Awaitable[str]]]
+
+
+class ArchiveWriter:
+    """
+    Writes files to a tar, tar.gz or zip stream
+
+    Each call returns the archive bytes produced so far, so the caller can
+    forward them (to a socket, a response or a file) and drop them.
+
+    Args:
+        archive_format: 'tar.gz', 'tar' or 'zip'
+        mtime: Modification time stored for every entry (default: now)
+    """
+
+    def __init__(self, archive_format: str = "tar.gz", mtime: Optional[float] = None):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {archive_format!r}")
+        self.archive_format = archive_format
+        self.mtime = time.time() if mtime is None else mtime
+        self._sink = _ChunkSink()
+        if archive_format == "zip":
+            self._archive = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            mode = "w|gz" if archive_format == "tar.gz" else "w|"
+            self._archive = tarfile.open(fileobj=self._sink, mode=mode)
+
+    def add(self, path: str, data: bytes) -> bytes:
+        """Append a file; returns the archive bytes written since the last call"""
+        if self.archive_format == "zip":
+            info = zipfile.ZipInfo(path, time.localtime(self.mtime)[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            info.mtime = int(self.mtime)
+            info.mode = 0o644
+            self._archive.addfile(info, io.BytesIO(data))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Finish the archive; returns the remaining bytes"""
+        self._archive.close()
+        return self._sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable stream collecting what the archive writes"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+class ProjectGenerator:
+    """
+    Generates an ECU module project and streams it as an archive
+
+    Args:
+        code_generator: CodeGenerator for the application logic
+        template_manager: Templates for the project files (default: the
+            code generator's)
+        signal_database: SignalDatabase for the codec when a request does
+            not name a DBC file
+    """
+
+    def __init__(self, code_generator, template_manager: Optional[TemplateManager] = None,
+                 signal_database: Optional[Any] = None):
+        self.code_generator = code_generator
+        self.config = code_generator.config
+        self.template_manager = template_manager or code_generator.template_manager
+        self.signal_database = signal_database
+
+    def _render_template(self, name: str, **parameters: Any) -> str:
+        return self.template_manager.compile(name).render(parameters)
+
+    @staticmethod
+    def module_name(request) -> str:
+        """C identifier for the module, from constraints['module_name'] or the description"""
+        name = (request.constraints or {}).get("module_name")
+        if not name:
+            words = [word for word in re.findall(r"[A-Za-z0-9]+", request.description.lower())
+                     if word not in _FILLER]
+            name = "_".join(words[:3]) or "ecu_module"
+        return _snake_case(name)
+
+    def plan(self, request, context_info: Optional[Dict[str, Any]] = None) -> List[ProjectFile]:
+        """
+        List the project's files without rendering them
+
+        Args:
+            request: CodeRequest; constraints may set module_name, ports
+                ({'inputs': [...], 'outputs': [...]}), cycle_time_ms,
+                generate_tests and dbc/dbc_messages/dbc_node (dbc is a file
+                in config.dbc_dir)
+            context_info: Context from the vehicle context manager
+
+        Returns:
+            Files in archive order
+        """
+        constraints = request.constraints or {}
+        context_info = context_info or {}
+        module = self.module_name(request)
+        component = "".join(part.capitalize() for part in module.split("_"))
+        guard = module.upper()
+        description = " ".join(request.description.split()).replace("*/", "* /")
+        ports = constraints.get("ports") or {}
+        inputs = [_camel_identifier(port) for port in ports.get("inputs", ["InputPort"])]
+        outputs = [_camel_identifier(port) for port in ports.get("outputs", ["OutputPort"])]
+        generate_tests = constraints.get("generate_tests", self.config.generate_tests)
+
+        codec = None
+        codec_messages = constraints.get("dbc_messages")
+        codec_node = constraints.get("dbc_node")
+        dbc_path = constraints.get("dbc") or (constraints.get("can") or {}).get("dbc")
+        if dbc_path:
+            from vehicle_context.signal_db import load_signal_database, resolve_dbc_path
+            dbc_path = resolve_dbc_path(dbc_path, self.config.dbc_dir)
+            codec = SignalCodecGenerator(load_signal_database(dbc_path))
+        elif self.signal_database is not None:
+            codec = SignalCodecGenerator(self.signal_database)
+
+        common = {"module": module, "component": component, "guard": guard, "description": description}
+        files = [
+            ProjectFile(f"include/{module}.h", "header", lambda: self._render_template(
+                "module_header", cycle_time_ms=int(constraints.get("cycle_time_ms", 10)), **common)),
+            ProjectFile(f"src/{module}.c", "source", lambda: self._render_template(
+                "module_source", runnable_body=_runnable_body(inputs, outputs), **common)),
+            ProjectFile(f"src/{module}_logic.c", "source",
+                        functools.partial(self._generate_logic, request, context_info)),
+            ProjectFile(f"rte/Rte_{component}.h", "rte", lambda: self._render_template(
+                "rte_header", port_declarations=_port_declarations(inputs, outputs), **common)),
+            ProjectFile(f"rte/Rte_{component}.c", "rte", lambda: self._render_template(
+                "rte_source", port_definitions=_port_definitions(inputs, outputs), **common)),
+        ]
+        sources = [f"src/{module}.c", f"rte/Rte_{component}.c"]
+
+        if codec is not None:
+            header = f"{module}_codec.h"
+            files.append(ProjectFile(f"include/{header}", "codec", lambda: codec.generate_header(
+                f"{guard}_CODEC_H", codec_messages, codec_node)))
+            files.append(ProjectFile(f"src/{module}_codec.c", "codec", lambda: codec.generate_source(
+                header, codec_messages, codec_node)))
+            sources.append(f"src/{module}_codec.c")
+
+        if generate_tests:
+            prefixes = codec.message_prefixes(codec_messages, codec_node) if codec is not None else []
+            files.append(ProjectFile(f"test/test_{module}.c", "test", lambda: self._render_unit_test(
+                common, inputs, outputs, prefixes)))
+
+        tests = ""
+        if generate_tests:
+            tests = (
+                f"\nenable_testing()\n"
+                f"add_executable(test_{module} test/test_{module}.c)\n"
+                f"target_link_libraries(test_{module} {module})\n"
+                f"add_test(NAME test_{module} COMMAND test_{module})\n"
+            )
+        files.append(ProjectFile("CMakeLists.txt", "build", lambda: self._render_template(
+            "cmake_project", sources="\n".join(f"    {path}" for path in sources), tests=tests, **common)))
+        return files
+
+    async def _generate_logic(self, request, context_info: Dict[str, Any]) -> str:
+        constraints = dict(request.constraints or {})
+        # The codec has its own files; keep it out of the logic source
+        constraints.pop("dbc", None)
+        if isinstance(constraints.get("can"), dict):
+            constraints["can"] = {k: v for k, v in constraints["can"].items() if k != "dbc"}
+        logic_request = dataclasses.replace(request, constraints=constraints)
+        return await self.code_generator.generate(logic_request, context_info)
+
+    def _render_unit_test(self, common: Dict[str, str], inputs: List[str], outputs: List[str],
+                          prefixes: List[str]) -> str:
+        checks = [f"    Rte_Stub_{port} = 0x2Au;" for port in inputs]
+        checks.append(f"    CHECK({common['module']}_main_function() == {common['guard']}_OK);")
+        expected = "0x2Au" if inputs else "0u"
+        checks.extend(f"    CHECK(Rte_Stub_{port} == {expected});" for port in outputs)
+        return self._render_template(
+            "unit_test",
+            extra_includes=f'#include "{common["module"]}_codec.h"\n' if prefixes else "",
+            main_function_test="\n".join(checks),
+            extra_tests="".join(
+                self._render_template("codec_roundtrip_test", prefix=prefix, macro=prefix.upper())
+                for prefix in prefixes
+            ),
+            extra_calls="".join(f"    test_{prefix}_roundtrip();\n" for prefix in prefixes),
+            **common,
+        )
+
+    @staticmethod
+    async def _render_file(project_file: ProjectFile) -> str:
+        if inspect.iscoroutinefunction(project_file.render):
+            return await project_file.render()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, project_file.render)
+
+    async def render(self, request, context_info: Optional[Dict[str, Any]] = None,
+                     window: int = 8) -> AsyncIterator[Tuple[ProjectFile, str]]:
+        """
+        Render the project's files concurrently
+
+        Args:
+            request: CodeRequest
+            context_info: Context from the vehicle context manager
+            window: Files rendering or rendered ahead of the consumer
+
+        Yields:
+            (file, text) in plan order
+        """
+        files = self.plan(request, context_info)
+        pending: deque = deque()
+        try:
+            for project_file in files:
+                pending.append((project_file, asyncio.ensure_future(self._render_file(project_file))))
+                if len(pending) >= window:
+                    project_file, task = pending.popleft()
+                    yield project_file, await task
+            while pending:
+                project_file, task = pending.popleft()
+                yield project_file, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def stream_archive(self, request, context_info: Optional[Dict[str, Any]] = None,
+                             archive_format: str = "tar.gz", window: int = 8) -> AsyncIterator[bytes]:
+        """
+        Generate the project as a tar.gz, tar or zip byte stream
+
+        Entries are placed under a directory named after the module.
+
+        Yields:
+            Archive bytes, in order
+        """
+        writer = ArchiveWriter(archive_format)
+        root = self.module_name(request)
+        async for project_file, text in self.render(request, context_info, window):
+            chunk = writer.add(f"{root}/{project_file.path}", text.encode("utf-8"))
+            if chunk:
+                yield chunk
+        yield writer.close()
+
+
+def _camel_identifier(name: str) -> str:
+    parts = re.findall(r"[A-Za-z0-9]+", str(name))
+    identifier = "".join(part[:1].upper() + part[1:] for part in parts) or "Port"
+    return "_" + identifier if identifier[0].isdigit() else identifier
+
+
+def _runnable_body(inputs: List[str], outputs: List[str]) -> str:
+    lines = []
+    for port in inputs:
+        lines.append(f"    uint8_t {_snake_case(port)} = 0u;")
+    if inputs:
+        lines.append("")
+    for port in inputs:
+        lines.append(f"    (void)Rte_Read_{port}_Data(&{_snake_case(port)});")
+    value = _snake_case(inputs[0]) if inputs else "0u"
+    for port in outputs:
+        lines.append(f"    (void)Rte_Write_{port}_Data({value});")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _port_declarations(inputs: List[str], outputs: List[str]) -> str:
+    lines = []
+    for port in inputs:
+        lines.append(f"extern uint8_t Rte_Stub_{port};")
+        lines.append(f"uint8_t Rte_Read_{port}_Data(uint8_t *data);")
+    for port in outputs:
+        lines.append(f"extern uint8_t Rte_Stub_{port};")
+        lines.append(f"uint8_t Rte_Write_{port}_Data(uint8_t data);")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _port_definitions(inputs: List[str], outputs: List[str]) -> str:
+    blocks = []
+    for port in inputs:
+        blocks.append(
+            f"uint8_t Rte_Stub_{port} = 0u;\n\n"
+            f"uint8_t Rte_Read_{port}_Data(uint8_t *data)\n"
+            "{\n"
+            "    if (data == NULL) {\n"
+            "        return RTE_E_INVALID;\n"
+            "    }\n"
+            f"    *data = Rte_Stub_{port};\n"
+            "    return RTE_E_OK;\n"
+            "}\n"
+        )
+    for port in outputs:
+        blocks.append(
+            f"uint8_t Rte_Stub_{port} = 0u;\n\n"
+            f"uint8_t Rte_Write_{port}_Data(uint8_t data)\n"
+            "{\n"
+            f"    Rte_Stub_{port} = data;\n"
+            "    return RTE_E_OK;\n"
+            "}\n"
+        )
+    return "\n".join(blocks)
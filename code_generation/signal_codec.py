@@ -0,0 +1,264 @@
+"""
+Pack/unpack code generation from a CAN signal database
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def _c_identifier(name: str) -> str:
+    identifier = re.sub(r'\W', '_', name)
+    if identifier[:1].isdigit():
+        identifier = "_" + identifier
+    return identifier
+
+
+def _snake_case(name: str) -> str:
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', _c_identifier(name))
+    return re.sub(r'_+', '_', name).lower()
+
+
+def _c_type(length: int, signed: bool) -> str:
+    width = 8 if length <= 8 else 16 if length <= 16 else 32 if length <= 32 else 64
+    return f"{'int' if signed else 'uint'}{width}_t"
+
+
+def _c_number(value: float) -> str:
+    return repr(float(value))
+
+
+class SignalCodecGenerator:
+    """
+    Emits MISRA-friendly C pack/unpack functions for database messages
+
+    Each message gets a struct of raw signal values, frame ID/length
+    macros, per-signal scale/offset macros and byte-wise pack/unpack
+    functions derived from the signal bit layout.
+    """
+
+    def __init__(self, database):
+        self.database = database
+
+    def generate(self, messages: Optional[Sequence[Union[int, str]]] = None,
+                 node: Optional[str] = None) -> str:
+        """
+        Generate codec source
+
+        Args:
+            messages: Frame IDs or names to generate (default: all)
+            node: Restrict to messages sent or received by this ECU node
+
+        Returns:
+            C source code
+        """
+        indices = self._select(messages, node)
+
+        parts = [
+            "#include <stdint.h>",
+            "#include <stddef.h>",
+            "#include <string.h>",
+            "",
+        ]
+        for index in indices:
+            parts.append(self.generate_message(int(index)))
+        return "\n".join(parts)
+
+    def generate_header(self, guard: str, messages: Optional[Sequence[Union[int, str]]] = None,
+                        node: Optional[str] = None) -> str:
+        """
+        Generate a header with the macros, structs and function prototypes
+
+        Args:
+            guard: Include guard macro
+            messages: Frame IDs or names to generate (default: all)
+            node: Restrict to messages sent or received by this ECU node
+
+        Returns:
+            C header code
+        """
+        parts = [
+            f"#ifndef {guard}",
+            f"#define {guard}",
+            "",
+            "#include <stdint.h>",
+            "#include <stddef.h>",
+            "",
+        ]
+        for index in self._select(messages, node):
+            prefix, lines = self._declarations(int(index))
+            parts.extend(lines)
+            parts.append(f"int {prefix}_pack(uint8_t *dst, const {prefix}_t *src, size_t size);")
+            parts.append(f"int {prefix}_unpack({prefix}_t *dst, const uint8_t *src, size_t size);")
+            parts.append("")
+        parts.append(f"#endif /* {guard} */")
+        parts.append("")
+        return "\n".join(parts)
+
+    def generate_source(self, header: str, messages: Optional[Sequence[Union[int, str]]] = None,
+                        node: Optional[str] = None) -> str:
+        """
+        Generate the pack/unpack definitions for a header from generate_header
+
+        Args:
+            header: Header file name to include
+            messages: Same selection as passed to generate_header
+            node: Same node as passed to generate_header
+
+        Returns:
+            C source code
+        """
+        parts = [
+            "#include <string.h>",
+            f'#include "{header}"',
+            "",
+        ]
+        for index in self._select(messages, node):
+            parts.extend(self._definitions(int(index)))
+        return "\n".join(parts)
+
+    def message_prefixes(self, messages: Optional[Sequence[Union[int, str]]] = None,
+                         node: Optional[str] = None) -> List[str]:
+        """C name prefix ('<prefix>_t', '<prefix>_pack') of each selected message"""
+        database = self.database
+        return [_snake_case(database.message_name(int(index))) for index in self._select(messages, node)]
+
+    def _select(self, messages: Optional[Sequence[Union[int, str]]], node: Optional[str]) -> np.ndarray:
+        database = self.database
+        if messages:
+            found = [database.message_index(key) for key in messages]
+            indices = np.array([index for index in found if index is not None], dtype=np.int64)
+        else:
+            indices = np.arange(database.message_count)
+
+        if node:
+            node_messages = np.union1d(database.node_messages(node, "tx"),
+                                       database.node_messages(node, "rx"))
+            indices = indices[np.isin(indices, node_messages)]
+
+        # Emit in frame ID order
+        return indices[np.argsort(database.messages["frame_id"][indices], kind="stable")]
+
+    def generate_message(self, message_index: int) -> str:
+        """Generate the struct, macros and pack/unpack functions for one message"""
+        _, lines = self._declarations(message_index)
+        return "\n".join(lines + self._definitions(message_index))
+
+    def _declarations(self, message_index: int) -> Tuple[str, List[str]]:
+        """Name prefix and the macro and struct lines of one message"""
+        database = self.database
+        row = database.messages[message_index]
+        name = database.message_name(message_index)
+        prefix = _snake_case(name)
+        macro = prefix.upper()
+        dlc = int(row["dlc"])
+        signal_indices = database.message_signals(message_index)
+
+        lines = [
+            f"/* {name}: frame 0x{int(row['frame_id']):X}, {dlc} bytes */",
+            f"#define {macro}_FRAME_ID (0x{int(row['frame_id']):X}u)",
+            f"#define {macro}_LENGTH ({dlc}u)",
+        ]
+        if row["cycle_time_ms"] > 0:
+            lines.append(f"#define {macro}_CYCLE_TIME_MS ({int(row['cycle_time_ms'])}u)")
+
+        fields = []
+        for signal_index in signal_indices:
+            signal = database.signals[signal_index]
+            field = _snake_case(database.signal_name(signal_index))
+            unit = database.string(int(signal["unit"]))
+            if signal["scale"] != 1.0 or signal["offset"] != 0.0:
+                lines.append(f"#define {macro}_{field.upper()}_SCALE ({_c_number(signal['scale'])})")
+                lines.append(f"#define {macro}_{field.upper()}_OFFSET ({_c_number(signal['offset'])})")
+            comment = f" /* {unit} */" if unit else ""
+            fields.append(f"    {_c_type(int(signal['length']), bool(signal['signed']))} {field};{comment}")
+
+        lines.append("")
+        lines.append("typedef struct {")
+        lines.extend(fields or ["    uint8_t reserved;"])
+        lines.append(f"}} {prefix}_t;")
+        lines.append("")
+        return prefix, lines
+
+    def _definitions(self, message_index: int) -> List[str]:
+        """The pack and unpack functions of one message"""
+        database = self.database
+        prefix = _snake_case(database.message_name(message_index))
+        signal_indices = database.message_signals(message_index)
+        lines = self._pack_function(prefix, prefix.upper(), signal_indices)
+        lines.append("")
+        lines.extend(self._unpack_function(prefix, prefix.upper(), signal_indices))
+        lines.append("")
+        return lines
+
+    def _pack_function(self, prefix: str, macro: str, signal_indices: np.ndarray) -> List[str]:
+        database = self.database
+        lines = [
+            f"int {prefix}_pack(uint8_t *dst, const {prefix}_t *src, size_t size)",
+            "{",
+            f"    if ((dst == NULL) || (src == NULL) || (size < {macro}_LENGTH)) {{",
+            "        return -1;",
+            "    }",
+            "",
+            f"    (void)memset(dst, 0, {macro}_LENGTH);",
+        ]
+
+        for signal_index in signal_indices:
+            signal = database.signals[signal_index]
+            field = _snake_case(database.signal_name(signal_index))
+            raw_type = _c_type(int(signal["length"]), False)
+            value = f"(({raw_type})src->{field})"
+            for byte, byte_shift, value_shift, width in database.signal_segments(int(signal_index)):
+                mask = (1 << width) - 1
+                shifted = f"({value} >> {value_shift}u)" if value_shift else value
+                term = f"({shifted} & 0x{mask:X}u)"
+                if byte_shift:
+                    term = f"({term} << {byte_shift}u)"
+                lines.append(f"    dst[{byte}] |= (uint8_t){term};")
+
+        lines.append("")
+        lines.append(f"    return (int){macro}_LENGTH;")
+        lines.append("}")
+        return lines
+
+    def _unpack_function(self, prefix: str, macro: str, signal_indices: np.ndarray) -> List[str]:
+        database = self.database
+        lines = [
+            f"int {prefix}_unpack({prefix}_t *dst, const uint8_t *src, size_t size)",
+            "{",
+            f"    if ((dst == NULL) || (src == NULL) || (size < {macro}_LENGTH)) {{",
+            "        return -1;",
+            "    }",
+        ]
+
+        for signal_index in signal_indices:
+            signal = database.signals[signal_index]
+            field = _snake_case(database.signal_name(signal_index))
+            length = int(signal["length"])
+            signed = bool(signal["signed"])
+            raw_type = _c_type(length, False)
+
+            terms = []
+            for byte, byte_shift, value_shift, width in database.signal_segments(int(signal_index)):
+                mask = (1 << width) - 1
+                term = f"(src[{byte}] >> {byte_shift}u)" if byte_shift else f"src[{byte}]"
+                term = f"(({raw_type})({term} & 0x{mask:X}u))"
+                if value_shift:
+                    term = f"({term} << {value_shift}u)"
+                terms.append(term)
+
+            lines.append("")
+            lines.append(f"    {{")
+            lines.append(f"        {raw_type} raw = {' | '.join(terms) or '0u'};")
+            type_bits = int(raw_type[4:-2])
+            if signed and length < type_bits:
+                sign_bit = f"0x{1 << (length - 1):X}u"
+                lines.append(f"        raw = ({raw_type})((raw ^ {sign_bit}) - {sign_bit});")
+            lines.append(f"        dst->{field} = ({_c_type(length, signed)})raw;")
+            lines.append(f"    }}")
+
+        lines.append("")
+        lines.append(f"    return (int){macro}_LENGTH;")
+        lines.append("}")
+        return lines
@@ -1,11 +1,151 @@
 """
 Template manager for code generation
+
+Templates are compiled once into a list of literal segments and named
+slots. Rendering copies that list, drops the slot values into place and
+joins it, so the cost is proportional to the output and nothing is
+rescanned. Rendered text is cached per template, keyed by the tuple of
+slot values.
 """
 
-from typing import Dict, List, Optional, Any
+import functools
+import re
+import string
+from typing import Dict, List, Optional, Any, Mapping, Sequence, Tuple
 from pathlib import Path
 
 
+# '{name}' in code templates; any other brace is C syntax
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class TemplateError(ValueError):
+    """Malformed template or missing template parameters"""
+
+
+class CompiledTemplate:
+    """
+    A template split into literal segments and named parameter slots
+
+    Args:
+        name: Template name used in error messages
+        source: Template text
+        syntax: 'placeholder' for code templates, where only '{identifier}'
+            is a slot and other braces are literal, or 'format' for
+            str.format-style text with '{{' and '}}' escapes
+        cache_size: Rendered outputs cached by parameter values (0 disables)
+
+    Raises:
+        TemplateError: If a 'format' template is malformed or uses
+            positional fields, attribute access, conversions or format specs
+    """
+
+    __slots__ = ("name", "source", "syntax", "slots", "_segments", "_positions", "_render")
+
+    def __init__(self, name: str, source: str, syntax: str = "placeholder", cache_size: int = 256):
+        self.name = name
+        self.source = source
+        self.syntax = syntax
+        if syntax == "placeholder":
+            pieces = self._split_placeholders(source)
+        elif syntax == "format":
+            pieces = self._split_format(name, source)
+        else:
+            raise TemplateError(f"Unknown template syntax: {syntax!r}")
+
+        # Literal text at fixed positions; slot positions are filled per render
+        segments: List[str] = []
+        positions: List[Tuple[int, int]] = []
+        slots: Dict[str, int] = {}
+        for literal, slot in pieces:
+            if literal:
+                # Escapes such as '{{' split format literals; keep one segment
+                if segments and not (positions and positions[-1][0] == len(segments) - 1):
+                    segments[-1] += literal
+                else:
+                    segments.append(literal)
+            if slot is not None:
+                positions.append((len(segments), slots.setdefault(slot, len(slots))))
+                segments.append("")
+        self.slots: Tuple[str, ...] = tuple(slots)
+        self._segments = segments
+        self._positions = tuple(positions)
+        self._render = functools.lru_cache(maxsize=cache_size)(self._join) if cache_size else self._join
+
+    @staticmethod
+    def _split_placeholders(source: str) -> List[Tuple[str, Optional[str]]]:
+        pieces = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            pieces.append((source[position:match.start()], match.group(1)))
+            position = match.end()
+        pieces.append((source[position:], None))
+        return pieces
+
+    @staticmethod
+    def _split_format(name: str, source: str) -> List[Tuple[str, Optional[str]]]:
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise TemplateError(f"Template {name!r} is malformed: {e}") from e
+        pieces = []
+        for literal, field, spec, conversion in parsed:
+            if field is not None and (not field.isidentifier() or spec or conversion):
+                raise TemplateError(
+                    f"Template {name!r}: unsupported field {{{field}{'!' + conversion if conversion else ''}"
+                    f"{':' + spec if spec else ''}}}; only named fields are allowed"
+                )
+            pieces.append((literal, field))
+        return pieces
+
+    def _join(self, values: Tuple[str, ...]) -> str:
+        segments = self._segments.copy()
+        for position, slot in self._positions:
+            segments[position] = values[slot]
+        return "".join(segments)
+
+    def render(self, parameters: Mapping[str, Any], strict: bool = True) -> str:
+        """
+        Fill the slots from ``parameters`` (values are converted with str)
+
+        Args:
+            parameters: Slot values by name; extra keys are ignored
+            strict: Raise for missing parameters instead of leaving
+                their '{name}' text in place
+
+        Returns:
+            Rendered text
+
+        Raises:
+            TemplateError: If strict and a slot has no value
+        """
+        return self._render(self.values(parameters, strict))
+
+    def render_values(self, values: Sequence[Any]) -> str:
+        """Render from values given in ``slots`` order"""
+        if len(values) != len(self.slots):
+            raise TemplateError(f"Template {self.name!r} takes {len(self.slots)} values, got {len(values)}")
+        return self._render(tuple(map(str, values)))
+
+    def values(self, parameters: Mapping[str, Any], strict: bool = True) -> Tuple[str, ...]:
+        """Slot values in ``slots`` order, the render cache key"""
+        values = []
+        missing = []
+        for slot in self.slots:
+            if slot in parameters:
+                values.append(str(parameters[slot]))
+            elif strict:
+                missing.append(slot)
+            else:
+                values.append("{" + slot + "}")
+        if missing:
+            raise TemplateError(f"Template {self.name!r} is missing parameters: {', '.join(missing)}")
+        return tuple(values)
+
+    def cache_info(self) -> Optional[Any]:
+        return self._render.cache_info() if hasattr(self._render, "cache_info") else None
+
+
 class TemplateManager:
     """
     Manages code templates for different embedded systems patterns
@@ -13,6 +153,9 @@ class TemplateManager:
     
     def __init__(self):
         self.templates = self._load_templates()
+        self._compiled: Dict[str, CompiledTemplate] = {}
+        for name in self.templates:
+            self.compile(name)
     
     def _load_templates(self) -> Dict[str, str]:
         """Load predefined code templates"""
@@ -187,7 +330,165 @@ bool buffer_is_empty(const circular_buffer_t* cb) {
 bool buffer_is_full(const circular_buffer_t* cb) {
     return (cb != NULL) ? (cb->count >= BUFFER_SIZE) : true;
 }
-'''
+''',
+            
+            # ECU module project files (see ProjectGenerator)
+            "module_header": '''/**
+ * @file {module}.h
+ * @brief {description}
+ */
+
+#ifndef {guard}_H
+#define {guard}_H
+
+#include <stdint.h>
+#include <stdbool.h>
+
+#define {guard}_CYCLE_TIME_MS ({cycle_time_ms}u)
+
+typedef enum {
+    {guard}_OK = 0,
+    {guard}_NOT_INITIALIZED = 1
+} {module}_status_t;
+
+{module}_status_t {module}_init(void);
+{module}_status_t {module}_main_function(void);
+
+#endif /* {guard}_H */
+''',
+            
+            "module_source": '''/**
+ * @file {module}.c
+ * @brief {description}
+ */
+
+#include "{module}.h"
+#include "Rte_{component}.h"
+
+static bool {module}_initialized = false;
+
+{module}_status_t {module}_init(void)
+{
+    {module}_initialized = true;
+    return {guard}_OK;
+}
+
+{module}_status_t {module}_main_function(void)
+{
+    if (!{module}_initialized) {
+        return {guard}_NOT_INITIALIZED;
+    }
+
+{runnable_body}
+    return {guard}_OK;
+}
+''',
+            
+            "rte_header": '''/**
+ * @file Rte_{component}.h
+ * @brief RTE port stubs for {component}
+ */
+
+#ifndef RTE_{guard}_H
+#define RTE_{guard}_H
+
+#include <stdint.h>
+#include <stddef.h>
+
+#ifndef RTE_E_OK
+#define RTE_E_OK ((uint8_t)0u)
+#define RTE_E_INVALID ((uint8_t)1u)
+#endif
+
+{port_declarations}
+#endif /* RTE_{guard}_H */
+''',
+            
+            "rte_source": '''/**
+ * @file Rte_{component}.c
+ * @brief RTE port stubs for {component}; replace with the generated RTE
+ */
+
+#include "Rte_{component}.h"
+
+{port_definitions}''',
+            
+            "unit_test": '''/**
+ * @file test_{module}.c
+ * @brief Unit tests for {module}
+ */
+
+#include <stdio.h>
+#include <string.h>
+#include "{module}.h"
+#include "Rte_{component}.h"
+{extra_includes}
+static int failures = 0;
+
+#define CHECK(condition) \\
+    do { \\
+        if (!(condition)) { \\
+            (void)printf("FAIL %s:%d: %s\\n", __FILE__, __LINE__, #condition); \\
+            failures++; \\
+        } \\
+    } while (0)
+
+static void test_main_function_requires_init(void)
+{
+    CHECK({module}_main_function() == {guard}_NOT_INITIALIZED);
+}
+
+static void test_init(void)
+{
+    CHECK({module}_init() == {guard}_OK);
+}
+
+static void test_main_function(void)
+{
+{main_function_test}
+}
+{extra_tests}
+int main(void)
+{
+    test_main_function_requires_init();
+    test_init();
+    test_main_function();
+{extra_calls}
+    (void)printf("%d failure(s)\\n", failures);
+    return (failures == 0) ? 0 : 1;
+}
+''',
+            
+            "codec_roundtrip_test": '''
+static void test_{prefix}_roundtrip(void)
+{
+    uint8_t frame[{macro}_LENGTH];
+    uint8_t repacked[{macro}_LENGTH];
+    uint8_t again[{macro}_LENGTH];
+    {prefix}_t decoded;
+
+    (void)memset(frame, 0xA5, sizeof(frame));
+    CHECK({prefix}_unpack(&decoded, frame, sizeof(frame)) == (int){macro}_LENGTH);
+    CHECK({prefix}_pack(repacked, &decoded, sizeof(repacked)) == (int){macro}_LENGTH);
+    CHECK({prefix}_unpack(&decoded, repacked, sizeof(repacked)) == (int){macro}_LENGTH);
+    CHECK({prefix}_pack(again, &decoded, sizeof(again)) == (int){macro}_LENGTH);
+    CHECK(memcmp(repacked, again, sizeof(again)) == 0);
+    CHECK({prefix}_pack(again, &decoded, 0u) == -1);
+}
+''',
+            
+            "cmake_project": '''cmake_minimum_required(VERSION 3.13)
+project({module} C)
+
+add_library({module} STATIC
+{sources}
+)
+target_include_directories({module} PUBLIC include rte)
+
+# Generated application logic; needs the target's drivers to build
+add_library({module}_logic OBJECT EXCLUDE_FROM_ALL src/{module}_logic.c)
+target_include_directories({module}_logic PRIVATE include rte)
+{tests}'''
         }
     
     def get_template(self, template_name: str) -> Optional[str]:
@@ -199,17 +500,29 @@ bool buffer_is_full(const circular_buffer_t* cb) {
         return list(self.templates.keys())
     
     def add_template(self, name: str, template: str) -> None:
-        """Add a new template"""
+        """Add a new template (compiled immediately, so errors surface here)"""
+        compiled = CompiledTemplate(name, template)
         self.templates[name] = template
+        self._compiled[name] = compiled
     
-    def customize_template(self, template_name: str, replacements: Dict[str, str]) -> Optional[str]:
-        """Customize a template with replacements"""
-        template = self.get_template(template_name)
+    def compile(self, template_name: str) -> Optional[CompiledTemplate]:
+        """Compiled form of a template, recompiled if its text was replaced"""
+        template = self.templates.get(template_name)
         if template is None:
             return None
-        
-        customized = template
-        for placeholder, replacement in replacements.items():
-            customized = customized.replace(f"{{{placeholder}}}", replacement)
-        
-        return customized
+        compiled = self._compiled.get(template_name)
+        if compiled is None or compiled.source is not template:
+            compiled = self._compiled[template_name] = CompiledTemplate(template_name, template)
+        return compiled
+    
+    def template_parameters(self, template_name: str) -> Optional[Tuple[str, ...]]:
+        """Names of a template's '{name}' slots"""
+        compiled = self.compile(template_name)
+        return compiled.slots if compiled is not None else None
+    
+    def customize_template(self, template_name: str, replacements: Dict[str, str]) -> Optional[str]:
+        """Customize a template with replacements; slots without one are left as '{name}'"""
+        compiled = self.compile(template_name)
+        if compiled is None:
+            return None
+        return compiled.render(replacements, strict=False)
@@ -2,11 +2,41 @@
 Code validators for embedded systems
 """
 
+import bisect
 import re
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
 
 from ai_copilot.config import CopilotConfig
+from embedded_integration.source_parser import (
+    ParsedSource, parse_source, function_regions, IDENT, NUMBER, STRING, CHAR, PUNCT
+)
+
+
+# Header required by each identifier
+FUNCTION_INCLUDES = {
+    'printf': 'stdio.h',
+    'malloc': 'stdlib.h',
+    'free': 'stdlib.h',
+    'memcpy': 'string.h',
+    'memset': 'string.h',
+    'strlen': 'string.h',
+    'uint8_t': 'stdint.h',
+    'uint16_t': 'stdint.h',
+    'uint32_t': 'stdint.h',
+    'bool': 'stdbool.h',
+    'true': 'stdbool.h',
+    'false': 'stdbool.h'
+}
+
+_INCLUDE_PATTERN = re.compile(r'#\s*include\s*[<"]([^>"]+)[>"]')
+
+# Tokens after which, or before which, a line break does not end a statement
+_CONTINUES_AFTER = frozenset(["++", "--", ")", "]"])
+_CONTINUES_BEFORE = frozenset([
+    "+", "-", "*", "/", "%", "&&", "||", "&", "|", "^", "<<", ">>", "<", ">", "<=", ">=",
+    "==", "!=", "?", ":", ".", "->", ")", "]", ",", ";", "=",
+])
 
 
 @dataclass
@@ -15,15 +45,27 @@ class ValidationResult:
     is_valid: bool
     issues: Dict[str, List[str]]
     suggestions: List[str]
+    # Character ranges of fixable issues: 'missing_semicolon' (one empty
+    # range where each ';' belongs) and 'missing_includes' (where the
+    # #include lines belong)
+    ranges: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    # Function regions checked rather than taken from the region cache
+    regions_validated: int = 0
 
 
 class CodeValidator:
     """
     Validates generated code for embedded systems compliance
+    
+    File-level checks (bracket balance, includes) run on the shared
+    parse_source() model. Checks local to a function run per region of
+    source_parser.function_regions() and are cached by region text, so
+    re-validating code after an edit only checks the regions it changed.
     """
     
     def __init__(self, config: CopilotConfig):
         self.config = config
+        self._region_cache: Dict[Tuple[bool, str], Dict[str, Any]] = {}
     
     async def validate(self, code: str, request) -> ValidationResult:
         """
@@ -39,19 +81,26 @@ class CodeValidator:
         
         issues = {}
         suggestions = []
+        ranges: Dict[str, List[Tuple[int, int]]] = {}
+        parsed = parse_source(code)
+        is_c = request.language.lower() in ['c', 'cpp']
+        regions = self._validate_regions(parsed, is_c)
         
         # Syntax validation
-        syntax_issues = self._validate_syntax(code, request.language)
+        syntax_issues = self._validate_syntax(code, request.language, parsed)
+        for offset, line in regions['semicolons']:
+            syntax_issues.append(f"Possible missing semicolon at line {line}")
+            ranges.setdefault('missing_semicolon', []).append((offset, offset))
         if syntax_issues:
             issues['syntax'] = syntax_issues
         
         # Include validation
-        include_issues = self._validate_includes(code)
+        include_issues = self._validate_includes(code, parsed, ranges)
         if include_issues:
             issues['missing_includes'] = include_issues
         
         # Memory safety validation
-        memory_issues = self._validate_memory_safety(code)
+        memory_issues = regions['memory_safety']
         if memory_issues:
             issues['memory_safety'] = memory_issues
             suggestions.extend([
@@ -60,7 +109,7 @@ class CodeValidator:
             ])
         
         # Embedded-specific validation
-        embedded_issues = self._validate_embedded_constraints(code)
+        embedded_issues = regions['embedded_constraints']
         if embedded_issues:
             issues['embedded_constraints'] = embedded_issues
         
@@ -69,70 +118,149 @@ class CodeValidator:
         return ValidationResult(
             is_valid=is_valid,
             issues=issues,
-            suggestions=suggestions
+            suggestions=suggestions,
+            ranges=ranges,
+            regions_validated=regions['validated']
         )
     
-    def _validate_syntax(self, code: str, language: str) -> List[str]:
-        """Basic syntax validation"""
+    def _validate_regions(self, parsed: ParsedSource, is_c: bool) -> Dict[str, Any]:
+        """Run the function-local checks, reusing results of unchanged regions"""
+        code = parsed.code
+        cache: Dict[Tuple[bool, str], Dict[str, Any]] = {}
+        token_starts: Optional[List[int]] = None
+        merged: Dict[str, Any] = {'semicolons': [], 'memory_safety': [], 'embedded_constraints': []}
+        validated = 0
+        line = 1
+        previous = 0
+        
+        for start, end, _ in function_regions(parsed):
+            line += code.count('\n', previous, start)
+            previous = start
+            key = (is_c, code[start:end])
+            result = cache.get(key) or self._region_cache.get(key)
+            if result is None:
+                if token_starts is None:
+                    token_starts = [token.start for token in parsed.tokens]
+                result = self._validate_region(
+                    parsed, key[1], start, line, is_c,
+                    bisect.bisect_left(token_starts, start), bisect.bisect_left(token_starts, end)
+                )
+                validated += 1
+            cache[key] = result
+            # Offsets and lines are stored relative to the region
+            merged['semicolons'].extend((start + offset, line + lines) for offset, lines in result['semicolons'])
+            merged['memory_safety'].extend(result['memory_safety'])
+            merged['embedded_constraints'].extend(result['embedded_constraints'])
+        
+        # Only the current document's regions stay cached
+        self._region_cache = cache
+        merged['memory_safety'] = list(dict.fromkeys(merged['memory_safety']))
+        merged['embedded_constraints'] = list(dict.fromkeys(merged['embedded_constraints']))
+        merged['validated'] = validated
+        return merged
+    
+    def _validate_region(self, parsed: ParsedSource, text: str, start: int, line: int, is_c: bool,
+                         first_token: int, end_token: int) -> Dict[str, Any]:
+        semicolons = []
+        if is_c:
+            semicolons = [
+                (token.end - start, token.line - line)
+                for token in self._missing_semicolons(parsed, first_token, end_token)
+            ]
+        return {
+            'semicolons': semicolons,
+            'memory_safety': self._validate_memory_safety(text),
+            'embedded_constraints': self._validate_embedded_constraints(text),
+        }
+    
+    def _validate_syntax(self, code: str, language: str, parsed: Optional[ParsedSource] = None) -> List[str]:
+        """Bracket balance on the token stream (strings and comments excluded)"""
         issues = []
         
         if language.lower() in ['c', 'cpp']:
-            # Check for basic C/C++ syntax issues
+            parsed = parsed or parse_source(code)
+            punctuation = [token.text for token in parsed.tokens if token.kind == PUNCT]
             
             # Check for unmatched braces
-            open_braces = code.count('{')
-            close_braces = code.count('}')
+            open_braces = punctuation.count('{')
+            close_braces = punctuation.count('}')
             if open_braces != close_braces:
                 issues.append(f"Unmatched braces: {open_braces} open, {close_braces} close")
             
             # Check for unmatched parentheses
-            open_parens = code.count('(')
-            close_parens = code.count(')')
+            open_parens = punctuation.count('(')
+            close_parens = punctuation.count(')')
             if open_parens != close_parens:
                 issues.append(f"Unmatched parentheses: {open_parens} open, {close_parens} close")
-            
-            # Check for missing semicolons (basic check)
-            lines = code.split('\n')
-            for i, line in enumerate(lines, 1):
-                stripped = line.strip()
-                if (stripped and 
-                    not stripped.startswith('#') and 
-                    not stripped.startswith('//') and
-                    not stripped.startswith('/*') and
-                    not stripped.endswith(';') and
-                    not stripped.endswith('{') and
-                    not stripped.endswith('}') and
-                    not stripped.endswith('*/') and
-                    'return' in stripped):
-                    issues.append(f"Possible missing semicolon at line {i}")
         
         return issues
     
-    def _validate_includes(self, code: str) -> List[str]:
+    @staticmethod
+    def _missing_semicolons(parsed: ParsedSource, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """Last tokens of return statements in tokens[start:stop] that end without a ';'"""
+        tokens = parsed.tokens
+        missing = []
+        
+        for index in range(start, len(tokens) if stop is None else stop):
+            token = tokens[index]
+            if token.kind != IDENT or token.text != 'return':
+                continue
+            depth = 0
+            last = token
+            for position in range(index + 1, len(tokens)):
+                following = tokens[position]
+                text = following.text
+                if depth == 0:
+                    if text == ';':
+                        break
+                    if text in ('{', '}'):
+                        missing.append(last)
+                        break
+                    if following.line != last.line:
+                        # A line break ends the statement unless an operator carries it on
+                        ends_expression = (last.kind in (IDENT, NUMBER, STRING, CHAR)
+                                           or last.text in _CONTINUES_AFTER)
+                        if ends_expression and text not in _CONTINUES_BEFORE:
+                            missing.append(last)
+                            break
+                if text in ('(', '['):
+                    depth += 1
+                elif text in (')', ']'):
+                    depth = max(0, depth - 1)
+                last = following
+            else:
+                missing.append(last)
+        
+        return missing
+    
+    def _validate_includes(self, code: str, parsed: Optional[ParsedSource] = None,
+                           ranges: Optional[Dict[str, List[Tuple[int, int]]]] = None) -> List[str]:
         """Check for missing includes"""
-        missing_includes = []
-        
-        # Common function to include mappings
-        function_includes = {
-            'printf': 'stdio.h',
-            'malloc': 'stdlib.h',
-            'free': 'stdlib.h',
-            'memcpy': 'string.h',
-            'memset': 'string.h',
-            'strlen': 'string.h',
-            'uint8_t': 'stdint.h',
-            'uint16_t': 'stdint.h',
-            'uint32_t': 'stdint.h',
-            'bool': 'stdbool.h',
-            'true': 'stdbool.h',
-            'false': 'stdbool.h'
-        }
+        parsed = parsed or parse_source(code)
+        identifiers = {token.text for token in parsed.tokens if token.kind == IDENT}
+        included = set()
+        last_include = None
+        for directive in parsed.directives:
+            match = _INCLUDE_PATTERN.match(directive.text.strip())
+            if match:
+                included.add(match.group(1))
+                last_include = directive
+        
+        missing_includes = sorted({
+            include for name, include in FUNCTION_INCLUDES.items()
+            if name in identifiers and include not in included
+        })
         
-        for func, include in function_includes.items():
-            if func in code and f'#include <{include}>' not in code:
-                missing_includes.append(include)
+        if missing_includes and ranges is not None:
+            # After the last #include, else at the start of the first code line
+            if last_include is not None:
+                position = last_include.end
+            else:
+                starts = [items[0].start for items in (parsed.tokens, parsed.directives) if items]
+                position = code.rfind('\n', 0, min(starts)) + 1 if starts else 0
+            ranges['missing_includes'] = [(position, position)]
         
-        return list(set(missing_includes))  # Remove duplicates
+        return missing_includes
     
     def _validate_memory_safety(self, code: str) -> List[str]:
         """Validate memory safety"""
@@ -0,0 +1,21 @@
+"""
+Collaboration Module
+
+This module provides real-time collaborative editing: operational
+transformation of text deltas, authoritative session state with
+snapshots, and a service that fans out coalesced changes and live
+analysis to session participants.
+"""
+
+from .ot import TextOperation, OperationError
+from .session import EditSession, SnapshotStore, StaleRevisionError
+from .service import CollaborationService
+
+__all__ = [
+    "TextOperation",
+    "OperationError",
+    "EditSession",
+    "SnapshotStore",
+    "StaleRevisionError",
+    "CollaborationService",
+]
@@ -0,0 +1,241 @@
+"""
+Operational transformation for plain text
+
+An operation is a list of components that walk the whole document:
+a positive int retains that many characters, a string inserts it and a
+negative int deletes that many characters. This is the wire format, so a
+keystroke in a 100 kB file is sent as e.g. ``[4211, "x", 95789]``.
+"""
+
+from typing import List, Tuple, Union
+
+
+Component = Union[int, str]
+
+
+class OperationError(ValueError):
+    """Operation that does not fit the document or cannot be combined"""
+
+
+class TextOperation:
+    """
+    A sequence of retain/insert/delete components
+
+    Components are kept canonical: no zero-length components, adjacent
+    components of the same kind merged and an insert always placed before
+    an adjacent delete.
+    """
+
+    __slots__ = ("components", "base_length", "target_length")
+
+    def __init__(self, components: List[Component] = ()):
+        self.components: List[Component] = []
+        self.base_length = 0
+        self.target_length = 0
+        for component in components:
+            if isinstance(component, bool) or not isinstance(component, (int, str)):
+                raise OperationError(f"Invalid operation component: {component!r}")
+            if isinstance(component, str):
+                self.insert(component)
+            elif component > 0:
+                self.retain(component)
+            else:
+                self.delete(-component)
+
+    def retain(self, count: int) -> "TextOperation":
+        if count <= 0:
+            return self
+        self.base_length += count
+        self.target_length += count
+        if self.components and _is_retain(self.components[-1]):
+            self.components[-1] += count
+        else:
+            self.components.append(count)
+        return self
+
+    def insert(self, text: str) -> "TextOperation":
+        if not text:
+            return self
+        self.target_length += len(text)
+        components = self.components
+        if components and isinstance(components[-1], str):
+            components[-1] += text
+        elif components and _is_delete(components[-1]):
+            # Keep inserts ahead of deletes so equal operations compare equal
+            if len(components) > 1 and isinstance(components[-2], str):
+                components[-2] += text
+            else:
+                components.insert(len(components) - 1, text)
+        else:
+            components.append(text)
+        return self
+
+    def delete(self, count: int) -> "TextOperation":
+        if count <= 0:
+            return self
+        self.base_length += count
+        if self.components and _is_delete(self.components[-1]):
+            self.components[-1] -= count
+        else:
+            self.components.append(-count)
+        return self
+
+    def is_noop(self) -> bool:
+        return all(_is_retain(component) for component in self.components)
+
+    def to_json(self) -> List[Component]:
+        return list(self.components)
+
+    @classmethod
+    def from_json(cls, components: List[Component]) -> "TextOperation":
+        if not isinstance(components, list):
+            raise OperationError("Operation must be a list of components")
+        return cls(components)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TextOperation) and self.components == other.components
+
+    def __repr__(self) -> str:
+        return f"TextOperation({self.components!r})"
+
+    def apply(self, document: str) -> str:
+        """Apply the operation to a document of length ``base_length``"""
+        if len(document) != self.base_length:
+            raise OperationError(
+                f"Operation expects a document of length {self.base_length}, got {len(document)}"
+            )
+        parts = []
+        position = 0
+        for component in self.components:
+            if isinstance(component, str):
+                parts.append(component)
+            elif component > 0:
+                parts.append(document[position:position + component])
+                position += component
+            else:
+                position -= component
+        return "".join(parts)
+
+    def compose(self, other: "TextOperation") -> "TextOperation":
+        """Single operation equivalent to applying ``self`` then ``other``"""
+        if self.target_length != other.base_length:
+            raise OperationError("Operations cannot be composed: length mismatch")
+        result = TextOperation()
+        first, second = _Cursor(self.components), _Cursor(other.components)
+
+        while first.current is not None or second.current is not None:
+            a, b = first.current, second.current
+            if a is not None and _is_delete(a):
+                result.delete(-a)
+                first.advance()
+            elif isinstance(b, str):
+                result.insert(b)
+                second.advance()
+            elif a is None or b is None:
+                raise OperationError("Operations cannot be composed: components left over")
+            elif _is_retain(a) and _is_retain(b):
+                length = min(a, b)
+                result.retain(length)
+                first.consume(length)
+                second.consume(length)
+            elif isinstance(a, str) and _is_delete(b):
+                length = min(len(a), -b)
+                first.consume(length)
+                second.consume(length)
+            elif isinstance(a, str) and _is_retain(b):
+                length = min(len(a), b)
+                result.insert(a[:length])
+                first.consume(length)
+                second.consume(length)
+            else:  # retain, delete
+                length = min(a, -b)
+                result.delete(length)
+                first.consume(length)
+                second.consume(length)
+        return result
+
+    @staticmethod
+    def transform(a: "TextOperation", b: "TextOperation") -> Tuple["TextOperation", "TextOperation"]:
+        """
+        Transform two concurrent operations on the same document
+
+        Returns:
+            (a', b') such that applying a then b' equals applying b then a'.
+            When both insert at the same position, ``a`` goes first.
+        """
+        if a.base_length != b.base_length:
+            raise OperationError("Concurrent operations must share a base document")
+        a_prime, b_prime = TextOperation(), TextOperation()
+        first, second = _Cursor(a.components), _Cursor(b.components)
+
+        while first.current is not None or second.current is not None:
+            x, y = first.current, second.current
+            if isinstance(x, str):
+                a_prime.insert(x)
+                b_prime.retain(len(x))
+                first.advance()
+            elif isinstance(y, str):
+                a_prime.retain(len(y))
+                b_prime.insert(y)
+                second.advance()
+            elif x is None or y is None:
+                raise OperationError("Concurrent operations cannot be transformed: components left over")
+            elif _is_retain(x) and _is_retain(y):
+                length = min(x, y)
+                a_prime.retain(length)
+                b_prime.retain(length)
+                first.consume(length)
+                second.consume(length)
+            elif _is_delete(x) and _is_delete(y):
+                # Both deleted the same text
+                length = min(-x, -y)
+                first.consume(length)
+                second.consume(length)
+            elif _is_delete(x):
+                length = min(-x, y)
+                a_prime.delete(length)
+                first.consume(length)
+                second.consume(length)
+            else:  # retain, delete
+                length = min(x, -y)
+                b_prime.delete(length)
+                first.consume(length)
+                second.consume(length)
+        return a_prime, b_prime
+
+
+def _is_retain(component: Component) -> bool:
+    return isinstance(component, int) and component > 0
+
+
+def _is_delete(component: Component) -> bool:
+    return isinstance(component, int) and component < 0
+
+
+class _Cursor:
+    """Walks components, allowing a component to be consumed in parts"""
+
+    __slots__ = ("components", "index", "current")
+
+    def __init__(self, components: List[Component]):
+        self.components = components
+        self.index = 0
+        self.current = components[0] if components else None
+
+    def advance(self) -> None:
+        self.index += 1
+        self.current = self.components[self.index] if self.index < len(self.components) else None
+
+    def consume(self, length: int) -> None:
+        """Consume ``length`` characters of the current component"""
+        current = self.current
+        if isinstance(current, str):
+            remainder = current[length:]
+        elif current > 0:
+            remainder = current - length
+        else:
+            remainder = current + length
+        if remainder:
+            self.current = remainder
+        else:
+            self.advance()
@@ -0,0 +1,125 @@
+"""
+Server-side state of collaborative editing sessions
+
+An EditSession holds the authoritative document and revision. Incoming
+operations carry the revision they were made against; they are
+transformed past every operation applied since then, applied and given
+the next revision. Only a bounded tail of history is kept, so a client
+that falls further behind is sent a fresh snapshot instead.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+
+from .ot import TextOperation, OperationError
+
+
+class StaleRevisionError(OperationError):
+    """Operation based on a revision older than the retained history"""
+
+
+class EditSession:
+    """
+    Authoritative document of one editing session
+
+    Args:
+        session_id: Session identifier
+        document: Initial document text
+        revision: Revision of the initial document
+        project: Human-readable project name
+        max_history: Number of recent operations kept for transforming
+            late operations
+    """
+
+    def __init__(self, session_id: str, document: str = "", revision: int = 0,
+                 project: str = "", max_history: int = 1000):
+        self.session_id = session_id
+        self.document = document
+        self.revision = revision
+        self.project = project
+        self.max_history = max_history
+        self.history: List[TextOperation] = []
+        self.history_start = revision
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def receive(self, base_revision: int, operation: TextOperation) -> TextOperation:
+        """
+        Apply an operation made against ``base_revision``
+
+        Returns:
+            The operation as applied (transformed to the current revision)
+
+        Raises:
+            StaleRevisionError: If base_revision is no longer in the history
+            OperationError: If the operation does not fit the document
+        """
+        if base_revision > self.revision or base_revision < 0:
+            raise OperationError(f"Unknown revision {base_revision}")
+        if base_revision < self.history_start:
+            raise StaleRevisionError(
+                f"Revision {base_revision} is older than the retained history ({self.history_start})"
+            )
+
+        for concurrent in self.history[base_revision - self.history_start:]:
+            # Operations already applied win ties at the same position
+            _, operation = TextOperation.transform(concurrent, operation)
+        self.document = operation.apply(self.document)
+        self.revision += 1
+        self.updated_at = time.time()
+
+        self.history.append(operation)
+        if len(self.history) > self.max_history:
+            trim = len(self.history) - self.max_history
+            del self.history[:trim]
+            self.history_start += trim
+        return operation
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "project": self.project,
+            "revision": self.revision,
+            "document": self.document,
+            "saved_at": time.time(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], max_history: int = 1000) -> "EditSession":
+        return cls(snapshot["session_id"], snapshot["document"], snapshot["revision"],
+                   snapshot.get("project", ""), max_history)
+
+
+class SnapshotStore:
+    """
+    Session snapshots as JSON files, one per session
+
+    Args:
+        directory: Directory for the snapshot files (created on first save)
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / (re.sub(r"[^\w.-]", "_", session_id) + ".json")
+
+    def save(self, snapshot: Dict[str, Any]) -> None:
+        """Write a snapshot atomically (readers never see a partial file)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(snapshot["session_id"])
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, path)
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(session_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -13,8 +13,15 @@ import time
 import urllib.parse
 import random
 from datetime import datetime
+from pathlib import Path
 
-class TATAAdvancedHandler(http.server.SimpleHTTPRequestHandler):
+from ai_copilot.config import CopilotConfig
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics, format_duration
+from ai_copilot.retrieval import Passage, LazyQAEngine, build_knowledge_corpus
+
+HTTP_METRICS = get_http_metrics()
+
+class TATAAdvancedHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_main_page()
@@ -24,9 +31,13 @@ class TATAAdvancedHandler(http.server.SimpleHTTPRequestHandler):
                 "message": "TATA AI Co-pilot is operational",
                 "version": "2.0.0-hackathon",
                 "features": ["interactive_qa", "code_generation", "analysis", "projects", "themes", "pwa", "voice_commands"],
-                "uptime": "Running since startup",
+                "uptime": format_duration(HTTP_METRICS.registry.get("process_uptime_seconds").value),
                 "ai_models": ["TATA-GPT-Automotive", "CodeGen-Embedded", "Safety-Analyzer"]
             })
+        elif self.path == '/api/analytics':
+            self.serve_json(HTTP_METRICS.analytics())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/api/platforms':
             self.serve_json({
                 "platforms": [
@@ -108,6 +119,7 @@ class TATAAdvancedHandler(http.server.SimpleHTTPRequestHandler):
                 "explanation": response.get("explanation", ""),
                 "related_topics": response.get("related_topics", []),
                 "confidence": response.get("confidence", 0.95),
+                "sources": response.get("passages", []),
                 "timestamp": datetime.now().isoformat()
             })
             
@@ -165,53 +177,16 @@ class TATAAdvancedHandler(http.server.SimpleHTTPRequestHandler):
             self.serve_json({"error": str(e)}, status=400)
     
     def generate_qa_response(self, question, context):
-        """Generate intelligent Q&A responses"""
-        question_lower = question.lower()
-        
-        # Automotive-specific responses
-        if any(word in question_lower for word in ['brake', 'braking', 'abs']):
-            return {
-                "answer": "TATA brake systems require ASIL-D compliance for safety-critical functions. The brake system should include redundant sensors, fail-safe mechanisms, and real-time monitoring. For ABS systems, we implement wheel speed sensors, hydraulic pressure control, and emergency braking protocols.",
-                "code_example": self.get_brake_code_example(),
-                "explanation": "This implementation follows ISO 26262 standards for automotive safety and includes TATA-specific error codes and CAN bus communication protocols.",
-                "related_topics": ["ASIL-D Compliance", "CAN Bus Communication", "Hydraulic Control", "Sensor Redundancy"],
-                "confidence": 0.98
-            }
-        
-        elif any(word in question_lower for word in ['engine', 'rpm', 'fuel', 'injection']):
-            return {
-                "answer": "TATA engine control systems manage fuel injection, ignition timing, and emissions control. The ECU monitors engine RPM, temperature, and load conditions to optimize performance and efficiency. For commercial vehicles, we focus on durability and fuel economy.",
-                "code_example": self.get_engine_code_example(),
-                "explanation": "This code implements a complete engine control loop with sensor validation, fuel map lookup, and diagnostic monitoring suitable for TATA commercial vehicles.",
-                "related_topics": ["Fuel Injection", "Ignition Timing", "Emissions Control", "Engine Diagnostics"],
-                "confidence": 0.96
-            }
-        
-        elif any(word in question_lower for word in ['battery', 'electric', 'ev', 'charging']):
-            return {
-                "answer": "TATA electric vehicle systems require sophisticated battery management, thermal control, and charging protocols. The BMS monitors cell voltages, temperatures, and current flow to ensure safety and longevity. Fast charging requires careful thermal management.",
-                "code_example": self.get_battery_code_example(),
-                "explanation": "This BMS implementation includes cell balancing, thermal protection, and SOC estimation algorithms optimized for TATA electric vehicle platforms.",
-                "related_topics": ["Battery Management", "Thermal Control", "Fast Charging", "Cell Balancing"],
-                "confidence": 0.97
-            }
-        
-        elif any(word in question_lower for word in ['can', 'communication', 'network']):
-            return {
-                "answer": "TATA vehicles use CAN bus networks for inter-ECU communication. The network includes engine, transmission, brake, and body control modules. Message priorities and timing are critical for real-time performance.",
-                "code_example": self.get_can_code_example(),
-                "explanation": "This CAN implementation provides message filtering, error handling, and diagnostic capabilities for TATA vehicle networks.",
-                "related_topics": ["CAN Bus", "Message Filtering", "Network Diagnostics", "Real-time Communication"],
-                "confidence": 0.95
-            }
-        
-        else:
-            return {
-                "answer": f"I understand you're asking about: '{question}'. For TATA automotive systems, I can help with engine control, brake systems, electric vehicles, CAN communication, safety compliance (ASIL), and embedded software development. Please provide more specific details about your automotive software requirements.",
-                "explanation": "I'm specialized in TATA automotive embedded software development and can provide detailed technical guidance.",
-                "related_topics": ["Engine Control", "Brake Systems", "Electric Vehicles", "Safety Compliance"],
-                "confidence": 0.85
-            }
+        """Answer from the knowledge index, falling back to a general reply"""
+        response = QA_ENGINE.answer(question)
+        if response is not None:
+            return response
+        return {
+            "answer": f"I understand you're asking about: '{question}'. For TATA automotive systems, I can help with engine control, brake systems, electric vehicles, CAN communication, safety compliance (ASIL), and embedded software development. Please provide more specific details about your automotive software requirements.",
+            "explanation": "I'm specialized in TATA automotive embedded software development and can provide detailed technical guidance.",
+            "related_topics": ["Engine Control", "Brake Systems", "Electric Vehicles", "Safety Compliance"],
+            "confidence": 0.85
+        }
     
     def generate_automotive_code(self, description, language, platform, asil_level):
         """Generate automotive-specific code"""
@@ -405,7 +380,8 @@ void tata_brake_safety_monitor(void) {{
             "complexity": 8.5
         }
     
-    def get_brake_code_example(self):
+    @staticmethod
+    def get_brake_code_example():
         return '''// TATA Brake Pressure Monitor Example
 typedef struct {
     uint16_t pressure_kpa;
@@ -420,7 +396,8 @@ int tata_brake_monitor_init(void) {
     return TATA_SUCCESS;
 }'''
 
-    def get_engine_code_example(self):
+    @staticmethod
+    def get_engine_code_example():
         return '''// TATA Engine Control Example
 typedef struct {
     uint16_t rpm;
@@ -434,7 +411,8 @@ int tata_engine_control_init(void) {
     return TATA_SUCCESS;
 }'''
 
-    def get_battery_code_example(self):
+    @staticmethod
+    def get_battery_code_example():
         return '''// TATA Battery Management Example
 typedef struct {
     uint16_t cell_voltages[12];
@@ -448,7 +426,8 @@ int tata_bms_init(void) {
     return TATA_SUCCESS;
 }'''
 
-    def get_can_code_example(self):
+    @staticmethod
+    def get_can_code_example():
         return '''// TATA CAN Communication Example
 typedef struct {
     uint32_t id;
@@ -1526,6 +1505,54 @@ void tata_safety_monitor(void) {{
         self.end_headers()
         self.wfile.write(json.dumps(data, indent=2).encode())
 
+# Curated answers, ranked together with the knowledge bases, templates and docs
+QA_PASSAGES = [
+    Passage(
+        id="answer:brake",
+        title="Brake systems and ABS",
+        text="TATA brake systems require ASIL-D compliance for safety-critical functions. The brake system should include redundant sensors, fail-safe mechanisms, and real-time monitoring. For ABS systems, we implement wheel speed sensors, hydraulic pressure control, and emergency braking protocols.",
+        source="complete_tata_copilot",
+        kind="answer",
+        topics=["ASIL-D Compliance", "CAN Bus Communication", "Hydraulic Control", "Sensor Redundancy"],
+        code=TATAAdvancedHandler.get_brake_code_example(),
+        explanation="This implementation follows ISO 26262 standards for automotive safety and includes TATA-specific error codes and CAN bus communication protocols.",
+    ),
+    Passage(
+        id="answer:engine",
+        title="Engine control",
+        text="TATA engine control systems manage fuel injection, ignition timing, and emissions control. The ECU monitors engine RPM, temperature, and load conditions to optimize performance and efficiency. For commercial vehicles, we focus on durability and fuel economy.",
+        source="complete_tata_copilot",
+        kind="answer",
+        topics=["Fuel Injection", "Ignition Timing", "Emissions Control", "Engine Diagnostics"],
+        code=TATAAdvancedHandler.get_engine_code_example(),
+        explanation="This code implements a complete engine control loop with sensor validation, fuel map lookup, and diagnostic monitoring suitable for TATA commercial vehicles.",
+    ),
+    Passage(
+        id="answer:battery",
+        title="Electric vehicle (EV) battery management",
+        text="TATA electric vehicle systems require sophisticated battery management, thermal control, and charging protocols. The BMS monitors cell voltages, temperatures, and current flow to ensure safety and longevity. Fast charging requires careful thermal management.",
+        source="complete_tata_copilot",
+        kind="answer",
+        topics=["Battery Management", "Thermal Control", "Fast Charging", "Cell Balancing"],
+        code=TATAAdvancedHandler.get_battery_code_example(),
+        explanation="This BMS implementation includes cell balancing, thermal protection, and SOC estimation algorithms optimized for TATA electric vehicle platforms.",
+    ),
+    Passage(
+        id="answer:can",
+        title="CAN bus communication",
+        text="TATA vehicles use CAN bus networks for inter-ECU communication. The network includes engine, transmission, brake, and body control modules. Message priorities and timing are critical for real-time performance.",
+        source="complete_tata_copilot",
+        kind="answer",
+        topics=["CAN Bus", "Message Filtering", "Network Diagnostics", "Real-time Communication"],
+        code=TATAAdvancedHandler.get_can_code_example(),
+        explanation="This CAN implementation provides message filtering, error handling, and diagnostic capabilities for TATA vehicle networks.",
+    ),
+]
+# Built (or loaded from output/) on the first question or at server start, not on import
+QA_ENGINE = LazyQAEngine(
+    Path(CopilotConfig().output_dir) / "qa_index_complete.npz", lambda: build_knowledge_corpus(extra=QA_PASSAGES)
+)
+
 def open_browser_delayed():
     time.sleep(3)
     try:
@@ -1545,6 +1572,8 @@ def main():
     print("-" * 70)
     
     threading.Thread(target=open_browser_delayed, daemon=True).start()
+    # Warm the knowledge index while the server comes up
+    threading.Thread(target=QA_ENGINE.get, daemon=True).start()
     
     PORT = 8000
     try:
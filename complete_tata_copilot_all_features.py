@@ -16,8 +16,102 @@ import base64
 import hashlib
 from datetime import datetime, timedelta
 import os
+from pathlib import Path
+
+from ai_copilot.config import CopilotConfig
+from telemetry import TelemetryStore, MaintenanceScorer, DeviceRegistry, IoTIngestServer, ingest_http_body
+from vehicle_context import StandardsChecker, SafetySimulator, SimulatorBusy
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics, format_duration
+from ai_copilot.retrieval import Passage, LazyQAEngine, build_knowledge_corpus
+
+# Shared by all request handlers (one handler instance per request)
+TELEMETRY_STORE = TelemetryStore()
+MAINTENANCE_SCORER = MaintenanceScorer(TELEMETRY_STORE)
+SAFETY_SIMULATOR = SafetySimulator(StandardsChecker(CopilotConfig()))
+HTTP_METRICS = get_http_metrics()
+
+# Demo fleet devices; anything else that sends messages is registered on first contact
+IOT_REGISTRY = DeviceRegistry()
+IOT_REGISTRY.register("TATA-ECU-001", "Engine Control Unit", "Test Vehicle #1", "Encrypted")
+IOT_REGISTRY.register("TATA-BMS-002", "Battery Management System", "EV Test Lab", "Encrypted")
+IOT_REGISTRY.register("TATA-BRAKE-003", "Brake Controller", "Safety Test Track", "Secure", status="Maintenance")
+IOT_PORT = 9100
+
+# Curated answers, ranked together with the knowledge bases, templates and docs
+QA_PASSAGES = [
+    Passage(
+        id="answer:brake",
+        title="Brake systems and ABS",
+        text="TATA brake systems require ASIL-D compliance with redundant sensors and fail-safe mechanisms. Our AI generates production-ready brake control code with built-in safety validation, performance optimization for ARM platforms, and enterprise-grade security.",
+        source="complete_tata_copilot_all_features",
+        kind="answer",
+        topics=["ASIL-D Compliance", "Braking", "ABS Controller"],
+        code='''// TATA Brake System - ASIL-D Compliant
+#include "tata_brake_system.h"
+
+typedef struct {
+    uint16_t pressure_front_kpa;
+    uint16_t pressure_rear_kpa;
+    uint8_t abs_status;
+    uint32_t timestamp;
+} tata_brake_data_t;
 
-class CompleteTATAHandler(http.server.SimpleHTTPRequestHandler):
+// Initialize brake system with safety checks
+int tata_brake_init(void) {
+    if (can_init(CAN_SPEED_500K) != CAN_OK) {
+        return TATA_ERROR_CAN_INIT;
+    }
+    return TATA_SUCCESS;
+}''',
+        extra={
+            "features_used": ["Code Generation", "Safety Simulation", "Performance Optimization", "Enterprise Security"],
+            "voice_command": "You can say: 'Generate brake system code for TATA commercial vehicles'",
+            "template_available": "ABS Controller Pro - ASIL-D compliant template available",
+            "iot_integration": "Compatible with TATA-BRAKE-003 IoT device",
+            "collaboration": "Shareable with team via secure collaboration sessions",
+        },
+    ),
+    Passage(
+        id="answer:voice",
+        title="Voice commands",
+        text="TATA AI Co-pilot supports advanced voice commands in multiple languages including English and Hindi. Voice recognition accuracy is 95%+ with real-time processing and enterprise-grade security for voice data.",
+        source="complete_tata_copilot_all_features",
+        kind="answer",
+        topics=["Voice Commands", "Speech Recognition", "Enterprise Security"],
+        extra={
+            "features_used": ["Voice Commands", "Enterprise Security", "Performance Optimization"],
+            "voice_capabilities": {
+                "languages": ["English", "Hindi", "Tamil", "Telugu"],
+                "accuracy": "95.8%",
+                "commands_supported": ["Code generation", "Feature control", "Q&A", "Template selection"]
+            },
+            "security_note": "All voice data is encrypted and processed locally for maximum security",
+        },
+    ),
+    Passage(
+        id="answer:templates",
+        title="Code templates",
+        text="TATA AI Co-pilot includes 12+ pre-built automotive code templates covering engine control, brake systems, electric vehicles, and safety systems. All templates are ASIL-compliant and optimized for TATA platforms.",
+        source="complete_tata_copilot_all_features",
+        kind="answer",
+        topics=["Code Templates", "Design Patterns", "Examples"],
+        extra={
+            "templates_available": [
+                "TATA Diesel Engine ECU (ASIL-C, 2847 lines)",
+                "ABS Controller Pro (ASIL-D, 3245 lines)",
+                "TATA EV Battery Management (ASIL-C, 4156 lines)"
+            ],
+            "features_used": ["Code Templates", "Performance Optimization", "Safety Simulation"],
+            "voice_command": "Say: 'Show me brake system templates'",
+        },
+    ),
+]
+# Built (or loaded from output/) on the first question or at server start, not on import
+QA_ENGINE = LazyQAEngine(
+    Path(CopilotConfig().output_dir) / "qa_index_all_features.npz", lambda: build_knowledge_corpus(extra=QA_PASSAGES)
+)
+
+class CompleteTATAHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_complete_main_page()
@@ -34,21 +128,27 @@ class CompleteTATAHandler(http.server.SimpleHTTPRequestHandler):
                 ],
                 "uptime": self.get_uptime(),
                 "ai_models": ["TATA-GPT-Automotive-Pro", "CodeGen-Embedded-Plus", "Safety-Analyzer-Advanced"],
-                "active_users": random.randint(15, 25),
-                "code_generated_today": random.randint(150, 300),
+                "active_users": int(HTTP_METRICS.active_clients.value),
+                "code_generated_today": HTTP_METRICS.count('/api/generate-code', 'POST'),
                 "voice_commands_today": random.randint(45, 85),
                 "security_scans_passed": random.randint(25, 45)
             })
         elif self.path == '/api/analytics':
             self.serve_json(self.get_analytics_data())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/api/digital-twin':
             self.serve_json(self.get_digital_twin_data())
+        elif self.path.startswith('/api/digital-twin/history'):
+            self.serve_digital_twin_history()
         elif self.path == '/api/collaboration':
             self.serve_json(self.get_collaboration_data())
         elif self.path == '/api/predictive-maintenance':
             self.serve_json(self.get_predictive_maintenance_data())
         elif self.path == '/api/safety-simulator':
             self.serve_json(self.get_safety_simulation_data())
+        elif self.path.startswith('/api/safety-simulator/jobs/'):
+            self.serve_safety_simulation_job()
         elif self.path == '/api/iot-devices':
             self.serve_json(self.get_iot_devices())
         elif self.path == '/api/code-templates':
@@ -85,76 +185,91 @@ class CompleteTATAHandler(http.server.SimpleHTTPRequestHandler):
             self.handle_performance_optimization()
         elif self.path == '/api/security-scan':
             self.handle_security_scan()
+        elif self.path == '/api/telemetry':
+            self.handle_telemetry_ingest()
+        elif self.path == '/api/iot/messages':
+            self.handle_iot_ingest()
+        elif self.path == '/api/safety-simulator/jobs':
+            self.handle_safety_simulation()
         else:
             self.send_error(404)
     
     def get_uptime(self):
-        return f"{random.randint(2, 8)} hours {random.randint(15, 45)} minutes"
+        return format_duration(HTTP_METRICS.registry.get("process_uptime_seconds").value)
     
     def get_analytics_data(self):
-        return {
-            "performance_metrics": {
-                "code_generation_speed": f"{random.uniform(2.1, 4.8):.1f}s",
-                "accuracy_rate": f"{random.uniform(94.5, 98.2):.1f}%",
-                "user_satisfaction": f"{random.uniform(4.6, 4.9):.1f}/5.0",
-                "system_uptime": "99.8%",
-                "voice_recognition_accuracy": f"{random.uniform(92.5, 97.8):.1f}%",
-                "security_score": f"{random.uniform(96.2, 99.1):.1f}%"
-            },
-            "usage_statistics": {
-                "total_code_generated": random.randint(15000, 25000),
-                "active_projects": random.randint(45, 85),
-                "voice_commands_used": random.randint(120, 250),
-                "collaboration_sessions": random.randint(25, 45),
-                "safety_tests_run": random.randint(85, 150),
-                "templates_used": random.randint(200, 350)
-            },
-            "real_time_data": {
-                "current_cpu_usage": f"{random.randint(15, 35)}%",
-                "memory_usage": f"{random.randint(40, 65)}%",
-                "api_response_time": f"{random.randint(120, 280)}ms",
-                "concurrent_users": random.randint(8, 18),
-                "active_voice_sessions": random.randint(2, 8)
-            }
-        }
+        """Request, latency and process metrics recorded by this server"""
+        analytics = HTTP_METRICS.analytics()
+        usage = analytics["usage_statistics"]
+        usage["total_code_generated"] = HTTP_METRICS.count('/api/generate-code', 'POST')
+        usage["questions_answered"] = HTTP_METRICS.count('/api/ask-advanced', 'POST')
+        usage["voice_commands_used"] = HTTP_METRICS.count('/api/voice-command', 'POST')
+        usage["safety_tests_run"] = (HTTP_METRICS.count('/api/safety-test', 'POST')
+                                     + HTTP_METRICS.count('/api/safety-simulator/jobs', 'POST'))
+        usage["security_scans_run"] = HTTP_METRICS.count('/api/security-scan', 'POST')
+        usage["telemetry_batches"] = HTTP_METRICS.count('/api/telemetry', 'POST')
+        return analytics
     
     def get_digital_twin_data(self):
-        return {
-            "vehicle_models": [
-                {
-                    "name": "TATA Nexon EV",
-                    "type": "Electric SUV",
-                    "status": "Active",
-                    "battery_level": random.randint(65, 95),
-                    "location": "Mumbai, India",
-                    "health_score": random.randint(85, 98),
-                    "digital_twin_accuracy": "97.2%"
-                },
-                {
-                    "name": "TATA Ace Commercial",
-                    "type": "Commercial Vehicle", 
-                    "status": "Active",
-                    "fuel_level": random.randint(40, 80),
-                    "location": "Delhi, India",
-                    "health_score": random.randint(78, 92),
-                    "digital_twin_accuracy": "94.8%"
-                },
-                {
-                    "name": "TATA Harrier",
-                    "type": "SUV",
-                    "status": "Maintenance",
-                    "fuel_level": random.randint(20, 60),
-                    "location": "Pune, India",
-                    "health_score": random.randint(88, 96),
-                    "digital_twin_accuracy": "96.1%"
-                }
-            ],
-            "real_time_telemetry": {
-                "total_data_points": random.randint(50000, 80000),
-                "data_quality": f"{random.uniform(96.5, 99.2):.1f}%",
-                "prediction_accuracy": f"{random.uniform(93.2, 97.8):.1f}%"
-            }
-        }
+        """Digital twin view built from ingested telemetry aggregates"""
+        snapshot = TELEMETRY_STORE.snapshot()
+        snapshot["predictive_insights"] = [
+            f"{vehicle['name']}: {insight}"
+            for vehicle in snapshot["vehicle_models"]
+            for insight in vehicle["insights"]
+        ]
+        return snapshot
+    
+    def serve_digital_twin_history(self):
+        """Downsampled signal history: ?vehicle_id=&signal=&start=&end=&max_points="""
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        if 'vehicle_id' not in query:
+            self.serve_json({"error": "vehicle_id is required"}, status=400)
+            return
+        try:
+            vehicle_id = query['vehicle_id'][0]
+            signals = query['signal'][0].split(',') if 'signal' in query else None
+            start = float(query['start'][0]) if 'start' in query else None
+            end = float(query['end'][0]) if 'end' in query else None
+            max_points = int(query.get('max_points', ['1000'])[0])
+            
+            self.serve_json(TELEMETRY_STORE.history(vehicle_id, signals, start, end, max_points))
+            
+        except KeyError as e:
+            self.serve_json({"error": f"Not found: {e}"}, status=404)
+        except ValueError as e:
+            self.serve_json({"error": str(e)}, status=400)
+    
+    def handle_telemetry_ingest(self):
+        """Ingest batched telemetry records into the digital twin store"""
+        try:
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            request_data = json.loads(post_data.decode('utf-8'))
+            
+            # Accept a list of records, {"records": [...]} or a single record
+            if isinstance(request_data, dict):
+                records = request_data.get('records', [request_data])
+            else:
+                records = request_data
+            result = TELEMETRY_STORE.ingest(records)
+            result["timestamp"] = datetime.now().isoformat()
+            
+            self.serve_json(result, status=202 if result["accepted"] else 400)
+            
+        except Exception as e:
+            self.serve_json({"error": str(e)}, status=400)
+    
+    def handle_iot_ingest(self):
+        """Ingest CAN/ECU messages: binary packets or JSON messages"""
+        try:
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            result = ingest_http_body(post_data, self.headers.get('Content-Type', ''), IOT_REGISTRY)
+            self.serve_json(result, status=202 if result["accepted"] else 400)
+            
+        except Exception as e:
+            self.serve_json({"error": str(e)}, status=400)
     
     def get_collaboration_data(self):
         return {
@@ -186,100 +301,57 @@ class CompleteTATAHandler(http.server.SimpleHTTPRequestHandler):
         }
     
     def get_predictive_maintenance_data(self):
-        return {
-            "maintenance_predictions": [
-                {
-                    "component": "Engine Oil Filter",
-                    "vehicle": "TATA Nexon",
-                    "predicted_failure": "In 2,500 km",
-                    "confidence": "94%",
-                    "ai_model": "TATA-Predictive-Pro"
-                },
-                {
-                    "component": "Brake Pads (Front)",
-                    "vehicle": "TATA Harrier",
-                    "predicted_failure": "In 1,200 km",
-                    "confidence": "97%",
-                    "ai_model": "TATA-Predictive-Pro"
-                }
-            ],
-            "cost_savings": {
-                "prevented_breakdowns": random.randint(15, 25),
-                "cost_saved": f"₹{random.randint(250000, 450000):,}",
-                "efficiency_improvement": f"{random.uniform(15.5, 28.3):.1f}%"
-            }
-        }
+        """Remaining-useful-life predictions scored from ingested telemetry"""
+        return MAINTENANCE_SCORER.report()
     
     def get_safety_simulation_data(self):
+        """Simulation scenarios with their latest Monte Carlo campaign results"""
         return {
-            "simulation_scenarios": [
-                {
-                    "name": "Emergency Braking Test",
-                    "description": "ASIL-D emergency braking simulation",
-                    "status": "Ready",
-                    "asil_level": "D",
-                    "last_run": "2024-01-30T10:15:00Z"
-                },
-                {
-                    "name": "Collision Avoidance",
-                    "description": "Forward collision detection and mitigation",
-                    "status": "Running",
-                    "asil_level": "D",
-                    "last_run": "2024-01-30T10:30:00Z"
-                },
-                {
-                    "name": "Battery Thermal Protection",
-                    "description": "EV battery thermal runaway simulation",
-                    "status": "Ready",
-                    "asil_level": "C",
-                    "last_run": "2024-01-30T09:45:00Z"
-                }
-            ],
-            "test_results": {
-                "total_tests": random.randint(180, 220),
-                "passed_tests": random.randint(170, 210),
-                "failed_tests": random.randint(2, 8),
-                "success_rate": f"{random.uniform(94.5, 98.5):.1f}%",
-                "asil_compliance": "100%"
-            }
+            "simulation_scenarios": SAFETY_SIMULATOR.scenarios(),
+            "jobs": [
+                {key: job[key] for key in ("job_id", "scenario", "runs", "status", "progress")}
+                for job in SAFETY_SIMULATOR.recent_jobs(10)
+            ]
         }
     
+    def handle_safety_simulation(self):
+        """Start a Monte Carlo campaign as a background job"""
+        try:
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            request_data = json.loads(post_data.decode('utf-8'))
+            
+            job_id = SAFETY_SIMULATOR.submit(
+                request_data.get('scenario', 'emergency_braking'),
+                runs=int(request_data.get('runs', 5000)),
+                seed=request_data.get('seed'),
+                asil_level=request_data.get('asil_level'),
+                params=request_data.get('params')
+            )
+            
+            self.serve_json({
+                "job_id": job_id,
+                "status": "queued",
+                "poll_url": f"/api/safety-simulator/jobs/{job_id}"
+            }, status=202)
+            
+        except SimulatorBusy as e:
+            self.serve_json({"error": str(e)}, status=503)
+        except Exception as e:
+            self.serve_json({"error": str(e)}, status=400)
+    
+    def serve_safety_simulation_job(self):
+        """Progress and (once completed) result of a simulation job"""
+        job_id = self.path.rsplit('/', 1)[-1]
+        job = SAFETY_SIMULATOR.job(job_id)
+        if job is None:
+            self.serve_json({"error": f"Unknown job: {job_id}"}, status=404)
+        else:
+            self.serve_json(job)
+    
     def get_iot_devices(self):
-        return {
-            "connected_devices": [
-                {
-                    "device_id": "TATA-ECU-001",
-                    "type": "Engine Control Unit",
-                    "status": "Online",
-                    "location": "Test Vehicle #1",
-                    "data_rate": "50 msg/sec",
-                    "security_status": "Encrypted"
-                },
-                {
-                    "device_id": "TATA-BMS-002",
-                    "type": "Battery Management System",
-                    "status": "Online",
-                    "location": "EV Test Lab",
-                    "data_rate": "35 msg/sec",
-                    "security_status": "Encrypted"
-                },
-                {
-                    "device_id": "TATA-BRAKE-003",
-                    "type": "Brake Controller",
-                    "status": "Maintenance",
-                    "location": "Safety Test Track",
-                    "data_rate": "0 msg/sec",
-                    "security_status": "Secure"
-                }
-            ],
-            "network_stats": {
-                "total_devices": 3,
-                "online_devices": 2,
-                "total_messages": random.randint(50000, 80000),
-                "data_quality": f"{random.uniform(96.5, 99.2):.1f}%",
-                "security_incidents": 0
-            }
-        }
+        """Registered devices with live message rates and ingestion statistics"""
+        return IOT_REGISTRY.snapshot()
     
     def get_code_templates(self):
         return {
@@ -428,86 +500,37 @@ class CompleteTATAHandler(http.server.SimpleHTTPRequestHandler):
             self.serve_json({"error": str(e)}, status=400)
 
     def generate_comprehensive_response(self, question):
-        """Generate responses covering all 12 features"""
-        question_lower = question.lower()
-
-        if any(word in question_lower for word in ['brake', 'braking', 'abs']):
-            return {
-                "question": question,
-                "answer": "TATA brake systems require ASIL-D compliance with redundant sensors and fail-safe mechanisms. Our AI generates production-ready brake control code with built-in safety validation, performance optimization for ARM platforms, and enterprise-grade security.",
-                "code_example": '''// TATA Brake System - ASIL-D Compliant
-#include "tata_brake_system.h"
+        """Answer from the knowledge index, covering all 12 features"""
+        result = QA_ENGINE.answer(question)
+        if result is not None:
+            response = {"question": question, "answer": result["answer"]}
+            if result["code_example"]:
+                response["code_example"] = result["code_example"]
+            response.update(result["extra"])
+            response["related_topics"] = result["related_topics"]
+            response["sources"] = result["passages"]
+            response["confidence"] = result["confidence"]
+            return response
 
-typedef struct {
-    uint16_t pressure_front_kpa;
-    uint16_t pressure_rear_kpa;
-    uint8_t abs_status;
-    uint32_t timestamp;
-} tata_brake_data_t;
-
-// Initialize brake system with safety checks
-int tata_brake_init(void) {
-    if (can_init(CAN_SPEED_500K) != CAN_OK) {
-        return TATA_ERROR_CAN_INIT;
-    }
-    return TATA_SUCCESS;
-}''',
-                "features_used": ["Code Generation", "Safety Simulation", "Performance Optimization", "Enterprise Security"],
-                "voice_command": "You can say: 'Generate brake system code for TATA commercial vehicles'",
-                "template_available": "ABS Controller Pro - ASIL-D compliant template available",
-                "iot_integration": "Compatible with TATA-BRAKE-003 IoT device",
-                "collaboration": "Shareable with team via secure collaboration sessions",
-                "confidence": 0.98
-            }
-
-        elif any(word in question_lower for word in ['voice', 'speech', 'command']):
-            return {
-                "question": question,
-                "answer": "TATA AI Co-pilot supports advanced voice commands in multiple languages including English and Hindi. Voice recognition accuracy is 95%+ with real-time processing and enterprise-grade security for voice data.",
-                "features_used": ["Voice Commands", "Enterprise Security", "Performance Optimization"],
-                "voice_capabilities": {
-                    "languages": ["English", "Hindi", "Tamil", "Telugu"],
-                    "accuracy": "95.8%",
-                    "commands_supported": ["Code generation", "Feature control", "Q&A", "Template selection"]
-                },
-                "security_note": "All voice data is encrypted and processed locally for maximum security",
-                "confidence": 0.96
-            }
-
-        elif any(word in question_lower for word in ['template', 'pattern', 'example']):
-            return {
-                "question": question,
-                "answer": "TATA AI Co-pilot includes 12+ pre-built automotive code templates covering engine control, brake systems, electric vehicles, and safety systems. All templates are ASIL-compliant and optimized for TATA platforms.",
-                "templates_available": [
-                    "TATA Diesel Engine ECU (ASIL-C, 2847 lines)",
-                    "ABS Controller Pro (ASIL-D, 3245 lines)",
-                    "TATA EV Battery Management (ASIL-C, 4156 lines)"
-                ],
-                "features_used": ["Code Templates", "Performance Optimization", "Safety Simulation"],
-                "voice_command": "Say: 'Show me brake system templates'",
-                "confidence": 0.97
-            }
-
-        else:
-            return {
-                "question": question,
-                "answer": f"I understand you're asking about: '{question}'. As your complete TATA AI Co-pilot with ALL 12 features, I can help with: Interactive Q&A, Code Generation, Real-time Collaboration, Digital Twin, Predictive Maintenance, Advanced Analytics, Voice Commands, Safety Simulation, IoT Integration, Code Templates, Performance Optimization, and Enterprise Security.",
-                "all_features": [
-                    "🤖 Interactive Q&A - Automotive domain expertise",
-                    "🔧 Code Generation - Production-ready embedded software",
-                    "👥 Real-time Collaboration - Team development environment",
-                    "🏗️ Digital Twin - Live vehicle monitoring",
-                    "🔮 Predictive Maintenance - AI failure prediction",
-                    "📊 Advanced Analytics - Performance insights",
-                    "🎤 Voice Commands - Hands-free interaction",
-                    "🛡️ Safety Simulation - ASIL compliance testing",
-                    "🌐 IoT Integration - Real device connectivity",
-                    "📋 Code Templates - Pre-built automotive patterns",
-                    "⚡ Performance Optimization - Platform-specific tuning",
-                    "🔒 Enterprise Security - Production-grade protection"
-                ],
-                "confidence": 0.90
-            }
+        return {
+            "question": question,
+            "answer": f"I understand you're asking about: '{question}'. As your complete TATA AI Co-pilot with ALL 12 features, I can help with: Interactive Q&A, Code Generation, Real-time Collaboration, Digital Twin, Predictive Maintenance, Advanced Analytics, Voice Commands, Safety Simulation, IoT Integration, Code Templates, Performance Optimization, and Enterprise Security.",
+            "all_features": [
+                "🤖 Interactive Q&A - Automotive domain expertise",
+                "🔧 Code Generation - Production-ready embedded software",
+                "👥 Real-time Collaboration - Team development environment",
+                "🏗️ Digital Twin - Live vehicle monitoring",
+                "🔮 Predictive Maintenance - AI failure prediction",
+                "📊 Advanced Analytics - Performance insights",
+                "🎤 Voice Commands - Hands-free interaction",
+                "🛡️ Safety Simulation - ASIL compliance testing",
+                "🌐 IoT Integration - Real device connectivity",
+                "📋 Code Templates - Pre-built automotive patterns",
+                "⚡ Performance Optimization - Platform-specific tuning",
+                "🔒 Enterprise Security - Production-grade protection"
+            ],
+            "confidence": 0.90
+        }
 
     def serve_complete_main_page(self):
         html = '''<!DOCTYPE html>
@@ -1008,6 +1031,14 @@ def main():
     print("-" * 80)
 
     threading.Thread(target=open_browser_delayed, daemon=True).start()
+    # Warm the knowledge index while the server comes up
+    threading.Thread(target=QA_ENGINE.get, daemon=True).start()
+
+    try:
+        IoTIngestServer(IOT_REGISTRY, udp_port=IOT_PORT, tcp_port=IOT_PORT).start()
+        print(f"📡 IoT ingest listening on UDP/TCP port {IOT_PORT}")
+    except OSError as e:
+        print(f"⚠️ IoT socket ingest disabled: {e}")
 
     PORT = 8000
     try:
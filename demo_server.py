@@ -9,7 +9,11 @@ import json
 import os
 from pathlib import Path
 
-class TATADemoHandler(http.server.SimpleHTTPRequestHandler):
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics
+
+HTTP_METRICS = get_http_metrics()
+
+class TATADemoHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/':
             self.send_demo_page()
@@ -27,6 +31,10 @@ class TATADemoHandler(http.server.SimpleHTTPRequestHandler):
             self.send_api_response({
                 "templates": ["can_driver", "brake_system", "engine_control", "transmission", "ecu_base"]
             })
+        elif self.path == '/api/analytics':
+            self.send_api_response(HTTP_METRICS.analytics())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         else:
             super().do_GET()
     
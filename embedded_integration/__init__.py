@@ -5,8 +5,17 @@ This module provides interfaces and analyzers for embedded systems,
 including memory analysis, real-time constraints, and platform-specific optimizations.
 """
 
-from .analyzer import EmbeddedAnalyzer
+from .analyzer import EmbeddedAnalyzer, AnalysisResult
+from .findings import Finding, Rule, FindingTable, register_rule
+from .rule_engine import RuleSet, RulePlan, RuleProfile, load_rule_set
+from .incremental import IncrementalAnalyzer
 from .platforms import PlatformManager
 from .constraints import ConstraintChecker
+from .timing import WCETEstimator
+from .footprint import FootprintEstimator
 
-__all__ = ["EmbeddedAnalyzer", "PlatformManager", "ConstraintChecker"]
+__all__ = [
+    "EmbeddedAnalyzer", "AnalysisResult", "IncrementalAnalyzer", "PlatformManager", "ConstraintChecker",
+    "WCETEstimator", "FootprintEstimator", "Finding", "Rule", "FindingTable", "register_rule",
+    "RuleSet", "RulePlan", "RuleProfile", "load_rule_set"
+]
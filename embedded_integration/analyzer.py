@@ -7,23 +7,69 @@ real-time requirements, and platform-specific optimizations.
 
 import re
 import ast
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, AsyncIterator
 from pathlib import Path
 
 from ai_copilot.config import CopilotConfig
 from .constraints import ConstraintChecker
 from .platforms import PlatformManager
+from .findings import (
+    Finding, LineIndex, register_rule, warning_messages, suggestion_messages
+)
+from .rule_engine import plan_for_config
+
+
+register_rule("MEM001", "Dynamic memory allocation detected ({0} instances). "
+              "Consider using static allocation for embedded systems.", category="memory",
+              suggestion="Replace dynamic allocation with static arrays or memory pools.")
+register_rule("MEM002", "Large local array detected ({0} bytes). "
+              "Consider using static or heap allocation.", category="memory")
+register_rule("MEM003", "Recursive function detected. Recursion can cause stack overflow "
+              "in embedded systems with limited stack space.", category="memory",
+              suggestion="Consider converting recursive algorithms to iterative ones.")
+register_rule("TIM001", "Blocking call detected ({0}). This may violate "
+              "real-time constraints in interrupt handlers or critical sections.", category="timing",
+              suggestion="Use non-blocking alternatives or move to background tasks.")
+register_rule("TIM002", "Interrupt-unsafe operation detected ({0}). "
+              "Avoid using in interrupt service routines.", category="timing",
+              suggestion="Use interrupt-safe alternatives or defer to main loop.")
+register_rule("TIM003", "Infinite loop without yield detected. This may starve other tasks.",
+              category="timing", suggestion="Add appropriate delays or yield points in infinite loops.")
+register_rule("PLT001", "{0} header detected ({1}). "
+              "This may not be available on embedded platforms.", category="platform",
+              suggestion="Use platform-abstraction layer instead of {1}.")
+register_rule("PLT002", "Standard library function '{0}' may not be available "
+              "or suitable for embedded systems.", category="platform",
+              suggestion="Consider embedded-specific alternatives to '{0}'.")
 
 
-@dataclass
 class AnalysisResult:
-    """Results from code analysis"""
-    is_valid: bool
-    warnings: List[str]
-    suggestions: List[str]
-    metrics: Dict[str, Any]
-    issues: Dict[str, List[str]]
+    """
+    Results from code analysis
+    
+    Warnings and suggestions are rendered from the findings on access.
+    """
+    
+    __slots__ = ("findings", "metrics", "issues")
+    
+    def __init__(self, findings: Optional[List[Finding]] = None,
+                 metrics: Optional[Dict[str, Any]] = None,
+                 issues: Optional[Dict[str, List[str]]] = None):
+        self.findings = findings if findings is not None else []
+        self.metrics = metrics if metrics is not None else {}
+        self.issues = issues if issues is not None else {}
+    
+    @property
+    def is_valid(self) -> bool:
+        return not any(finding.severity != "note" for finding in self.findings)
+    
+    @property
+    def warnings(self) -> List[str]:
+        return warning_messages(self.findings)
+    
+    @property
+    def suggestions(self) -> List[str]:
+        return suggestion_messages(self.findings)
 
 
 class EmbeddedAnalyzer:
@@ -33,8 +79,10 @@ class EmbeddedAnalyzer:
     
     def __init__(self, config: CopilotConfig):
         self.config = config
-        self.constraint_checker = ConstraintChecker(config)
         self.platform_manager = PlatformManager(config)
+        self.constraint_checker = ConstraintChecker(config, self.platform_manager)
+        # MISRA C rules of the safety pass, from the declarative rule sets
+        self.safety_rules = plan_for_config(config, ["MISRA-C"])
         
         # Common embedded patterns and anti-patterns
         self.memory_patterns = {
@@ -82,58 +130,70 @@ class EmbeddedAnalyzer:
         Returns:
             Analysis results with warnings, suggestions, and metrics
         """
+        analysis_result = await self.analyze(code, constraints)
+        warnings = analysis_result.warnings
+        suggestions = analysis_result.suggestions
+        return {
+            'explanation': self._generate_explanation(analysis_result.metrics, warnings, suggestions),
+            'warnings': warnings,
+            'suggestions': suggestions,
+            'metrics': analysis_result.metrics,
+            'is_valid': not warnings
+        }
+    
+    async def analyze(self, code: str, constraints: Optional[Dict[str, Any]] = None) -> AnalysisResult:
+        """
+        Analyze code into findings
         
-        analysis_result = AnalysisResult(
-            is_valid=True,
-            warnings=[],
-            suggestions=[],
-            metrics={},
-            issues={}
-        )
+        Args:
+            code: Source code to analyze
+            constraints: Additional constraints to check
+            
+        Returns:
+            AnalysisResult with the findings (with source lines) and metrics
+        """
+        analysis_result = AnalysisResult()
+        async for pass_result in self._passes(code, constraints):
+            analysis_result.findings.extend(pass_result['findings'])
+            analysis_result.metrics.update(pass_result.get('metrics', {}))
+        return analysis_result
+    
+    async def stream_findings(self, code: str,
+                              constraints: Optional[Dict[str, Any]] = None) -> AsyncIterator[Finding]:
+        """Yield findings as each analysis pass completes"""
+        async for pass_result in self._passes(code, constraints):
+            for finding in pass_result['findings']:
+                yield finding
+    
+    async def _passes(self, code: str, constraints: Optional[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        lines = LineIndex(code)
         
         # Memory analysis
-        memory_analysis = self._analyze_memory_usage(code)
-        analysis_result.metrics.update(memory_analysis['metrics'])
-        analysis_result.warnings.extend(memory_analysis['warnings'])
-        analysis_result.suggestions.extend(memory_analysis['suggestions'])
+        yield self._analyze_memory_usage(code, lines)
         
         # Timing analysis
-        timing_analysis = self._analyze_timing_constraints(code)
-        analysis_result.warnings.extend(timing_analysis['warnings'])
-        analysis_result.suggestions.extend(timing_analysis['suggestions'])
+        yield self._analyze_timing_constraints(code, lines)
         
         # Platform-specific analysis
-        platform_analysis = await self._analyze_platform_compatibility(code)
-        analysis_result.warnings.extend(platform_analysis['warnings'])
-        analysis_result.suggestions.extend(platform_analysis['suggestions'])
+        yield await self._analyze_platform_compatibility(code, lines)
         
         # Safety analysis
-        safety_analysis = self._analyze_safety_compliance(code)
-        analysis_result.warnings.extend(safety_analysis['warnings'])
-        analysis_result.suggestions.extend(safety_analysis['suggestions'])
+        yield self._analyze_safety_compliance(code, lines)
         
         # Check custom constraints
         if constraints:
             constraint_analysis = await self.constraint_checker.check_constraints(code, constraints)
-            analysis_result.warnings.extend(constraint_analysis['warnings'])
-            analysis_result.suggestions.extend(constraint_analysis['suggestions'])
-        
-        # Determine overall validity
-        analysis_result.is_valid = len(analysis_result.warnings) == 0
-        
-        return {
-            'explanation': self._generate_explanation(analysis_result),
-            'warnings': analysis_result.warnings,
-            'suggestions': analysis_result.suggestions,
-            'metrics': analysis_result.metrics,
-            'is_valid': analysis_result.is_valid
-        }
+            findings = [Finding("EXT001", args=(warning,)) for warning in constraint_analysis['warnings']]
+            findings.extend(
+                Finding("EXT002", args=(suggestion,)) for suggestion in constraint_analysis['suggestions']
+            )
+            yield {'findings': findings, 'metrics': constraint_analysis.get('metrics', {})}
     
-    def _analyze_memory_usage(self, code: str) -> Dict[str, Any]:
+    def _analyze_memory_usage(self, code: str, lines: Optional[LineIndex] = None) -> Dict[str, Any]:
         """Analyze memory usage patterns"""
         
-        warnings = []
-        suggestions = []
+        lines = lines or LineIndex(code)
+        findings = []
         metrics = {
             'estimated_stack_usage': 0,
             'dynamic_allocations': 0,
@@ -142,103 +202,68 @@ class EmbeddedAnalyzer:
         
         # Check for dynamic memory allocation
         for pattern in self.memory_patterns['dynamic_allocation']:
-            matches = re.findall(pattern, code, re.IGNORECASE)
+            matches = list(re.finditer(pattern, code, re.IGNORECASE))
             if matches:
                 metrics['dynamic_allocations'] += len(matches)
-                warnings.append(
-                    f"Dynamic memory allocation detected ({len(matches)} instances). "
-                    "Consider using static allocation for embedded systems."
-                )
-                suggestions.append(
-                    "Replace dynamic allocation with static arrays or memory pools."
-                )
+                findings.append(Finding("MEM001", *lines.position(matches[0].start()), (len(matches),)))
         
         # Analyze stack usage from local arrays
         for pattern in self.memory_patterns['stack_usage']:
-            matches = re.findall(pattern, code)
-            for match in matches:
+            for match in re.finditer(pattern, code):
                 try:
-                    size = int(match)
+                    size = int(match.group(1))
                     metrics['estimated_stack_usage'] += size
                     if size > 1024:  # Large array threshold
                         metrics['large_arrays'].append(size)
-                        warnings.append(
-                            f"Large local array detected ({size} bytes). "
-                            "Consider using static or heap allocation."
-                        )
+                        findings.append(Finding("MEM002", *lines.position(match.start()), (size,)))
                 except ValueError:
                     pass
         
         # Check for recursion
         for pattern in self.memory_patterns['recursion']:
-            matches = re.findall(pattern, code, re.DOTALL)
-            if matches:
-                warnings.append(
-                    "Recursive function detected. Recursion can cause stack overflow "
-                    "in embedded systems with limited stack space."
-                )
-                suggestions.append(
-                    "Consider converting recursive algorithms to iterative ones."
-                )
+            match = re.search(pattern, code, re.DOTALL)
+            if match:
+                findings.append(Finding("MEM003", *lines.position(match.start())))
         
         return {
-            'warnings': warnings,
-            'suggestions': suggestions,
+            'findings': findings,
             'metrics': metrics
         }
     
-    def _analyze_timing_constraints(self, code: str) -> Dict[str, Any]:
+    def _analyze_timing_constraints(self, code: str, lines: Optional[LineIndex] = None) -> Dict[str, Any]:
         """Analyze real-time and timing constraints"""
         
-        warnings = []
-        suggestions = []
+        lines = lines or LineIndex(code)
+        findings = []
         
         # Check for blocking calls
         for pattern in self.timing_patterns['blocking_calls']:
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            if matches:
-                warnings.append(
-                    f"Blocking call detected ({pattern}). This may violate "
-                    "real-time constraints in interrupt handlers or critical sections."
-                )
-                suggestions.append(
-                    "Use non-blocking alternatives or move to background tasks."
-                )
+            match = re.search(pattern, code, re.IGNORECASE)
+            if match:
+                findings.append(Finding("TIM001", *lines.position(match.start()), (pattern,)))
         
         # Check for interrupt-unsafe operations
         for pattern in self.timing_patterns['interrupt_unsafe']:
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            if matches:
-                warnings.append(
-                    f"Interrupt-unsafe operation detected ({pattern}). "
-                    "Avoid using in interrupt service routines."
-                )
-                suggestions.append(
-                    "Use interrupt-safe alternatives or defer to main loop."
-                )
+            match = re.search(pattern, code, re.IGNORECASE)
+            if match:
+                findings.append(Finding("TIM002", *lines.position(match.start()), (pattern,)))
         
         # Check for infinite loops without yield
         infinite_loop_pattern = r'while\s*\(\s*1\s*\)\s*{[^}]*}'
-        matches = re.findall(infinite_loop_pattern, code, re.DOTALL)
-        for match in matches:
-            if 'yield' not in match and 'delay' not in match and 'sleep' not in match:
-                warnings.append(
-                    "Infinite loop without yield detected. This may starve other tasks."
-                )
-                suggestions.append(
-                    "Add appropriate delays or yield points in infinite loops."
-                )
+        for match in re.finditer(infinite_loop_pattern, code, re.DOTALL):
+            body = match.group()
+            if 'yield' not in body and 'delay' not in body and 'sleep' not in body:
+                findings.append(Finding("TIM003", *lines.position(match.start())))
         
         return {
-            'warnings': warnings,
-            'suggestions': suggestions
+            'findings': findings
         }
     
-    async def _analyze_platform_compatibility(self, code: str) -> Dict[str, Any]:
+    async def _analyze_platform_compatibility(self, code: str, lines: Optional[LineIndex] = None) -> Dict[str, Any]:
         """Analyze platform-specific compatibility"""
         
-        warnings = []
-        suggestions = []
+        lines = lines or LineIndex(code)
+        findings = []
         
         # Check for platform-specific includes
         platform_includes = {
@@ -248,14 +273,11 @@ class EmbeddedAnalyzer:
         }
         
         for include, platform in platform_includes.items():
-            if f'#include <{include}>' in code or f'#include "{include}"' in code:
-                warnings.append(
-                    f"{platform} header detected ({include}). "
-                    "This may not be available on embedded platforms."
-                )
-                suggestions.append(
-                    f"Use platform-abstraction layer instead of {include}."
-                )
+            position = code.find(f'#include <{include}>')
+            if position < 0:
+                position = code.find(f'#include "{include}"')
+            if position >= 0:
+                findings.append(Finding("PLT001", *lines.position(position), (platform, include)))
         
         # Check for standard library functions that may not be available
         embedded_unsafe_functions = [
@@ -265,91 +287,42 @@ class EmbeddedAnalyzer:
         
         for func in embedded_unsafe_functions:
             pattern = rf'\b{func}\s*\('
-            if re.search(pattern, code):
-                warnings.append(
-                    f"Standard library function '{func}' may not be available "
-                    "or suitable for embedded systems."
-                )
-                suggestions.append(
-                    f"Consider embedded-specific alternatives to '{func}'."
-                )
+            match = re.search(pattern, code)
+            if match:
+                findings.append(Finding("PLT002", *lines.position(match.start()), (func,)))
         
         return {
-            'warnings': warnings,
-            'suggestions': suggestions
+            'findings': findings
         }
     
-    def _analyze_safety_compliance(self, code: str) -> Dict[str, Any]:
-        """Analyze safety and compliance aspects"""
-        
-        warnings = []
-        suggestions = []
-        
-        # MISRA C compliance checks (basic)
-        misra_violations = []
-        
-        # Check for magic numbers
-        magic_number_pattern = r'\b(?<!#define\s)\d{2,}\b'
-        matches = re.findall(magic_number_pattern, code)
-        if matches:
-            misra_violations.append("Magic numbers detected")
-            suggestions.append(
-                "Replace magic numbers with named constants (#define or const)."
-            )
-        
-        # Check for goto statements
-        if re.search(r'\bgoto\b', code):
-            misra_violations.append("goto statement detected")
-            warnings.append(
-                "goto statements violate MISRA C guidelines and should be avoided."
-            )
-            suggestions.append("Restructure code to eliminate goto statements.")
-        
-        # Check for proper error handling
-        function_pattern = r'(\w+)\s*\([^)]*\)\s*{'
-        functions = re.findall(function_pattern, code)
-        for func in functions:
-            if func not in ['main', 'void']:
-                # Check if function has return value checking
-                call_pattern = rf'{func}\s*\([^)]*\)\s*;'
-                calls = re.findall(call_pattern, code)
-                if calls:
-                    warnings.append(
-                        f"Function '{func}' return value may not be checked. "
-                        "Always check return values for error handling."
-                    )
-                    suggestions.append(
-                        f"Add return value checking for '{func}' function calls."
-                    )
-        
-        if misra_violations:
-            warnings.append(f"MISRA C violations detected: {', '.join(misra_violations)}")
+    def _analyze_safety_compliance(self, code: str, lines: Optional[LineIndex] = None) -> Dict[str, Any]:
+        """Analyze safety and compliance aspects (MISRA C rule set)"""
         
         return {
-            'warnings': warnings,
-            'suggestions': suggestions
+            'findings': self.safety_rules.evaluate(code)
         }
     
-    def _generate_explanation(self, analysis_result: AnalysisResult) -> str:
-        """Generate human-readable explanation of analysis results"""
+    def _generate_explanation(self, metrics: Dict[str, Any], warnings: List[str],
+                              suggestions: List[str]) -> str:
+        """Generate human-readable explanation of rendered analysis results"""
         
-        if analysis_result.is_valid:
+        if not warnings:
             explanation = "Code analysis completed successfully. "
         else:
             explanation = "Code analysis found potential issues. "
         
-        if analysis_result.metrics.get('estimated_stack_usage', 0) > 0:
-            stack_usage = analysis_result.metrics['estimated_stack_usage']
+        if metrics.get('estimated_stack_usage', 0) > 0:
+            stack_usage = metrics['estimated_stack_usage']
             explanation += f"Estimated stack usage: {stack_usage} bytes. "
         
-        if analysis_result.metrics.get('dynamic_allocations', 0) > 0:
-            allocs = analysis_result.metrics['dynamic_allocations']
+        if metrics.get('dynamic_allocations', 0) > 0:
+            allocs = metrics['dynamic_allocations']
             explanation += f"Found {allocs} dynamic memory allocations. "
         
-        if len(analysis_result.warnings) > 0:
-            explanation += f"Found {len(analysis_result.warnings)} warnings. "
+        if len(warnings) > 0:
+            explanation += f"Found {len(warnings)} warnings. "
         
-        if len(analysis_result.suggestions) > 0:
-            explanation += f"Generated {len(analysis_result.suggestions)} improvement suggestions."
+        if len(suggestions) > 0:
+            explanation += f"Generated {len(suggestions)} improvement suggestions."
         
         return explanation
@@ -4,6 +4,9 @@ Constraint checker for embedded systems
 
 from typing import Dict, List, Optional, Any
 from ai_copilot.config import CopilotConfig
+from .platforms import PlatformManager
+from .timing import WCETEstimator
+from .footprint import FootprintEstimator
 
 
 class ConstraintChecker:
@@ -11,10 +14,13 @@ class ConstraintChecker:
     Checks code against embedded system constraints
     """
     
-    def __init__(self, config: CopilotConfig):
+    def __init__(self, config: CopilotConfig, platform_manager: Optional[PlatformManager] = None):
         self.config = config
+        self.platform_manager = platform_manager or PlatformManager(config)
+        self.wcet_estimator = WCETEstimator(self.platform_manager)
+        self.footprint_estimator = FootprintEstimator(self.platform_manager)
     
-    async def check_constraints(self, code: str, constraints: Dict[str, Any]) -> Dict[str, List[str]]:
+    async def check_constraints(self, code: str, constraints: Dict[str, Any]) -> Dict[str, Any]:
         """
         Check code against specified constraints
         
@@ -23,21 +29,38 @@ class ConstraintChecker:
             constraints: Constraints to validate against
             
         Returns:
-            Dictionary with warnings and suggestions
+            Dictionary with warnings, suggestions and metrics
         """
         
         warnings = []
         suggestions = []
+        metrics = {}
         
         # Memory constraints
         if 'memory' in constraints:
             memory_warnings = self._check_memory_constraints(code, constraints['memory'])
             warnings.extend(memory_warnings)
+            
+            if 'flash_kb' in constraints['memory'] or 'ram_kb' in constraints['memory']:
+                budget_analysis = self._check_memory_budget(
+                    code, constraints['memory'], constraints.get('platform')
+                )
+                warnings.extend(budget_analysis['warnings'])
+                suggestions.extend(budget_analysis['suggestions'])
+                metrics['footprint'] = budget_analysis['metrics']
         
         # Timing constraints
         if 'timing' in constraints:
             timing_warnings = self._check_timing_constraints(code, constraints['timing'])
             warnings.extend(timing_warnings)
+            
+            if 'deadline_us' in constraints['timing']:
+                wcet_analysis = self._check_wcet_deadlines(
+                    code, constraints['timing'], constraints.get('platform')
+                )
+                warnings.extend(wcet_analysis['warnings'])
+                suggestions.extend(wcet_analysis['suggestions'])
+                metrics['wcet'] = wcet_analysis['metrics']
         
         # Power constraints
         if 'power' in constraints:
@@ -46,7 +69,8 @@ class ConstraintChecker:
         
         return {
             'warnings': warnings,
-            'suggestions': suggestions
+            'suggestions': suggestions,
+            'metrics': metrics
         }
     
     def _check_memory_constraints(self, code: str, memory_constraints: Dict[str, Any]) -> List[str]:
@@ -67,6 +91,17 @@ class ConstraintChecker:
         
         return warnings
     
+    def _check_memory_budget(self, code: str, memory_constraints: Dict[str, Any],
+                             platform: Optional[str] = None) -> Dict[str, Any]:
+        """Check estimated flash/RAM footprint against an ECU memory budget"""
+        report = self.footprint_estimator.estimate(
+            code, memory_constraints.get('platform', platform)
+        )
+        budget_analysis = self.footprint_estimator.check_budget(report, memory_constraints)
+        budget_analysis['metrics'].update(report.to_dict())
+        
+        return budget_analysis
+    
     def _check_timing_constraints(self, code: str, timing_constraints: Dict[str, Any]) -> List[str]:
         """Check timing-related constraints"""
         warnings = []
@@ -80,6 +115,83 @@ class ConstraintChecker:
         
         return warnings
     
+    def _check_wcet_deadlines(self, code: str, timing_constraints: Dict[str, Any],
+                              platform: Optional[str] = None) -> Dict[str, Any]:
+        """Check per-function worst-case execution time against deadlines
+        
+        ``deadline_us`` is either a single deadline applied to every function
+        or a mapping of function name to deadline in microseconds.
+        """
+        warnings = []
+        suggestions = []
+        
+        platform_key = self.wcet_estimator.resolve_platform(
+            timing_constraints.get('platform', platform)
+        )
+        timings = self.wcet_estimator.estimate(
+            code,
+            platform=platform_key,
+            clock_mhz=timing_constraints.get('clock_mhz'),
+            max_loop_iterations=timing_constraints.get('max_loop_iterations')
+        )
+        
+        deadlines = timing_constraints['deadline_us']
+        for name, timing in timings.items():
+            deadline = deadlines.get(name) if isinstance(deadlines, dict) else deadlines
+            if deadline is None:
+                continue
+            
+            if not timing.bounded:
+                reasons = []
+                if timing.recursive:
+                    reasons.append("recursion")
+                    suggestions.append(
+                        f"Bound the recursion depth of '{name}' or rewrite it iteratively"
+                    )
+                if timing.unbounded_loops:
+                    lines = ', '.join(str(line) for line in timing.unbounded_loops)
+                    reasons.append(f"loops without a constant trip count (line {lines})")
+                    suggestions.append(
+                        f"Use constant loop bounds in '{name}' or set timing.max_loop_iterations"
+                    )
+                if not reasons:
+                    unbounded = [callee for callee in timing.calls
+                                 if callee in timings and not timings[callee].bounded]
+                    reasons.append(f"calls to unbounded functions ({', '.join(unbounded)})")
+                    suggestions.append(
+                        f"Bound the WCET of {', '.join(unbounded)} to verify the deadline of '{name}'"
+                    )
+                warnings.append(
+                    f"WCET of '{name}' cannot be bounded due to {' and '.join(reasons)}; "
+                    f"deadline of {deadline} us cannot be verified"
+                )
+            elif timing.time_us > deadline:
+                warnings.append(
+                    f"Estimated WCET of '{name}' ({timing.time_us} us, {timing.cycles} cycles "
+                    f"on {platform_key}) exceeds deadline ({deadline} us)"
+                )
+                suggestions.append(
+                    f"Reduce loop iterations or move work out of '{name}' to meet its deadline"
+                )
+        
+        metrics = {
+            'platform': platform_key,
+            'functions': {
+                name: {
+                    'cycles': timing.cycles,
+                    'time_us': timing.time_us,
+                    'bounded': timing.bounded
+                }
+                for name, timing in timings.items()
+            }
+        }
+        
+        return {
+            'warnings': warnings,
+            'suggestions': suggestions,
+            'metrics': metrics
+        }
+    
     def _check_power_constraints(self, code: str, power_constraints: Dict[str, Any]) -> List[str]:
         """Check power-related constraints"""
         warnings = []
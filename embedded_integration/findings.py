@@ -0,0 +1,259 @@
+"""
+Compact analysis findings
+
+A Finding is a small record: the ID of the rule that produced it, a
+source location and the arguments for the rule's message template. The
+message and suggestion texts exist once per rule (interned) and are only
+rendered when results are serialized. FindingTable stores the findings of
+many files in parallel arrays for project-level aggregation.
+"""
+
+import bisect
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+SEVERITIES = ("error", "warning", "note")
+
+
+class Rule:
+    """
+    A check's identity and message templates
+
+    Args:
+        rule_id: Stable identifier, e.g. "MEM001"
+        template: str.format template of the finding message
+        severity: "error", "warning" or "note" (notes carry only a suggestion)
+        category: Group for reports, e.g. "memory"
+        suggestion: str.format template of the fix suggestion (optional)
+    """
+
+    __slots__ = ("rule_id", "template", "severity", "category", "suggestion")
+
+    def __init__(self, rule_id: str, template: str, severity: str = "warning",
+                 category: str = "", suggestion: Optional[str] = None):
+        if severity not in SEVERITIES:
+            raise ValueError(f"Unknown severity {severity!r} for rule {rule_id}")
+        self.rule_id = sys.intern(rule_id)
+        self.template = sys.intern(template)
+        self.severity = severity
+        self.category = sys.intern(category)
+        self.suggestion = sys.intern(suggestion) if suggestion else None
+
+    def __repr__(self) -> str:
+        return f"Rule({self.rule_id!r}, {self.template!r})"
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(rule_id: str, template: str, severity: str = "warning",
+                  category: str = "", suggestion: Optional[str] = None) -> Rule:
+    """Add a rule to the catalog (re-registering an ID replaces it)"""
+    rule = Rule(rule_id, template, severity, category, suggestion)
+    RULES[rule.rule_id] = rule
+    return rule
+
+
+# Free-text messages from checks that are not rule-based (constraint budgets)
+register_rule("EXT001", "{0}", category="constraints")
+register_rule("EXT002", "{0}", severity="note", category="constraints", suggestion="{0}")
+
+
+class Finding:
+    """
+    One occurrence of a rule
+
+    Args:
+        rule_id: ID of a registered rule
+        line: 1-based line (0 if unknown)
+        column: 1-based column (0 if unknown)
+        args: Arguments for the rule's message and suggestion templates
+    """
+
+    __slots__ = ("rule_id", "line", "column", "args")
+
+    def __init__(self, rule_id: str, line: int = 0, column: int = 0, args: Tuple[Any, ...] = ()):
+        self.rule_id = rule_id
+        self.line = line
+        self.column = column
+        self.args = tuple(sys.intern(arg) if type(arg) is str else arg for arg in args)
+
+    @property
+    def rule(self) -> Rule:
+        return RULES[self.rule_id]
+
+    @property
+    def severity(self) -> str:
+        return RULES[self.rule_id].severity
+
+    @property
+    def message(self) -> str:
+        return RULES[self.rule_id].template.format(*self.args)
+
+    @property
+    def suggestion(self) -> Optional[str]:
+        suggestion = RULES[self.rule_id].suggestion
+        return suggestion.format(*self.args) if suggestion else None
+
+    def moved(self, lines: int) -> "Finding":
+        """The same finding ``lines`` further down (for region-relative findings)"""
+        return Finding(self.rule_id, self.line + lines if self.line else 0, self.column, self.args)
+
+    def to_dict(self) -> Dict[str, Any]:
+        rule = RULES[self.rule_id]
+        return {
+            "rule_id": self.rule_id,
+            "severity": rule.severity,
+            "category": rule.category,
+            "message": self.message,
+            "suggestion": self.suggestion,
+            "line": self.line,
+            "column": self.column,
+        }
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return (self.rule_id, self.line, self.column, self.args) == \
+            (other.rule_id, other.line, other.column, other.args)
+
+    def __hash__(self) -> int:
+        return hash((self.rule_id, self.line, self.column, self.args))
+
+    def __repr__(self) -> str:
+        return f"Finding({self.rule_id!r}, line={self.line}, column={self.column}, args={self.args!r})"
+
+
+def warning_messages(findings: Iterable[Finding]) -> List[str]:
+    """Rendered messages of the findings that are warnings or errors"""
+    return [finding.message for finding in findings if RULES[finding.rule_id].severity != "note"]
+
+
+def suggestion_messages(findings: Iterable[Finding]) -> List[str]:
+    """Rendered suggestions of the findings that have one"""
+    return [suggestion for suggestion in (finding.suggestion for finding in findings) if suggestion]
+
+
+class LineIndex:
+    """Maps character offsets in a source text to 1-based (line, column)"""
+
+    __slots__ = ("_starts",)
+
+    def __init__(self, code: str):
+        starts = array("l", [0])
+        position = code.find("\n")
+        while position >= 0:
+            starts.append(position + 1)
+            position = code.find("\n", position + 1)
+        self._starts = starts
+
+    def line(self, offset: int) -> int:
+        return bisect.bisect_right(self._starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        line = bisect.bisect_right(self._starts, offset)
+        return line, offset - self._starts[line - 1] + 1
+
+
+class FindingTable:
+    """
+    Findings of many files in columnar form
+
+    Each finding takes a rule index, a file index, a line and a column in
+    fixed-width arrays; message arguments are kept only for findings that
+    have them. Aggregations run over the arrays without materializing
+    Finding objects.
+    """
+
+    def __init__(self):
+        self.files: List[str] = []
+        self.rule_ids: List[str] = []
+        self._file_index: Dict[str, int] = {}
+        self._rule_index: Dict[str, int] = {}
+        self._rules = array("H")
+        self._file = array("I")
+        self._line = array("I")
+        self._column = array("H")
+        self._args: Dict[int, Tuple[Any, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _index(self, index: Dict[str, int], values: List[str], value: str) -> int:
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(values)
+            values.append(value)
+        return position
+
+    def add(self, path: str, findings: Iterable[Finding]) -> int:
+        """
+        Append a file's findings
+
+        Returns:
+            Number of findings added
+        """
+        file_index = self._index(self._file_index, self.files, path)
+        added = 0
+        for finding in findings:
+            if finding.args:
+                self._args[len(self._rules)] = finding.args
+            self._rules.append(self._index(self._rule_index, self.rule_ids, finding.rule_id))
+            self._file.append(file_index)
+            self._line.append(finding.line)
+            self._column.append(min(finding.column, 0xFFFF))
+            added += 1
+        return added
+
+    def __iter__(self) -> Iterator[Tuple[str, Finding]]:
+        """(file path, Finding) in insertion order"""
+        for index in range(len(self._rules)):
+            yield self.files[self._file[index]], Finding(
+                self.rule_ids[self._rules[index]], self._line[index], self._column[index],
+                self._args.get(index, ())
+            )
+
+    def findings(self, path: str) -> List[Finding]:
+        """Findings of one file"""
+        file_index = self._file_index.get(path)
+        if file_index is None:
+            return []
+        indices = np.flatnonzero(np.frombuffer(self._file, dtype=np.uint32) == file_index)
+        return [
+            Finding(self.rule_ids[self._rules[i]], self._line[i], self._column[i], self._args.get(i, ()))
+            for i in indices.tolist()
+        ]
+
+    def _counts(self, column: array, dtype: Any, labels: List[str]) -> Dict[str, int]:
+        if not labels:
+            return {}
+        counts = np.bincount(np.frombuffer(column, dtype=dtype), minlength=len(labels))
+        return {labels[i]: int(count) for i, count in enumerate(counts.tolist()) if count}
+
+    def counts_by_rule(self) -> Dict[str, int]:
+        return self._counts(self._rules, np.uint16, self.rule_ids)
+
+    def counts_by_file(self) -> Dict[str, int]:
+        return self._counts(self._file, np.uint32, self.files)
+
+    def counts_by_severity(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for rule_id, count in self.counts_by_rule().items():
+            severity = RULES[rule_id].severity if rule_id in RULES else "warning"
+            counts[severity] = counts.get(severity, 0) + count
+        return counts
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Totals per severity and rule, and the files with most findings"""
+        by_file = self.counts_by_file()
+        return {
+            "files": len(self.files),
+            "findings": len(self),
+            "by_severity": self.counts_by_severity(),
+            "by_rule": dict(sorted(self.counts_by_rule().items(), key=lambda item: (-item[1], item[0]))),
+            "top_files": sorted(by_file.items(), key=lambda item: (-item[1], item[0]))[:top],
+        }
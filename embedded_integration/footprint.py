@@ -0,0 +1,451 @@
+"""
+Code size and RAM footprint estimator
+
+Estimates flash and RAM usage of a translation unit in a single pass over
+the shared source model and checks it against ECU memory budgets.
+"""
+
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+
+from .platforms import PlatformManager
+from .source_parser import ParsedSource, Token, parse_source, IDENT, NUMBER, STRING
+
+
+# Instructions emitted per C statement on a native-width core
+STATEMENT_INSTRUCTIONS = 3
+# Prologue/epilogue instructions per function
+FUNCTION_OVERHEAD_INSTRUCTIONS = 4
+
+_FIXED_TYPE_SIZES = {
+    "char": 1, "bool": 1, "_Bool": 1, "int8_t": 1, "uint8_t": 1,
+    "short": 2, "int16_t": 2, "uint16_t": 2,
+    "int32_t": 4, "uint32_t": 4, "float": 4,
+    "int64_t": 8, "uint64_t": 8,
+}
+_CONTROL_KEYWORDS = frozenset(["if", "for", "while", "do", "switch", "case", "default"])
+_QUALIFIERS = frozenset([
+    "static", "const", "volatile", "extern", "register", "inline",
+    "signed", "unsigned", "struct", "union", "enum",
+])
+
+
+@dataclass
+class FootprintReport:
+    """Estimated memory footprint of a translation unit"""
+    platform: str
+    code_bytes: int = 0
+    const_bytes: int = 0
+    data_bytes: int = 0
+    bss_bytes: int = 0
+    statement_count: int = 0
+    function_count: int = 0
+    estimated_types: List[str] = field(default_factory=list)
+
+    @property
+    def flash_bytes(self) -> int:
+        """Code, constants and the initialization image of .data"""
+        return self.code_bytes + self.const_bytes + self.data_bytes
+
+    @property
+    def ram_bytes(self) -> int:
+        """Initialized and zero-initialized static storage"""
+        return self.data_bytes + self.bss_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "flash_bytes": self.flash_bytes,
+            "ram_bytes": self.ram_bytes,
+            "code_bytes": self.code_bytes,
+            "const_bytes": self.const_bytes,
+            "data_bytes": self.data_bytes,
+            "bss_bytes": self.bss_bytes,
+            "statement_count": self.statement_count,
+            "function_count": self.function_count,
+        }
+
+
+class FootprintEstimator:
+    """
+    Estimates flash and RAM usage against ECU memory budgets
+    """
+
+    def __init__(self, platform_manager: PlatformManager):
+        self.platform_manager = platform_manager
+
+    def estimate(self, code: str, platform: Optional[str] = None) -> FootprintReport:
+        """
+        Estimate the memory footprint of the code
+
+        Args:
+            code: Source code to analyze
+            platform: Target platform name
+
+        Returns:
+            FootprintReport with code, constant and static data sizes
+        """
+        platform_key = self.platform_manager.resolve_platform(platform)
+        word_size = self.platform_manager.get_platform_info(platform_key).get("word_size", 32)
+        parsed = parse_source(code)
+
+        return _FootprintPass(parsed, platform_key, word_size).run()
+
+    def check_budget(self, report: FootprintReport, budget: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check a footprint report against a memory budget
+
+        Args:
+            report: Footprint estimate
+            budget: Memory budget with 'flash_kb' and/or 'ram_kb'
+
+        Returns:
+            Dictionary with warnings, suggestions and utilization metrics
+        """
+        warnings = []
+        suggestions = []
+        utilization = {}
+
+        for memory, used in (("flash", report.flash_bytes), ("ram", report.ram_bytes)):
+            budget_kb = budget.get(f"{memory}_kb")
+            if not budget_kb:
+                continue
+
+            percent = round(100.0 * used / (budget_kb * 1024), 2)
+            utilization[f"{memory}_utilization_percent"] = percent
+
+            if percent > 100:
+                warnings.append(
+                    f"Estimated {memory.upper()} usage ({used} bytes) exceeds "
+                    f"budget ({budget_kb} KB)"
+                )
+                if memory == "flash":
+                    suggestions.append("Reduce code size or move constant tables to external storage")
+                else:
+                    suggestions.append("Reduce static buffers or share them between tasks")
+
+        return {
+            "warnings": warnings,
+            "suggestions": suggestions,
+            "metrics": utilization
+        }
+
+
+class _FootprintPass:
+    """Single linear walk over the token stream"""
+
+    def __init__(self, parsed: ParsedSource, platform: str, word_size: int):
+        self.parsed = parsed
+        self.tokens = parsed.tokens
+        self.brackets = parsed.brackets
+        self.word_bytes = max(1, word_size // 8)
+        self.type_sizes = dict(_FIXED_TYPE_SIZES)
+        self.type_sizes.update({
+            "int": 2 if word_size < 32 else 4,
+            "long": 4,
+            "double": 4 if word_size < 32 else 8,
+            "size_t": 2 if word_size < 32 else 4,
+        })
+        self.pointer_size = 2 if word_size < 32 else 4
+
+        # Narrow cores need several instructions per 32-bit operation
+        widening = max(1, 32 // word_size)
+        instruction_bytes = max(2, self.word_bytes // 2)
+        self.statement_bytes = STATEMENT_INSTRUCTIONS * instruction_bytes * widening
+        self.function_bytes = FUNCTION_OVERHEAD_INSTRUCTIONS * instruction_bytes * widening
+
+        self.report = FootprintReport(platform=platform)
+
+    def run(self) -> FootprintReport:
+        tokens = self.tokens
+        report = self.report
+        functions = iter(self.parsed.functions)
+        next_function = next(functions, None)
+        statement_start = 0
+        index = 0
+        count = len(tokens)
+
+        while index < count:
+            if next_function is not None and index == next_function.name_index:
+                self._function_body(next_function.body_start + 1, next_function.body_end)
+                report.function_count += 1
+                index = next_function.body_end + 1
+                statement_start = index
+                next_function = next(functions, None)
+                continue
+
+            text = tokens[index].text
+            if text == "{":
+                index = self.brackets.get(index, index) + 1
+                continue
+            if text == ";":
+                self._declaration(statement_start, index, file_scope=True)
+                statement_start = index + 1
+            elif text == "}":
+                statement_start = index + 1
+            index += 1
+
+        report.code_bytes += (report.statement_count * self.statement_bytes
+                              + report.function_count * self.function_bytes)
+        return report
+
+    def _function_body(self, start: int, end: int) -> None:
+        tokens = self.tokens
+        report = self.report
+        statement_start = start
+        index = start
+
+        while index < end:
+            token = tokens[index]
+            text = token.text
+
+            if token.kind == STRING:
+                report.const_bytes += self._string_size(token)
+            elif text in _CONTROL_KEYWORDS:
+                report.statement_count += 1
+            elif text == "(":
+                # for (...;...;...) headers are not statements
+                close = self.brackets.get(index, index)
+                for inner in range(index + 1, close):
+                    if tokens[inner].kind == STRING:
+                        report.const_bytes += self._string_size(tokens[inner])
+                index = close
+            elif text == ";":
+                report.statement_count += 1
+                if tokens[statement_start].text == "static":
+                    self._declaration(statement_start, index, file_scope=False)
+                statement_start = index + 1
+            elif text in ("{", "}", ":"):
+                statement_start = index + 1
+
+            index += 1
+
+    def _declaration(self, start: int, end: int, file_scope: bool) -> None:
+        """Account for a static-storage declaration in tokens[start:end]"""
+        tokens = self.tokens
+        if start >= end:
+            return
+
+        head = tokens[start].text
+        if head == "extern":
+            return
+        if head == "typedef":
+            self._typedef(start, end)
+            return
+
+        # struct/union/enum definitions, optionally followed by declarators
+        body = next((i for i in range(start, end) if tokens[i].text in ("{", "=")), None)
+        if body is not None and tokens[body].text == "{":
+            close = self.brackets.get(body, end)
+            keywords = {tokens[i].text for i in range(start, body)}
+            if "enum" in keywords:
+                # Enumeration objects have the size of int, not of their enumerator list
+                size = self.type_sizes["int"]
+            else:
+                size = self._aggregate_size(body + 1, close, "union" in keywords)
+            if body - start >= 2 and tokens[body - 1].kind == IDENT:
+                self.type_sizes[tokens[body - 1].text] = size
+            is_const = any(tokens[i].text == "const" for i in range(start, body))
+            if close + 1 < end:
+                self._account(close + 1, end, size, is_const)
+            return
+
+        # Split declarators on top-level commas
+        declarators = []
+        part_start = start
+        index = start
+        while index < end:
+            text = tokens[index].text
+            if text in ("(", "[", "{"):
+                index = self.brackets.get(index, index)
+            elif text == ",":
+                declarators.append((part_start, index))
+                part_start = index + 1
+            index += 1
+        declarators.append((part_start, end))
+
+        # Base type: leading tokens up to the first declarator name
+        first_start, first_end = declarators[0]
+        name_index = self._declarator_name(first_start, first_end)
+        if name_index is None:
+            return
+        type_tokens = [t.text for t in tokens[first_start:name_index] if t.text != "*"]
+        if not type_tokens:
+            return
+        is_const = "const" in type_tokens
+        base_size = self._type_size(type_tokens)
+
+        for position, (decl_start, decl_end) in enumerate(declarators):
+            is_pointer = False
+            if position == 0:
+                is_pointer = any(t.text == "*" for t in tokens[first_start:name_index])
+                decl_start = name_index
+            self._account(decl_start, decl_end, base_size, is_const, is_pointer)
+
+    def _declarator_name(self, start: int, end: int) -> Optional[int]:
+        """Index of the declared name, or None for prototypes and statements"""
+        tokens = self.tokens
+        name_index = None
+        for index in range(start, end):
+            token = tokens[index]
+            text = token.text
+            if text in ("=", "["):
+                break
+            if text == "(":
+                # Function prototype or call statement
+                return None
+            if token.kind == IDENT and text not in _QUALIFIERS:
+                name_index = index
+        if name_index is None or name_index == start:
+            return None
+        return name_index
+
+    def _account(self, start: int, end: int, base_size: int, is_const: bool,
+                 is_pointer: bool = False) -> None:
+        """Add one declarator (pointer stars, name, dimensions, initializer)"""
+        tokens = self.tokens
+        report = self.report
+        elements = 1
+        open_dimension = False
+        initializer = None
+
+        index = start
+        while index < end:
+            text = tokens[index].text
+            if text == "*":
+                is_pointer = True
+            elif text == "[":
+                close = self.brackets.get(index, index)
+                dimension = self._constant(index + 1, close)
+                if dimension is None:
+                    open_dimension = True
+                else:
+                    elements *= dimension
+                index = close
+            elif text == "=":
+                initializer = (index + 1, end)
+                break
+            index += 1
+
+        if is_pointer:
+            size = self.pointer_size * elements
+            if initializer is not None and tokens[initializer[0]].kind == STRING:
+                report.const_bytes += self._string_size(tokens[initializer[0]])
+        else:
+            size = base_size * elements
+
+        if open_dimension and initializer is not None:
+            size *= self._initializer_elements(*initializer)
+
+        if is_const and not is_pointer:
+            report.const_bytes += size
+        elif initializer is not None:
+            report.data_bytes += size
+        else:
+            report.bss_bytes += size
+
+    def _initializer_elements(self, start: int, end: int) -> int:
+        tokens = self.tokens
+        if start < end and tokens[start].kind == STRING:
+            return self._string_size(tokens[start])
+        if start < end and tokens[start].text == "{":
+            close = self.brackets.get(start, end)
+            if close == start + 1:
+                return 0
+            elements = 1
+            index = start + 1
+            while index < close:
+                text = tokens[index].text
+                if text in ("(", "[", "{"):
+                    index = self.brackets.get(index, index)
+                elif text == "," and index + 1 < close:
+                    elements += 1
+                index += 1
+            return elements
+        return 1
+
+    def _typedef(self, start: int, end: int) -> None:
+        """Record sizes of typedef'd structs and enums"""
+        tokens = self.tokens
+        name = tokens[end - 1].text if tokens[end - 1].kind == IDENT else None
+        if name is None:
+            return
+
+        body = next((i for i in range(start, end) if tokens[i].text == "{"), None)
+        kind = tokens[start + 1].text if start + 1 < end else ""
+
+        if kind == "enum":
+            self.type_sizes[name] = self.type_sizes["int"]
+        elif kind in ("struct", "union") and body is not None:
+            self.type_sizes[name] = self._aggregate_size(body + 1, self.brackets.get(body, end), kind == "union")
+        elif body is None:
+            # typedef <type> name;
+            type_tokens = [t.text for t in tokens[start + 1:end - 1]]
+            if "*" in type_tokens:
+                self.type_sizes[name] = self.pointer_size
+            elif type_tokens:
+                self.type_sizes[name] = self._type_size(type_tokens)
+
+    def _aggregate_size(self, start: int, end: int, is_union: bool) -> int:
+        tokens = self.tokens
+        offset = 0
+        largest = 0
+        alignment = 1
+        member_start = start
+        for index in range(start, end):
+            if tokens[index].text != ";":
+                continue
+            name_index = self._declarator_name(member_start, index)
+            member_start_index = member_start
+            member_start = index + 1
+            if name_index is None:
+                continue
+
+            type_tokens = [t.text for t in tokens[member_start_index:name_index]]
+            if "*" in type_tokens:
+                size = self.pointer_size
+                align = size
+            else:
+                size = self._type_size(type_tokens)
+                align = min(size, self.word_bytes) or 1
+            elements = 1
+            for inner in range(name_index, index):
+                if tokens[inner].text == "[":
+                    dimension = self._constant(inner + 1, self.brackets.get(inner, inner))
+                    elements *= dimension if dimension is not None else 1
+
+            alignment = max(alignment, align)
+            largest = max(largest, size * elements)
+            offset = -(-offset // align) * align + size * elements
+
+        total = largest if is_union else offset
+        return max(1, -(-total // alignment) * alignment)
+
+    def _type_size(self, type_tokens: List[str]) -> int:
+        names = [text for text in type_tokens if text not in _QUALIFIERS and text != "*"]
+        if "long" in names and names.count("long") > 1:
+            return 8
+        for text in reversed(names):
+            if text in self.type_sizes:
+                return self.type_sizes[text]
+        if "unsigned" in type_tokens or "signed" in type_tokens or "enum" in type_tokens:
+            return self.type_sizes["int"]
+        if names:
+            self.report.estimated_types.append(names[-1])
+        return self.word_bytes
+
+    def _constant(self, start: int, end: int) -> Optional[int]:
+        if end - start != 1:
+            return None
+        token = self.tokens[start]
+        if token.kind == NUMBER:
+            try:
+                return int(token.text.rstrip("uUlL"), 0)
+            except ValueError:
+                return None
+        return self.parsed.defines.get(token.text)
+
+    @staticmethod
+    def _string_size(token: Token) -> int:
+        # Quotes are excluded, the terminating NUL is included
+        return max(1, len(token.text) - 1)
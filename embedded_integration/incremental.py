@@ -0,0 +1,127 @@
+"""
+Incremental embedded code analysis for documents under live editing
+
+The document is cut into regions at function boundaries (each region is a
+function definition together with the file-scope text before it). Region
+results from EmbeddedAnalyzer's memory, timing, platform and safety passes
+are cached by region text in a bounded LRU shared by every document, so
+after an edit only the regions whose text changed are analyzed again and
+documents edited side by side do not evict each other's regions. Findings
+are per region: a rule that relates code in two different functions only
+sees one of them at a time.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple
+
+from .analyzer import EmbeddedAnalyzer, AnalysisResult
+from .source_parser import parse_source, function_regions
+from .findings import LineIndex, warning_messages
+
+
+class IncrementalAnalyzer:
+    """
+    Region-cached wrapper around EmbeddedAnalyzer
+
+    Args:
+        analyzer: Analyzer whose passes are run on changed regions
+        cache_size: Region results kept, keyed by region text
+    """
+
+    def __init__(self, analyzer: EmbeddedAnalyzer, cache_size: int = 4096):
+        self.analyzer = analyzer
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # analyze() may run in several worker threads at once
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def regions(code: str) -> List[Tuple[int, int, str]]:
+        """(start offset, end offset, function name or '') for each region"""
+        return function_regions(parse_source(code))
+
+    async def _analyze_region(self, text: str) -> Dict[str, Any]:
+        analyzer = self.analyzer
+        lines = LineIndex(text)
+        memory = analyzer._analyze_memory_usage(text, lines)
+        passes = [
+            memory,
+            analyzer._analyze_timing_constraints(text, lines),
+            await analyzer._analyze_platform_compatibility(text, lines),
+            analyzer._analyze_safety_compliance(text, lines),
+        ]
+        findings = [finding for result in passes for finding in result["findings"]]
+        return {
+            "findings": findings,
+            "warnings": warning_messages(findings),
+            "metrics": memory["metrics"],
+        }
+
+    def _cached(self, text: str):
+        with self._lock:
+            result = self._cache.get(text)
+            if result is not None:
+                self._cache.move_to_end(text)
+            return result
+
+    def _store(self, text: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[text] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def analyze(self, code: str) -> Dict[str, Any]:
+        """
+        Analyze a document, reusing results of unchanged regions
+
+        Returns:
+            Analysis results shaped like EmbeddedAnalyzer.analyze_code, plus
+            per-region line ranges and how many regions were re-analyzed
+        """
+        seen: Dict[str, Dict[str, Any]] = {}
+        reanalyzed = 0
+        regions = []
+        results = []
+        line = 1
+        for start, end, name in self.regions(code):
+            text = code[start:end]
+            result = seen.get(text) or self._cached(text)
+            if result is None:
+                result = await self._analyze_region(text)
+                reanalyzed += 1
+                self._store(text, result)
+            seen[text] = result
+            results.append((line, result))
+            end_line = line + text.count("\n")
+            regions.append({
+                "function": name or None,
+                "start_line": line,
+                "end_line": end_line - 1 if text.endswith("\n") else end_line,
+                "warnings": result["warnings"],
+            })
+            line = end_line
+
+        # Region findings carry lines relative to the region
+        findings = [
+            finding.moved(start_line - 1) for start_line, result in results for finding in result["findings"]
+        ]
+        analysis = AnalysisResult(
+            findings=findings,
+            metrics={
+                "estimated_stack_usage": sum(r["metrics"]["estimated_stack_usage"] for _, r in results),
+                "dynamic_allocations": sum(r["metrics"]["dynamic_allocations"] for _, r in results),
+                "large_arrays": [size for _, r in results for size in r["metrics"]["large_arrays"]],
+            },
+        )
+        warnings = list(dict.fromkeys(analysis.warnings))
+        suggestions = list(dict.fromkeys(analysis.suggestions))
+        return {
+            "explanation": self.analyzer._generate_explanation(analysis.metrics, warnings, suggestions),
+            "warnings": warnings,
+            "suggestions": suggestions,
+            "metrics": analysis.metrics,
+            "is_valid": not warnings,
+            "regions": regions,
+            "reanalyzed_regions": reanalyzed,
+        }
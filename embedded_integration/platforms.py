@@ -27,6 +27,19 @@ class PlatformManager:
                 "typical_flash": "512KB",
                 "typical_ram": "64KB",
                 "compiler_flags": ["-mcpu=cortex-m4", "-mthumb"],
+                "clock_mhz": 168,
+                "cycle_costs": {
+                    "alu": 1,
+                    "mul": 1,
+                    "div": 12,
+                    "load": 2,
+                    "store": 1,
+                    "branch": 3,
+                    "call": 4,
+                    "return": 4,
+                    "loop_overhead": 3,
+                    "float_op": 60
+                },
                 "optimization_hints": [
                     "Use thumb instructions",
                     "Minimize stack usage",
@@ -42,6 +55,19 @@ class PlatformManager:
                 "typical_flash": "32KB",
                 "typical_ram": "2KB",
                 "compiler_flags": ["-mmcu=atmega328p"],
+                "clock_mhz": 16,
+                "cycle_costs": {
+                    "alu": 2,
+                    "mul": 8,
+                    "div": 220,
+                    "load": 4,
+                    "store": 4,
+                    "branch": 2,
+                    "call": 4,
+                    "return": 4,
+                    "loop_overhead": 4,
+                    "float_op": 120
+                },
                 "optimization_hints": [
                     "Use 8-bit data types when possible",
                     "Minimize RAM usage",
@@ -57,6 +83,19 @@ class PlatformManager:
                 "typical_flash": "unlimited",
                 "typical_ram": "unlimited",
                 "compiler_flags": ["-m32"],
+                "clock_mhz": 1000,
+                "cycle_costs": {
+                    "alu": 1,
+                    "mul": 3,
+                    "div": 26,
+                    "load": 4,
+                    "store": 1,
+                    "branch": 15,
+                    "call": 5,
+                    "return": 5,
+                    "loop_overhead": 2,
+                    "float_op": 5
+                },
                 "optimization_hints": [
                     "Can use standard library",
                     "Floating point operations available",
@@ -69,6 +108,44 @@ class PlatformManager:
         """Get information about a specific platform"""
         return self.platforms.get(platform_name)
     
+    def find_platform(self, platform_name: Optional[str]) -> Optional[str]:
+        """Resolve a platform or part name (e.g. 'ARM Cortex-M4') to a known platform key"""
+        if not platform_name:
+            return None
+        if platform_name in self.platforms:
+            return platform_name
+        
+        name_lower = platform_name.lower()
+        for key in self.platforms:
+            if name_lower.startswith(key.lower()) or key.lower() in name_lower:
+                return key
+        return None
+    
+    def resolve_platform(self, platform_name: Optional[str] = None) -> str:
+        """Resolve a platform name, falling back to the configured target architectures"""
+        platform_key = self.find_platform(platform_name)
+        if platform_key:
+            return platform_key
+        for architecture in self.config.embedded.target_architectures:
+            platform_key = self.find_platform(architecture)
+            if platform_key:
+                return platform_key
+        return next(iter(self.platforms))
+    
+    def get_cycle_costs(self, platform_name: str) -> Dict[str, int]:
+        """Get worst-case cycle costs per operation class for a platform"""
+        platform_info = self.get_platform_info(platform_name)
+        if platform_info:
+            return platform_info.get("cycle_costs", {})
+        return {}
+    
+    def get_clock_mhz(self, platform_name: str) -> Optional[float]:
+        """Get the typical core clock of a platform in MHz"""
+        platform_info = self.get_platform_info(platform_name)
+        if platform_info:
+            return platform_info.get("clock_mhz")
+        return None
+    
     def get_optimization_hints(self, platform_name: str) -> List[str]:
         """Get optimization hints for a platform"""
         platform_info = self.get_platform_info(platform_name)
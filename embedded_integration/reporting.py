@@ -0,0 +1,147 @@
+"""
+Machine-readable, streamed analysis output
+
+Encoders turn (path, Finding) pairs into text one finding at a time:
+JSON lines (one object per finding) and SARIF 2.1.0 for code-review
+tools. The SARIF document is written incrementally; results go out as
+they arrive and only the table of rules seen so far is kept, to be
+written after the results.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Tuple
+
+from .findings import Finding, RULES
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+_SARIF_LEVELS = {"error": "error", "warning": "warning", "note": "note"}
+
+
+class JsonLinesEncoder:
+    """One JSON object per finding, newline-terminated"""
+
+    media_type = "application/x-ndjson"
+
+    def start(self) -> str:
+        return ""
+
+    def encode(self, path: str, finding: Finding) -> str:
+        record = finding.to_dict()
+        record["path"] = path
+        return json.dumps(record) + "\n"
+
+    def finish(self) -> str:
+        return ""
+
+
+class SarifEncoder:
+    """
+    SARIF 2.1.0 log with a single run, written incrementally
+
+    Args:
+        tool_name: Driver name reported to the consumer
+        tool_version: Driver version
+    """
+
+    media_type = "application/sarif+json"
+
+    def __init__(self, tool_name: str = "ai-copilot", tool_version: str = "0.1.0"):
+        self.tool_name = tool_name
+        self.tool_version = tool_version
+        self._rule_index: Dict[str, int] = {}
+        self._results = 0
+
+    def start(self) -> str:
+        return f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{{"results": ['
+
+    def encode(self, path: str, finding: Finding) -> str:
+        rule_index = self._rule_index.setdefault(finding.rule_id, len(self._rule_index))
+        result: Dict[str, Any] = {
+            "ruleId": finding.rule_id,
+            "ruleIndex": rule_index,
+            "level": _SARIF_LEVELS.get(finding.severity, "warning"),
+            "message": {
+                "text": finding.message,
+                "id": "default",
+                "arguments": [str(arg) for arg in finding.args],
+            },
+        }
+        location: Dict[str, Any] = {"artifactLocation": {"uri": _artifact_uri(path)}}
+        if finding.line > 0:
+            region = {"startLine": finding.line}
+            if finding.column > 0:
+                region["startColumn"] = finding.column
+            location["region"] = region
+        result["locations"] = [{"physicalLocation": location}]
+        suggestion = finding.suggestion
+        if suggestion:
+            result["properties"] = {"suggestion": suggestion}
+
+        separator = "," if self._results else ""
+        self._results += 1
+        return separator + json.dumps(result)
+
+    def finish(self) -> str:
+        rules = [self._rule(rule_id) for rule_id in self._rule_index]
+        driver = {
+            "name": self.tool_name,
+            "version": self.tool_version,
+            "rules": rules,
+        }
+        return '], "tool": {"driver": ' + json.dumps(driver) + '}}]}\n'
+
+    @staticmethod
+    def _rule(rule_id: str) -> Dict[str, Any]:
+        rule = RULES.get(rule_id)
+        if rule is None:
+            return {"id": rule_id}
+        descriptor: Dict[str, Any] = {
+            "id": rule_id,
+            # SARIF message strings use the same {0} placeholders as the templates
+            "messageStrings": {"default": {"text": rule.template}},
+            "defaultConfiguration": {"level": _SARIF_LEVELS.get(rule.severity, "warning")},
+            "properties": {"category": rule.category},
+        }
+        if rule.suggestion:
+            descriptor["help"] = {"text": rule.suggestion}
+        return descriptor
+
+
+def _artifact_uri(path: str) -> str:
+    """Absolute paths as file URIs, relative ones with forward slashes"""
+    if os.path.isabs(path):
+        return Path(path).as_uri()
+    return path.replace(os.sep, "/")
+
+
+ENCODERS = {
+    "jsonl": JsonLinesEncoder,
+    "sarif": SarifEncoder,
+}
+
+
+def get_encoder(output_format: str, **kwargs: Any):
+    """
+    Create an encoder by format name
+
+    Raises:
+        ValueError: If the format is not one of ENCODERS
+    """
+    encoder = ENCODERS.get(output_format)
+    if encoder is None:
+        raise ValueError(f"Unknown output format {output_format!r}; expected one of {sorted(ENCODERS)}")
+    return encoder(**kwargs)
+
+
+async def encode_findings(encoder, findings: AsyncIterable[Tuple[str, Finding]]) -> AsyncIterator[str]:
+    """Encode (path, finding) pairs as they are produced"""
+    yield encoder.start()
+    async for path, finding in findings:
+        yield encoder.encode(path, finding)
+    tail = encoder.finish()
+    if tail:
+        yield tail
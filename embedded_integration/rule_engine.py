@@ -0,0 +1,627 @@
+"""
+Declarative rule engine for coding-standard and protocol checks
+
+Rules are loaded from YAML rule sets (MISRA C, AUTOSAR, ISO 26262 and bus
+protocols ship in ``rulesets/``) and registered in the finding catalog.
+A selection of rules is compiled into a RulePlan: the distinct token
+patterns ("atoms") all selected rules refer to, indexed by token text.
+Evaluating a plan walks the shared token model once, records which atoms
+occur where and then decides every rule from those occurrences, so adding
+a rule adds table entries rather than another pass over the source.
+
+Rule profiles are the ISO 26262 levels QM and ASIL-A to ASIL-D: a profile
+runs the rules whose ``min_asil`` is at or below it, so low profiles skip
+the costlier checks (fast pre-merge runs) and ASIL-D runs everything.
+
+Rule keys:
+    id, message, severity, category, suggestion: as for register_rule
+    standard: Overrides the file's standard (e.g. per-protocol rules)
+    match: Atom (or list of alternative atoms); the rule fires at occurrences
+    missing: List of required items; the rule fires once if any is absent
+    summarizes: Rule IDs; the rule fires if any of them fired
+    when: List of items that must all be present for the rule to apply
+    min_asil: Lowest rule profile that runs the rule (default: QM)
+    report: "first" (default), "each" or "first_per_name" for match rules
+    args: Message arguments: "name", "count", "asil" or "labels"
+    label: Short text used by summarizing rules
+
+An item of ``missing``/``when`` is an atom or a list of alternative atoms.
+Atoms are single-key mappings:
+    ident: Exact identifier
+    ident_re: Regex searched in identifiers
+    number_re: Regex matching a whole numeric literal
+    tokens: Sequence of token texts
+    directive_re: Regex searched in preprocessor lines
+    function_re: Regex searched in names of defined functions
+    discarded_result: Statement calling a value-returning function defined
+        in the file without using the result
+"""
+
+import hashlib
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import yaml
+
+from .findings import Finding, LineIndex, RULES, register_rule
+from .source_parser import IDENT, NUMBER, parse_source
+
+
+RULESET_DIR = Path(__file__).parent / "rulesets"
+
+ASIL_LEVELS = ("QM", "ASIL-A", "ASIL-B", "ASIL-C", "ASIL-D")
+ATOM_KINDS = ("ident", "ident_re", "number_re", "tokens", "directive_re", "function_re", "discarded_result")
+REPORT_MODES = ("first", "each", "first_per_name")
+ARG_SOURCES = ("name", "count", "asil", "labels")
+
+# Tokens after which an identifier starts a new statement
+_STATEMENT_START = frozenset([";", "{", "}", "else", "do"])
+_CONDITION_KEYWORDS = frozenset(["if", "while", "for"])
+
+# Distinct identifiers classified per plan before the memo is reset
+_MEMO_LIMIT = 8192
+
+
+class RuleSpec:
+    """
+    A rule as loaded from a rule set
+
+    Args:
+        data: The rule's mapping from the YAML file
+        standard: Standard of the file the rule came from
+        category: Default category of the file
+    """
+
+    __slots__ = ("rule_id", "standard", "when", "match", "missing", "summarizes",
+                 "min_asil", "report", "args", "label")
+
+    def __init__(self, data: Dict[str, Any], standard: Optional[str] = None, category: str = ""):
+        rule_id = data.get("id")
+        if not rule_id:
+            raise ValueError(f"Rule without id: {data!r}")
+        self.rule_id = rule_id
+        self.standard = data.get("standard", standard)
+        if not self.standard:
+            raise ValueError(f"Rule {rule_id} has no standard")
+
+        kinds = [key for key in ("match", "missing", "summarizes") if key in data]
+        if len(kinds) != 1:
+            raise ValueError(f"Rule {rule_id} needs exactly one of match, missing or summarizes")
+        self.match = _alternatives(data["match"], rule_id) if "match" in data else None
+        self.missing = _items(data["missing"], rule_id) if "missing" in data else None
+        self.summarizes = tuple(data.get("summarizes", ()))
+        self.when = _items(data.get("when", []), rule_id)
+        try:
+            self.min_asil = asil_rank(data.get("min_asil", "QM"))
+        except ValueError as exc:
+            raise ValueError(f"Rule {rule_id}: {exc}") from None
+        self.report = data.get("report", "first")
+        if self.report not in REPORT_MODES:
+            raise ValueError(f"Rule {rule_id}: unknown report mode {self.report!r}")
+        self.args = tuple(data.get("args", ()))
+        for source in self.args:
+            if source not in ARG_SOURCES:
+                raise ValueError(f"Rule {rule_id}: unknown argument source {source!r}")
+        self.label = data.get("label", data["message"])
+
+        register_rule(rule_id, data["message"], data.get("severity", "warning"),
+                      data.get("category", category), data.get("suggestion"))
+
+
+def asil_rank(level: str) -> int:
+    """
+    Position of a safety level in ASIL_LEVELS
+
+    Raises:
+        ValueError: If the level is not QM, ASIL-A..ASIL-D or A..D
+    """
+    if level in ("A", "B", "C", "D"):
+        level = f"ASIL-{level}"
+    try:
+        return ASIL_LEVELS.index(level)
+    except ValueError:
+        raise ValueError(f"Unknown ASIL level {level!r}; expected one of {ASIL_LEVELS}") from None
+
+
+def _atom(data: Any, rule_id: str) -> Tuple[str, Any]:
+    if not isinstance(data, dict) or len(data) != 1:
+        raise ValueError(f"Rule {rule_id}: an atom is a single-key mapping, got {data!r}")
+    (kind, value), = data.items()
+    if kind not in ATOM_KINDS:
+        raise ValueError(f"Rule {rule_id}: unknown atom kind {kind!r}")
+    if kind == "tokens":
+        if not value:
+            raise ValueError(f"Rule {rule_id}: empty token sequence")
+        value = tuple(str(text) for text in value)
+    elif kind == "discarded_result":
+        value = True
+    else:
+        value = str(value)
+    if kind.endswith("_re"):
+        try:
+            re.compile(value)
+        except re.error as exc:
+            raise ValueError(f"Rule {rule_id}: invalid {kind} {value!r}: {exc}") from None
+    return kind, value
+
+
+def _alternatives(data: Any, rule_id: str) -> Tuple[Tuple[str, Any], ...]:
+    entries = data if isinstance(data, list) else [data]
+    return tuple(_atom(entry, rule_id) for entry in entries)
+
+
+def _items(data: Any, rule_id: str) -> Tuple[Tuple[Tuple[str, Any], ...], ...]:
+    if not isinstance(data, list):
+        raise ValueError(f"Rule {rule_id}: 'missing' and 'when' take a list")
+    return tuple(_alternatives(entry, rule_id) for entry in data)
+
+
+class RuleSet:
+    """
+    Rules loaded from one or more YAML files
+
+    Args:
+        specs: Rules in evaluation order
+        version: Digest of the rule data, changes whenever a rule does
+    """
+
+    def __init__(self, specs: Sequence[RuleSpec], version: str):
+        self.specs = list(specs)
+        self.version = version
+        self._by_id = {spec.rule_id: spec for spec in self.specs}
+        self._plans: Dict[Tuple[Any, ...], "RulePlan"] = {}
+        self.profiler: Optional["RuleProfile"] = None
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    @property
+    def standards(self) -> List[str]:
+        return list(dict.fromkeys(spec.standard for spec in self.specs))
+
+    def standard_of(self, rule_id: str) -> Optional[str]:
+        spec = self._by_id.get(rule_id)
+        return spec.standard if spec else None
+
+    def set_profiler(self, profiler: Optional["RuleProfile"]) -> None:
+        """Record per-rule evaluation times of all plans of this set (None stops)"""
+        self.profiler = profiler
+        for plan in self._plans.values():
+            plan.profiler = profiler
+
+    def select(self, standards: Optional[Iterable[str]] = None, enabled: Optional[Iterable[str]] = None,
+               disabled: Iterable[str] = (), asil: Optional[str] = None) -> List[RuleSpec]:
+        """
+        Rules for a project
+
+        Args:
+            standards: Standards to check (default: all)
+            enabled: Rule IDs to keep (default: all of the selected standards)
+            disabled: Rule IDs to drop
+            asil: Rule profile; rules with a higher min_asil are dropped
+                (default: all rules)
+        """
+        standards = set(standards) if standards is not None else None
+        enabled = set(enabled) if enabled else None
+        disabled = set(disabled)
+        rank = asil_rank(asil) if asil else len(ASIL_LEVELS)
+        return [
+            spec for spec in self.specs
+            if (standards is None or spec.standard in standards)
+            and (enabled is None or spec.rule_id in enabled)
+            and spec.rule_id not in disabled
+            and spec.min_asil <= rank
+        ]
+
+    def compile(self, standards: Optional[Iterable[str]] = None, enabled: Optional[Iterable[str]] = None,
+                disabled: Iterable[str] = (), asil: Optional[str] = None) -> "RulePlan":
+        """Compile (or reuse) the plan for a selection, see select()"""
+        standards = tuple(standards) if standards is not None else None
+        enabled = tuple(enabled) if enabled else None
+        disabled = tuple(disabled)
+        key = (
+            tuple(sorted(standards)) if standards is not None else None,
+            tuple(sorted(enabled)) if enabled else None,
+            tuple(sorted(disabled)),
+            asil,
+        )
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = RulePlan(self.select(standards, enabled, disabled, asil), asil)
+            plan.profiler = self.profiler
+        return plan
+
+
+def load_rule_set(paths: Iterable[str] = ()) -> RuleSet:
+    """
+    Load the bundled rule sets followed by additional rule files
+
+    Rules of later files replace earlier rules with the same ID. Loaded
+    sets are cached until one of the extra files changes.
+
+    Args:
+        paths: Extra YAML rule files (e.g. project-specific rules)
+
+    Returns:
+        RuleSet with the rules registered in the finding catalog
+
+    Raises:
+        ValueError: If a rule definition is invalid
+    """
+    stamps = []
+    for path in paths:
+        stat = Path(path).stat()
+        stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return _load_rule_set(tuple(stamps))
+
+
+@lru_cache(maxsize=8)
+def _load_rule_set(stamps: Tuple[Tuple[str, int, int], ...]) -> RuleSet:
+    files = sorted(RULESET_DIR.glob("*.yaml")) + [Path(path) for path, _, _ in stamps]
+    specs: Dict[str, RuleSpec] = {}
+    digest = hashlib.sha256()
+    for path in files:
+        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        digest.update(json.dumps(data, sort_keys=True).encode("utf-8"))
+        for rule in data.get("rules", []):
+            try:
+                spec = RuleSpec(rule, data.get("standard"), data.get("category", ""))
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"{path.name}: {exc}") from None
+            specs.pop(spec.rule_id, None)
+            specs[spec.rule_id] = spec
+    return RuleSet(list(specs.values()), digest.hexdigest()[:16])
+
+
+def rule_set_for_config(config) -> RuleSet:
+    """The bundled rules plus the project's rule files"""
+    return load_rule_set(config.rules.rule_files)
+
+
+def plan_for_config(config, standards: Optional[Iterable[str]] = None) -> "RulePlan":
+    """
+    Compile the project's selection of rules
+
+    Args:
+        config: CopilotConfig; its ``rules`` section selects standards, rule
+            IDs and the rule profile (default: ``embedded.safety_level``)
+        standards: Standards the caller checks, narrowed by the configuration
+    """
+    selection = config.rules
+    if selection.standards is not None:
+        standards = [standard for standard in (standards or selection.standards)
+                     if standard in selection.standards]
+    return rule_set_for_config(config).compile(
+        standards, selection.enabled, selection.disabled, selection.profile or config.embedded.safety_level
+    )
+
+
+class RulePlan:
+    """
+    Selected rules compiled into token-indexed atom tables
+
+    Args:
+        specs: Rules to evaluate, in order
+        asil: Safety level passed to rule messages
+    """
+
+    def __init__(self, specs: Sequence[RuleSpec], asil: Optional[str] = None):
+        self.specs = list(specs)
+        self.asil = asil
+        self.rule_ids = [spec.rule_id for spec in self.specs]
+        self.profiler: Optional[RuleProfile] = None
+        # Single-rule plans and an empty plan, built when profiling
+        self._solo: Optional[List["RulePlan"]] = None
+        self._baseline: Optional["RulePlan"] = None
+
+        self._atom_ids: Dict[Tuple[str, Any], int] = {}
+        self._ident_exact: Dict[str, List[int]] = {}
+        self._ident_patterns: List[Tuple[int, Any]] = []
+        self._number_patterns: List[Tuple[int, Any]] = []
+        self._directive_patterns: List[Tuple[int, Any]] = []
+        self._function_patterns: List[Tuple[int, Any]] = []
+        self._sequences: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        self._discarded_result: Optional[int] = None
+        # Atom IDs per distinct identifier / number text, filled lazily
+        self._ident_memo: Dict[str, Tuple[int, ...]] = {}
+        self._number_memo: Dict[str, Tuple[int, ...]] = {}
+
+        self._rules = []
+        for spec in self.specs:
+            self._rules.append((
+                spec,
+                tuple(tuple(self._atom(atom) for atom in group) for group in spec.when),
+                tuple(self._atom(atom) for atom in spec.match) if spec.match else None,
+                tuple(tuple(self._atom(atom) for atom in group) for group in spec.missing)
+                if spec.missing is not None else None,
+            ))
+
+    @property
+    def atom_count(self) -> int:
+        return len(self._atom_ids)
+
+    def _atom(self, atom: Tuple[str, Any]) -> int:
+        atom_id = self._atom_ids.get(atom)
+        if atom_id is not None:
+            return atom_id
+        atom_id = self._atom_ids[atom] = len(self._atom_ids)
+        kind, value = atom
+        if kind == "ident":
+            self._ident_exact.setdefault(value, []).append(atom_id)
+        elif kind == "ident_re":
+            self._ident_patterns.append((atom_id, re.compile(value).search))
+        elif kind == "number_re":
+            self._number_patterns.append((atom_id, re.compile(value).fullmatch))
+        elif kind == "directive_re":
+            self._directive_patterns.append((atom_id, re.compile(value).search))
+        elif kind == "function_re":
+            self._function_patterns.append((atom_id, re.compile(value).search))
+        elif kind == "tokens":
+            self._sequences.setdefault(value[0], []).append((atom_id, value[1:]))
+        else:
+            self._discarded_result = atom_id
+        return atom_id
+
+    def _classify_ident(self, text: str) -> Tuple[int, ...]:
+        if len(self._ident_memo) >= _MEMO_LIMIT:
+            self._ident_memo.clear()
+        atoms = list(self._ident_exact.get(text, ()))
+        atoms.extend(atom_id for atom_id, search in self._ident_patterns if search(text))
+        result = self._ident_memo[text] = tuple(atoms)
+        return result
+
+    def _classify_number(self, text: str) -> Tuple[int, ...]:
+        if len(self._number_memo) >= _MEMO_LIMIT:
+            self._number_memo.clear()
+        result = self._number_memo[text] = tuple(
+            atom_id for atom_id, fullmatch in self._number_patterns if fullmatch(text)
+        )
+        return result
+
+    def scan(self, code: str) -> Dict[int, List[Tuple[int, str]]]:
+        """
+        Locate all atoms of the plan in one walk over the token model
+
+        Returns:
+            Atom ID -> (character offset, matched name) for each occurrence
+        """
+        parsed = parse_source(code)
+        tokens = parsed.tokens
+        count = len(tokens)
+        brackets = parsed.brackets
+        found: Dict[int, List[Tuple[int, str]]] = {}
+
+        ident_memo = self._ident_memo
+        number_memo = self._number_memo
+        sequences = self._sequences
+        numbers = bool(self._number_patterns)
+        discarded = self._discarded_result
+        callables = set()
+        if discarded is not None:
+            callables = {
+                function.name for function in parsed.functions
+                if function.name != "main" and function.return_type.split()[-1:] != ["void"]
+            }
+
+        for index, token in enumerate(tokens):
+            text = token.text
+            kind = token.kind
+            atoms: Tuple[int, ...] = ()
+            if kind == IDENT:
+                atoms = ident_memo.get(text)
+                if atoms is None:
+                    atoms = self._classify_ident(text)
+                if text in callables and self._discards_result(tokens, brackets, index, count):
+                    atoms += (discarded,)
+            elif kind == NUMBER and numbers:
+                atoms = number_memo.get(text)
+                if atoms is None:
+                    atoms = self._classify_number(text)
+            for atom_id in atoms:
+                found.setdefault(atom_id, []).append((token.start, text))
+
+            candidates = sequences.get(text)
+            if candidates:
+                for atom_id, rest in candidates:
+                    end = index + 1 + len(rest)
+                    if end <= count and all(tokens[index + 1 + offset].text == expected
+                                            for offset, expected in enumerate(rest)):
+                        found.setdefault(atom_id, []).append((token.start, text))
+
+        for atom_id, search in self._directive_patterns:
+            for directive in parsed.directives:
+                if search(directive.text):
+                    found.setdefault(atom_id, []).append((directive.start, directive.text.strip()))
+        for atom_id, search in self._function_patterns:
+            for function in parsed.functions:
+                if search(function.name):
+                    found.setdefault(atom_id, []).append((tokens[function.name_index].start, function.name))
+        return found
+
+    @staticmethod
+    def _discards_result(tokens, brackets: Dict[int, int], index: int, count: int) -> bool:
+        """Whether tokens[index] starts a call statement 'name(...);'"""
+        if index + 1 >= count or tokens[index + 1].text != "(":
+            return False
+        close = brackets.get(index + 1)
+        if close is None or close + 1 >= count or tokens[close + 1].text != ";":
+            return False
+        if index == 0:
+            return True
+        previous = tokens[index - 1].text
+        if previous in _STATEMENT_START:
+            return True
+        # Body of 'if (...) name(...);' but not a cast such as '(void)name(...);'
+        if previous == ")":
+            opener = brackets.get(index - 1)
+            return opener is not None and opener > 0 and tokens[opener - 1].text in _CONDITION_KEYWORDS
+        return False
+
+    def evaluate(self, code: str, context: Optional[Dict[str, Any]] = None) -> List[Finding]:
+        """
+        Evaluate all rules of the plan
+
+        Args:
+            code: Source code to check
+            context: Values for message arguments (``asil`` overrides the plan's)
+
+        Returns:
+            Findings in rule order
+        """
+        if self.profiler is not None:
+            return self._evaluate_profiled(code, context)
+        return self._evaluate(code, context)
+
+    def _evaluate_profiled(self, code: str, context: Optional[Dict[str, Any]]) -> List[Finding]:
+        """
+        Evaluate and record the time of each rule
+
+        A rule's time is that of a plan with only this rule, less the walk
+        over the tokens that every plan performs, so it covers matching
+        the rule's atoms and deciding it. Profiling therefore costs one
+        evaluation per rule.
+        """
+        if self._solo is None:
+            self._solo = [RulePlan([spec], self.asil) for spec in self.specs]
+            self._baseline = RulePlan([], self.asil)
+        clock = time.perf_counter
+        start = clock()
+        findings = self._evaluate(code, context)
+        total = clock() - start
+
+        start = clock()
+        self._baseline._evaluate(code, context)
+        shared = clock() - start
+        seconds = {}
+        for plan in self._solo:
+            start = clock()
+            plan._evaluate(code, context)
+            seconds[plan.rule_ids[0]] = max(0.0, clock() - start - shared)
+        self.profiler.record(total, shared, seconds, findings)
+        return findings
+
+    def _evaluate(self, code: str, context: Optional[Dict[str, Any]]) -> List[Finding]:
+        found = self.scan(code)
+        asil = (context or {}).get("asil", self.asil)
+        lines: Optional[LineIndex] = None
+        findings: List[Finding] = []
+        fired: Dict[str, RuleSpec] = {}
+
+        for spec, when, match, missing in self._rules:
+            if any(not any(atom_id in found for atom_id in group) for group in when):
+                continue
+
+            if match is not None:
+                occurrences = sorted(
+                    occurrence for atom_id in match for occurrence in found.get(atom_id, ())
+                )
+                if not occurrences:
+                    continue
+                if spec.report == "first":
+                    occurrences = occurrences[:1]
+                elif spec.report == "first_per_name":
+                    occurrences = list({name: (offset, name) for offset, name in reversed(occurrences)}.values())
+                    occurrences.sort()
+                if lines is None:
+                    lines = LineIndex(code)
+                for offset, name in occurrences:
+                    args = self._args(spec, name, len(occurrences), asil, fired)
+                    findings.append(Finding(spec.rule_id, *lines.position(offset), args))
+            elif missing is not None:
+                if all(any(atom_id in found for atom_id in group) for group in missing):
+                    continue
+                findings.append(Finding(spec.rule_id, args=self._args(spec, "", 0, asil, fired)))
+            else:
+                if not any(rule_id in fired for rule_id in spec.summarizes):
+                    continue
+                findings.append(Finding(spec.rule_id, args=self._args(spec, "", 0, asil, fired)))
+            fired[spec.rule_id] = spec
+        return findings
+
+    @staticmethod
+    def _args(spec: RuleSpec, name: str, count: int, asil: Optional[str],
+              fired: Dict[str, RuleSpec]) -> Tuple[Any, ...]:
+        values = []
+        for source in spec.args:
+            if source == "name":
+                values.append(name)
+            elif source == "count":
+                values.append(count)
+            elif source == "asil":
+                values.append(asil or "")
+            else:
+                values.append(", ".join(fired[rule_id].label for rule_id in spec.summarizes
+                                        if rule_id in fired))
+        return tuple(values)
+
+
+class RuleProfile:
+    """
+    Evaluation time per rule, accumulated over profiled evaluations
+
+    Attributes:
+        seconds: Rule ID -> total evaluation time
+        findings: Rule ID -> number of findings
+        evaluations: Number of profiled plan evaluations
+        total_seconds: Time of the plan evaluations themselves
+        shared_seconds: Time of the token walk all rules share
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.findings: Dict[str, int] = {}
+        self.evaluations = 0
+        self.total_seconds = 0.0
+        self.shared_seconds = 0.0
+
+    def record(self, total: float, shared: float, seconds: Dict[str, float],
+               findings: Iterable[Finding]) -> None:
+        self.evaluations += 1
+        self.total_seconds += total
+        self.shared_seconds += shared
+        for rule_id, elapsed in seconds.items():
+            self.seconds[rule_id] = self.seconds.get(rule_id, 0.0) + elapsed
+            self.findings.setdefault(rule_id, 0)
+        for finding in findings:
+            self.findings[finding.rule_id] = self.findings.get(finding.rule_id, 0) + 1
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Rules by descending total time, with their share of all rule time"""
+        rule_time = sum(self.seconds.values()) or 1.0
+        rows = []
+        for rule_id, elapsed in sorted(self.seconds.items(), key=lambda item: (-item[1], item[0])):
+            rule = RULES.get(rule_id)
+            rows.append({
+                "rule_id": rule_id,
+                "category": rule.category if rule else "",
+                "total_ms": elapsed * 1000.0,
+                "mean_ms": elapsed * 1000.0 / max(self.evaluations, 1),
+                "share": elapsed / rule_time,
+                "findings": self.findings.get(rule_id, 0),
+            })
+        return rows
+
+
+def compliance_report(findings: Iterable[Finding]) -> Dict[str, Any]:
+    """
+    Group findings the way the compliance checks report them
+
+    Errors are violations, warnings are warnings; suggestions come from
+    every finding that has one.
+    """
+    report: Dict[str, Any] = {"compliant": True, "violations": [], "warnings": [], "suggestions": []}
+    for finding in findings:
+        severity = RULES[finding.rule_id].severity
+        if severity == "error":
+            report["violations"].append(finding.message)
+        elif severity == "warning":
+            report["warnings"].append(finding.message)
+        suggestion = finding.suggestion
+        if suggestion:
+            report["suggestions"].append(suggestion)
+    report["compliant"] = not report["violations"]
+    return report
@@ -0,0 +1,300 @@
+"""
+Lightweight C source model shared by the embedded analyzers
+
+Tokenizes C/C++ source once (string, character and comment aware),
+matches brackets and locates function definitions so that analyzers can
+walk the program structure instead of re-scanning the raw text. Changes
+to the source are expressed as Edits on its character offsets and applied
+together in one splice.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+
+# Token kinds
+COMMENT = "comment"
+STRING = "string"
+CHAR = "char"
+NUMBER = "number"
+IDENT = "ident"
+PUNCT = "punct"
+DIRECTIVE = "directive"
+
+C_KEYWORDS = frozenset([
+    "auto", "break", "case", "char", "const", "continue", "default", "do",
+    "double", "else", "enum", "extern", "float", "for", "goto", "if",
+    "inline", "int", "long", "register", "restrict", "return", "short",
+    "signed", "sizeof", "static", "struct", "switch", "typedef", "union",
+    "unsigned", "void", "volatile", "while", "bool", "_Bool",
+])
+
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<directive>^[ \t]*\#(?:\\\n|[^\n])*)
+  | (?P<string>"(?:\\.|[^"\\\n])*"?)
+  | (?P<char>'(?:\\.|[^'\\\n])*'?)
+  | (?P<number>0[xX][0-9a-fA-F]+[uUlL]*|(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?[uUlLfF]*)
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<punct><<=|>>=|\.\.\.|->|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^]=|::|[^\s\w])
+  | (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+''', re.VERBOSE | re.DOTALL | re.MULTILINE)
+
+_DEFINE_PATTERN = re.compile(r'#\s*define\s+(\w+)\s+\(?\s*(0[xX][0-9a-fA-F]+|\d+)[uUlL]*\s*\)?\s*$')
+
+_OPEN_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+_CLOSE_BRACKETS = {")", "]", "}"}
+
+
+@dataclass
+class Token:
+    """A single lexical token"""
+    kind: str
+    text: str
+    start: int
+    end: int
+    line: int
+
+
+@dataclass
+class FunctionInfo:
+    """A function definition located in the token stream"""
+    name: str
+    return_type: str
+    line: int
+    end_line: int
+    name_index: int
+    body_start: int  # index of the opening '{'
+    body_end: int    # index of the matching '}'
+    is_static: bool = False
+
+
+@dataclass
+class ParsedSource:
+    """Result of parsing a translation unit"""
+    code: str
+    tokens: List[Token]
+    comments: List[Token]
+    directives: List[Token]
+    brackets: Dict[int, int]
+    functions: List[FunctionInfo]
+    defines: Dict[str, int] = field(default_factory=dict)
+
+    def function(self, name: str) -> Optional[FunctionInfo]:
+        """Get a function definition by name"""
+        for func in self.functions:
+            if func.name == name:
+                return func
+        return None
+
+    def text(self, start: int, end: int) -> str:
+        """Join token texts in the half-open index range [start, end)"""
+        return " ".join(token.text for token in self.tokens[start:end])
+
+
+@dataclass(frozen=True)
+class Edit:
+    """Replacement of code[start:end] with text (an insertion if start == end)"""
+    start: int
+    end: int
+    text: str
+    explanation: str = ""
+
+
+def apply_edits(code: str, edits: Iterable[Edit]) -> str:
+    """
+    Apply edits to the original code in a single pass
+
+    Insertions at the same offset keep their given order.
+
+    Raises:
+        ValueError: If two edits replace overlapping ranges
+    """
+    pieces = []
+    position = 0
+    for edit in sorted(edits, key=lambda edit: (edit.start, edit.end)):
+        if edit.start < position:
+            raise ValueError(f"Overlapping edit at offset {edit.start}: {edit.explanation}")
+        pieces.append(code[position:edit.start])
+        pieces.append(edit.text)
+        position = edit.end
+    if not pieces:
+        return code
+    pieces.append(code[position:])
+    return "".join(pieces)
+
+
+def tokenize(code: str) -> Tuple[List[Token], List[Token], List[Token]]:
+    """
+    Tokenize C source code
+
+    Args:
+        code: Source code to tokenize
+
+    Returns:
+        Tuple of (code tokens, comment tokens, preprocessor directive tokens)
+    """
+    tokens = []
+    comments = []
+    directives = []
+    line = 1
+
+    for match in _TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        text = match.group()
+
+        if kind == "newline":
+            line += 1
+            continue
+        if kind == "space":
+            continue
+
+        token = Token(kind, text, match.start(), match.end(), line)
+        if kind == COMMENT:
+            comments.append(token)
+        elif kind == DIRECTIVE:
+            directives.append(token)
+        else:
+            tokens.append(token)
+
+        if kind in (COMMENT, DIRECTIVE):
+            line += text.count("\n")
+
+    return tokens, comments, directives
+
+
+def match_brackets(tokens: List[Token]) -> Dict[int, int]:
+    """Map each bracket token index to the index of its partner"""
+    brackets = {}
+    stack = []
+
+    for index, token in enumerate(tokens):
+        if token.kind != PUNCT:
+            continue
+        if token.text in _OPEN_BRACKETS:
+            stack.append(index)
+        elif token.text in _CLOSE_BRACKETS:
+            # Unbalanced input: drop unmatched openers of a different kind
+            while stack and _OPEN_BRACKETS[tokens[stack[-1]].text] != token.text:
+                stack.pop()
+            if stack:
+                opener = stack.pop()
+                brackets[opener] = index
+                brackets[index] = opener
+
+    return brackets
+
+
+def _find_functions(tokens: List[Token], brackets: Dict[int, int]) -> List[FunctionInfo]:
+    """Locate function definitions at file scope"""
+    functions = []
+    statement_start = 0
+    index = 0
+    count = len(tokens)
+
+    while index < count:
+        token = tokens[index]
+
+        if token.text in (";", "}"):
+            statement_start = index + 1
+            index += 1
+            continue
+
+        if token.text == "{":
+            # Aggregate initializers and struct/enum bodies at file scope
+            index = brackets.get(index, index) + 1
+            continue
+
+        if (token.kind == IDENT and token.text not in C_KEYWORDS
+                and index + 1 < count and tokens[index + 1].text == "("):
+            close = brackets.get(index + 1)
+            if close is not None and close + 1 < count and tokens[close + 1].text == "{":
+                body_start = close + 1
+                body_end = brackets.get(body_start, count - 1)
+                return_tokens = [t.text for t in tokens[statement_start:index]]
+                functions.append(FunctionInfo(
+                    name=token.text,
+                    return_type=" ".join(return_tokens),
+                    line=token.line,
+                    end_line=tokens[body_end].line,
+                    name_index=index,
+                    body_start=body_start,
+                    body_end=body_end,
+                    is_static="static" in return_tokens
+                ))
+                index = body_end + 1
+                statement_start = index
+                continue
+            if close is not None:
+                index = close + 1
+                continue
+
+        index += 1
+
+    return functions
+
+
+def _collect_defines(directives: List[Token]) -> Dict[str, int]:
+    """Collect object-like macros with integer values"""
+    defines = {}
+    for directive in directives:
+        match = _DEFINE_PATTERN.match(directive.text.strip())
+        if match:
+            defines[match.group(1)] = int(match.group(2), 0)
+    return defines
+
+
+@lru_cache(maxsize=32)
+def parse_source(code: str) -> ParsedSource:
+    """
+    Parse source code into a shared, read-only source model
+
+    Results are memoized per source text so that the analyzer, constraint
+    checker and validators can share one parse of the same code.
+
+    Args:
+        code: Source code to parse
+
+    Returns:
+        ParsedSource with tokens, bracket pairs and function definitions
+    """
+    tokens, comments, directives = tokenize(code)
+    brackets = match_brackets(tokens)
+
+    return ParsedSource(
+        code=code,
+        tokens=tokens,
+        comments=comments,
+        directives=directives,
+        brackets=brackets,
+        functions=_find_functions(tokens, brackets),
+        defines=_collect_defines(directives)
+    )
+
+
+def function_regions(parsed: ParsedSource) -> List[Tuple[int, int, str]]:
+    """
+    Cut the source into regions at function boundaries
+
+    Each region is a function definition, through the end of the line of
+    its closing brace, together with the file-scope text before it; text
+    after the last function forms a final region.
+
+    Returns:
+        (start offset, end offset, function name or '') for each region
+    """
+    code = parsed.code
+    regions = []
+    start = 0
+    for function in parsed.functions:
+        end = parsed.tokens[function.body_end].end
+        newline = code.find("\n", end)
+        end = len(code) if newline < 0 else newline + 1
+        regions.append((start, end, function.name))
+        start = end
+    if start < len(code) or not regions:
+        regions.append((start, len(code), ""))
+    return regions
@@ -0,0 +1,464 @@
+"""
+Static worst-case execution time (WCET) estimator
+
+Walks the function and loop structure of the shared source model and
+bounds the execution time of each function using per-platform cycle-cost
+tables from the PlatformManager.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
+
+from .platforms import PlatformManager
+from .source_parser import ParsedSource, FunctionInfo, parse_source, IDENT, NUMBER, PUNCT, C_KEYWORDS
+
+
+@dataclass
+class FunctionTiming:
+    """Worst-case timing estimate for a single function"""
+    name: str
+    line: int
+    cycles: int
+    time_us: float
+    bounded: bool
+    unbounded_loops: List[int] = field(default_factory=list)
+    calls: List[str] = field(default_factory=list)
+    recursive: bool = False
+
+
+_ALU_OPS = frozenset([
+    "+", "-", "&", "|", "^", "~", "!", "<<", ">>", "<", ">", "<=", ">=",
+    "==", "!=", "++", "--", "+=", "-=", "&=", "|=", "^=", "<<=", ">>=",
+])
+_MUL_OPS = frozenset(["*", "*="])
+_DIV_OPS = frozenset(["/", "%", "/=", "%="])
+_STORE_OPS = frozenset([
+    "=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>=", "++", "--",
+])
+_BRANCH_OPS = frozenset(["&&", "||", "?"])
+_LOAD_OPS = frozenset(["[", "->"])
+_NON_CALLS = frozenset(["if", "for", "while", "switch", "return", "sizeof"])
+
+
+class _CostWalker:
+    """Computes the worst-case cycle count of one function body"""
+
+    def __init__(self, parsed: ParsedSource, costs: Dict[str, int],
+                 callee_cycles: Dict[str, int], max_loop_iterations: Optional[int]):
+        self.tokens = parsed.tokens
+        self.brackets = parsed.brackets
+        self.defines = parsed.defines
+        self.costs = costs
+        self.callee_cycles = callee_cycles
+        self.max_loop_iterations = max_loop_iterations
+        self.float_vars = set()
+        self.unbounded_loops = []
+        self.calls = []
+
+    def walk(self, func: FunctionInfo) -> int:
+        """Return the worst-case cycles of the function body"""
+        self._collect_float_vars(func.name_index + 1, func.body_end)
+        return self._block(func.body_start + 1, func.body_end)
+
+    def _collect_float_vars(self, start: int, end: int) -> None:
+        for index in range(start, end - 1):
+            if self.tokens[index].text in ("float", "double"):
+                following = self.tokens[index + 1]
+                if following.text == "*" and index + 2 < end:
+                    following = self.tokens[index + 2]
+                if following.kind == IDENT:
+                    self.float_vars.add(following.text)
+
+    def _match(self, index: int) -> int:
+        return self.brackets.get(index, index)
+
+    def _statement_end(self, index: int, end: int) -> int:
+        """Index of the ';' terminating a simple statement"""
+        while index < end:
+            text = self.tokens[index].text
+            if text == ";":
+                return index
+            if text in ("(", "[", "{"):
+                index = self._match(index)
+            index += 1
+        return end
+
+    def _block(self, index: int, end: int) -> int:
+        cycles = 0
+        while index < end:
+            cost, index = self._statement(index, end)
+            cycles += cost
+        return cycles
+
+    def _expression(self, start: int, end: int) -> int:
+        """Cycle cost of the operations in an expression"""
+        costs = self.costs
+        counts = {"alu": 0, "mul": 0, "div": 0, "load": 0, "store": 0, "branch": 0}
+        uses_float = False
+        cycles = 0
+        previous = None
+
+        for index in range(start, end):
+            token = self.tokens[index]
+            text = token.text
+
+            if token.kind == IDENT:
+                if (index + 1 < end and self.tokens[index + 1].text == "("
+                        and text not in _NON_CALLS and text not in C_KEYWORDS):
+                    cycles += costs.get("call", 0) + costs.get("return", 0)
+                    cycles += self.callee_cycles.get(text, 0)
+                    self.calls.append(text)
+                elif text in self.float_vars:
+                    uses_float = True
+            elif token.kind == NUMBER:
+                lowered = text.lower()
+                if not lowered.startswith("0x") and ("." in lowered or "e" in lowered or lowered.endswith("f")):
+                    uses_float = True
+            elif token.kind == PUNCT:
+                unary = previous is None or (previous.kind == PUNCT and previous.text not in (")", "]"))
+                if text in _MUL_OPS:
+                    counts["load" if unary and text == "*" else "mul"] += 1
+                elif text in _DIV_OPS:
+                    counts["div"] += 1
+                elif text in _ALU_OPS:
+                    counts["alu"] += 1
+                elif text in _BRANCH_OPS:
+                    counts["branch"] += 1
+                elif text in _LOAD_OPS:
+                    counts["load"] += 1
+                if text in _STORE_OPS:
+                    counts["store"] += 1
+
+            previous = token
+
+        if uses_float:
+            arithmetic = counts.pop("alu") + counts.pop("mul") + counts.pop("div")
+            cycles += arithmetic * costs.get("float_op", 0)
+
+        for op_class, count in counts.items():
+            cycles += count * costs.get(op_class, 0)
+
+        return cycles
+
+    def _loop_bound(self, line: int, trip_count: Optional[int]) -> int:
+        """Resolve the iteration bound of a loop, recording unbounded loops"""
+        if trip_count is not None:
+            return trip_count
+        if self.max_loop_iterations is not None:
+            return self.max_loop_iterations
+        self.unbounded_loops.append(line)
+        return 1
+
+    def _constant(self, start: int, end: int) -> Optional[int]:
+        """Evaluate a single integer literal or #define constant"""
+        if end - start == 3 and self.tokens[start].text == "(" and self.tokens[end - 1].text == ")":
+            start, end = start + 1, end - 1
+        if end - start != 1:
+            return None
+        token = self.tokens[start]
+        if token.kind == NUMBER:
+            try:
+                return int(token.text.rstrip("uUlL"), 0)
+            except ValueError:
+                return None
+        return self.defines.get(token.text)
+
+    def _for_trip_count(self, init: Tuple[int, int], cond: Tuple[int, int],
+                        step: Tuple[int, int]) -> Optional[int]:
+        """Trip count of a counted for loop with constant bounds"""
+        tokens = self.tokens
+
+        # init: [type] var = A
+        init_start, init_end = init
+        assign = next((i for i in range(init_start, init_end) if tokens[i].text == "="), None)
+        if assign is None or assign == init_start:
+            return None
+        var = tokens[assign - 1].text
+        first = self._constant(assign + 1, init_end)
+
+        # cond: var OP B
+        cond_start, cond_end = cond
+        if cond_end - cond_start < 3 or tokens[cond_start].text != var:
+            return None
+        op = tokens[cond_start + 1].text
+        last = self._constant(cond_start + 2, cond_end)
+
+        # step: var++, ++var, var--, --var, var += k, var -= k
+        step_start, step_end = step
+        step_texts = [t.text for t in tokens[step_start:step_end]]
+        if step_texts in ([var, "++"], ["++", var]):
+            stride = 1
+        elif step_texts in ([var, "--"], ["--", var]):
+            stride = -1
+        elif len(step_texts) >= 3 and step_texts[0] == var and step_texts[1] in ("+=", "-="):
+            stride = self._constant(step_start + 2, step_end)
+            if not stride:
+                return None
+            if step_texts[1] == "-=":
+                stride = -stride
+        else:
+            return None
+
+        if first is None or last is None:
+            return None
+
+        if stride > 0 and op in ("<", "<=", "!="):
+            span = last - first + (1 if op == "<=" else 0)
+        elif stride < 0 and op in (">", ">=", "!="):
+            span = first - last + (1 if op == ">=" else 0)
+        else:
+            return None
+
+        if span <= 0:
+            return 0
+        return -(-span // abs(stride))
+
+    def _split_header(self, start: int, end: int) -> List[Tuple[int, int]]:
+        parts = []
+        part_start = start
+        index = start
+        while index < end:
+            text = self.tokens[index].text
+            if text in ("(", "[", "{"):
+                index = self._match(index)
+            elif text == ";":
+                parts.append((part_start, index))
+                part_start = index + 1
+            index += 1
+        parts.append((part_start, end))
+        return parts
+
+    def _statement(self, index: int, end: int) -> Tuple[int, int]:
+        """Return (worst-case cycles, index after statement)"""
+        costs = self.costs
+        token = self.tokens[index]
+        text = token.text
+
+        if text == "{":
+            close = self._match(index)
+            return self._block(index + 1, close), close + 1
+
+        if text == ";":
+            return 0, index + 1
+
+        if text == "if":
+            close = self._match(index + 1)
+            cycles = self._expression(index + 2, close) + costs.get("branch", 0)
+            then_cycles, index = self._statement(close + 1, end)
+            else_cycles = 0
+            if index < end and self.tokens[index].text == "else":
+                else_cycles, index = self._statement(index + 1, end)
+            return cycles + max(then_cycles, else_cycles), index
+
+        if text == "for":
+            close = self._match(index + 1)
+            parts = self._split_header(index + 2, close)
+            if len(parts) != 3:
+                return 0, close + 1
+            init, cond, step = parts
+            body_cycles, after = self._statement(close + 1, end)
+            trip = self._loop_bound(token.line, self._for_trip_count(init, cond, step))
+            cond_cycles = self._expression(*cond) + costs.get("branch", 0)
+            iteration = body_cycles + self._expression(*step) + costs.get("loop_overhead", 0)
+            return self._expression(*init) + (trip + 1) * cond_cycles + trip * iteration, after
+
+        if text == "while":
+            close = self._match(index + 1)
+            cond_cycles = self._expression(index + 2, close) + costs.get("branch", 0)
+            body_cycles, after = self._statement(close + 1, end)
+            trip = self._loop_bound(token.line, None)
+            return (trip + 1) * cond_cycles + trip * (body_cycles + costs.get("loop_overhead", 0)), after
+
+        if text == "do":
+            body_cycles, after = self._statement(index + 1, end)
+            cond_cycles = 0
+            if after < end and self.tokens[after].text == "while":
+                close = self._match(after + 1)
+                cond_cycles = self._expression(after + 2, close) + costs.get("branch", 0)
+                after = self._statement_end(close, end) + 1
+            trip = self._loop_bound(token.line, None)
+            return trip * (body_cycles + cond_cycles + costs.get("loop_overhead", 0)), after
+
+        if text == "switch":
+            close = self._match(index + 1)
+            cycles = self._expression(index + 2, close) + costs.get("branch", 0)
+            body = close + 1
+            if body >= end or self.tokens[body].text != "{":
+                return cycles, body
+            body_end = self._match(body)
+            return cycles + self._switch_body(body + 1, body_end), body_end + 1
+
+        if text in ("case", "default"):
+            colon = index
+            while colon < end and self.tokens[colon].text != ":":
+                colon += 1
+            return 0, colon + 1
+
+        if text == "return":
+            semicolon = self._statement_end(index + 1, end)
+            return self._expression(index + 1, semicolon) + costs.get("return", 0), semicolon + 1
+
+        if text in ("break", "continue", "goto"):
+            return costs.get("branch", 0), self._statement_end(index, end) + 1
+
+        semicolon = self._statement_end(index, end)
+        return self._expression(index, semicolon), semicolon + 1
+
+    def _switch_body(self, index: int, end: int) -> int:
+        """Worst case over the case sections of a switch body"""
+        worst = 0
+        section = 0
+        while index < end:
+            if self.tokens[index].text in ("case", "default"):
+                worst = max(worst, section)
+                section = 0
+            cost, index = self._statement(index, end)
+            section += cost
+        return max(worst, section)
+
+
+class WCETEstimator:
+    """
+    Estimates worst-case execution time per function
+
+    Estimates are cached per function fingerprint (platform, body tokens,
+    referenced constants and callee estimates), so re-analysing large
+    projects only walks functions that actually changed.
+    """
+
+    def __init__(self, platform_manager: PlatformManager, cache_size: int = 4096):
+        self.platform_manager = platform_manager
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def estimate(self, code: str, platform: Optional[str] = None,
+                 clock_mhz: Optional[float] = None,
+                 max_loop_iterations: Optional[int] = None) -> Dict[str, FunctionTiming]:
+        """
+        Estimate worst-case execution time of every function in the code
+
+        Args:
+            code: Source code to analyze
+            platform: Target platform name (defaults to the first configured architecture)
+            clock_mhz: Core clock override in MHz
+            max_loop_iterations: Bound applied to loops without a constant trip count
+
+        Returns:
+            Mapping of function name to FunctionTiming
+        """
+        platform_key = self.resolve_platform(platform)
+        costs = self.platform_manager.get_cycle_costs(platform_key)
+        clock = clock_mhz or self.platform_manager.get_clock_mhz(platform_key) or 1.0
+
+        parsed = parse_source(code)
+        defined = {func.name: func for func in parsed.functions}
+        results: Dict[str, FunctionTiming] = {}
+
+        def visit(func: FunctionInfo, active: set) -> FunctionTiming:
+            if func.name in results:
+                return results[func.name]
+            active.add(func.name)
+
+            callees = self._callees(parsed, func, defined)
+            recursive = any(callee in active for callee in callees)
+            callee_timings = {
+                callee: visit(defined[callee], active)
+                for callee in callees if callee not in active
+            }
+            active.discard(func.name)
+
+            key = (
+                platform_key,
+                max_loop_iterations,
+                self._fingerprint(parsed, func),
+                tuple(sorted((name, timing.cycles) for name, timing in callee_timings.items())),
+            )
+            cached = self._cache_get(key)
+            if cached is None:
+                walker = _CostWalker(
+                    parsed, costs,
+                    {name: timing.cycles for name, timing in callee_timings.items()},
+                    max_loop_iterations
+                )
+                cycles = walker.walk(func)
+                cached = (
+                    cycles,
+                    tuple(line - func.line for line in walker.unbounded_loops),
+                    tuple(dict.fromkeys(walker.calls)),
+                )
+                self._cache_put(key, cached)
+
+            cycles, loop_offsets, calls = cached
+            unbounded_loops = [func.line + offset for offset in loop_offsets]
+            bounded = (not unbounded_loops and not recursive
+                       and all(timing.bounded for timing in callee_timings.values()))
+
+            timing = FunctionTiming(
+                name=func.name,
+                line=func.line,
+                cycles=cycles,
+                time_us=round(cycles / clock, 3),
+                bounded=bounded,
+                unbounded_loops=unbounded_loops,
+                calls=list(calls),
+                recursive=recursive
+            )
+            results[func.name] = timing
+            return timing
+
+        for func in parsed.functions:
+            visit(func, set())
+
+        return results
+
+    def resolve_platform(self, platform: Optional[str]) -> str:
+        """Resolve a platform name, falling back to the configured default"""
+        return self.platform_manager.resolve_platform(platform)
+
+    def _callees(self, parsed: ParsedSource, func: FunctionInfo,
+                 defined: Dict[str, FunctionInfo]) -> List[str]:
+        tokens = parsed.tokens
+        callees = []
+        for index in range(func.body_start + 1, func.body_end):
+            token = tokens[index]
+            if (token.kind == IDENT and token.text in defined
+                    and tokens[index + 1].text == "(" and token.text not in callees):
+                callees.append(token.text)
+        return callees
+
+    def _fingerprint(self, parsed: ParsedSource, func: FunctionInfo) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        constants = []
+        for token in parsed.tokens[func.name_index:func.body_end + 1]:
+            digest.update(token.text.encode())
+            digest.update(b"\x1f")
+            if token.text in parsed.defines:
+                constants.append(f"{token.text}={parsed.defines[token.text]}")
+        digest.update("\x1e".join(sorted(set(constants))).encode())
+        return digest.hexdigest()
+
+    def _cache_get(self, key: Tuple) -> Optional[Tuple]:
+        cached = self._cache.get(key)
+        if cached is None:
+            self.cache_misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        return cached
+
+    def _cache_put(self, key: Tuple, value: Tuple) -> None:
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get fingerprint cache statistics"""
+        return {
+            "entries": len(self._cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses
+        }
@@ -16,8 +16,28 @@ import base64
 import hashlib
 from datetime import datetime, timedelta
 import os
+from pathlib import Path
 
-class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
+from ai_copilot.config import CopilotConfig
+from telemetry import TelemetryStore, MaintenanceScorer, DeviceRegistry, IoTIngestServer, ingest_http_body
+from vehicle_context import StandardsChecker, SafetySimulator, SimulatorBusy
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics, format_duration
+from ai_copilot.retrieval import Passage, LazyQAEngine, build_knowledge_corpus
+
+# Shared by all request handlers (one handler instance per request)
+TELEMETRY_STORE = TelemetryStore()
+MAINTENANCE_SCORER = MaintenanceScorer(TELEMETRY_STORE)
+SAFETY_SIMULATOR = SafetySimulator(StandardsChecker(CopilotConfig()))
+HTTP_METRICS = get_http_metrics()
+
+# Demo fleet devices; anything else that sends messages is registered on first contact
+IOT_REGISTRY = DeviceRegistry()
+IOT_REGISTRY.register("TATA-ECU-001", "Engine Control Unit", "Test Vehicle #1", "Encrypted")
+IOT_REGISTRY.register("TATA-BMS-002", "Battery Management System", "EV Test Lab", "Encrypted")
+IOT_REGISTRY.register("TATA-BRAKE-003", "Brake Controller", "Safety Test Track", "Secure", status="Maintenance")
+IOT_PORT = 9100
+
+class EnhancedTATAHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_enhanced_main_page()
@@ -34,17 +54,23 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
                 ],
                 "uptime": self.get_uptime(),
                 "ai_models": ["TATA-GPT-Automotive-Pro", "CodeGen-Embedded-Plus", "Safety-Analyzer-Advanced"],
-                "active_users": random.randint(15, 25),
-                "code_generated_today": random.randint(150, 300)
+                "active_users": int(HTTP_METRICS.active_clients.value),
+                "code_generated_today": HTTP_METRICS.count('/api/generate-advanced', 'POST')
             })
         elif self.path == '/api/analytics':
             self.serve_json(self.get_analytics_data())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/api/templates':
             self.serve_json(self.get_code_templates())
         elif self.path == '/api/digital-twin':
             self.serve_json(self.get_digital_twin_data())
+        elif self.path.startswith('/api/digital-twin/history'):
+            self.serve_digital_twin_history()
         elif self.path == '/api/safety-simulator':
             self.serve_json(self.get_safety_simulation_data())
+        elif self.path.startswith('/api/safety-simulator/jobs/'):
+            self.serve_safety_simulation_job()
         elif self.path == '/api/collaboration':
             self.serve_json(self.get_collaboration_data())
         elif self.path == '/api/iot-devices':
@@ -71,42 +97,29 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
             self.handle_model_training()
         elif self.path == '/api/generate-report':
             self.handle_report_generation()
+        elif self.path == '/api/telemetry':
+            self.handle_telemetry_ingest()
+        elif self.path == '/api/iot/messages':
+            self.handle_iot_ingest()
+        elif self.path == '/api/safety-simulator/jobs':
+            self.handle_safety_simulation()
         else:
             self.send_error(404)
     
     def get_uptime(self):
-        return f"{random.randint(2, 8)} hours {random.randint(15, 45)} minutes"
+        return format_duration(HTTP_METRICS.registry.get("process_uptime_seconds").value)
     
     def get_analytics_data(self):
-        return {
-            "performance_metrics": {
-                "code_generation_speed": f"{random.uniform(2.1, 4.8):.1f}s",
-                "accuracy_rate": f"{random.uniform(94.5, 98.2):.1f}%",
-                "user_satisfaction": f"{random.uniform(4.6, 4.9):.1f}/5.0",
-                "system_uptime": "99.7%"
-            },
-            "usage_statistics": {
-                "total_code_generated": random.randint(15000, 25000),
-                "active_projects": random.randint(45, 85),
-                "safety_checks_passed": random.randint(1200, 1800),
-                "collaboration_sessions": random.randint(25, 45)
-            },
-            "real_time_data": {
-                "current_cpu_usage": f"{random.randint(15, 35)}%",
-                "memory_usage": f"{random.randint(40, 65)}%",
-                "api_response_time": f"{random.randint(120, 280)}ms",
-                "concurrent_users": random.randint(8, 18)
-            },
-            "weekly_trends": [
-                {"day": "Mon", "code_gen": random.randint(80, 120), "qa_sessions": random.randint(25, 45)},
-                {"day": "Tue", "code_gen": random.randint(90, 130), "qa_sessions": random.randint(30, 50)},
-                {"day": "Wed", "code_gen": random.randint(100, 140), "qa_sessions": random.randint(35, 55)},
-                {"day": "Thu", "code_gen": random.randint(85, 125), "qa_sessions": random.randint(28, 48)},
-                {"day": "Fri", "code_gen": random.randint(95, 135), "qa_sessions": random.randint(32, 52)},
-                {"day": "Sat", "code_gen": random.randint(60, 90), "qa_sessions": random.randint(15, 30)},
-                {"day": "Sun", "code_gen": random.randint(50, 80), "qa_sessions": random.randint(10, 25)}
-            ]
-        }
+        """Request, latency and process metrics recorded by this server"""
+        analytics = HTTP_METRICS.analytics()
+        usage = analytics["usage_statistics"]
+        usage["total_code_generated"] = HTTP_METRICS.count('/api/generate-advanced', 'POST')
+        usage["questions_answered"] = HTTP_METRICS.count('/api/ask-advanced', 'POST')
+        usage["safety_simulations_run"] = (HTTP_METRICS.count('/api/simulate-safety', 'POST')
+                                           + HTTP_METRICS.count('/api/safety-simulator/jobs', 'POST'))
+        usage["collaboration_requests"] = HTTP_METRICS.count('/api/collaborate', 'POST')
+        usage["telemetry_batches"] = HTTP_METRICS.count('/api/telemetry', 'POST')
+        return analytics
     
     def get_code_templates(self):
         return {
@@ -135,88 +148,111 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
         }
     
     def get_digital_twin_data(self):
-        return {
-            "vehicle_models": [
-                {
-                    "name": "TATA Nexon EV",
-                    "type": "Electric SUV",
-                    "status": "Active",
-                    "battery_level": random.randint(65, 95),
-                    "location": "Mumbai, India",
-                    "mileage": random.randint(15000, 25000),
-                    "last_service": "2024-01-15",
-                    "health_score": random.randint(85, 98)
-                },
-                {
-                    "name": "TATA Ace Commercial",
-                    "type": "Commercial Vehicle",
-                    "status": "Active",
-                    "fuel_level": random.randint(40, 80),
-                    "location": "Delhi, India",
-                    "mileage": random.randint(45000, 65000),
-                    "last_service": "2024-01-10",
-                    "health_score": random.randint(78, 92)
-                },
-                {
-                    "name": "TATA Harrier",
-                    "type": "SUV",
-                    "status": "Maintenance",
-                    "fuel_level": random.randint(20, 60),
-                    "location": "Pune, India",
-                    "mileage": random.randint(8000, 18000),
-                    "last_service": "2024-01-20",
-                    "health_score": random.randint(88, 96)
-                }
-            ],
-            "real_time_telemetry": {
-                "engine_rpm": random.randint(800, 3500),
-                "vehicle_speed": random.randint(0, 120),
-                "coolant_temp": random.randint(85, 105),
-                "oil_pressure": random.uniform(2.5, 4.2),
-                "battery_voltage": random.uniform(12.2, 14.4),
-                "fuel_consumption": random.uniform(8.5, 15.2)
-            },
-            "predictive_insights": [
-                "Brake pads need replacement in 2,500 km",
-                "Engine oil change due in 15 days",
-                "Battery performance optimal for next 6 months",
-                "Tire rotation recommended within 1,000 km"
-            ]
-        }
+        """Digital twin view built from ingested telemetry aggregates"""
+        snapshot = TELEMETRY_STORE.snapshot()
+        snapshot["predictive_insights"] = [
+            f"{vehicle['name']}: {insight}"
+            for vehicle in snapshot["vehicle_models"]
+            for insight in vehicle["insights"]
+        ]
+        return snapshot
+    
+    def serve_digital_twin_history(self):
+        """Downsampled signal history: ?vehicle_id=&signal=&start=&end=&max_points="""
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        if 'vehicle_id' not in query:
+            self.serve_json({"error": "vehicle_id is required"}, status=400)
+            return
+        try:
+            vehicle_id = query['vehicle_id'][0]
+            signals = query['signal'][0].split(',') if 'signal' in query else None
+            start = float(query['start'][0]) if 'start' in query else None
+            end = float(query['end'][0]) if 'end' in query else None
+            max_points = int(query.get('max_points', ['1000'])[0])
+            
+            self.serve_json(TELEMETRY_STORE.history(vehicle_id, signals, start, end, max_points))
+            
+        except KeyError as e:
+            self.serve_json({"error": f"Not found: {e}"}, status=404)
+        except ValueError as e:
+            self.serve_json({"error": str(e)}, status=400)
+    
+    def handle_telemetry_ingest(self):
+        """Ingest batched telemetry records into the digital twin store"""
+        try:
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            request_data = json.loads(post_data.decode('utf-8'))
+            
+            # Accept a list of records, {"records": [...]} or a single record
+            if isinstance(request_data, dict):
+                records = request_data.get('records', [request_data])
+            else:
+                records = request_data
+            result = TELEMETRY_STORE.ingest(records)
+            result["timestamp"] = datetime.now().isoformat()
+            
+            self.serve_json(result, status=202 if result["accepted"] else 400)
+            
+        except Exception as e:
+            self.serve_json({"error": str(e)}, status=400)
     
     def get_safety_simulation_data(self):
+        """Simulation scenarios with their latest Monte Carlo campaign results"""
         return {
-            "simulation_scenarios": [
-                {
-                    "name": "Emergency Braking Test",
-                    "description": "Simulate emergency braking at various speeds",
-                    "status": "Ready",
-                    "duration": "5 minutes",
-                    "safety_level": "ASIL-D"
-                },
-                {
-                    "name": "Collision Avoidance",
-                    "description": "Test collision detection and avoidance systems",
-                    "status": "Running",
-                    "duration": "8 minutes",
-                    "safety_level": "ASIL-D"
-                },
-                {
-                    "name": "Battery Thermal Runaway",
-                    "description": "Simulate battery overheating scenarios",
-                    "status": "Ready",
-                    "duration": "12 minutes",
-                    "safety_level": "ASIL-C"
-                }
-            ],
-            "test_results": {
-                "passed_tests": random.randint(145, 180),
-                "failed_tests": random.randint(2, 8),
-                "success_rate": f"{random.uniform(94.5, 98.5):.1f}%",
-                "critical_issues": random.randint(0, 2)
-            }
+            "simulation_scenarios": SAFETY_SIMULATOR.scenarios(),
+            "jobs": [
+                {key: job[key] for key in ("job_id", "scenario", "runs", "status", "progress")}
+                for job in SAFETY_SIMULATOR.recent_jobs(10)
+            ]
         }
     
+    def handle_safety_simulation(self):
+        """Start a Monte Carlo campaign as a background job"""
+        try:
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            request_data = json.loads(post_data.decode('utf-8'))
+            
+            job_id = SAFETY_SIMULATOR.submit(
+                request_data.get('scenario', 'emergency_braking'),
+                runs=int(request_data.get('runs', 5000)),
+                seed=request_data.get('seed'),
+                asil_level=request_data.get('asil_level'),
+                params=request_data.get('params')
+            )
+            
+            self.serve_json({
+                "job_id": job_id,
+                "status": "queued",
+                "poll_url": f"/api/safety-simulator/jobs/{job_id}"
+            }, status=202)
+            
+        except SimulatorBusy as e:
+            self.serve_json({"error": str(e)}, status=503)
+        except Exception as e:
+            self.serve_json({"error": str(e)}, status=400)
+    
+    def serve_safety_simulation_job(self):
+        """Progress and (once completed) result of a simulation job"""
+        job_id = self.path.rsplit('/', 1)[-1]
+        job = SAFETY_SIMULATOR.job(job_id)
+        if job is None:
+            self.serve_json({"error": f"Unknown job: {job_id}"}, status=404)
+        else:
+            self.serve_json(job)
+    
+    def handle_iot_ingest(self):
+        """Ingest CAN/ECU messages: binary packets or JSON messages"""
+        try:
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            result = ingest_http_body(post_data, self.headers.get('Content-Type', ''), IOT_REGISTRY)
+            self.serve_json(result, status=202 if result["accepted"] else 400)
+            
+        except Exception as e:
+            self.serve_json({"error": str(e)}, status=400)
+    
     def get_collaboration_data(self):
         return {
             "active_sessions": [
@@ -241,74 +277,19 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
         }
     
     def get_iot_devices(self):
-        return {
-            "connected_devices": [
-                {
-                    "device_id": "TATA-ECU-001",
-                    "type": "Engine Control Unit",
-                    "status": "Online",
-                    "location": "Test Vehicle #1",
-                    "last_update": "2 minutes ago",
-                    "data_points": random.randint(1500, 2500)
-                },
-                {
-                    "device_id": "TATA-BMS-002",
-                    "type": "Battery Management System",
-                    "status": "Online", 
-                    "location": "EV Test Lab",
-                    "last_update": "1 minute ago",
-                    "data_points": random.randint(800, 1200)
-                },
-                {
-                    "device_id": "TATA-BRAKE-003",
-                    "type": "Brake Controller",
-                    "status": "Maintenance",
-                    "location": "Safety Test Track",
-                    "last_update": "15 minutes ago",
-                    "data_points": random.randint(500, 900)
-                }
-            ],
-            "data_streams": {
-                "total_messages": random.randint(50000, 80000),
-                "messages_per_second": random.randint(25, 45),
-                "data_quality": f"{random.uniform(96.5, 99.2):.1f}%"
-            }
-        }
+        """Registered devices with live message rates and ingestion statistics"""
+        devices = IOT_REGISTRY.snapshot()
+        stats = devices["network_stats"]
+        devices["data_streams"] = {
+            "total_messages": stats["total_messages"],
+            "messages_per_second": stats["messages_per_second"],
+            "data_quality": stats["data_quality"]
+        }
+        return devices
     
     def get_predictive_maintenance_data(self):
-        return {
-            "maintenance_predictions": [
-                {
-                    "component": "Engine Oil Filter",
-                    "vehicle": "TATA Nexon",
-                    "predicted_failure": "In 2,500 km",
-                    "confidence": "94%",
-                    "severity": "Medium",
-                    "recommended_action": "Schedule maintenance"
-                },
-                {
-                    "component": "Brake Pads (Front)",
-                    "vehicle": "TATA Harrier",
-                    "predicted_failure": "In 1,200 km", 
-                    "confidence": "97%",
-                    "severity": "High",
-                    "recommended_action": "Immediate attention required"
-                },
-                {
-                    "component": "Battery Cells (Module 3)",
-                    "vehicle": "TATA Nexon EV",
-                    "predicted_failure": "In 6 months",
-                    "confidence": "89%",
-                    "severity": "Low",
-                    "recommended_action": "Monitor closely"
-                }
-            ],
-            "cost_savings": {
-                "prevented_breakdowns": random.randint(15, 25),
-                "cost_saved": f"₹{random.randint(250000, 450000):,}",
-                "efficiency_improvement": f"{random.uniform(15.5, 28.3):.1f}%"
-            }
-        }
+        """Remaining-useful-life predictions scored from ingested telemetry"""
+        return MAINTENANCE_SCORER.report()
     
     def handle_advanced_qa(self):
         """Handle advanced Q&A with context awareness"""
@@ -333,6 +314,7 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
                 "confidence": response.get("confidence", 0.95),
                 "context_used": response.get("context_used", []),
                 "follow_up_questions": response.get("follow_up_questions", []),
+                "sources": response.get("sources", []),
                 "timestamp": datetime.now().isoformat(),
                 "session_id": session_id
             })
@@ -341,71 +323,40 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
             self.serve_json({"error": str(e)}, status=400)
     
     def generate_advanced_qa_response(self, question, context, session_id):
-        """Generate advanced Q&A responses with context awareness"""
-        question_lower = question.lower()
-        
-        # Advanced automotive responses with context
-        if any(word in question_lower for word in ['digital twin', 'twin', 'simulation']):
-            return {
-                "answer": "TATA Digital Twin technology creates virtual replicas of physical vehicles, enabling real-time monitoring, predictive maintenance, and performance optimization. Our digital twins integrate IoT sensors, machine learning algorithms, and 3D visualization to provide comprehensive vehicle insights.",
-                "code_example": self.get_digital_twin_code(),
-                "explanation": "Digital twins enable predictive maintenance, reduce downtime, and optimize vehicle performance through continuous monitoring and AI-driven insights.",
-                "related_topics": ["IoT Integration", "Predictive Analytics", "Real-time Monitoring", "3D Visualization"],
-                "context_used": ["vehicle_telemetry", "sensor_data"],
-                "follow_up_questions": [
-                    "How do I implement IoT sensors for digital twin data collection?",
-                    "What machine learning algorithms work best for predictive maintenance?",
-                    "How can I visualize digital twin data in real-time?"
-                ],
-                "confidence": 0.97
-            }
-        
-        elif any(word in question_lower for word in ['collaboration', 'team', 'share']):
-            return {
-                "answer": "TATA AI Co-pilot supports real-time collaboration features including shared code editing, project synchronization, code reviews, and team chat. Multiple engineers can work on the same automotive project simultaneously with conflict resolution and version control.",
-                "code_example": self.get_collaboration_code(),
-                "explanation": "Collaboration features enable distributed teams to work efficiently on complex automotive projects with real-time synchronization and communication.",
-                "related_topics": ["Real-time Editing", "Version Control", "Code Reviews", "Team Communication"],
-                "context_used": ["team_projects", "shared_sessions"],
-                "follow_up_questions": [
-                    "How do I set up a collaborative project for my team?",
-                    "What are the best practices for code reviews in automotive projects?",
-                    "How can I manage version control for safety-critical code?"
-                ],
-                "confidence": 0.95
-            }
-        
-        elif any(word in question_lower for word in ['predictive', 'maintenance', 'predict']):
-            return {
-                "answer": "TATA Predictive Maintenance uses AI and machine learning to analyze vehicle data patterns, predict component failures before they occur, and optimize maintenance schedules. This reduces downtime, prevents costly breakdowns, and improves vehicle reliability.",
-                "code_example": self.get_predictive_maintenance_code(),
-                "explanation": "Predictive maintenance algorithms analyze sensor data, usage patterns, and historical maintenance records to forecast component health and optimal replacement timing.",
-                "related_topics": ["Machine Learning", "Sensor Analytics", "Failure Prediction", "Maintenance Optimization"],
-                "context_used": ["sensor_data", "maintenance_history"],
+        """Answer from the knowledge index with follow-ups for the session"""
+        result = QA_ENGINE.answer(question)
+        if result is not None:
+            response = {
+                "answer": result["answer"],
+                "code_example": result["code_example"],
+                "explanation": result["explanation"],
+                "related_topics": result["related_topics"],
+                "context_used": list(dict.fromkeys(passage["source"] for passage in result["passages"])),
                 "follow_up_questions": [
-                    "What sensors are needed for predictive maintenance?",
-                    "How accurate are the failure predictions?",
-                    "Can I customize the prediction algorithms for specific components?"
+                    f"Tell me more about {passage['title']}" for passage in result["passages"][1:]
                 ],
-                "confidence": 0.96
+                "sources": result["passages"],
+                "confidence": result["confidence"],
             }
-        
-        else:
-            # Enhanced general response
-            return {
-                "answer": f"I understand you're asking about: '{question}'. As your advanced TATA AI Co-pilot, I can help with digital twins, predictive maintenance, real-time collaboration, safety simulation, IoT integration, and advanced automotive software development. I have access to real-time vehicle data, collaboration tools, and advanced analytics.",
-                "explanation": "I'm equipped with advanced features including digital twin technology, predictive analytics, and collaborative development tools specifically designed for TATA automotive systems.",
-                "related_topics": ["Digital Twins", "Predictive Maintenance", "Collaboration", "Safety Simulation"],
-                "context_used": ["general_automotive"],
-                "follow_up_questions": [
-                    "Tell me about TATA digital twin capabilities",
-                    "How does predictive maintenance work?",
-                    "What collaboration features are available?"
-                ],
-                "confidence": 0.88
-            }
-    
-    def get_digital_twin_code(self):
+            response.update(result["extra"])
+            return response
+
+        # Enhanced general response
+        return {
+            "answer": f"I understand you're asking about: '{question}'. As your advanced TATA AI Co-pilot, I can help with digital twins, predictive maintenance, real-time collaboration, safety simulation, IoT integration, and advanced automotive software development. I have access to real-time vehicle data, collaboration tools, and advanced analytics.",
+            "explanation": "I'm equipped with advanced features including digital twin technology, predictive analytics, and collaborative development tools specifically designed for TATA automotive systems.",
+            "related_topics": ["Digital Twins", "Predictive Maintenance", "Collaboration", "Safety Simulation"],
+            "context_used": ["general_automotive"],
+            "follow_up_questions": [
+                "Tell me about TATA digital twin capabilities",
+                "How does predictive maintenance work?",
+                "What collaboration features are available?"
+            ],
+            "confidence": 0.88
+        }
+
+    @staticmethod
+    def get_digital_twin_code():
         return '''// TATA Digital Twin Data Collection
 typedef struct {
     uint32_t vehicle_id;
@@ -422,7 +373,8 @@ int tata_send_twin_data(tata_twin_data_t* data) {
     return iot_publish("tata/vehicle/telemetry", data, sizeof(*data));
 }'''
     
-    def get_collaboration_code(self):
+    @staticmethod
+    def get_collaboration_code():
         return '''// TATA Collaboration API
 typedef struct {
     char session_id[32];
@@ -436,7 +388,8 @@ int tata_join_session(const char* session_id, const char* user_id) {
     return collab_api_join(session_id, user_id);
 }'''
     
-    def get_predictive_maintenance_code(self):
+    @staticmethod
+    def get_predictive_maintenance_code():
         return '''// TATA Predictive Maintenance
 typedef struct {
     float vibration_level;
@@ -866,6 +819,68 @@ float tata_predict_failure(tata_component_health_t* health) {
         self.end_headers()
         self.wfile.write(json.dumps(data, indent=2).encode())
 
+# Curated answers, ranked together with the knowledge bases, templates and docs
+QA_PASSAGES = [
+    Passage(
+        id="answer:digital-twin",
+        title="Digital twin",
+        text="TATA Digital Twin technology creates virtual replicas of physical vehicles, enabling real-time monitoring, predictive maintenance, and performance optimization. Our digital twins integrate IoT sensors, machine learning algorithms, and 3D visualization to provide comprehensive vehicle insights.",
+        source="enhanced_tata_copilot",
+        kind="answer",
+        topics=["IoT Integration", "Predictive Analytics", "Real-time Monitoring", "3D Visualization", "Simulation"],
+        code=EnhancedTATAHandler.get_digital_twin_code(),
+        explanation="Digital twins enable predictive maintenance, reduce downtime, and optimize vehicle performance through continuous monitoring and AI-driven insights.",
+        extra={
+            "context_used": ["vehicle_telemetry", "sensor_data"],
+            "follow_up_questions": [
+                "How do I implement IoT sensors for digital twin data collection?",
+                "What machine learning algorithms work best for predictive maintenance?",
+                "How can I visualize digital twin data in real-time?"
+            ],
+        },
+    ),
+    Passage(
+        id="answer:collaboration",
+        title="Team collaboration",
+        text="TATA AI Co-pilot supports real-time collaboration features including shared code editing, project synchronization, code reviews, and team chat. Multiple engineers can work on the same automotive project simultaneously with conflict resolution and version control.",
+        source="enhanced_tata_copilot",
+        kind="answer",
+        topics=["Real-time Editing", "Version Control", "Code Reviews", "Team Communication", "Share"],
+        code=EnhancedTATAHandler.get_collaboration_code(),
+        explanation="Collaboration features enable distributed teams to work efficiently on complex automotive projects with real-time synchronization and communication.",
+        extra={
+            "context_used": ["team_projects", "shared_sessions"],
+            "follow_up_questions": [
+                "How do I set up a collaborative project for my team?",
+                "What are the best practices for code reviews in automotive projects?",
+                "How can I manage version control for safety-critical code?"
+            ],
+        },
+    ),
+    Passage(
+        id="answer:predictive-maintenance",
+        title="Predictive maintenance",
+        text="TATA Predictive Maintenance uses AI and machine learning to analyze vehicle data patterns, predict component failures before they occur, and optimize maintenance schedules. This reduces downtime, prevents costly breakdowns, and improves vehicle reliability.",
+        source="enhanced_tata_copilot",
+        kind="answer",
+        topics=["Machine Learning", "Sensor Analytics", "Failure Prediction", "Maintenance Optimization"],
+        code=EnhancedTATAHandler.get_predictive_maintenance_code(),
+        explanation="Predictive maintenance algorithms analyze sensor data, usage patterns, and historical maintenance records to forecast component health and optimal replacement timing.",
+        extra={
+            "context_used": ["sensor_data", "maintenance_history"],
+            "follow_up_questions": [
+                "What sensors are needed for predictive maintenance?",
+                "How accurate are the failure predictions?",
+                "Can I customize the prediction algorithms for specific components?"
+            ],
+        },
+    ),
+]
+# Built (or loaded from output/) on the first question or at server start, not on import
+QA_ENGINE = LazyQAEngine(
+    Path(CopilotConfig().output_dir) / "qa_index_enhanced.npz", lambda: build_knowledge_corpus(extra=QA_PASSAGES)
+)
+
 def open_browser_delayed():
     time.sleep(3)
     try:
@@ -886,6 +901,14 @@ def main():
     print("-" * 80)
     
     threading.Thread(target=open_browser_delayed, daemon=True).start()
+    # Warm the knowledge index while the server comes up
+    threading.Thread(target=QA_ENGINE.get, daemon=True).start()
+
+    try:
+        IoTIngestServer(IOT_REGISTRY, udp_port=IOT_PORT, tcp_port=IOT_PORT).start()
+        print(f"📡 IoT ingest listening on UDP/TCP port {IOT_PORT}")
+    except OSError as e:
+        print(f"⚠️ IoT socket ingest disabled: {e}")
     
     PORT = 8000
     try:
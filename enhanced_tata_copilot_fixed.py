@@ -16,8 +16,15 @@ import base64
 import hashlib
 from datetime import datetime, timedelta
 import os
+from pathlib import Path
 
-class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
+from ai_copilot.config import CopilotConfig
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics, format_duration
+from ai_copilot.retrieval import Passage, LazyQAEngine, build_knowledge_corpus
+
+HTTP_METRICS = get_http_metrics()
+
+class EnhancedTATAHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_enhanced_main_page()
@@ -34,12 +41,14 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
                 ],
                 "uptime": self.get_uptime(),
                 "ai_models": ["TATA-GPT-Automotive-Pro", "CodeGen-Embedded-Plus", "Safety-Analyzer-Advanced"],
-                "active_users": random.randint(15, 25),
-                "code_generated_today": random.randint(150, 300),
+                "active_users": int(HTTP_METRICS.active_clients.value),
+                "code_generated_today": HTTP_METRICS.count('/api/generate-advanced', 'POST'),
                 "voice_support": True
             })
         elif self.path == '/api/analytics':
             self.serve_json(self.get_analytics_data())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/api/digital-twin':
             self.serve_json(self.get_digital_twin_data())
         elif self.path == '/api/collaboration':
@@ -69,29 +78,15 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
             self.send_error(404)
     
     def get_uptime(self):
-        return f"{random.randint(2, 8)} hours {random.randint(15, 45)} minutes"
+        return format_duration(HTTP_METRICS.registry.get("process_uptime_seconds").value)
     
     def get_analytics_data(self):
-        return {
-            "performance_metrics": {
-                "code_generation_speed": f"{random.uniform(2.1, 4.8):.1f}s",
-                "accuracy_rate": f"{random.uniform(94.5, 98.2):.1f}%",
-                "user_satisfaction": f"{random.uniform(4.6, 4.9):.1f}/5.0",
-                "system_uptime": "99.7%"
-            },
-            "usage_statistics": {
-                "total_code_generated": random.randint(15000, 25000),
-                "active_projects": random.randint(45, 85),
-                "voice_commands_used": random.randint(120, 250),
-                "collaboration_sessions": random.randint(25, 45)
-            },
-            "real_time_data": {
-                "current_cpu_usage": f"{random.randint(15, 35)}%",
-                "memory_usage": f"{random.randint(40, 65)}%",
-                "api_response_time": f"{random.randint(120, 280)}ms",
-                "concurrent_users": random.randint(8, 18)
-            }
-        }
+        """Request, latency and process metrics recorded by this server"""
+        analytics = HTTP_METRICS.analytics()
+        usage = analytics["usage_statistics"]
+        usage["total_code_generated"] = HTTP_METRICS.count('/api/generate-advanced', 'POST')
+        usage["questions_answered"] = HTTP_METRICS.count('/api/ask-advanced', 'POST')
+        return analytics
     
     def get_digital_twin_data(self):
         return {
@@ -161,6 +156,7 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
                 "related_topics": response.get("related_topics", []),
                 "confidence": response.get("confidence", 0.95),
                 "follow_up_questions": response.get("follow_up_questions", []),
+                "sources": response.get("sources", []),
                 "timestamp": datetime.now().isoformat(),
                 "session_id": session_id
             })
@@ -169,79 +165,37 @@ class EnhancedTATAHandler(http.server.SimpleHTTPRequestHandler):
             self.serve_json({"error": str(e)}, status=400)
     
     def generate_advanced_qa_response(self, question, context, session_id):
-        """Generate advanced Q&A responses with context awareness"""
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['brake', 'braking', 'abs']):
-            return {
-                "answer": "TATA brake systems require ASIL-D compliance for safety-critical functions. The brake system should include redundant sensors, fail-safe mechanisms, and real-time monitoring. For ABS systems, we implement wheel speed sensors, hydraulic pressure control, and emergency braking protocols.",
-                "code_example": self.get_brake_code_example(),
-                "explanation": "This implementation follows ISO 26262 standards for automotive safety and includes TATA-specific error codes and CAN bus communication protocols.",
-                "related_topics": ["ASIL-D Compliance", "CAN Bus Communication", "Hydraulic Control", "Sensor Redundancy"],
-                "follow_up_questions": [
-                    "How do I implement redundant brake sensors?",
-                    "What are the ASIL-D testing requirements?",
-                    "How can I optimize brake response time?"
-                ],
-                "confidence": 0.98
-            }
-        
-        elif any(word in question_lower for word in ['engine', 'rpm', 'fuel', 'injection']):
-            return {
-                "answer": "TATA engine control systems manage fuel injection, ignition timing, and emissions control. The ECU monitors engine RPM, temperature, and load conditions to optimize performance and efficiency. For commercial vehicles, we focus on durability and fuel economy.",
-                "code_example": self.get_engine_code_example(),
-                "explanation": "This code implements a complete engine control loop with sensor validation, fuel map lookup, and diagnostic monitoring suitable for TATA commercial vehicles.",
-                "related_topics": ["Fuel Injection", "Ignition Timing", "Emissions Control", "Engine Diagnostics"],
-                "follow_up_questions": [
-                    "How do I calibrate fuel injection timing?",
-                    "What sensors are needed for engine control?",
-                    "How can I implement emissions monitoring?"
-                ],
-                "confidence": 0.96
-            }
-        
-        elif any(word in question_lower for word in ['battery', 'electric', 'ev', 'charging']):
-            return {
-                "answer": "TATA electric vehicle systems require sophisticated battery management, thermal control, and charging protocols. The BMS monitors cell voltages, temperatures, and current flow to ensure safety and longevity. Fast charging requires careful thermal management.",
-                "code_example": self.get_battery_code_example(),
-                "explanation": "This BMS implementation includes cell balancing, thermal protection, and SOC estimation algorithms optimized for TATA electric vehicle platforms.",
-                "related_topics": ["Battery Management", "Thermal Control", "Fast Charging", "Cell Balancing"],
+        """Answer from the knowledge index with follow-ups for the session"""
+        result = QA_ENGINE.answer(question)
+        if result is not None:
+            response = {
+                "answer": result["answer"],
+                "code_example": result["code_example"],
+                "explanation": result["explanation"],
+                "related_topics": result["related_topics"],
                 "follow_up_questions": [
-                    "How do I implement cell balancing algorithms?",
-                    "What are the thermal protection requirements?",
-                    "How can I optimize charging speed?"
+                    f"Tell me more about {passage['title']}" for passage in result["passages"][1:]
                 ],
-                "confidence": 0.97
-            }
-        
-        elif any(word in question_lower for word in ['voice', 'speech', 'command']):
-            return {
-                "answer": "TATA AI Co-pilot supports advanced voice commands using Web Speech API. You can speak naturally to ask questions, generate code, or control features. Voice recognition works in multiple languages and understands automotive terminology.",
-                "code_example": self.get_voice_code_example(),
-                "explanation": "Voice commands enable hands-free interaction, improving productivity and accessibility for automotive engineers working in various environments.",
-                "related_topics": ["Speech Recognition", "Voice UI", "Hands-free Operation", "Accessibility"],
-                "follow_up_questions": [
-                    "What voice commands are available?",
-                    "How accurate is the voice recognition?",
-                    "Can I use voice commands in Hindi?"
-                ],
-                "confidence": 0.95
-            }
-        
-        else:
-            return {
-                "answer": f"I understand you're asking about: '{question}'. As your advanced TATA AI Co-pilot, I can help with brake systems, engine control, electric vehicles, voice commands, and all aspects of automotive software development. I have deep knowledge of TATA vehicle architectures and safety requirements.",
-                "explanation": "I'm equipped with automotive domain expertise and can provide detailed technical guidance for TATA vehicle development.",
-                "related_topics": ["Brake Systems", "Engine Control", "Electric Vehicles", "Voice Commands"],
-                "follow_up_questions": [
-                    "Tell me about TATA brake system requirements",
-                    "How do I develop engine control software?",
-                    "What are the voice command capabilities?"
-                ],
-                "confidence": 0.88
+                "sources": result["passages"],
+                "confidence": result["confidence"],
             }
+            response.update(result["extra"])
+            return response
+
+        return {
+            "answer": f"I understand you're asking about: '{question}'. As your advanced TATA AI Co-pilot, I can help with brake systems, engine control, electric vehicles, voice commands, and all aspects of automotive software development. I have deep knowledge of TATA vehicle architectures and safety requirements.",
+            "explanation": "I'm equipped with automotive domain expertise and can provide detailed technical guidance for TATA vehicle development.",
+            "related_topics": ["Brake Systems", "Engine Control", "Electric Vehicles", "Voice Commands"],
+            "follow_up_questions": [
+                "Tell me about TATA brake system requirements",
+                "How do I develop engine control software?",
+                "What are the voice command capabilities?"
+            ],
+            "confidence": 0.88
+        }
     
-    def get_brake_code_example(self):
+    @staticmethod
+    def get_brake_code_example():
         return '''// TATA Brake System Controller
 #include "tata_brake_system.h"
 
@@ -258,7 +212,8 @@ int tata_brake_monitor_init(void) {
     return TATA_SUCCESS;
 }'''
     
-    def get_engine_code_example(self):
+    @staticmethod
+    def get_engine_code_example():
         return '''// TATA Engine Control Module
 #include "tata_engine_control.h"
 
@@ -273,7 +228,8 @@ int tata_engine_control_init(void) {
     return TATA_SUCCESS;
 }'''
     
-    def get_battery_code_example(self):
+    @staticmethod
+    def get_battery_code_example():
         return '''// TATA Battery Management System
 #include "tata_bms.h"
 
@@ -289,7 +245,8 @@ int tata_bms_init(void) {
     return TATA_SUCCESS;
 }'''
     
-    def get_voice_code_example(self):
+    @staticmethod
+    def get_voice_code_example():
         return '''// Voice Command Integration
 const recognition = new (window.SpeechRecognition || window.webkitSpeechRecognition)();
 recognition.continuous = false;
@@ -606,3 +563,79 @@ function processVoiceCommand(command) {
                 addMessage('ai', '❌ Failed to start voice recognition. Please try again.');
             }
         }'''
+
+
+QA_PASSAGES = [
+    Passage(
+        id="answer:brake",
+        title="Brake systems",
+        text="TATA brake systems require ASIL-D compliance for safety-critical functions. The brake system should include redundant sensors, fail-safe mechanisms, and real-time monitoring. For ABS systems, we implement wheel speed sensors, hydraulic pressure control, and emergency braking protocols.",
+        source="enhanced_tata_copilot_fixed",
+        kind="answer",
+        topics=["ASIL-D Compliance", "CAN Bus Communication", "Hydraulic Control", "Sensor Redundancy"],
+        code=EnhancedTATAHandler.get_brake_code_example(),
+        explanation="This implementation follows ISO 26262 standards for automotive safety and includes TATA-specific error codes and CAN bus communication protocols.",
+        extra={
+            "follow_up_questions": [
+                "How do I implement redundant brake sensors?",
+                "What are the ASIL-D testing requirements?",
+                "How can I optimize brake response time?"
+            ],
+        },
+    ),
+    Passage(
+        id="answer:engine",
+        title="Engine control",
+        text="TATA engine control systems manage fuel injection, ignition timing, and emissions control. The ECU monitors engine RPM, temperature, and load conditions to optimize performance and efficiency. For commercial vehicles, we focus on durability and fuel economy.",
+        source="enhanced_tata_copilot_fixed",
+        kind="answer",
+        topics=["Fuel Injection", "Ignition Timing", "Emissions Control", "Engine Diagnostics"],
+        code=EnhancedTATAHandler.get_engine_code_example(),
+        explanation="This code implements a complete engine control loop with sensor validation, fuel map lookup, and diagnostic monitoring suitable for TATA commercial vehicles.",
+        extra={
+            "follow_up_questions": [
+                "How do I calibrate fuel injection timing?",
+                "What sensors are needed for engine control?",
+                "How can I implement emissions monitoring?"
+            ],
+        },
+    ),
+    Passage(
+        id="answer:battery",
+        title="Electric vehicle batteries",
+        text="TATA electric vehicle systems require sophisticated battery management, thermal control, and charging protocols. The BMS monitors cell voltages, temperatures, and current flow to ensure safety and longevity. Fast charging requires careful thermal management.",
+        source="enhanced_tata_copilot_fixed",
+        kind="answer",
+        topics=["Battery Management", "Thermal Control", "Fast Charging", "Cell Balancing"],
+        code=EnhancedTATAHandler.get_battery_code_example(),
+        explanation="This BMS implementation includes cell balancing, thermal protection, and SOC estimation algorithms optimized for TATA electric vehicle platforms.",
+        extra={
+            "follow_up_questions": [
+                "How do I implement cell balancing algorithms?",
+                "What are the thermal protection requirements?",
+                "How can I optimize charging speed?"
+            ],
+        },
+    ),
+    Passage(
+        id="answer:voice",
+        title="Voice commands",
+        text="TATA AI Co-pilot supports advanced voice commands using Web Speech API. You can speak naturally to ask questions, generate code, or control features. Voice recognition works in multiple languages and understands automotive terminology.",
+        source="enhanced_tata_copilot_fixed",
+        kind="answer",
+        topics=["Speech Recognition", "Voice UI", "Hands-free Operation", "Accessibility"],
+        code=EnhancedTATAHandler.get_voice_code_example(),
+        explanation="Voice commands enable hands-free interaction, improving productivity and accessibility for automotive engineers working in various environments.",
+        extra={
+            "follow_up_questions": [
+                "What voice commands are available?",
+                "How accurate is the voice recognition?",
+                "Can I use voice commands in Hindi?"
+            ],
+        },
+    ),
+]
+# Built (or loaded from output/) on the first question, not on import
+QA_ENGINE = LazyQAEngine(
+    Path(CopilotConfig().output_dir) / "qa_index_enhanced_fixed.npz", lambda: build_knowledge_corpus(extra=QA_PASSAGES)
+)
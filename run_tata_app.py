@@ -69,8 +69,9 @@ def main():
         # Alternative: Simple HTTP server for static files
         import http.server
         import socketserver
+        from ai_copilot.metrics import MetricsHandlerMixin
         
-        class TATAHandler(http.server.SimpleHTTPRequestHandler):
+        class TATAHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
             def end_headers(self):
                 self.send_header('Access-Control-Allow-Origin', '*')
                 super().end_headers()
@@ -64,5 +64,6 @@ setup(
     package_data={
         "ai_copilot": ["data/*.json", "templates/*.txt", "models/*.pt"],
         "vehicle_context": ["protocols/*.json", "standards/*.yaml"],
+        "embedded_integration": ["rulesets/*.yaml"],
     },
 )
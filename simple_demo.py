@@ -10,7 +10,11 @@ import webbrowser
 import threading
 import time
 
-class TATADemoServer(http.server.SimpleHTTPRequestHandler):
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics
+
+HTTP_METRICS = get_http_metrics()
+
+class TATADemoServer(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_demo_page()
@@ -24,6 +28,10 @@ class TATADemoServer(http.server.SimpleHTTPRequestHandler):
             self.serve_json({
                 "platforms": ["ARM Cortex-M", "ARM Cortex-A", "AVR", "x86", "RISC-V", "TATA Custom"]
             })
+        elif self.path == '/api/analytics':
+            self.serve_json(HTTP_METRICS.analytics())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/manifest.json':
             self.serve_json({
                 "short_name": "TATA AI Co-pilot",
@@ -13,7 +13,11 @@ import time
 import os
 from pathlib import Path
 
-class TATADemoHandler(http.server.SimpleHTTPRequestHandler):
+from ai_copilot.metrics import MetricsHandlerMixin, get_http_metrics
+
+HTTP_METRICS = get_http_metrics()
+
+class TATADemoHandler(MetricsHandlerMixin, http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_main_page()
@@ -24,6 +28,10 @@ class TATADemoHandler(http.server.SimpleHTTPRequestHandler):
                 "version": "1.0.0-hackathon",
                 "features": ["code_generation", "analysis", "projects", "themes", "pwa"]
             })
+        elif self.path == '/api/analytics':
+            self.serve_json(HTTP_METRICS.analytics())
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/api/platforms':
             self.serve_json({
                 "platforms": [
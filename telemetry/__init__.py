@@ -0,0 +1,29 @@
+"""
+Telemetry Module
+
+This module provides vehicle telemetry ingestion and in-memory storage
+for the digital twin, and the IoT device registry, shared by the demo
+servers and the web API.
+"""
+
+from .store import TelemetryStore, SignalRingBuffer
+from .timeseries import MultiResolutionSeries, BucketRing
+from .maintenance import MaintenanceScorer, MaintenanceComponent, LinearTrendRUL, degradation_features
+from .iot import DeviceRegistry, IoTIngestServer, encode_packet, make_frames, parse_packet, ingest_http_body
+
+__all__ = [
+    "TelemetryStore",
+    "SignalRingBuffer",
+    "MultiResolutionSeries",
+    "BucketRing",
+    "MaintenanceScorer",
+    "MaintenanceComponent",
+    "LinearTrendRUL",
+    "degradation_features",
+    "DeviceRegistry",
+    "IoTIngestServer",
+    "encode_packet",
+    "make_frames",
+    "parse_packet",
+    "ingest_http_body",
+]
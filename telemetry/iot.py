@@ -0,0 +1,456 @@
+"""
+IoT device registry and CAN/ECU message ingestion
+
+Devices send framed batches of CAN frames over HTTP, UDP or TCP. Each
+packet is a fixed header followed by the device id and the frames:
+
+    header  <2sBBHH   magic b"TI", version, flags, device id length, frame count
+    device  utf-8 bytes
+    frames  <dIBB8s   timestamp, CAN id, dlc, flags (bit 0 extended, bit 1 FD), data
+
+Packets are self-delimiting, so a TCP stream is a plain concatenation of
+them. Headers are read with ``struct.unpack_from`` and frames are viewed
+in place with ``np.frombuffer`` over a ``memoryview`` of the receive
+buffer; nothing is copied per message. Per-device counters (messages,
+bytes, errors, last seen, per-second rate window) are updated once per
+packet.
+"""
+
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Union
+
+import numpy as np
+
+
+PACKET_MAGIC = b"TI"
+PACKET_VERSION = 1
+PACKET_HEADER = struct.Struct("<2sBBHH")
+FRAME = struct.Struct("<dIBB8s")
+FRAME_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("id", "<u4"),
+    ("dlc", "u1"),
+    ("flags", "u1"),
+    ("data", "u1", (8,)),
+])
+assert FRAME_DTYPE.itemsize == FRAME.size
+
+MAX_DATAGRAM = 65507
+MAX_CAN_ID = 0x1FFFFFFF  # 29-bit extended identifier
+RATE_WINDOW_S = 10
+
+
+class PacketError(ValueError):
+    """Packet that cannot be parsed (bad magic, version or length)"""
+
+
+def parse_packet(view: memoryview, offset: int = 0) -> Optional[Tuple[bytes, np.ndarray, int]]:
+    """
+    Parse one packet starting at ``offset``
+
+    Args:
+        view: Buffer holding one or more packets
+        offset: Start of the packet in the buffer
+
+    Returns:
+        (device id bytes, frame record array viewing the buffer, offset of
+        the next packet), or None if the buffer ends mid-packet
+
+    Raises:
+        PacketError: If the header is invalid
+    """
+    if len(view) - offset < PACKET_HEADER.size:
+        return None
+    magic, version, _, id_length, count = PACKET_HEADER.unpack_from(view, offset)
+    if magic != PACKET_MAGIC or version != PACKET_VERSION or id_length == 0:
+        raise PacketError(f"Invalid packet header at offset {offset}")
+
+    start = offset + PACKET_HEADER.size
+    frames_start = start + id_length
+    end = frames_start + count * FRAME.size
+    if len(view) < end:
+        return None
+    frames = np.frombuffer(view, dtype=FRAME_DTYPE, count=count, offset=frames_start)
+    return bytes(view[start:frames_start]), frames, end
+
+
+def make_frames(timestamps: Iterable[float], can_ids: Iterable[int],
+                payloads: Iterable[bytes], flags: int = 0) -> np.ndarray:
+    """Frame record array from per-frame timestamps, CAN ids and payloads"""
+    payloads = list(payloads)
+    frames = np.zeros(len(payloads), dtype=FRAME_DTYPE)
+    frames["timestamp"] = list(timestamps)
+    frames["id"] = list(can_ids)
+    frames["flags"] = flags
+    for index, payload in enumerate(payloads):
+        frames["dlc"][index] = len(payload)
+        frames["data"][index, :len(payload)] = np.frombuffer(payload[:8], dtype=np.uint8)
+    return frames
+
+
+def encode_packet(device_id: str, frames: np.ndarray) -> bytes:
+    """Wire encoding of a batch of frames (FRAME_DTYPE records) from one device"""
+    encoded_id = device_id.encode("utf-8")
+    header = PACKET_HEADER.pack(PACKET_MAGIC, PACKET_VERSION, 0, len(encoded_id), len(frames))
+    return header + encoded_id + np.ascontiguousarray(frames, dtype=FRAME_DTYPE).tobytes()
+
+
+class DeviceStats:
+    """Registration data and live counters of one device"""
+
+    __slots__ = ("device_id", "type", "location", "security_status", "status",
+                 "messages", "bytes", "errors", "last_seen", "last_timestamp",
+                 "can_ids", "window_counts", "window_seconds")
+
+    def __init__(self, device_id: str, type: str = "Unknown", location: str = "",
+                 security_status: str = "Unverified", status: Optional[str] = None):
+        self.device_id = device_id
+        self.type = type
+        self.location = location
+        self.security_status = security_status
+        self.status = status
+        self.messages = 0
+        self.bytes = 0
+        self.errors = 0
+        self.last_seen = 0.0
+        self.last_timestamp = 0.0
+        self.can_ids: Dict[int, int] = {}
+        self.window_counts = [0] * RATE_WINDOW_S
+        self.window_seconds = [-1] * RATE_WINDOW_S
+
+    def record(self, frames: np.ndarray, size: int, now: float) -> None:
+        count = len(frames)
+        self.messages += count
+        self.bytes += size
+        self.last_seen = now
+        if count == 0:
+            return
+        self.last_timestamp = max(self.last_timestamp, float(frames["timestamp"].max()))
+
+        second = int(now)
+        slot = second % RATE_WINDOW_S
+        if self.window_seconds[slot] != second:
+            self.window_seconds[slot] = second
+            self.window_counts[slot] = 0
+        self.window_counts[slot] += count
+
+        can_ids = self.can_ids
+        if count <= 8:
+            for can_id in frames["id"].tolist():
+                can_ids[can_id] = can_ids.get(can_id, 0) + 1
+        else:
+            unique, counts = np.unique(frames["id"], return_counts=True)
+            for can_id, seen in zip(unique.tolist(), counts.tolist()):
+                can_ids[can_id] = can_ids.get(can_id, 0) + seen
+
+    def rate(self, now: float) -> float:
+        """Messages per second over the last complete seconds of the window"""
+        current = int(now)
+        complete = [count for count, second in zip(self.window_counts, self.window_seconds)
+                    if current - RATE_WINDOW_S < second < current]
+        return sum(complete) / (RATE_WINDOW_S - 1)
+
+
+class DeviceRegistry:
+    """
+    Registered devices and ingestion counters
+
+    Args:
+        allow_unknown: Auto-register devices on first message; when False
+            their packets are rejected and counted as security incidents
+        online_after_s: A device is Online if seen within this many seconds
+    """
+
+    def __init__(self, allow_unknown: bool = True, online_after_s: float = 10.0):
+        self.allow_unknown = allow_unknown
+        self.online_after_s = online_after_s
+        self.devices: Dict[str, DeviceStats] = {}
+        self._ids: Dict[bytes, DeviceStats] = {}
+        self._lock = threading.Lock()
+        self.packets = 0
+        self.malformed_packets = 0
+        self.invalid_frames = 0
+        self.rejected_messages = 0
+        self.started = time.time()
+
+    def register(self, device_id: str, type: str = "Unknown", location: str = "",
+                 security_status: str = "Encrypted", status: Optional[str] = None) -> DeviceStats:
+        """Register a device (or update its description)"""
+        with self._lock:
+            device = self.devices.get(device_id)
+            if device is None:
+                device = self.devices[device_id] = DeviceStats(device_id)
+                self._ids[device_id.encode("utf-8")] = device
+            device.type, device.location = type, location
+            device.security_status, device.status = security_status, status
+            return device
+
+    def _device(self, encoded_id: bytes) -> Optional[DeviceStats]:
+        device = self._ids.get(encoded_id)
+        if device is None and self.allow_unknown:
+            device_id = encoded_id.decode("utf-8", errors="replace")
+            device = self.devices[device_id] = DeviceStats(device_id)
+            self._ids[encoded_id] = device
+        return device
+
+    def _record(self, encoded_id: bytes, frames: np.ndarray, size: int, now: float) -> int:
+        # Caller holds the lock
+        self.packets += 1
+        device = self._device(encoded_id)
+        if device is None:
+            self.rejected_messages += len(frames)
+            return 0
+        valid = (frames["dlc"] <= 8) & (frames["id"] <= MAX_CAN_ID)
+        if not valid.all():
+            invalid = len(frames) - int(np.count_nonzero(valid))
+            device.errors += invalid
+            self.invalid_frames += invalid
+            frames = frames[valid]
+        device.record(frames, size, now)
+        return len(frames)
+
+    def ingest_bytes(self, data: Union[bytes, bytearray, memoryview]) -> Dict[str, int]:
+        """
+        Ingest a buffer holding complete packets (a UDP datagram or HTTP body)
+
+        Returns:
+            Dictionary with accepted message, packet and error counts
+        """
+        consumed, accepted, packets, error = self._ingest(memoryview(data))
+        malformed = error is not None or consumed != len(data)
+        if malformed:
+            with self._lock:
+                self.malformed_packets += 1
+        return {"accepted": accepted, "packets": packets, "malformed": int(malformed)}
+
+    def ingest_stream(self, view: memoryview) -> int:
+        """
+        Ingest the complete packets at the start of a stream buffer
+
+        Returns:
+            Number of bytes consumed; the rest is an incomplete packet
+
+        Raises:
+            PacketError: If the stream is corrupt (it cannot be resynchronised)
+        """
+        consumed, _, _, error = self._ingest(view)
+        if error:
+            with self._lock:
+                self.malformed_packets += 1
+            raise PacketError(error)
+        return consumed
+
+    def _ingest(self, view: memoryview) -> Tuple[int, int, int, Optional[str]]:
+        offset = accepted = packets = 0
+        now = time.time()
+        with self._lock:
+            while offset < len(view):
+                try:
+                    packet = parse_packet(view, offset)
+                except PacketError as e:
+                    return offset, accepted, packets, str(e)
+                if packet is None:
+                    break
+                encoded_id, frames, end = packet
+                accepted += self._record(encoded_id, frames, end - offset, now)
+                packets += 1
+                offset = end
+        return offset, accepted, packets, None
+
+    def ingest_records(self, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Ingest JSON messages ({"device_id", "id", "data" hex, "timestamp"?})
+
+        Messages are grouped per device and recorded as one batch each.
+
+        Returns:
+            Dictionary with accepted and rejected message counts
+        """
+        now = time.time()
+        grouped: Dict[bytes, List[Tuple[float, int, bytes]]] = {}
+        rejected = 0
+        for record in records:
+            try:
+                payload = bytes.fromhex(str(record.get("data", "")).replace(" ", ""))
+                can_id = int(str(record["id"]), 0)
+                message = (float(record.get("timestamp", now)), can_id, payload)
+                encoded_id = str(record["device_id"]).encode("utf-8")
+            except (AttributeError, KeyError, TypeError, ValueError):
+                rejected += 1
+                continue
+            if len(payload) > 8 or not 0 <= can_id <= MAX_CAN_ID:
+                rejected += 1
+                continue
+            grouped.setdefault(encoded_id, []).append(message)
+
+        accepted = 0
+        with self._lock:
+            self.invalid_frames += rejected
+            for encoded_id, messages in grouped.items():
+                timestamps, can_ids, payloads = zip(*messages)
+                frames = make_frames(timestamps, can_ids, payloads)
+                accepted += self._record(encoded_id, frames, frames.nbytes, now)
+        return {"accepted": accepted, "rejected": rejected + sum(len(m) for m in grouped.values()) - accepted}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Device list and network statistics for the IoT dashboards"""
+        now = time.time()
+        devices = []
+        online = 0
+        total_rate = 0.0
+        with self._lock:
+            for device in self.devices.values():
+                rate = device.rate(now)
+                age = now - device.last_seen if device.last_seen else None
+                is_online = age is not None and age <= self.online_after_s
+                online += is_online
+                total_rate += rate
+                devices.append({
+                    "device_id": device.device_id,
+                    "type": device.type,
+                    "status": device.status or ("Online" if is_online else "Offline"),
+                    "location": device.location,
+                    "data_rate": f"{rate:.0f} msg/sec",
+                    "messages_per_second": round(rate, 1),
+                    "last_update": "never" if age is None else f"{age:.0f} s ago",
+                    "last_seen": device.last_seen or None,
+                    "data_points": device.messages,
+                    "bytes_received": device.bytes,
+                    "errors": device.errors,
+                    "can_ids": len(device.can_ids),
+                    "security_status": device.security_status,
+                })
+            messages = sum(device.messages for device in self.devices.values())
+            received = sum(device.bytes for device in self.devices.values())
+            errors = self.invalid_frames + self.rejected_messages
+            stats = {
+                "total_devices": len(self.devices),
+                "online_devices": online,
+                "total_messages": messages,
+                "messages_per_second": round(total_rate, 1),
+                "bytes_received": received,
+                "packets": self.packets,
+                "malformed_packets": self.malformed_packets,
+                "invalid_frames": self.invalid_frames,
+                "data_quality": f"{100.0 * messages / (messages + errors):.1f}%" if messages + errors else "n/a",
+                "security_incidents": self.rejected_messages,
+            }
+        return {"connected_devices": devices, "network_stats": stats}
+
+
+class _TCPIngestHandler(socketserver.BaseRequestHandler):
+    """Reads packets into a reusable buffer; a partial packet is moved to the front"""
+
+    def handle(self):
+        registry = self.server.registry
+        buffer = bytearray(1 << 20)
+        view = memoryview(buffer)
+        filled = 0
+        while True:
+            if filled == len(buffer):
+                # A single packet larger than the buffer: move to a bigger one
+                grown = bytearray(2 * len(buffer))
+                grown[:filled] = view[:filled]
+                buffer, view = grown, memoryview(grown)
+            received = self.request.recv_into(view[filled:])
+            if not received:
+                return
+            filled += received
+            try:
+                consumed = registry.ingest_stream(view[:filled])
+            except PacketError:
+                return
+            if consumed:
+                view[:filled - consumed] = view[consumed:filled]
+                filled -= consumed
+
+
+class _TCPIngestServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, registry: DeviceRegistry):
+        self.registry = registry
+        super().__init__(address, _TCPIngestHandler)
+
+
+class IoTIngestServer:
+    """
+    UDP and TCP listeners feeding a DeviceRegistry
+
+    Args:
+        registry: Registry that receives the packets
+        host: Interface to bind
+        udp_port: UDP port (one packet or several per datagram); None to disable
+        tcp_port: TCP port (a stream of packets per connection); None to disable
+    """
+
+    def __init__(self, registry: DeviceRegistry, host: str = "0.0.0.0",
+                 udp_port: Optional[int] = 9100, tcp_port: Optional[int] = 9100):
+        self.registry = registry
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self._udp: Optional[socket.socket] = None
+        self._tcp: Optional[_TCPIngestServer] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "IoTIngestServer":
+        """Bind the sockets and serve them on background threads"""
+        if self.udp_port is not None:
+            self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+            self._udp.bind((self.host, self.udp_port))
+            self.udp_port = self._udp.getsockname()[1]
+            self._threads.append(threading.Thread(target=self._serve_udp, daemon=True))
+        if self.tcp_port is not None:
+            self._tcp = _TCPIngestServer((self.host, self.tcp_port), self.registry)
+            self.tcp_port = self._tcp.server_address[1]
+            self._threads.append(threading.Thread(target=self._tcp.serve_forever, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _serve_udp(self) -> None:
+        buffer = bytearray(MAX_DATAGRAM)
+        view = memoryview(buffer)
+        sock = self._udp
+        while True:
+            try:
+                size = sock.recv_into(buffer)
+            except OSError:
+                return
+            self.registry.ingest_bytes(view[:size])
+
+    def stop(self) -> None:
+        if self._udp is not None:
+            self._udp.close()
+        if self._tcp is not None:
+            self._tcp.shutdown()
+            self._tcp.server_close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+
+def ingest_http_body(body: bytes, content_type: str, registry: DeviceRegistry) -> Dict[str, int]:
+    """
+    Ingest an HTTP request body: binary packets (application/octet-stream)
+    or JSON messages (a list, {"messages": [...]} or a single message)
+
+    Raises:
+        ValueError: If the body is not valid JSON or holds no message list
+    """
+    if content_type.split(";")[0].strip() == "application/octet-stream":
+        return registry.ingest_bytes(body)
+    data = json.loads(body.decode("utf-8"))
+    if isinstance(data, dict):
+        data = data.get("messages", [data])
+    if not isinstance(data, list):
+        raise ValueError("messages must be a list")
+    return registry.ingest_records(data)
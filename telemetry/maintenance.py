@@ -0,0 +1,271 @@
+"""
+Predictive-maintenance scoring
+
+Degradation features (trend slope, exponentially weighted variance and
+threshold crossings) are computed for every vehicle component at once from
+the newest window of each telemetry ring buffer, then passed to a pluggable
+remaining-useful-life (RUL) model. Scores are cached per series and only
+recomputed for series that received new samples since the last refresh.
+"""
+
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
+
+import numpy as np
+
+from .store import TelemetryStore
+
+
+@dataclass(frozen=True)
+class MaintenanceComponent:
+    """A component whose wear is tracked through one telemetry signal"""
+    name: str
+    signal: str
+    threshold: float
+    direction: int  # +1: fails above the threshold, -1: fails below it
+    unit: str = ""
+
+
+DEFAULT_COMPONENTS: Tuple[MaintenanceComponent, ...] = (
+    MaintenanceComponent("Brake Pads", "brake_pad_mm", 3.0, -1, "mm"),
+    MaintenanceComponent("Engine Oil System", "oil_pressure", 2.0, -1, "bar"),
+    MaintenanceComponent("Cooling System", "coolant_temp", 105.0, 1, "C"),
+    MaintenanceComponent("12V Battery", "battery_voltage", 11.8, -1, "V"),
+    MaintenanceComponent("Tyres", "tire_pressure", 30.0, -1, "psi"),
+)
+
+# RUL bands (hours) for severity and recommended action
+SEVERITY_BANDS = (
+    (24.0, "High", "Immediate attention required"),
+    (168.0, "Medium", "Schedule maintenance"),
+    (720.0, "Low", "Monitor closely"),
+)
+
+
+def degradation_features(timestamps: np.ndarray, values: np.ndarray,
+                         thresholds: np.ndarray, alpha: float = 0.1) -> Dict[str, np.ndarray]:
+    """
+    Degradation features for a batch of sample windows
+
+    Args:
+        timestamps: (series, window) sample times in seconds, NaN-padded on the left
+        values: (series, window) sample values, NaN where timestamps are NaN
+        thresholds: (series,) failure threshold per series
+        alpha: Smoothing factor of the exponentially weighted statistics
+
+    Returns:
+        Dictionary of (series,) arrays: samples, last, level (trend value at
+        the newest sample), slope (units per hour), r2, ew_mean, ew_variance,
+        crossings
+    """
+    mask = ~np.isnan(values)
+    weight = mask.astype(np.float64)
+    samples = mask.sum(axis=1)
+    safe = np.maximum(samples, 1)
+
+    # Regress on hours before the newest sample; padding becomes zero
+    filled = np.nan_to_num(values)
+    hours = np.nan_to_num(timestamps - timestamps[:, -1:])
+    hours /= 3600.0
+    hours_mean = hours.sum(axis=1) / safe
+    hours -= hours_mean[:, None]
+    hours *= weight
+    mean = filled.sum(axis=1) / safe
+    centred = filled - mean[:, None]
+    centred *= weight
+
+    s_tt = np.einsum("ij,ij->i", hours, hours)
+    s_ty = np.einsum("ij,ij->i", hours, centred)
+    s_yy = np.einsum("ij,ij->i", centred, centred)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(s_tt > 0, s_ty / s_tt, 0.0)
+        r2 = np.where((s_tt > 0) & (s_yy > 0), s_ty * s_ty / (s_tt * s_yy), 0.0)
+    # Trend line evaluated at the newest sample
+    level = mean - slope * hours_mean
+
+    # Weights decay from the newest column backwards
+    window = values.shape[1]
+    weight *= (1.0 - alpha) ** np.arange(window - 1, -1, -1, dtype=np.float64)
+    weight_sum = np.maximum(weight.sum(axis=1), 1e-300)
+    ew_mean = np.einsum("ij,ij->i", weight, filled) / weight_sum
+    deviation = filled - ew_mean[:, None]
+    deviation *= deviation
+    ew_variance = np.einsum("ij,ij->i", weight, deviation) / weight_sum
+
+    # Padding is on the left only, so a valid left sample implies a valid pair
+    offset = filled - thresholds[:, None]
+    crossings = np.count_nonzero((offset[:, 1:] * offset[:, :-1] < 0) & mask[:, :-1], axis=1)
+
+    return {
+        "samples": samples,
+        "last": values[:, -1],
+        "level": level,
+        "slope": slope,
+        "r2": r2,
+        "ew_mean": ew_mean,
+        "ew_variance": ew_variance,
+        "crossings": crossings,
+    }
+
+
+class LinearTrendRUL:
+    """
+    Default RUL model: extrapolate the fitted trend line from its value at
+    the newest sample to the failure threshold
+
+    Any object with the same ``predict`` signature can be passed to
+    MaintenanceScorer instead.
+    """
+
+    def __init__(self, min_samples: int = 8):
+        self.min_samples = min_samples
+
+    def predict(self, features: Dict[str, np.ndarray], thresholds: np.ndarray,
+                directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            (rul_hours, confidence) arrays; RUL is inf when the signal is not
+            trending towards its threshold
+        """
+        margin = directions * (thresholds - features["level"])
+        rate = directions * features["slope"]
+        with np.errstate(divide="ignore"):
+            rul = np.where(rate > 0, margin / rate, np.inf)
+        rul = np.where(margin <= 0, 0.0, rul)
+
+        # Trust fit quality, discounted for short or threshold-straddling histories
+        enough = np.clip(features["samples"] / float(self.min_samples), 0.0, 1.0)
+        confidence = np.where(margin <= 0, 1.0, features["r2"] * enough / (1.0 + features["crossings"]))
+        return rul, confidence
+
+
+class MaintenanceScorer:
+    """
+    Fleet-wide predictive-maintenance scores with an incremental cache
+
+    Args:
+        store: Telemetry store to read ring-buffer windows from
+        components: Tracked components (default: DEFAULT_COMPONENTS)
+        model: RUL model with ``predict(features, thresholds, directions)``
+        window: Number of newest samples per series used for the features
+        alpha: Smoothing factor of the exponentially weighted statistics
+    """
+
+    CHUNK_ROWS = 1024
+    FEATURES = ("samples", "last", "level", "slope", "r2", "ew_mean", "ew_variance", "crossings")
+
+    def __init__(self, store: TelemetryStore,
+                 components: Optional[Tuple[MaintenanceComponent, ...]] = None,
+                 model: Optional[Any] = None, window: int = 128, alpha: float = 0.1):
+        self.store = store
+        self.components = {component.signal: component for component in (components or DEFAULT_COMPONENTS)}
+        self.model = model or LinearTrendRUL()
+        self.window = window
+        self.alpha = alpha
+
+        self.keys: List[Tuple[str, str]] = []
+        self.index: Dict[Tuple[str, str], int] = {}
+        self.seen: Dict[Tuple[str, str], int] = {}
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(0) for name in self.FEATURES + ("rul_hours", "confidence")}
+
+    def refresh(self) -> int:
+        """
+        Rescore series that received samples since the last refresh
+
+        Returns:
+            Number of series rescored
+        """
+        keys, counts, timestamps, values = self.store.collect_windows(
+            set(self.components), self.window, self.seen
+        )
+        if not keys:
+            return 0
+
+        components = [self.components[signal] for _, signal in keys]
+        thresholds = np.array([component.threshold for component in components], dtype=np.float64)
+        directions = np.array([component.direction for component in components], dtype=np.float64)
+
+        rows = np.array([self._row(key) for key in keys], dtype=np.int64)
+        # Row blocks keep the feature temporaries cache-resident
+        for start in range(0, len(keys), self.CHUNK_ROWS):
+            block = slice(start, start + self.CHUNK_ROWS)
+            features = degradation_features(timestamps[block], values[block], thresholds[block], self.alpha)
+            features["rul_hours"], features["confidence"] = self.model.predict(
+                features, thresholds[block], directions[block]
+            )
+            for name, column in features.items():
+                self.columns[name][rows[block]] = column
+        self.seen.update(zip(keys, counts))
+        return len(keys)
+
+    def _row(self, key: Tuple[str, str]) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = self.index[key] = len(self.keys)
+            self.keys.append(key)
+            if row >= len(self.columns["rul_hours"]):
+                size = max(64, 2 * row)
+                for name, column in self.columns.items():
+                    grown = np.zeros(size, dtype=np.float64)
+                    grown[:len(column)] = column
+                    self.columns[name] = grown
+        return row
+
+    def predictions(self, limit: Optional[int] = 20,
+                    horizon_hours: float = SEVERITY_BANDS[-1][0]) -> List[Dict[str, Any]]:
+        """Components expected to reach their threshold within the horizon, soonest first"""
+        count = len(self.keys)
+        rul = self.columns["rul_hours"][:count]
+        candidates = np.flatnonzero(rul <= horizon_hours)
+        if limit is not None and len(candidates) > limit:
+            candidates = candidates[np.argpartition(rul[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(rul[candidates], kind="stable")]
+        return [self._prediction(row) for row in candidates]
+
+    def _prediction(self, row: int) -> Dict[str, Any]:
+        vehicle_id, signal = self.keys[row]
+        component = self.components[signal]
+        rul = float(self.columns["rul_hours"][row])
+        severity, action = "Low", "Monitor closely"
+        for limit, band_severity, band_action in SEVERITY_BANDS:
+            if rul <= limit:
+                severity, action = band_severity, band_action
+                break
+
+        info = self.store.vehicle_info.get(vehicle_id, {})
+        return {
+            "vehicle_id": vehicle_id,
+            "vehicle": info.get("name", vehicle_id),
+            "component": component.name,
+            "signal": signal,
+            "predicted_failure": "Threshold exceeded" if rul == 0 else f"In {rul:,.0f} h",
+            "rul_hours": round(rul, 2),
+            "confidence": f"{100.0 * float(self.columns['confidence'][row]):.0f}%",
+            "severity": severity,
+            "recommended_action": action,
+            "features": {
+                "level": round(float(self.columns["level"][row]), 4),
+                "ew_mean": round(float(self.columns["ew_mean"][row]), 4),
+                "threshold": component.threshold,
+                "unit": component.unit,
+                "slope_per_hour": round(float(self.columns["slope"][row]), 6),
+                "ew_variance": round(float(self.columns["ew_variance"][row]), 6),
+                "threshold_crossings": int(self.columns["crossings"][row]),
+            },
+        }
+
+    def report(self, limit: Optional[int] = 20) -> Dict[str, Any]:
+        """Refresh and summarize the fleet for the maintenance dashboards"""
+        rescored = self.refresh()
+        rul = self.columns["rul_hours"][:len(self.keys)]
+        return {
+            "maintenance_predictions": self.predictions(limit),
+            "fleet_summary": {
+                "vehicles": len({vehicle_id for vehicle_id, _ in self.keys}),
+                "components_scored": len(self.keys),
+                "rescored": rescored,
+                "threshold_exceeded": int(np.count_nonzero(rul == 0)),
+                "due_within_24h": int(np.count_nonzero(rul <= 24.0)),
+                "due_within_7d": int(np.count_nonzero(rul <= 168.0)),
+            },
+        }
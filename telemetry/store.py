@@ -0,0 +1,422 @@
+"""
+Telemetry ingest store
+
+Keeps a fixed-size NumPy ring buffer per vehicle and signal together with
+running aggregates (last, min, max, mean, in-range share) that are updated
+in O(1) per sample, so dashboards read aggregates without touching history.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable, Set, Tuple
+
+import numpy as np
+
+from .timeseries import MultiResolutionSeries, DEFAULT_RESOLUTIONS
+
+
+# Normal operating ranges used for the health score
+DEFAULT_SIGNAL_LIMITS: Dict[str, Tuple[float, float]] = {
+    "engine_rpm": (600.0, 6000.0),
+    "vehicle_speed": (0.0, 180.0),
+    "coolant_temp": (70.0, 105.0),
+    "oil_pressure": (2.0, 5.0),
+    "battery_voltage": (11.8, 14.8),
+    "battery_level": (15.0, 100.0),
+    "fuel_level": (10.0, 100.0),
+    "tire_pressure": (30.0, 40.0),
+    "brake_pad_mm": (3.0, 15.0),
+}
+
+# Record fields describing the vehicle rather than carrying samples
+VEHICLE_INFO_FIELDS = ("name", "type", "location", "status")
+
+
+class SignalRingBuffer:
+    """
+    Fixed-capacity sample history with running aggregates
+
+    Appends write into timestamp/value arrays that double in size until
+    they reach ``capacity`` and then wrap; aggregates are lifetime values
+    maintained from each appended batch.
+    """
+
+    __slots__ = ("capacity", "timestamps", "values", "head", "size", "count", "total",
+                 "minimum", "maximum", "last", "last_timestamp", "limits", "in_range")
+
+    def __init__(self, capacity: int, limits: Optional[Tuple[float, float]] = None,
+                 initial_size: int = 64):
+        self.capacity = capacity
+        self.timestamps = np.zeros(min(initial_size, capacity), dtype=np.float64)
+        self.values = np.zeros(min(initial_size, capacity), dtype=np.float64)
+        self.head = 0
+        self.size = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.last = np.nan
+        self.last_timestamp = 0.0
+        self.limits = limits
+        self.in_range = 0
+
+    def _grow(self, size: int) -> None:
+        # Only called before the first wrap, so samples sit in [0, self.size)
+        for name in ("timestamps", "values"):
+            grown = np.zeros(size, dtype=np.float64)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+        self.head = self.size
+
+    def append(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append a batch of samples (arrays of equal length)"""
+        batch = len(values)
+        if batch == 0:
+            return
+
+        allocated = len(self.values)
+        if self.size + batch > allocated and allocated < self.capacity:
+            self._grow(min(self.capacity, max(2 * allocated, self.size + batch)))
+
+        capacity = len(self.values)
+        if batch >= capacity:
+            self.timestamps[:] = timestamps[-capacity:]
+            self.values[:] = values[-capacity:]
+            self.head = 0
+            self.size = capacity
+        else:
+            end = self.head + batch
+            if end <= capacity:
+                self.timestamps[self.head:end] = timestamps
+                self.values[self.head:end] = values
+            else:
+                split = capacity - self.head
+                self.timestamps[self.head:] = timestamps[:split]
+                self.values[self.head:] = values[:split]
+                self.timestamps[:end - capacity] = timestamps[split:]
+                self.values[:end - capacity] = values[split:]
+            self.head = end % capacity
+            self.size = min(self.size + batch, capacity)
+
+        self.count += batch
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.last = float(values[-1])
+        self.last_timestamp = float(timestamps[-1])
+        if self.limits is not None:
+            low, high = self.limits
+            self.in_range += int(np.count_nonzero((values >= low) & (values <= high)))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+    @property
+    def health(self) -> Optional[float]:
+        """Share of samples within the normal range (0-100), if limits are known"""
+        if self.limits is None or not self.count:
+            return None
+        return 100.0 * self.in_range / self.count
+
+    def recent(self, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Buffered samples in arrival order (optionally the newest ``limit``)"""
+        size = self.size if limit is None else min(limit, self.size)
+        index = (self.head - size + np.arange(size)) % len(self.values)
+        return self.timestamps[index], self.values[index]
+
+    def aggregates(self) -> Dict[str, Any]:
+        health = self.health
+        return {
+            "last": self.last,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None,
+            "mean": round(self.mean, 4) if self.count else None,
+            "count": self.count,
+            "last_timestamp": self.last_timestamp,
+            "health_score": round(health, 1) if health is not None else None,
+        }
+
+
+class TelemetryStore:
+    """
+    Thread-safe in-memory telemetry store for the digital twin
+
+    Every vehicle signal keeps a raw ring buffer plus 1 s / 1 min / 1 h
+    rollups, so range queries can chart long windows cheaply.
+
+    Records look like ``{"vehicle_id": "NEXON-01", "timestamp": 1700000000.0,
+    "signals": {"engine_rpm": 2100, "coolant_temp": 92}}``; optional
+    'name', 'type', 'location' and 'status' fields describe the vehicle.
+    """
+
+    def __init__(self, capacity: int = 4096,
+                 signal_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 resolutions: Tuple[Tuple[str, int, int], ...] = DEFAULT_RESOLUTIONS):
+        self.capacity = capacity
+        self.resolutions = resolutions
+        self.signal_limits = dict(DEFAULT_SIGNAL_LIMITS if signal_limits is None else signal_limits)
+        self.vehicles: Dict[str, Dict[str, SignalRingBuffer]] = {}
+        self.vehicle_info: Dict[str, Dict[str, Any]] = {}
+        self.rollups: Dict[Tuple[str, str], MultiResolutionSeries] = {}
+        self.total_samples = 0
+        self.rejected_samples = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def ingest(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Ingest a batch of telemetry records
+
+        Samples are grouped per vehicle and signal, then appended to each
+        ring buffer as one array batch.
+
+        Returns:
+            Dictionary with accepted/rejected sample counts and vehicle count
+        """
+        now = time.time()
+        columns: Dict[Tuple[str, str], Tuple[List[float], List[float]]] = {}
+        info_updates: Dict[str, Dict[str, Any]] = {}
+        rejected = 0
+
+        for record in records:
+            vehicle_id = record.get("vehicle_id")
+            signals = record.get("signals")
+            if not vehicle_id or not isinstance(signals, dict):
+                rejected += len(signals) if isinstance(signals, dict) else 1
+                continue
+            vehicle_id = str(vehicle_id)
+            try:
+                timestamp = float(record.get("timestamp", now))
+            except (TypeError, ValueError):
+                timestamp = math.nan
+            if not math.isfinite(timestamp):
+                rejected += len(signals)
+                continue
+
+            info = {key: record[key] for key in VEHICLE_INFO_FIELDS if key in record}
+            if info:
+                info_updates.setdefault(vehicle_id, {}).update(info)
+
+            for signal, value in signals.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    rejected += 1
+                    continue
+                # NaN, infinities and ints beyond float range would poison the running min/max/mean
+                try:
+                    value = float(value)
+                except OverflowError:
+                    value = math.inf
+                if not math.isfinite(value):
+                    rejected += 1
+                    continue
+                column = columns.get((vehicle_id, signal))
+                if column is None:
+                    column = columns[(vehicle_id, signal)] = ([], [])
+                column[0].append(timestamp)
+                column[1].append(value)
+
+        accepted = 0
+        with self._lock:
+            for vehicle_id, info in info_updates.items():
+                self.vehicle_info.setdefault(vehicle_id, {}).update(info)
+            for (vehicle_id, signal), (timestamps, values) in columns.items():
+                self._append(vehicle_id, signal, timestamps, values)
+                accepted += len(values)
+            self.total_samples += accepted
+            self.rejected_samples += rejected
+
+        return {"accepted": accepted, "rejected": rejected, "vehicles": len(self.vehicles)}
+
+    def ingest_samples(self, vehicle_id: str, signal: str,
+                       timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append pre-built sample arrays for one vehicle signal; non-finite samples are dropped"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(timestamps) & np.isfinite(values)
+        rejected = len(values) - int(np.count_nonzero(finite))
+        if rejected:
+            timestamps, values = timestamps[finite], values[finite]
+        with self._lock:
+            self.rejected_samples += rejected
+            # Nothing left to store: do not create an empty series
+            if not len(values):
+                return
+            self._append(vehicle_id, signal, timestamps, values)
+            self.total_samples += len(values)
+
+    def _append(self, vehicle_id: str, signal: str, timestamps, values) -> None:
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        self._buffer(vehicle_id, signal).append(timestamps, values)
+        self.rollups[(vehicle_id, signal)].append(timestamps, values)
+
+    def _buffer(self, vehicle_id: str, signal: str) -> SignalRingBuffer:
+        signals = self.vehicles.get(vehicle_id)
+        if signals is None:
+            signals = self.vehicles[vehicle_id] = {}
+            self.vehicle_info.setdefault(vehicle_id, {})
+        buffer = signals.get(signal)
+        if buffer is None:
+            buffer = signals[signal] = SignalRingBuffer(self.capacity, self.signal_limits.get(signal))
+            self.rollups[(vehicle_id, signal)] = MultiResolutionSeries(self.resolutions)
+        return buffer
+
+    def collect_windows(self, signals: Set[str], window: int,
+                        seen: Dict[Tuple[str, str], int]) -> Tuple[List[Tuple[str, str]], List[int], np.ndarray, np.ndarray]:
+        """
+        Newest ``window`` samples of every series whose sample count differs
+        from ``seen``
+
+        Returns:
+            (keys, sample counts, timestamps, values); the arrays have shape
+            (len(keys), window) and are NaN-padded on the left
+        """
+        keys = []
+        counts = []
+        timestamp_rows = []
+        value_rows = []
+        with self._lock:
+            for vehicle_id, vehicle_signals in self.vehicles.items():
+                for signal, buffer in vehicle_signals.items():
+                    if signal not in signals:
+                        continue
+                    key = (vehicle_id, signal)
+                    if seen.get(key) == buffer.count:
+                        continue
+                    keys.append(key)
+                    counts.append(buffer.count)
+
+                    # Samples end at head, or at the array end right after a wrap
+                    end = buffer.head or len(buffer.values)
+                    if end >= window and buffer.size >= window:
+                        # Contiguous tail: stacked as views below
+                        timestamp_rows.append(buffer.timestamps[end - window:end])
+                        value_rows.append(buffer.values[end - window:end])
+                    else:
+                        timestamp_row, value_row = buffer.recent(window)
+                        padding = np.full(window - len(value_row), np.nan)
+                        timestamp_rows.append(np.concatenate((padding, timestamp_row)))
+                        value_rows.append(np.concatenate((padding, value_row)))
+
+            if keys:
+                timestamps = np.stack(timestamp_rows)
+                values = np.stack(value_rows)
+            else:
+                timestamps = values = np.empty((0, window))
+
+        return keys, counts, timestamps, values
+
+    def get_buffer(self, vehicle_id: str, signal: str) -> Optional[SignalRingBuffer]:
+        return self.vehicles.get(vehicle_id, {}).get(signal)
+
+    def query(self, vehicle_id: str, signal: str, start: Optional[float] = None,
+              end: Optional[float] = None, max_points: int = 1000) -> Dict[str, Any]:
+        """
+        Range query for one vehicle signal
+
+        Raw samples are returned when the ring buffer provably holds the
+        whole range (never wrapped, or filled in time order from before
+        ``start`` up to the newest sample) and it fits the point budget; otherwise the finest rollup
+        that fits is used.
+
+        Args:
+            vehicle_id: Vehicle identifier
+            signal: Signal name
+            start: Range start (default: one hour before ``end``)
+            end: Range end (default: newest sample)
+            max_points: Maximum number of points to return
+
+        Returns:
+            Dictionary with 'resolution', 'bucket_seconds' and parallel
+            'timestamps', 'min', 'max', 'mean' and 'count' lists
+        """
+        with self._lock:
+            buffer = self.get_buffer(vehicle_id, signal)
+            if buffer is None:
+                raise KeyError(f"No telemetry for {vehicle_id}/{signal}")
+            rollups = self.rollups[(vehicle_id, signal)]
+            end = rollups.newest if end is None else end
+            start = end - 3600.0 if start is None else start
+
+            timestamps, values = buffer.recent()
+            in_range = (timestamps >= start) & (timestamps <= end)
+            complete = buffer.count == buffer.size or (
+                timestamps[0] <= start and timestamps[-1] >= min(end, rollups.newest)
+                and bool(np.all(np.diff(timestamps) >= 0))
+            )
+            if complete and np.count_nonzero(in_range) <= max_points:
+                values = values[in_range].tolist()
+                series = {
+                    "timestamps": timestamps[in_range].tolist(),
+                    "min": values,
+                    "max": values,
+                    "mean": values,
+                    "count": [1] * len(values),
+                    "resolution": "raw",
+                    "bucket_seconds": 0,
+                }
+            else:
+                series = rollups.query(start, end, max_points)
+
+        series.update({"vehicle_id": vehicle_id, "signal": signal, "start": start, "end": end})
+        return series
+
+    def history(self, vehicle_id: str, signals: Optional[List[str]] = None,
+                start: Optional[float] = None, end: Optional[float] = None,
+                max_points: int = 1000) -> Dict[str, Any]:
+        """Range query for several signals of one vehicle (default: all)"""
+        with self._lock:
+            if vehicle_id not in self.vehicles:
+                raise KeyError(f"No telemetry for {vehicle_id}")
+            names = signals or sorted(self.vehicles[vehicle_id])
+        return {
+            "vehicle_id": vehicle_id,
+            "signals": {name: self.query(vehicle_id, name, start, end, max_points) for name in names},
+        }
+
+    def vehicle_summary(self, vehicle_id: str) -> Dict[str, Any]:
+        """Aggregates for one vehicle"""
+        with self._lock:
+            signals = self.vehicles.get(vehicle_id, {})
+            aggregates = {name: buffer.aggregates() for name, buffer in signals.items()}
+            info = dict(self.vehicle_info.get(vehicle_id, {}))
+
+        scores = [value["health_score"] for value in aggregates.values() if value["health_score"] is not None]
+        last_seen = max((value["last_timestamp"] for value in aggregates.values()), default=0.0)
+        insights = [
+            f"{name} outside its normal range in {100.0 - value['health_score']:.1f}% of samples"
+            for name, value in aggregates.items()
+            if value["health_score"] is not None and value["health_score"] < 95.0
+        ]
+
+        return {
+            "vehicle_id": vehicle_id,
+            "name": info.get("name", vehicle_id),
+            "type": info.get("type", ""),
+            "location": info.get("location", ""),
+            "status": info.get("status", "Active"),
+            "health_score": round(sum(scores) / len(scores), 1) if scores else None,
+            "last_seen": last_seen,
+            "signals": aggregates,
+            "insights": insights,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Digital-twin view of every vehicle plus ingest totals"""
+        # Copied under the lock; ingest threads add vehicles and samples concurrently
+        with self._lock:
+            vehicle_ids = sorted(self.vehicles)
+            total_samples, rejected_samples = self.total_samples, self.rejected_samples
+        uptime = max(time.time() - self.started_at, 1e-9)
+        return {
+            "vehicle_models": [self.vehicle_summary(vehicle_id) for vehicle_id in vehicle_ids],
+            "real_time_telemetry": {
+                "vehicles": len(vehicle_ids),
+                "total_data_points": total_samples,
+                "rejected_data_points": rejected_samples,
+                "average_ingest_rate": round(total_samples / uptime, 1),
+                "buffer_capacity": self.capacity,
+            },
+        }
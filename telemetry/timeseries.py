@@ -0,0 +1,200 @@
+"""
+Multi-resolution telemetry rollups
+
+Raw samples are rolled into 1 s, 1 min and 1 h buckets (min, max, sum,
+count) as they are ingested. Each resolution is a fixed-size ring indexed
+by bucket number modulo its size, so late samples merge into their bucket
+in place. Rings start small and double (up to their retention) only when a
+new bucket would evict a live one, so sparse or short-lived signals stay
+cheap. Range queries return
+the finest resolution whose point count fits the caller's budget.
+"""
+
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+
+# (name, bucket seconds, retained buckets): 1 h of seconds, 7 days of
+# minutes, 90 days of hours
+DEFAULT_RESOLUTIONS: Tuple[Tuple[str, int, int], ...] = (
+    ("1s", 1, 3600),
+    ("1m", 60, 7 * 24 * 60),
+    ("1h", 3600, 90 * 24),
+)
+
+
+def _group(ids: np.ndarray, mins: np.ndarray, maxs: np.ndarray,
+           sums: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Combine partial aggregates that share a bucket id"""
+    if len(ids) > 1 and np.any(ids[1:] < ids[:-1]):
+        order = np.argsort(ids, kind="stable")
+        ids, mins, maxs, sums, counts = ids[order], mins[order], maxs[order], sums[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    return (
+        ids[starts],
+        np.minimum.reduceat(mins, starts),
+        np.maximum.reduceat(maxs, starts),
+        np.add.reduceat(sums, starts),
+        np.add.reduceat(counts, starts),
+    )
+
+
+class BucketRing:
+    """Aggregate buckets at one resolution, retaining the newest ``capacity``"""
+
+    __slots__ = ("name", "seconds", "capacity", "ids", "minimum", "maximum", "total", "count", "latest")
+
+    def __init__(self, name: str, seconds: int, capacity: int, initial_size: int = 16):
+        self.name = name
+        self.seconds = seconds
+        self.capacity = capacity
+        self._allocate(min(initial_size, capacity))
+        self.latest = -1
+
+    def _allocate(self, size: int) -> None:
+        self.ids = np.full(size, -1, dtype=np.int64)
+        self.minimum = np.zeros(size, dtype=np.float64)
+        self.maximum = np.zeros(size, dtype=np.float64)
+        self.total = np.zeros(size, dtype=np.float64)
+        self.count = np.zeros(size, dtype=np.int64)
+
+    def _grow(self, size: int) -> None:
+        old = (self.ids, self.minimum, self.maximum, self.total, self.count)
+        self._allocate(min(size, self.capacity))
+        keep = old[0] >= self.oldest_retained
+        slots = old[0][keep] % len(self.ids)
+        for new, previous in zip((self.ids, self.minimum, self.maximum, self.total, self.count), old):
+            new[slots] = previous[keep]
+
+    @property
+    def oldest_retained(self) -> int:
+        """Oldest bucket id that is still in the ring"""
+        return self.latest - self.capacity + 1
+
+    def merge(self, ids: np.ndarray, mins: np.ndarray, maxs: np.ndarray,
+              sums: np.ndarray, counts: np.ndarray) -> int:
+        """
+        Merge grouped aggregates (unique, ascending ids) into the ring
+
+        Returns:
+            Number of samples dropped because their bucket has expired
+        """
+        self.latest = max(self.latest, int(ids[-1]))
+        live = ids >= self.oldest_retained
+        dropped = int(counts[~live].sum())
+        if not live.all():
+            ids, mins, maxs, sums, counts = ids[live], mins[live], maxs[live], sums[live], counts[live]
+            if len(ids) == 0:
+                return dropped
+
+        # At full size the retained window maps to distinct slots; below it,
+        # grow while a bucket would collide with a live one
+        while len(self.ids) < self.capacity:
+            slots = ids % len(self.ids)
+            occupant = self.ids[slots]
+            evicts = (occupant != ids) & (occupant >= 0) & (occupant >= self.oldest_retained)
+            spread = ids[-1] - ids[0] < len(self.ids) or len(np.unique(slots)) == len(slots)
+            if spread and not evicts.any():
+                break
+            self._grow(2 * len(self.ids))
+
+        slots = ids % len(self.ids)
+        stale = self.ids[slots] != ids
+        if stale.any():
+            reset = slots[stale]
+            self.ids[reset] = ids[stale]
+            self.minimum[reset] = np.inf
+            self.maximum[reset] = -np.inf
+            self.total[reset] = 0.0
+            self.count[reset] = 0
+
+        self.minimum[slots] = np.minimum(self.minimum[slots], mins)
+        self.maximum[slots] = np.maximum(self.maximum[slots], maxs)
+        self.total[slots] += sums
+        self.count[slots] += counts
+        return dropped
+
+    def covers(self, start: float) -> bool:
+        return self.latest >= 0 and int(start // self.seconds) >= self.oldest_retained
+
+    def range(self, start: float, end: float) -> Dict[str, List[float]]:
+        """Non-empty buckets overlapping [start, end]"""
+        first = max(int(start // self.seconds), self.oldest_retained)
+        last = min(int(end // self.seconds), self.latest)
+        if last < first:
+            return {"timestamps": [], "min": [], "max": [], "mean": [], "count": []}
+
+        ids = np.arange(first, last + 1, dtype=np.int64)
+        slots = ids % len(self.ids)
+        present = (self.ids[slots] == ids) & (self.count[slots] > 0)
+        ids, slots = ids[present], slots[present]
+        count = self.count[slots]
+        return {
+            "timestamps": (ids * self.seconds).astype(np.float64).tolist(),
+            "min": self.minimum[slots].tolist(),
+            "max": self.maximum[slots].tolist(),
+            "mean": (self.total[slots] / count).tolist(),
+            "count": count.tolist(),
+        }
+
+
+class MultiResolutionSeries:
+    """
+    Cascaded 1 s / 1 min / 1 h rollups of one signal
+
+    Each ingested batch is grouped once into 1 s buckets; coarser levels are
+    built from those partial aggregates, not from the raw samples, so every
+    resolution must be a whole multiple of the one before it.
+    """
+
+    __slots__ = ("levels", "dropped", "newest")
+
+    def __init__(self, resolutions: Tuple[Tuple[str, int, int], ...] = DEFAULT_RESOLUTIONS):
+        self.levels = [BucketRing(name, seconds, capacity) for name, seconds, capacity in resolutions]
+        self.dropped = 0
+        self.newest = float("-inf")
+
+    def append(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Roll a batch of samples into every resolution"""
+        if len(values) == 0:
+            return
+        self.newest = max(self.newest, float(timestamps.max()))
+
+        previous_seconds = 1
+        grouped = (
+            np.floor(timestamps).astype(np.int64),
+            values, values, values, np.ones(len(values), dtype=np.int64),
+        )
+        for level in self.levels:
+            ids = grouped[0] // (level.seconds // previous_seconds)
+            grouped = _group(ids, *grouped[1:])
+            dropped = level.merge(*grouped)
+            previous_seconds = level.seconds
+        # Only samples too old for every resolution are lost
+        self.dropped += dropped
+
+    def level(self, name: str) -> BucketRing:
+        for level in self.levels:
+            if level.name == name:
+                return level
+        raise ValueError(f"Unknown resolution: {name}")
+
+    def select(self, start: float, end: float, max_points: int) -> BucketRing:
+        """
+        Finest retained resolution with at most ``max_points`` buckets in
+        the range (the coarsest level if none fits)
+        """
+        for level in self.levels:
+            buckets = int(end // level.seconds) - int(start // level.seconds) + 1
+            if buckets <= max_points and level.covers(start):
+                return level
+        return self.levels[-1]
+
+    def query(self, start: float, end: float, max_points: int = 1000) -> Dict[str, Any]:
+        """Bucketed series for [start, end] within the point budget"""
+        level = self.select(start, end, max_points)
+        series = level.range(start, end)
+        series["resolution"] = level.name
+        series["bucket_seconds"] = level.seconds
+        return series
@@ -17,6 +17,7 @@ from ai_copilot.config import CopilotConfig
 from code_generation.generator import CodeGenerator
 from code_generation.validators import CodeValidator
 from embedded_integration.analyzer import EmbeddedAnalyzer
+from embedded_integration.constraints import ConstraintChecker
 from vehicle_context.context_manager import VehicleContextManager
 
 
@@ -65,6 +66,155 @@ async def test_code_generator():
     print("✓ Code Generator tests passed")
 
 
+async def test_code_formatter():
+    """Test single-pass, chunk-by-chunk code formatting"""
+    print("Testing Code Formatter...")
+    
+    from code_generation import CodeFormatter
+    
+    source = (
+        "\n\n#include <stdint.h>\n"
+        "   #define RESET(x) do { \\\n        (x) = 0; \\\n    } while (0)\n"
+        "int check(int a) {\n"
+        "if (a) {\n"
+        "const char *s = \"{\"; /* { */\n"
+        "} else {\n"
+        "*out = '}'; // {\n"
+        "}\n\n\n\n"
+        "/*\n* done {\n*/\n"
+        "return 0;\n"
+        "}   \n\n"
+    )
+    expected = (
+        "#include <stdint.h>\n"
+        "#define RESET(x) do { \\\n        (x) = 0; \\\n    } while (0)\n"
+        "int check(int a) {\n"
+        "    if (a) {\n"
+        "        const char *s = \"{\"; /* { */\n"
+        "    } else {\n"
+        "        *out = '}'; // {\n"
+        "    }\n\n"
+        "    /*\n     * done {\n     */\n"
+        "    return 0;\n"
+        "}"
+    )
+    formatter = CodeFormatter()
+    assert formatter.format(source) == expected
+    
+    # Any chunking of the input gives the same output
+    for size in (1, 5, 64):
+        chunks = [source[i:i + size] for i in range(0, len(source), size)]
+        assert "".join(formatter.format_stream(chunks)) == expected
+    
+    async def model_tokens():
+        for token in source.split(" "):
+            yield token + " "
+    streamed = "".join([text async for text in formatter.format_async(model_tokens())])
+    assert streamed == formatter.format(source + " ")
+    
+    generator = CodeGenerator(CopilotConfig())
+    assert generator._format_code(source) == expected
+    
+    print("✓ Code formatter test passed")
+
+
+async def test_template_engine():
+    """Test compiled templates, parameter slots and prompt building"""
+    print("Testing Template Engine...")
+    
+    from ai_copilot.core import CodeRequest
+    from code_generation import TemplateManager, CompiledTemplate, TemplateError
+    
+    manager = TemplateManager()
+    manager.add_template("init", "int {module}_init(void) {\n    return {status};\n}\nstatic const int t[] = {0, 1};\n")
+    assert manager.template_parameters("init") == ("module", "status")
+    # C braces stay literal; slots without a value keep their placeholder
+    assert manager.customize_template("init", {"module": "can"}) == (
+        "int can_init(void) {\n    return {status};\n}\nstatic const int t[] = {0, 1};\n"
+    )
+    assert manager.customize_template("can_driver", {}) == manager.get_template("can_driver")
+    assert manager.customize_template("missing", {}) is None
+    
+    # Format-style templates are validated when compiled
+    for bad in ("{0} positional", "{value:>8} spec", "{unterminated"):
+        try:
+            CompiledTemplate("bad", bad, syntax="format")
+            assert False, bad
+        except TemplateError:
+            pass
+    compiled = CompiledTemplate("prompt", "{{id}} {a}-{b}-{a}", syntax="format")
+    assert compiled.render({"a": 1, "b": "x", "unused": 3}) == "{id} 1-x-1"
+    assert compiled.render({"a": 1, "b": "x"}) == "{id} 1-x-1"
+    assert compiled.cache_info().hits == 1
+    try:
+        compiled.render({"a": 1})
+        assert False
+    except TemplateError as e:
+        assert "b" in str(e)
+    
+    # Constraints override context, which overrides request defaults
+    generator = CodeGenerator(CopilotConfig())
+    request = CodeRequest(description="CAN {gateway} handler", constraints={"message_id": "0x300"})
+    prompt = generator._build_prompt("can_protocol", request, {"message_id": "0x200", "data_length": 64})
+    assert "- Message ID: 0x300" in prompt
+    assert "- Data length: 64" in prompt
+    assert "- Protocol: CAN" in prompt
+    assert "- Description: CAN {gateway} handler" in prompt
+    
+    print("✓ Template engine test passed")
+
+
+async def test_project_generator():
+    """Test multi-file project planning and streamed archives"""
+    print("Testing Project Generator...")
+    
+    import io
+    import tarfile
+    import zipfile
+    from ai_copilot.core import CodeRequest
+    from code_generation import ProjectGenerator
+    from vehicle_context.signal_db import SignalDatabase
+    
+    database = SignalDatabase.from_messages([
+        {'id': 0x120, 'name': 'BrakeStatus', 'dlc': 2, 'senders': ['ECM'],
+         'signals': [{'name': 'Pressure', 'start': 0, 'length': 12, 'scale': 0.1}]},
+    ])
+    generator = ProjectGenerator(CodeGenerator(CopilotConfig()), signal_database=database)
+    request = CodeRequest(
+        description="Brake pressure monitor",
+        constraints={"ports": {"inputs": ["pressure"], "outputs": ["BrakeCmd"]}}
+    )
+    
+    paths = [project_file.path for project_file in generator.plan(request, {})]
+    assert paths == [
+        "include/brake_pressure_monitor.h", "src/brake_pressure_monitor.c",
+        "src/brake_pressure_monitor_logic.c", "rte/Rte_BrakePressureMonitor.h",
+        "rte/Rte_BrakePressureMonitor.c", "include/brake_pressure_monitor_codec.h",
+        "src/brake_pressure_monitor_codec.c", "test/test_brake_pressure_monitor.c", "CMakeLists.txt",
+    ]
+    no_tests = CodeRequest(description="CAN gateway", constraints={"generate_tests": False})
+    assert not any(path.startswith("test/") for path in
+                   (project_file.path for project_file in generator.plan(no_tests, {})))
+    
+    # Files arrive in plan order although they render concurrently
+    rendered = [project_file.path async for project_file, _ in generator.render(request, {}, window=3)]
+    assert rendered == paths
+    
+    data = b"".join([chunk async for chunk in generator.stream_archive(request, {}, "tar.gz")])
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        assert archive.getnames() == ["brake_pressure_monitor/" + path for path in paths]
+        codec = archive.extractfile("brake_pressure_monitor/include/brake_pressure_monitor_codec.h").read()
+        assert b"brake_status_pack(" in codec
+    
+    data = b"".join([chunk async for chunk in generator.stream_archive(request, {}, "zip")])
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        cmake = archive.read("brake_pressure_monitor/CMakeLists.txt").decode()
+        assert "add_library(brake_pressure_monitor STATIC" in cmake
+    
+    print("✓ Project generator test passed")
+
+
 async def test_code_validator():
     """Test code validation functionality"""
     print("Testing Code Validator...")
@@ -106,6 +256,116 @@ void bad_function() {
     print("✓ Code Validator tests passed")
 
 
+async def test_code_fixups():
+    """Test that fix-ups edit only the ranges the validator flagged"""
+    print("Testing Code Fix-ups...")
+    
+    from code_generation import FixupEngine
+    
+    class MockRequest:
+        language = "c"
+    
+    code = (
+        "/* header */\n"
+        "#include <stdio.h>\n"
+        "\n"
+        "uint8_t scale(uint8_t a) {\n"
+        "    const char *s = \"return x\"  // return y\n"
+        "    return (a\n"
+        "        * 2)\n"
+        "}\n"
+        "bool ready(void) { return true }\n"
+    )
+    validator = CodeValidator(CopilotConfig())
+    result = await validator.validate(code, MockRequest())
+    assert result.issues["missing_includes"] == ["stdbool.h", "stdint.h"]
+    assert len(result.ranges["missing_semicolon"]) == 2
+    
+    fixed = FixupEngine().apply(code, result)
+    assert fixed.code == (
+        "/* header */\n"
+        "#include <stdio.h>\n"
+        "#include <stdbool.h>\n"
+        "#include <stdint.h>\n"
+        "\n"
+        "uint8_t scale(uint8_t a) {\n"
+        "    const char *s = \"return x\"  // return y\n"
+        "    return (a\n"
+        "        * 2);\n"
+        "}\n"
+        "bool ready(void) { return true; }\n"
+    )
+    assert fixed.explanations[:2] == [
+        "Added missing semicolon at line 7", "Added missing semicolon at line 9"
+    ]
+    result = await validator.validate(fixed.code, MockRequest())
+    assert "syntax" not in result.issues and "missing_includes" not in result.issues
+    
+    # Nothing flagged, nothing changed
+    assert FixupEngine().apply(fixed.code, result).edits == []
+    
+    print("✓ Code fix-ups test passed")
+
+
+async def test_generation_pipeline():
+    """Test the bounded generate-validate-repair loop"""
+    print("Testing Generation Pipeline...")
+    
+    from ai_copilot.core import CodeRequest
+    
+    model_output = (
+        "#include <stdio.h>\n"
+        "static uint8_t level;\n"
+        "uint8_t get_level(void) {\n"
+        "    return level\n"
+        "}\n"
+        "void set_level(uint8_t value) {\n"
+        "    level = value;\n"
+        "}\n"
+    )
+    
+    async def fake_model(prompt):
+        return model_output
+    
+    config = CopilotConfig(include_comments=False)
+    generator = CodeGenerator(config)
+    generator._generate_with_model = fake_model
+    request = CodeRequest(description="Level store")
+    
+    report = await generator.generate_report(request, {}, EmbeddedAnalyzer(config))
+    assert report.converged and report.iterations == 1
+    assert "    return level;\n" in report.code
+    assert "#include <stdint.h>" in report.code
+    assert [edit.explanation for edit in report.fixes] == [
+        "Added missing semicolon at line 4", "Added #include <stdint.h> for identifiers it declares"
+    ]
+    assert not report.validation.ranges
+    # The unchanged set_level region was not validated again
+    assert report.validation.regions_validated == 1
+    assert report.analysis is not None and "warnings" in report.analysis
+    
+    # Out of iterations: the fixable issues are reported, not fixed
+    generator.config = CopilotConfig(include_comments=False, repair_max_iterations=0)
+    report = await generator.generate_report(request, {})
+    assert not report.converged and report.iterations == 0
+    assert "missing_semicolon" in report.validation.ranges
+    assert report.analysis is None
+    
+    # A model slower than the repair budget still gets its first fix pass
+    async def slow_model(prompt):
+        await asyncio.sleep(0.3)
+        return model_output
+    
+    generator.config = CopilotConfig(include_comments=False, repair_budget_ms=250)
+    generator._generate_with_model = slow_model
+    report = await generator.generate_report(request, {})
+    assert report.converged and report.iterations == 1
+    assert "    return level;\n" in report.code
+    assert "#include <stdint.h>" in report.code
+    
+    print("✓ Generation pipeline test passed")
+
+
 async def test_embedded_analyzer():
     """Test embedded systems analyzer"""
     print("Testing Embedded Analyzer...")
@@ -140,6 +400,1189 @@ void test_function() {
     print("✓ Embedded Analyzer tests passed")
 
 
+async def test_finding_model():
+    """Test compact findings, lazy messages and columnar aggregation"""
+    print("Testing Finding Model...")
+    
+    from embedded_integration import Finding, FindingTable
+    from embedded_integration.findings import RULES
+    
+    analyzer = EmbeddedAnalyzer(CopilotConfig())
+    code = (
+        "#include <stdint.h>\n"
+        "void reset(void) {\n"
+        "    uint8_t *p = malloc(4);\n"
+        "    goto done;\n"
+        "}\n"
+    )
+    result = await analyzer.analyze(code)
+    by_rule = {finding.rule_id: finding for finding in result.findings}
+    assert (by_rule["MEM001"].line, by_rule["MEM001"].column) == (3, 18)
+    assert by_rule["SAF002"].line == 4
+    assert by_rule["MEM001"].message.startswith("Dynamic memory allocation detected (1 instances)")
+    assert not hasattr(by_rule["MEM001"], "__dict__")
+    # Rendering matches the dictionary interface
+    analysis = await analyzer.analyze_code(code)
+    assert analysis["warnings"] == result.warnings and not analysis["is_valid"]
+    
+    table = FindingTable()
+    for index in range(200):
+        table.add(f"src/file_{index % 4}.c", result.findings)
+    assert len(table) == 200 * len(result.findings)
+    assert table.counts_by_rule()["MEM001"] == 200
+    assert table.counts_by_file()["src/file_3.c"] == 50 * len(result.findings)
+    assert table.findings("src/file_0.c")[:len(result.findings)] == result.findings
+    summary = table.summary(top=2)
+    assert summary["files"] == 4 and len(summary["top_files"]) == 2
+    assert summary["by_severity"] == {"warning": len(table)}
+    
+    # Findings share one template; messages are rendered from arguments
+    path, finding = next(iter(table))
+    assert path == "src/file_0.c" and finding == result.findings[0]
+    assert finding.rule.template is RULES[finding.rule_id].template
+    assert Finding("SAF003", 7, 5, ("can_send",)).to_dict()["suggestion"] == (
+        "Add return value checking for 'can_send' function calls."
+    )
+    
+    print("✓ Finding model test passed")
+
+
+async def test_analysis_output():
+    """Test streamed JSON-lines and SARIF output of findings"""
+    print("Testing Analysis Output...")
+    
+    import json
+    from embedded_integration.reporting import get_encoder, encode_findings
+    
+    analyzer = EmbeddedAnalyzer(CopilotConfig())
+    sources = [
+        ("src/a.c", "void f(void) {\n    int *p = malloc(4);\n    goto done;\n}\n"),
+        ("src/b.c", "void g(void) { goto done; }\n"),
+    ]
+    
+    async def findings():
+        for path, code in sources:
+            async for finding in analyzer.stream_findings(code):
+                yield path, finding
+    
+    lines = [chunk async for chunk in encode_findings(get_encoder("jsonl"), findings())]
+    records = [json.loads(line) for line in "".join(lines).splitlines()]
+    expected = [(path, finding) for path, code in sources for finding in (await analyzer.analyze(code)).findings]
+    assert [(r["path"], r["rule_id"], r["line"]) for r in records] == [
+        (path, finding.rule_id, finding.line) for path, finding in expected
+    ]
+    
+    chunks = [chunk async for chunk in encode_findings(get_encoder("sarif"), findings())]
+    assert len(chunks) == len(expected) + 2  # header, one chunk per result, rules
+    log = json.loads("".join(chunks))
+    assert log["version"] == "2.1.0"
+    run = log["runs"][0]
+    rules = run["tool"]["driver"]["rules"]
+    assert len(run["results"]) == len(expected)
+    for result in run["results"]:
+        assert rules[result["ruleIndex"]]["id"] == result["ruleId"]
+    goto = [result for result in run["results"] if result["ruleId"] == "SAF002"]
+    assert goto[0]["locations"][0]["physicalLocation"]["region"] == {"startLine": 3, "startColumn": 5}
+    assert goto[1]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] == "src/b.c"
+    
+    try:
+        get_encoder("xml")
+        assert False
+    except ValueError:
+        pass
+    
+    print("✓ Analysis output test passed")
+
+
+async def test_rule_engine():
+    """Test declarative rule sets compiled into one matcher plan"""
+    print("Testing Rule Engine...")
+    
+    import os
+    import tempfile
+    from embedded_integration import load_rule_set
+    from vehicle_context import StandardsChecker
+    
+    rule_set = load_rule_set()
+    assert {"MISRA-C", "AUTOSAR", "ISO26262", "CAN"} <= set(rule_set.standards)
+    code = (
+        "int can_read(uint8_t dlc) {\n"
+        "    if (dlc > 8) return -1;\n"
+        "    return 0;\n"
+        "}\n"
+        "void poll(void) {\n"
+        "    can_read(4);\n"
+        "    (void)can_read(2);\n"
+        "    goto out;\n"
+        "}\n"
+    )
+    findings = rule_set.compile(["MISRA-C", "CAN"]).evaluate(code)
+    by_rule = {finding.rule_id: finding for finding in findings}
+    assert (by_rule["SAF003"].line, by_rule["SAF003"].column) == (6, 5)
+    assert by_rule["SAF003"].args == ("can_read",)
+    assert by_rule["SAF002"].line == 8
+    assert "CAN001" not in by_rule  # DLC is validated
+    
+    # Rules restricted to higher ASILs are left out of the plan
+    assert "ISO003" not in rule_set.compile(["ISO26262"], asil="ASIL-B").rule_ids
+    assert "ISO003" in rule_set.compile(["ISO26262"], asil="ASIL-D").rule_ids
+    
+    # Project rule files and selection; shared atoms are matched once
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as handle:
+        handle.write(
+            "standard: PROJECT\n"
+            "rules:\n"
+            "  - id: PRJ001\n"
+            "    message: \"goto in {0}\"\n"
+            "    match: {ident: goto}\n"
+            "    args: [name]\n"
+        )
+    config = CopilotConfig(rules={"rule_files": [handle.name], "disabled": ["SAF001"]})
+    checker = StandardsChecker(config)
+    plan = checker.rule_plan(["MISRA-C", "PROJECT"])
+    assert "PRJ001" in plan.rule_ids and "SAF001" not in plan.rule_ids
+    assert plan.atom_count == rule_set.compile(["MISRA-C"]).atom_count - 1  # without SAF001's
+    
+    results = await checker.check_compliance(code, ["AUTOSAR", "ISO26262", "PROJECT"])
+    assert results["PROJECT"]["warnings"] == ["goto in goto"]
+    assert not results["AUTOSAR"]["compliant"]
+    assert results["ISO26262"]["asil_level"] == config.embedded.safety_level
+    
+    with open(handle.name, "w") as invalid:
+        invalid.write("standard: PROJECT\nrules:\n  - id: PRJ002\n    message: x\n    match: {regex: x}\n")
+    try:
+        load_rule_set((handle.name,))
+        assert False
+    except ValueError:
+        pass
+    os.unlink(handle.name)
+    
+    print("✓ Rule engine test passed")
+
+
+async def test_rule_profiles():
+    """Test per-ASIL rule profiles and per-rule timing"""
+    print("Testing Rule Profiles...")
+    
+    from embedded_integration import load_rule_set, RuleProfile
+    from embedded_integration.rule_engine import ASIL_LEVELS, plan_for_config
+    
+    rule_set = load_rule_set()
+    plans = [set(rule_set.compile(asil=level).rule_ids) for level in ASIL_LEVELS]
+    # Each profile runs the rules of the one below it and possibly more
+    assert all(lower <= higher for lower, higher in zip(plans, plans[1:]))
+    assert "SAF001" not in plans[0] and "ISO003" in plans[-1]
+    assert plans[-1] == {spec.rule_id for spec in rule_set.specs}
+    
+    config = CopilotConfig()
+    config.rules.profile = "QM"
+    assert "SAF003" not in plan_for_config(config, ["MISRA-C"]).rule_ids
+    try:
+        rule_set.compile(asil="ASIL-E")
+        assert False
+    except ValueError:
+        pass
+    
+    code = "int f(void) { return 100; }\nvoid g(void) { f(); goto out; }\n"
+    plan = rule_set.compile(["MISRA-C"], asil="ASIL-D")
+    expected = plan.evaluate(code)
+    profiler = RuleProfile()
+    rule_set.set_profiler(profiler)
+    try:
+        assert plan.evaluate(code) == expected
+        plan.evaluate(code)
+    finally:
+        rule_set.set_profiler(None)
+    assert plan.profiler is None
+    report = profiler.report()
+    assert {row["rule_id"] for row in report} == set(plan.rule_ids)
+    assert profiler.evaluations == 2 and profiler.findings["SAF003"] == 2
+    assert all(row["total_ms"] >= 0 for row in report)
+    assert abs(sum(row["share"] for row in report) - 1.0) < 1e-6 or not any(row["total_ms"] for row in report)
+    
+    print("✓ Rule profiles test passed")
+
+
+async def test_analysis_cache():
+    """Test the persistent analysis cache and its LRU size cap"""
+    print("Testing Analysis Cache...")
+    
+    import tempfile
+    from ai_copilot.core import AICopilot
+    from ai_copilot.analysis_cache import AnalysisCache
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = Path(tmp) / "src"
+        sources.mkdir()
+        for index in range(3):
+            (sources / f"unit_{index}.c").write_text(
+                f"void task_{index}(void) {{\n    char *p = malloc({index + 10});\n    goto out;\n}}\n"
+            )
+        config = CopilotConfig(analysis_cache_dir=str(Path(tmp) / "cache"))
+        
+        async def run():
+            copilot = AICopilot(config)
+            with AnalysisCache.from_config(config) as cache:
+                findings = [item async for item in copilot.stream_file_findings([sources], cache)]
+                return findings, (cache.hits, cache.misses)
+        
+        cold, cold_counts = await run()
+        warm, warm_counts = await run()
+        assert cold_counts == (0, 3) and warm_counts == (3, 0)
+        assert warm == cold and any(finding.rule_id == "SAF002" for _, finding in warm)
+        
+        # A changed file misses; other versions of the analysis do not share results
+        (sources / "unit_0.c").write_text("int ok(void) { return 0; }\n")
+        _, counts = await run()
+        assert counts == (2, 1)
+        config.rules.profile = "QM"
+        _, counts = await run()
+        assert counts == (0, 3)
+        
+        with AnalysisCache.from_config(config) as cache:
+            stats = cache.stats()
+            assert stats["entries"] == 7 and stats["hits"] == 5 and stats["misses"] == 7
+            assert cache.invalidate([sources / "unit_1.c"]) == 2
+            assert cache.invalidate() == 5
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(tmp, max_bytes=100)
+        for index in range(4):
+            cache.put(f"hash{index}", "v1", ["x" * 30])
+        cache.flush()
+        assert cache.get("hash0", "v1") is None and cache.get("hash3", "v1") is not None
+        cache.get("hash2", "v1")
+        cache.put("hash4", "v1", ["x" * 30])
+        cache.flush()
+        # hash3 was used before hash2, so it goes to make room for hash4
+        assert cache.get("hash3", "v1") is None
+        assert cache.get("hash2", "v1") is not None and cache.get("hash4", "v1") is not None
+        assert cache.stats()["evictions"] == 3
+        cache.close()
+    
+    print("✓ Analysis cache test passed")
+
+
+async def test_wcet_estimator():
+    """Test worst-case execution time estimation against deadlines"""
+    print("Testing WCET Estimator...")
+    
+    config = CopilotConfig()
+    checker = ConstraintChecker(config)
+    
+    test_code = '''
+#define SAMPLES 16
+
+uint32_t sum_samples(const uint8_t* samples) {
+    uint32_t total = 0;
+    for (uint8_t i = 0; i < SAMPLES; i++) {
+        total += samples[i];
+    }
+    return total;
+}
+
+void wait_ready(void) {
+    while (!ready) {
+    }
+}
+'''
+    
+    timings = checker.wcet_estimator.estimate(test_code, "ARM Cortex-M4")
+    assert timings['sum_samples'].bounded
+    assert timings['sum_samples'].cycles > 0
+    assert not timings['wait_ready'].bounded
+    
+    # Constant trip count scales the loop cost
+    longer = checker.wcet_estimator.estimate(
+        test_code.replace("#define SAMPLES 16", "#define SAMPLES 32"), "ARM Cortex-M4"
+    )
+    assert longer['sum_samples'].cycles > timings['sum_samples'].cycles
+    
+    # Slow platforms miss tight deadlines
+    result = await checker.check_constraints(
+        test_code, {'timing': {'deadline_us': {'sum_samples': 5}, 'platform': 'AVR'}}
+    )
+    assert any('sum_samples' in warning for warning in result['warnings'])
+    assert result['metrics']['wcet']['platform'] == 'AVR'
+    
+    # Recursion gets recursion advice, not loop-bound advice
+    recursive_code = '''
+uint32_t factorial(uint32_t n) {
+    if (n <= 1) { return 1; }
+    return n * factorial(n - 1);
+}
+'''
+    result = await checker.check_constraints(recursive_code, {'timing': {'deadline_us': 100}})
+    assert any("'factorial' cannot be bounded due to recursion" in warning for warning in result['warnings'])
+    assert result['suggestions'] == ["Bound the recursion depth of 'factorial' or rewrite it iteratively"]
+    result = await checker.check_constraints(test_code, {'timing': {'deadline_us': {'wait_ready': 100}}})
+    assert result['suggestions'] == ["Use constant loop bounds in 'wait_ready' or set timing.max_loop_iterations"]
+    
+    # Unchanged functions are served from the fingerprint cache
+    hits = checker.wcet_estimator.cache_hits
+    checker.wcet_estimator.estimate(test_code, "ARM Cortex-M4")
+    assert checker.wcet_estimator.cache_hits > hits
+    
+    print("✓ WCET Estimator tests passed")
+
+
+async def test_footprint_estimator():
+    """Test flash/RAM footprint estimation against ECU budgets"""
+    print("Testing Footprint Estimator...")
+    
+    config = CopilotConfig()
+    checker = ConstraintChecker(config)
+    
+    test_code = '''
+#define QUEUE_SIZE 32
+
+typedef struct {
+    uint32_t id;
+    uint8_t dlc;
+    uint8_t data[8];
+} can_message_t;
+
+static can_message_t tx_queue[QUEUE_SIZE];
+static const uint8_t crc_table[4] = {0x00, 0x07, 0x0E, 0x09};
+static uint16_t tx_count = 0;
+
+void queue_reset(void) {
+    tx_count = 0;
+}
+'''
+    
+    report = checker.footprint_estimator.estimate(test_code, "ARM Cortex-M")
+    assert report.bss_bytes == 32 * 16  # aligned can_message_t
+    assert report.const_bytes == 4
+    assert report.data_bytes == 2
+    assert report.code_bytes > 0
+    
+    # 8-bit cores use more code bytes for the same statements
+    avr_report = checker.footprint_estimator.estimate(test_code, "AVR")
+    assert avr_report.code_bytes > report.code_bytes
+    
+    # Enumeration objects take an int, whether the enum is defined inline or by tag
+    enums = checker.footprint_estimator.estimate(
+        "enum mode { OFF, ON } current;\nenum {A, B} e;\nstatic enum mode previous;\n", "ARM Cortex-M"
+    )
+    assert enums.bss_bytes == 12 and not enums.estimated_types
+    
+    result = await checker.check_constraints(
+        test_code, {'memory': {'flash_kb': 2048, 'ram_kb': 0.25}}
+    )
+    footprint = result['metrics']['footprint']
+    assert footprint['ram_utilization_percent'] > 100
+    assert footprint['flash_utilization_percent'] < 1
+    assert any('RAM usage' in warning for warning in result['warnings'])
+    
+    print("✓ Footprint Estimator tests passed")
+
+
+async def test_can_bus_simulator():
+    """Test CAN bus load and response-time analysis"""
+    print("Testing CAN Bus Simulator...")
+    
+    import json
+    
+    config = CopilotConfig()
+    context_manager = VehicleContextManager(config)
+    protocol_manager = context_manager.protocol_manager
+    
+    # Worked example from Davis et al. (2007): 125 kbit/s, 8-byte frames
+    messages = [
+        {'id': 0x1, 'dlc': 8, 'period_ms': 2.5},
+        {'id': 0x2, 'dlc': 8, 'period_ms': 3.5},
+        {'id': 0x3, 'dlc': 8, 'period_ms': 3.5},
+    ]
+    
+    result = await protocol_manager.check_bus_load(messages, "CAN", baudrate=125000)
+    summary = result['bus_load']
+    assert summary['max_frame_time_us'] == 1080.0
+    assert summary['utilization_percent'] > 100 - 1e-6
+    assert summary['unschedulable_count'] == 1
+    assert summary['unschedulable_messages'][0]['id'] == "0x3"
+    assert summary['unschedulable_messages'][0]['response_time_ms'] == 4.32
+    assert not result['compliant']
+    
+    # The same set fits easily on a 500 kbit/s CAN FD bus
+    fd_result = await protocol_manager.check_bus_load(messages, "CAN-FD")
+    assert fd_result['compliant']
+    assert fd_result['bus_load']['schedulable']
+    
+    # An overloaded bus whose response times do not converge is not schedulable
+    simulator = protocol_manager.can_simulator
+    max_iterations, simulator.max_iterations = simulator.max_iterations, 3
+    try:
+        overloaded = [{'id': i, 'dlc': 8, 'period_ms': 1.0, 'deadline_ms': 1e9} for i in range(1, 4)]
+        summary = (await protocol_manager.check_bus_load(overloaded, "CAN", baudrate=125000))['bus_load']
+    finally:
+        simulator.max_iterations = max_iterations
+    assert not summary['schedulable']
+    assert [m['id'] for m in summary['unschedulable_messages']] == ["0x2", "0x3"]
+    
+    # Malformed messages are violations and stay out of the analysis
+    malformed = messages + [
+        {'id': 0x10, 'dlc': 8, 'period_ms': 0},
+        {'id': 0x11, 'dlc': -3, 'period_ms': 10.0},
+        {'id': 0x12, 'dlc': 8, 'period_ms': -5.0},
+    ]
+    result = await protocol_manager.check_bus_load(malformed, "CAN-FD")
+    assert not result['compliant']
+    assert any('DLC outside 0..64' in violation and '0x11' in violation for violation in result['violations'])
+    assert any('period that is not positive (0x10, 0x12)' in violation for violation in result['violations'])
+    assert result['bus_load']['message_count'] == 3
+    assert result['bus_load']['utilization_percent'] == fd_result['bus_load']['utilization_percent']
+    json.dumps(result)
+    
+    print("✓ CAN Bus Simulator tests passed")
+
+
+async def test_signal_database():
+    """Test the compact signal database, its binary cache and codec generation"""
+    print("Testing Signal Database...")
+    
+    import tempfile
+    from vehicle_context.signal_db import SignalDatabase
+    
+    config = CopilotConfig()
+    context_manager = VehicleContextManager(config)
+    generator = CodeGenerator(config)
+    
+    messages = [
+        {'id': 0x100, 'name': 'EngineData', 'dlc': 8, 'cycle_time_ms': 10, 'senders': ['ECM'],
+         'signals': [
+             {'name': 'EngineSpeed', 'start': 0, 'length': 16, 'scale': 0.25, 'unit': 'rpm',
+              'receivers': ['TCM']},
+             {'name': 'CoolantTemp', 'start': 16, 'length': 8, 'is_signed': True, 'offset': -40},
+             {'name': 'Torque', 'start': 39, 'length': 12, 'byte_order': 'big_endian',
+              'receivers': ['TCM']},
+         ]},
+        {'id': 0x200, 'name': 'GearStatus', 'dlc': 1, 'senders': ['TCM'],
+         'signals': [{'name': 'Gear', 'start': 0, 'length': 4, 'receivers': ['ECM']}]},
+    ]
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = Path(cache_dir) / "vehicle.sdb"
+        SignalDatabase.from_messages(messages).save(cache_path)
+        database = SignalDatabase.load(cache_path)
+        
+        assert database.signal_count == 4
+        assert database.message_index(0x200) == 1
+        assert database.message_index("EngineData") == 0
+        assert list(database.find_signals("Torque")) == [2]
+        assert list(database.node_messages("TCM", "rx")) == [0]
+        assert database.validate() == []
+        
+        # Motorola signal: 8 MSBs in byte 4, 4 LSBs in the high nibble of byte 5
+        assert database.signal_segments(2) == [(4, 0, 4, 8), (5, 4, 0, 4)]
+        
+        codec = generator.generate_signal_codec(database, node="ECM")
+        assert "int engine_data_pack(uint8_t *dst, const engine_data_t *src, size_t size)" in codec
+        assert "gear_status_unpack" in codec
+        assert "#define ENGINE_DATA_FRAME_ID (0x100u)" in codec
+        
+        result = await context_manager.protocol_manager.check_database_compliance(
+            "#define BRAKE_STATUS_ID 0x321\n", database
+        )
+        assert not result['compliant']
+        assert any('0x321' in violation for violation in result['violations'])
+        
+        database = None
+        
+        # DBC files named in requests stay inside the configured directory
+        from ai_copilot.core import CodeRequest
+        from vehicle_context import signal_db, DBCPathError, resolve_dbc_path
+        dbc_dir = Path(cache_dir) / "dbc"
+        dbc_dir.mkdir()
+        (dbc_dir / "vehicle.dbc").write_text('VERSION ""\n')
+        (dbc_dir / "subdir").mkdir()
+        (dbc_dir / "outside.dbc").symlink_to(cache_path)
+        assert resolve_dbc_path("vehicle.dbc", dbc_dir) == (dbc_dir / "vehicle.dbc").resolve()
+        for name in ["../vehicle.sdb", str(cache_path), "outside.dbc", "subdir", "missing.dbc", "/dev/zero"]:
+            try:
+                resolve_dbc_path(name, dbc_dir)
+                assert False, f"{name} should be rejected"
+            except DBCPathError:
+                pass
+        limit = signal_db.MAX_DBC_BYTES
+        signal_db.MAX_DBC_BYTES = 4
+        try:
+            resolve_dbc_path("vehicle.dbc", dbc_dir)
+            assert False, "oversized DBC should be rejected"
+        except DBCPathError:
+            pass
+        finally:
+            signal_db.MAX_DBC_BYTES = limit
+        
+        generator.config = CopilotConfig(dbc_dir=str(dbc_dir))
+        try:
+            generator._generate_dbc_codec(CodeRequest(description="x", constraints={"dbc": "/etc/passwd"}))
+            assert False, "absolute DBC paths outside dbc_dir should be rejected"
+        except DBCPathError:
+            pass
+    
+    print("✓ Signal Database tests passed")
+
+
+async def test_can_log_replay():
+    """Test streaming CAN log decoding and windowed bus load"""
+    print("Testing CAN Log Replay...")
+    
+    import tempfile
+    from vehicle_context.signal_db import SignalDatabase
+    
+    config = CopilotConfig()
+    context_manager = VehicleContextManager(config)
+    
+    database = SignalDatabase.from_messages([
+        {'id': 0x100, 'name': 'EngineData', 'dlc': 8, 'signals': [
+            {'name': 'EngineSpeed', 'start': 0, 'length': 16, 'scale': 0.25, 'unit': 'rpm'},
+            {'name': 'CoolantTemp', 'start': 16, 'length': 8, 'is_signed': True, 'offset': -40},
+        ]},
+    ])
+    
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_path = Path(log_dir) / "trace.log"
+        # 1000 rpm / 4000 rpm and 50 degC / -50 degC (raw 90 and -10)
+        log_path.write_text(
+            "(100.000000) can0 100#A00F5A0000000000\n"
+            "(100.500000) can0 100#803EF60000000000\n"
+            "(101.200000) can0 321#0102\n"
+        )
+        
+        summary = await context_manager.protocol_manager.analyze_can_log(
+            str(log_path), database, baudrate=500000, window_s=1.0
+        )
+    
+    assert summary['frame_count'] == 3
+    assert summary['unknown_frame_count'] == 1
+    assert len(summary['bus_load_percent']['windows']) == 2
+    
+    speed = summary['signals']['EngineSpeed']
+    assert speed['count'] == 2
+    assert speed['min'] == 1000.0 and speed['max'] == 4000.0
+    assert speed['mean'] == 2500.0
+    
+    temperature = summary['signals']['CoolantTemp']
+    assert temperature['min'] == -50.0 and temperature['max'] == 50.0
+    
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_path = Path(log_dir) / "glitches.log"
+        # A remote frame, a frame cut short after EngineSpeed, a stamp far in
+        # the future and one that jumps back into an already flushed window
+        log_path.write_text(
+            "(100.000000) can0 100#A00F5A0000000000\n"
+            "(100.100000) can0 100#R\n"
+            "(100.200000) can0 100#803E\n"
+            "(1000000000.000000) can0 100#A00F5A0000000000\n"
+            "(103.500000) can0 100#A00F5A0000000000\n"
+            "(100.300000) can0 100#A00F5A0000000000\n"
+        )
+        summary = await context_manager.protocol_manager.analyze_can_log(
+            str(log_path), database, baudrate=500000, window_s=1.0
+        )
+        
+        csv_path = Path(log_dir) / "short.csv"
+        csv_path.write_text("timestamp,id,dlc,data\n0.0,100,8,A00F5A0000000000\n0.1,100\n")
+        try:
+            await context_manager.protocol_manager.analyze_can_log(str(csv_path), database)
+            assert False, "short CSV rows should be rejected"
+        except ValueError as e:
+            assert ':3:' in str(e)
+    
+    assert summary['frame_count'] == 5
+    assert summary['out_of_range_frame_count'] == 1
+    assert summary['out_of_order_frame_count'] == 1
+    assert len(summary['bus_load_percent']['windows']) == 4
+    assert summary['signals']['EngineSpeed']['count'] == 5
+    assert summary['signals']['CoolantTemp']['count'] == 4
+    assert any('backwards' in warning for warning in summary['warnings'])
+    
+    print("✓ CAN Log Replay tests passed")
+
+
+async def test_flexray_scheduler():
+    """Test FlexRay static-segment schedule synthesis"""
+    print("Testing FlexRay Scheduler...")
+    
+    config = CopilotConfig()
+    context_manager = VehicleContextManager(config)
+    
+    frames = [
+        {'name': 'EngineTorque', 'sender': 'ECM', 'payload_bytes': 16, 'period_ms': 5},
+        {'name': 'EngineTemp', 'sender': 'ECM', 'payload_bytes': 8, 'period_ms': 10},
+        {'name': 'EngineLoad', 'sender': 'ECM', 'payload_bytes': 8, 'period_ms': 10},
+        {'name': 'BrakePressure', 'sender': 'ESP', 'payload_bytes': 32, 'period_ms': 7},
+    ]
+    
+    result = await context_manager.protocol_manager.check_flexray_schedule(frames, cycle_ms=5.0)
+    schedule = result['schedule']
+    assert result['compliant']
+    assert schedule['used_slots'] == 3
+    
+    # The two 10 ms frames share one slot in alternating cycles
+    shared = [f for f in schedule['frames'] if f['name'] in ('EngineTemp', 'EngineLoad')]
+    assert shared[0]['slot'] == shared[1]['slot']
+    assert {f['base_cycle'] for f in shared} == {0, 1}
+    assert all(f['repetition'] == 2 for f in shared)
+    
+    # 7 ms cannot be met exactly with a 5 ms cycle
+    brake = [f for f in schedule['frames'] if f['name'] == 'BrakePressure'][0]
+    assert brake['period_ms'] == 5.0 and brake['jitter_ms'] == 4.0
+    assert result['warnings']
+    assert "flexray_esp_schedule[1]" in result['c_code']
+    
+    oversized = await context_manager.protocol_manager.check_flexray_schedule(
+        [{'name': 'Video', 'sender': 'CAM', 'payload_bytes': 300, 'period_ms': 5}]
+    )
+    assert not oversized['compliant']
+    
+    empty = await context_manager.protocol_manager.check_flexray_schedule([])
+    assert empty['compliant'] and empty['schedule']['frame_count'] == 0
+    assert empty['schedule']['payload_utilization_percent'] == 0.0
+    
+    print("✓ FlexRay Scheduler tests passed")
+
+
+async def test_lin_schedule():
+    """Test LIN schedule-table generation and period verification"""
+    print("Testing LIN Schedule Generator...")
+    
+    config = CopilotConfig()
+    context_manager = VehicleContextManager(config)
+    
+    frames = [
+        {'name': 'DoorStatus', 'id': 0x11, 'length': 4, 'period_ms': 20, 'publisher': 'Door'},
+        {'name': 'DoorLock', 'id': 0x10, 'length': 2, 'period_ms': 40, 'publisher': 'master'},
+        {'name': 'WindowPosition', 'id': 0x13, 'length': 1, 'period_ms': 80, 'publisher': 'Window'},
+    ]
+    
+    result = await context_manager.protocol_manager.check_lin_schedule(
+        frames, nodes=['Door', 'Window'], baudrate=19200
+    )
+    schedule = result['schedule']
+    assert result['compliant'], result['violations']
+    assert schedule['cycle_ms'] == 80.0
+    assert sum(entry['delay_ms'] for entry in schedule['table']) == schedule['cycle_ms']
+    
+    # 4 data bytes at 19200 baud: 1.4 * (34 + 50) bits = 6.125 ms, 7 ms slot
+    door = [f for f in schedule['frames'] if f['name'] == 'DoorStatus'][0]
+    assert door['frame_time_ms'] == 6.125 and door['slot_ms'] == 7.0
+    assert door['max_gap_ms'] <= 20.0
+    assert door['frame_time_by_baudrate'][9600] == 12.25
+    
+    # Protected ID of frame 0x10 is 0x50
+    assert "{0x50u, 2u," in result['c_code']
+    
+    overloaded = await context_manager.protocol_manager.check_lin_schedule(
+        [{'name': f'F{i}', 'id': i, 'length': 8, 'period_ms': 10} for i in range(4)],
+        baudrate=9600
+    )
+    assert not overloaded['compliant']
+    
+    print("✓ LIN Schedule Generator tests passed")
+
+
+async def test_telemetry_store():
+    """Test telemetry ring buffers and digital twin aggregates"""
+    print("Testing Telemetry Store...")
+    
+    import numpy as np
+    from telemetry import TelemetryStore
+    
+    store = TelemetryStore(capacity=8)
+    records = [
+        {'vehicle_id': 'NEXON-01', 'name': 'TATA Nexon EV', 'timestamp': float(t),
+         'signals': {'coolant_temp': 80.0 + t, 'battery_level': 90.0}}
+        for t in range(20)
+    ]
+    records.append({'vehicle_id': 'NEXON-01', 'signals': {'coolant_temp': 'hot'}})
+    records.append({'signals': {'coolant_temp': 90.0}})
+    # Non-finite samples and timestamps are rejected before they reach the aggregates
+    records.append({'vehicle_id': 'NEXON-01', 'signals': {'coolant_temp': float('nan'), 'battery_level': float('inf')}})
+    records.append({'vehicle_id': 'NEXON-01', 'signals': {'coolant_temp': -float('inf'), 'battery_level': 10 ** 400}})
+    records.append({'vehicle_id': 'NEXON-01', 'timestamp': float('nan'), 'signals': {'coolant_temp': 90.0}})
+    result = store.ingest(records)
+    assert result['accepted'] == 40 and result['rejected'] == 7
+    
+    # Ring keeps the newest 8 samples in order, aggregates cover all 20
+    buffer = store.get_buffer('NEXON-01', 'coolant_temp')
+    timestamps, values = buffer.recent()
+    assert list(timestamps) == [float(t) for t in range(12, 20)]
+    assert np.all(np.diff(values) == 1.0)
+    stats = buffer.aggregates()
+    assert stats['min'] == 80.0 and stats['max'] == 99.0 and stats['last'] == 99.0
+    assert stats['mean'] == 89.5 and stats['count'] == 20
+    # 70-105 C is normal: 80..99 all in range
+    assert stats['health_score'] == 100.0
+    
+    store.ingest_samples('NEXON-01', 'coolant_temp', np.arange(20.0, 40.0), np.full(20, 120.0))
+    store.ingest_samples('NEXON-01', 'coolant_temp', np.array([40.0, np.nan]), np.array([np.nan, 90.0]))
+    store.ingest_samples('NEXON-01', 'battery_soc', np.array([np.nan]), np.array([80.0]))
+    assert 'battery_soc' not in store.vehicles['NEXON-01']
+    summary = store.vehicle_summary('NEXON-01')
+    assert summary['name'] == 'TATA Nexon EV'
+    assert summary['signals']['coolant_temp']['health_score'] == 50.0
+    assert summary['health_score'] == 75.0
+    assert any('coolant_temp' in insight for insight in summary['insights'])
+    
+    snapshot = store.snapshot()
+    assert snapshot['real_time_telemetry']['total_data_points'] == 60
+    assert snapshot['real_time_telemetry']['rejected_data_points'] == 10
+    assert [v['vehicle_id'] for v in snapshot['vehicle_models']] == ['NEXON-01']
+    
+    print("✓ Telemetry Store tests passed")
+
+
+async def test_telemetry_rollups():
+    """Test multi-resolution rollups and point-budget range queries"""
+    print("Testing Telemetry Rollups...")
+    
+    import numpy as np
+    from telemetry import TelemetryStore
+    
+    store = TelemetryStore(capacity=256)
+    start = 1_699_999_200.0  # hour-aligned
+    timestamps = start + np.arange(0, 2 * 86400, 0.5)
+    values = np.tile(np.arange(10.0), len(timestamps) // 10)
+    # Deliver out of order: the second day first
+    half = len(timestamps) // 2
+    store.ingest_samples('NEXON-01', 'vehicle_speed', timestamps[half:], values[half:])
+    store.ingest_samples('NEXON-01', 'vehicle_speed', timestamps[:half], values[:half])
+    
+    # The ring buffer last received the first day, so the newest minute
+    # comes from second buckets
+    recent = store.query('NEXON-01', 'vehicle_speed', start=timestamps[-1] - 60, max_points=500)
+    assert recent['resolution'] == '1s' and recent['count'] == [2] * 61
+    
+    # One hour at a 100-point budget uses minute buckets
+    hour = store.query('NEXON-01', 'vehicle_speed', start=timestamps[-1] - 3599, end=timestamps[-1], max_points=100)
+    assert hour['resolution'] == '1m' and len(hour['timestamps']) <= 100
+    assert all(count == 120 for count in hour['count'][1:-1])
+    assert hour['min'][1] == 0.0 and hour['max'][1] == 9.0 and hour['mean'][1] == 4.5
+    
+    # Two days (including the late-delivered first day) roll up to hours
+    days = store.query('NEXON-01', 'vehicle_speed', start=start, end=timestamps[-1], max_points=1000)
+    assert days['resolution'] == '1h' and len(days['timestamps']) == 48
+    assert sum(days['count']) == len(timestamps)
+    
+    # Once filled in time order, the raw samples are served directly
+    later = timestamps[-1] + np.arange(1, 101, 0.5)
+    store.ingest_samples('NEXON-01', 'vehicle_speed', later, np.ones(len(later)))
+    recent = store.query('NEXON-01', 'vehicle_speed', start=later[-1] - 60, max_points=500)
+    assert recent['resolution'] == 'raw' and len(recent['timestamps']) == 121
+    
+    history = store.history('NEXON-01', max_points=10)
+    assert history['signals']['vehicle_speed']['resolution'] == '1h'
+    
+    print("✓ Telemetry Rollups tests passed")
+
+
+async def test_predictive_maintenance():
+    """Test vectorized degradation features, RUL model and incremental scoring"""
+    print("Testing Predictive Maintenance...")
+    
+    import numpy as np
+    from telemetry import TelemetryStore, MaintenanceScorer
+    
+    store = TelemetryStore()
+    hours = np.arange(100.0)
+    timestamps = 1_700_000_000.0 + hours * 3600.0
+    # Pads wear 0.05 mm/h from 10 mm: 3 mm threshold reached 41 h after the last sample
+    store.ingest_samples('NEXON-01', 'brake_pad_mm', timestamps, 10.0 - 0.05 * hours)
+    store.ingest_samples('NEXON-01', 'coolant_temp', timestamps, np.full(100, 90.0))
+    store.ingest_samples('ACE-07', 'oil_pressure', timestamps, 2.0 + 0.1 * np.cos(np.pi * hours))
+    store.ingest_samples('ACE-07', 'engine_rpm', timestamps, np.full(100, 2000.0))
+    
+    scorer = MaintenanceScorer(store, window=64, alpha=0.5)
+    assert scorer.refresh() == 3  # engine_rpm is not a tracked component
+    report = scorer.report()
+    assert report['fleet_summary']['rescored'] == 0
+    
+    predictions = {(p['vehicle_id'], p['signal']): p for p in report['maintenance_predictions']}
+    pads = predictions[('NEXON-01', 'brake_pad_mm')]
+    assert pads['features']['slope_per_hour'] == -0.05
+    assert abs(pads['rul_hours'] - 41.0) < 0.01 and pads['severity'] == 'Medium'
+    assert pads['confidence'] == '100%'
+    # Flat coolant never reaches its threshold
+    assert ('NEXON-01', 'coolant_temp') not in predictions
+    # Oil pressure straddles its threshold every hour
+    oil = predictions[('ACE-07', 'oil_pressure')]
+    assert oil['features']['threshold_crossings'] == 63
+    assert oil['predicted_failure'] == 'Threshold exceeded' and oil['severity'] == 'High'
+    
+    # Only the series that received samples is rescored
+    store.ingest_samples('NEXON-01', 'brake_pad_mm', timestamps[-1:] + 3600.0, [2.5])
+    assert scorer.refresh() == 1
+    rescored = scorer.predictions()[1]
+    assert rescored['signal'] == 'brake_pad_mm' and rescored['rul_hours'] < pads['rul_hours']
+    # The outlier crosses the threshold once and degrades the fit
+    assert rescored['features']['threshold_crossings'] == 1 and rescored['confidence'] == '46%'
+    
+    # RUL models are pluggable
+    class FixedRUL:
+        def predict(self, features, thresholds, directions):
+            return np.full(len(thresholds), 12.0), np.ones(len(thresholds))
+    
+    fixed = MaintenanceScorer(store, model=FixedRUL())
+    assert all(p['rul_hours'] == 12.0 and p['severity'] == 'High' for p in fixed.report()['maintenance_predictions'])
+    
+    print("✓ Predictive Maintenance tests passed")
+
+
+async def test_safety_simulator():
+    """Test Monte Carlo safety campaigns, ASIL verdicts and the job API"""
+    print("Testing Safety Simulator...")
+    
+    import time
+    from vehicle_context import StandardsChecker, SafetySimulator
+    
+    checker = StandardsChecker(CopilotConfig())
+    targets = checker.get_asil_targets('D')
+    assert targets['asil_level'] == 'ASIL-D' and targets['safety_margin'] == 1.2
+    
+    simulator = SafetySimulator(checker, workers=2, chunk_runs=500)
+    try:
+        braking = simulator.run('emergency_braking', runs=2000, seed=42)
+        assert braking['runs'] == 2000 and braking['asil_level'] == 'ASIL-D'
+        low, high = braking['metric']['mean_ci95']
+        assert low < braking['metric']['mean'] < high
+        # 2000 clean runs cannot demonstrate 1e-3 at 99% confidence
+        assert braking['failures'] == 0 and braking['verdict'] == 'INCONCLUSIVE'
+        assert braking['runs_required_for_target'] == 6629
+        
+        # Chunks carry their own seeds: worker count does not change results
+        serial = SafetySimulator(checker, workers=1, chunk_runs=500).run('emergency_braking', runs=2000, seed=42)
+        assert serial['metric'] == braking['metric']
+        
+        # A short sensor range makes the stop infeasible at speed
+        blind = simulator.run('emergency_braking', runs=1000, seed=1,
+                              params={'detection_range_m': (40.0, 1.0)})
+        assert blind['verdict'] == 'FAIL'
+        lower = blind['failure_probability_interval']['lower']
+        assert lower <= blind['failure_probability'] <= blind['failure_probability_interval']['upper']
+        
+        job_id = simulator.submit('battery_thermal', runs=1000, seed=5, asil_level='ASIL-B')
+        for _ in range(600):
+            job = simulator.job(job_id)
+            if job['status'] in ('completed', 'failed'):
+                break
+            time.sleep(0.05)
+        assert job['status'] == 'completed' and job['progress'] == 1.0
+        assert job['result']['asil_level'] == 'ASIL-B'
+        assert job['result']['metric']['max'] < 60.0
+        assert simulator.scenarios()[2]['last_result']['runs'] == 1000
+        assert simulator.job('missing') is None
+        recent = simulator.recent_jobs()
+        assert [entry['job_id'] for entry in recent] == [job_id]
+        # Snapshots are copies, not the entries worker threads update
+        recent[0]['status'] = 'edited'
+        assert simulator.job(job_id)['status'] == 'completed'
+        
+        # Parameters are checked before any work is scheduled
+        for params in ({'dt_s': 0}, {'dt_s': 1e-9}, {'duration_s': 3600.0, 'dt_s': 0.01},
+                       {'spin': 1.0}, {'speed_kmh': (30.0, float('nan'))}, {'brake_efficiency': True},
+                       {'surfaces': {'ice': (0.0, 0.1, 0.2)}}):
+            try:
+                simulator.submit('collision_avoidance', runs=10, params=params)
+                assert False, f"{params} should be rejected"
+            except ValueError:
+                pass
+        coarse = simulator.run('collision_avoidance', runs=100, seed=3,
+                               params={'dt_s': 0.05, 'surfaces': {'ice': [1.0, 0.1, 0.2]}})
+        assert coarse['runs'] == 100
+        
+        # A full queue refuses new campaigns instead of growing
+        from vehicle_context import SimulatorBusy
+        from vehicle_context import safety_simulation
+        pending_limit = safety_simulation.MAX_PENDING_JOBS
+        safety_simulation.MAX_PENDING_JOBS = 0
+        try:
+            simulator.submit('emergency_braking', runs=10)
+            assert False, "submit should refuse a full queue"
+        except SimulatorBusy:
+            pass
+        finally:
+            safety_simulation.MAX_PENDING_JOBS = pending_limit
+        assert len(simulator.recent_jobs()) == 1
+    finally:
+        simulator.shutdown()
+    
+    print("✓ Safety Simulator tests passed")
+
+
+async def test_iot_ingest():
+    """Test IoT packet parsing, per-device counters and socket ingestion"""
+    print("Testing IoT Ingest...")
+    
+    import socket
+    import time
+    from telemetry import DeviceRegistry, IoTIngestServer, encode_packet, make_frames, parse_packet, ingest_http_body
+    
+    registry = DeviceRegistry()
+    registry.register("TATA-ECU-001", "Engine Control Unit", "Test Vehicle #1")
+    frames = make_frames([1.0, 1.5, 2.0], [0x100, 0x101, 0x100], [b"\x01\x02", b"\x03", b"\x04" * 8])
+    packet = encode_packet("TATA-ECU-001", frames)
+    
+    # Frames are viewed in place; a cut packet is incomplete, not an error
+    device_id, parsed, end = parse_packet(memoryview(packet))
+    assert device_id == b"TATA-ECU-001" and end == len(packet)
+    assert parsed["id"].tolist() == [0x100, 0x101, 0x100] and parsed["dlc"].tolist() == [2, 1, 8]
+    assert parse_packet(memoryview(packet)[:-1]) is None
+    
+    assert registry.ingest_bytes(packet * 2)["accepted"] == 6
+    assert registry.ingest_bytes(b"XX" + packet[2:])["malformed"] == 1
+    bad = make_frames([3.0], [0x200], [b"\x00"])
+    bad["dlc"] = 12
+    assert registry.ingest_bytes(encode_packet("TATA-ECU-001", bad))["accepted"] == 0
+    bad = make_frames([3.0], [0x200], [b"\x00"])
+    bad["id"] = 0xFFFFFFFF
+    assert registry.ingest_bytes(encode_packet("TATA-ECU-001", bad))["accepted"] == 0
+    assert registry.invalid_frames == 2
+    result = registry.ingest_records([
+        {"device_id": "TATA-BMS-002", "id": "0x7DF", "data": "02 01 0C"},
+        {"device_id": "TATA-BMS-002", "id": "oops"},
+    ])
+    assert result == {"accepted": 1, "rejected": 1}
+    
+    # Ids outside the 29-bit range are rejected without a partial ingest
+    other = DeviceRegistry()
+    result = other.ingest_records([
+        {"device_id": "TATA-GW-003", "id": "0x100", "data": "00"},
+        {"device_id": "TATA-GW-004", "id": "0x1FFFFFFFFF", "data": "00"},
+        {"device_id": "TATA-GW-004", "id": -1, "data": "00"},
+    ])
+    assert result == {"accepted": 1, "rejected": 2}
+    try:
+        ingest_http_body(b'{"messages": 5}', "application/json", other)
+        assert False, "non-list messages should be rejected"
+    except ValueError:
+        pass
+    
+    server = IoTIngestServer(registry, "127.0.0.1", udp_port=0, tcp_port=0).start()
+    try:
+        with socket.create_connection(("127.0.0.1", server.tcp_port)) as connection:
+            stream = packet * 50
+            # Packets split across writes are reassembled
+            connection.sendall(stream[:1001])
+            time.sleep(0.05)
+            connection.sendall(stream[1001:])
+        for _ in range(100):
+            if registry.devices["TATA-ECU-001"].messages >= 156:
+                break
+            time.sleep(0.02)
+    finally:
+        server.stop()
+    
+    snapshot = registry.snapshot()
+    ecu = next(d for d in snapshot["connected_devices"] if d["device_id"] == "TATA-ECU-001")
+    assert ecu["data_points"] == 156 and ecu["errors"] == 2 and ecu["can_ids"] == 2
+    assert ecu["status"] == "Online"
+    stats = snapshot["network_stats"]
+    assert stats["total_devices"] == 2 and stats["total_messages"] == 157
+    assert stats["malformed_packets"] == 1 and stats["invalid_frames"] == 3
+    
+    print("✓ IoT ingest test passed")
+
+
+async def test_collaboration_sync():
+    """Test OT delta sync, coalesced fan-out, snapshots and incremental analysis"""
+    print("Testing Collaboration Sync...")
+    
+    import asyncio
+    import json
+    import tempfile
+    from collaboration import TextOperation, CollaborationService, SnapshotStore
+    from embedded_integration import EmbeddedAnalyzer, IncrementalAnalyzer
+    
+    # Concurrent edits converge; the earlier operation wins the tie
+    document = "int speed;\n"
+    a = TextOperation([4, "max_", 7])
+    b = TextOperation([4, "raw_", 7])
+    a_prime, b_prime = TextOperation.transform(a, b)
+    assert b_prime.apply(a.apply(document)) == a_prime.apply(b.apply(document)) == "int max_raw_speed;\n"
+    assert a.compose(TextOperation([8, -5, 2])).apply(document) == "int max_;\n"
+    
+    analyzer = IncrementalAnalyzer(EmbeddedAnalyzer(CopilotConfig()))
+    code = "void a(void) {\n    x = 1;\n}\n\nvoid b(void) {\n    y = malloc(4);\n}\n"
+    first = await analyzer.analyze(code)
+    assert first['reanalyzed_regions'] == 2 and first['metrics']['dynamic_allocations'] == 1
+    assert first['regions'][1]['function'] == 'b' and first['regions'][1]['start_line'] == 4
+    edited = await analyzer.analyze(code.replace("x = 1", "x = 2"))
+    assert edited['reanalyzed_regions'] == 1 and edited['warnings'] == first['warnings']
+    # Documents analyzed in turn keep their regions cached
+    other = "void c(void) {\n    z = 3;\n}\n"
+    assert (await analyzer.analyze(other))['reanalyzed_regions'] == 1
+    assert (await analyzer.analyze(code))['reanalyzed_regions'] == 0
+    
+    store = SnapshotStore(tempfile.mkdtemp())
+    service = CollaborationService(analyzer, store, coalesce_s=0.02, analysis_interval_s=0.05)
+    inboxes = {}
+    
+    def sender(name):
+        inboxes[name] = []
+        async def send(text):
+            inboxes[name].append(json.loads(text))
+        return send
+    
+    alice = await service.join("review", "alice", sender("alice"), "Brake Controller")
+    bob = await service.join("review", "bob", sender("bob"))
+    await service.handle("review", alice, {"type": "op", "revision": 0, "seq": 1, "op": [code]})
+    await asyncio.sleep(0.05)
+    # Ten keystrokes from alice and a concurrent edit from bob
+    for i in range(10):
+        await service.handle("review", alice, {"type": "op", "revision": 1 + i, "seq": 2 + i,
+                                               "op": [14 + i, "z", len(code) - 14]})
+    await service.handle("review", bob, {"type": "op", "revision": 1, "seq": 1, "op": [len(code), "// end\n"]})
+    await asyncio.sleep(0.2)
+    
+    batches = [m for m in inboxes["bob"] if m["type"] == "ops"]
+    assert len(batches) == 2
+    changes = batches[1]["changes"]
+    assert [(c["client"], c["seq"]) for c in changes] == [(alice, 11), (bob, 1)]
+    replica = ""
+    for batch in batches:
+        for change in batch["changes"]:
+            replica = TextOperation(change["op"]).apply(replica)
+    assert replica == service.sessions["review"].session.document
+    assert replica.startswith("void a(void) {zzzzzzzzzz\n") and replica.endswith("}\n// end\n")
+    assert any(m["type"] == "analysis" and m["revision"] == 12 for m in inboxes["alice"])
+    
+    await service.leave("review", alice)
+    await service.leave("review", bob)
+    assert store.load("review")["revision"] == 12 and "review" not in service.sessions
+    
+    # Someone joining while the last participant's flush is awaited keeps the session
+    alice = await service.join("review", "alice", sender("alice"))
+    flush = service._flush
+    async def slow_flush(state):
+        await asyncio.sleep(0.01)
+        await flush(state)
+    service._flush = slow_flush
+    leaving = asyncio.ensure_future(service.leave("review", alice))
+    await asyncio.sleep(0)
+    carol = await service.join("review", "carol", sender("carol"))
+    await leaving
+    service._flush = flush
+    assert "review" in service.sessions
+    await service.handle("review", carol, {"type": "op", "revision": 12, "seq": 1, "op": [len(replica), "//\n"]})
+    assert service.sessions["review"].session.revision == 13
+    await service.leave("review", carol)
+    
+    print("✓ Collaboration sync test passed")
+
+
+async def test_metrics_registry():
+    """Test counters, latency histograms, Prometheus output and analytics"""
+    print("Testing Metrics Registry...")
+    
+    import threading
+    from ai_copilot.metrics import MetricsRegistry, HTTPMetrics, ProcessMetrics, normalize_path
+    
+    registry = MetricsRegistry()
+    ProcessMetrics(registry)
+    metrics = HTTPMetrics(registry)
+    assert normalize_path('/api/safety-simulator/jobs/1a2b3c4d5e6f?x=1') == '/api/safety-simulator/jobs/:id'
+    
+    # Per-thread cells add up across concurrent writers
+    def serve(count):
+        for _ in range(count):
+            metrics.observe('GET', '/api/status', 200, 0.004, '10.0.0.1')
+    threads = [threading.Thread(target=serve, args=(500,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.observe('POST', '/api/generate-code', 500, 0.2, '10.0.0.2')
+    
+    assert metrics.count('/api/status', 'GET') == 2000
+    assert metrics.count('/api/generate-code') == 0
+    assert metrics.count('/api/generate-code', successful=False) == 1
+    
+    analytics = metrics.analytics()
+    performance = analytics['performance_metrics']
+    assert performance['requests_total'] == 2001
+    assert 2.5 <= performance['p50_response_time_ms'] <= 5.0
+    assert abs(performance['mean_response_time_ms'] - 4.1) < 0.01
+    assert abs(performance['error_rate'] - 1 / 2001) < 1e-4
+    assert analytics['real_time_data']['concurrent_users'] == 2
+    assert analytics['real_time_data']['resident_memory_mb'] > 0
+    assert analytics['usage_statistics']['top_endpoints'][0] == {'endpoint': 'GET /api/status', 'requests': 2000}
+    
+    text = registry.render_prometheus()
+    assert 'http_requests_total{method="GET",path="/api/status",status="200"} 2000' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",path="/api/status",le="+Inf"} 2000' in text
+    assert '# TYPE process_resident_memory_bytes gauge' in text
+    
+    # Unmatched routes, unknown methods and routes past the cap share labels
+    metrics.observe('GET', None, 404, 0.001)
+    metrics.observe('BREW', '/api/status', 200, 0.001)
+    for index in range(HTTPMetrics.MAX_ROUTES + 10):
+        metrics.observe('GET', f'/static/file-{index}.css', 200, 0.001)
+    routes = {path for (_, path, _), _ in metrics.requests.children()}
+    assert len(routes) == HTTPMetrics.MAX_ROUTES + 1 and '<unmatched>' in routes
+    assert metrics.count('/api/status', 'OTHER') == 1
+    
+    print("✓ Metrics registry test passed")
+
+
+async def test_knowledge_retrieval():
+    """Test the BM25 knowledge index, its persistence and the answer cache"""
+    print("Testing Knowledge Retrieval...")
+    
+    import tempfile
+    from ai_copilot.retrieval import Passage, QAEngine, LazyQAEngine, build_knowledge_corpus, normalize_question
+    
+    curated = Passage(
+        id="answer:brake", title="Brake systems", source="test", kind="answer",
+        text="Brake systems need redundant wheel speed sensors and fail-safe ABS control.",
+        topics=["Sensor Redundancy"], code="int brake_init(void);",
+    )
+    passages = build_knowledge_corpus(CopilotConfig(), extra=[curated])
+    assert any(p.id == "ecu:brake" for p in passages)
+    assert any(p.id == "protocol:FlexRay" for p in passages)
+    assert any(p.id == "standard:ISO26262" for p in passages)
+    assert any(p.kind == "code" and p.code for p in passages)
+    assert any(p.kind == "doc" for p in passages)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "qa_index.npz"
+        engine = QAEngine.load_or_build(path, passages)
+        assert path.exists()
+        
+        answer = engine.answer("How do I implement ABS braking with redundant sensors?")
+        assert answer["passages"][0]["id"] == "answer:brake"
+        assert answer["code_example"] == "int brake_init(void);"
+        assert "Sensor Redundancy" in answer["related_topics"]
+        assert 0.5 < answer["confidence"] < 1.0 and not answer["cached"]
+        
+        # Knowledge-base passages answer questions no curated answer covers
+        flexray = engine.answer("What is FlexRay used for?")
+        assert flexray["passages"][0]["id"] == "protocol:FlexRay"
+        assert engine.answer("xyzzy plugh") is None
+        
+        # Same terms in another order and case hit the cache
+        assert normalize_question("Redundant sensors: ABS braking?") == normalize_question("abs BRAKING redundant sensor")
+        again = engine.answer("ABS braking with redundant sensors - how do I implement it")
+        assert again["cached"] and again["answer"] == answer["answer"]
+        assert engine.stats()["cache_hits"] == 1
+        
+        # A saved index is reused for the same corpus and rebuilt for a changed one
+        reloaded = QAEngine.load_or_build(path, passages)
+        assert reloaded.answer("What is FlexRay used for?")["passages"] == flexray["passages"]
+        changed = QAEngine.load_or_build(path, passages[1:])
+        assert changed.answer("ABS braking redundant sensors")["passages"][0]["id"] != "answer:brake"
+        
+        # A lazy engine builds nothing and writes no index until first used
+        lazy_path = Path(tmp) / "lazy_index.npz"
+        lazy = LazyQAEngine(lazy_path, lambda: passages)
+        assert not lazy_path.exists()
+        assert lazy.answer("What is FlexRay used for?")["passages"] == flexray["passages"]
+        assert lazy_path.exists() and lazy.get() is lazy.get()
+    
+    print("✓ Knowledge retrieval test passed")
+
+
 async def test_vehicle_context():
     """Test vehicle context manager"""
     print("Testing Vehicle Context Manager...")
@@ -219,8 +1662,33 @@ async def main():
     try:
         await test_configuration()
         await test_code_generator()
+        await test_code_formatter()
+        await test_template_engine()
+        await test_project_generator()
         await test_code_validator()
+        await test_code_fixups()
+        await test_generation_pipeline()
         await test_embedded_analyzer()
+        await test_finding_model()
+        await test_analysis_output()
+        await test_rule_engine()
+        await test_rule_profiles()
+        await test_analysis_cache()
+        await test_wcet_estimator()
+        await test_footprint_estimator()
+        await test_can_bus_simulator()
+        await test_signal_database()
+        await test_can_log_replay()
+        await test_flexray_scheduler()
+        await test_lin_schedule()
+        await test_telemetry_store()
+        await test_telemetry_rollups()
+        await test_predictive_maintenance()
+        await test_safety_simulator()
+        await test_iot_ingest()
+        await test_collaboration_sync()
+        await test_metrics_registry()
+        await test_knowledge_retrieval()
         await test_vehicle_context()
         await test_integration()
         
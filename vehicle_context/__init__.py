@@ -8,5 +8,27 @@ and vehicle-specific context understanding for the AI co-pilot.
 from .context_manager import VehicleContextManager
 from .protocols import ProtocolManager
 from .standards import StandardsChecker
+from .can_bus import CANBusSimulator, CANMessageSet
+from .signal_db import SignalDatabase, DBCPathError, load_signal_database, resolve_dbc_path
+from .can_log import CANLogReader, CANLogAnalyzer
+from .flexray import FlexRayScheduler
+from .lin import LINScheduleGenerator
+from .safety_simulation import SafetySimulator, SimulatorBusy
 
-__all__ = ["VehicleContextManager", "ProtocolManager", "StandardsChecker"]
+__all__ = [
+    "VehicleContextManager",
+    "ProtocolManager",
+    "StandardsChecker",
+    "CANBusSimulator",
+    "CANMessageSet",
+    "SignalDatabase",
+    "DBCPathError",
+    "load_signal_database",
+    "resolve_dbc_path",
+    "CANLogReader",
+    "CANLogAnalyzer",
+    "FlexRayScheduler",
+    "LINScheduleGenerator",
+    "SafetySimulator",
+    "SimulatorBusy",
+]
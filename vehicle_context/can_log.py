@@ -0,0 +1,601 @@
+"""
+Streaming CAN log replay and signal decoding
+
+Reads CAN traces in fixed-size chunks into NumPy record arrays that mirror
+the ``can_message_t`` frame structure, decodes signals with the bit layout
+of a SignalDatabase and aggregates per-signal statistics and bus load per
+time window. Only one chunk is held in memory at a time, so trace size is
+bounded by disk rather than RAM.
+
+Supported formats: CSV (timestamp, id, dlc, data) and candump log files
+natively; ASC and BLF (and other python-can formats) via the optional
+``python-can`` package.
+"""
+
+import csv
+from typing import Dict, List, Optional, Any, Iterator, Sequence, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .can_bus import CANBusSimulator, CANMessageSet
+from .signal_db import SignalDatabase, MUX_SELECTOR
+
+
+DEFAULT_CHUNK_SIZE = 32768
+# Bus load windows kept per replay; frames past the last window are flagged
+MAX_WINDOWS = 86400
+# Windows behind the newest one that stay open for slightly reordered frames
+REORDER_WINDOWS = 1
+
+
+def can_frame_dtype(max_data_length: int = 8) -> np.dtype:
+    """Record layout of one logged frame (``can_message_t`` plus timestamp and flags)"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("id", "<u4"),
+        ("dlc", "u1"),
+        ("extended", "?"),
+        ("fd", "?"),
+        ("data", "u1", (max_data_length,)),
+    ])
+
+
+# ASCII hex digit -> nibble value
+_HEX_LUT = np.zeros(256, dtype=np.uint8)
+for _digit in b"0123456789":
+    _HEX_LUT[_digit] = _digit - ord("0")
+for _digit in b"abcdef":
+    _HEX_LUT[_digit] = _digit - ord("a") + 10
+    _HEX_LUT[_digit - 32] = _digit - ord("a") + 10
+
+
+def _hex_payloads(payloads: Sequence[str], width: int) -> np.ndarray:
+    """Decode hex payload strings into an (n, width) byte matrix in one pass"""
+    padded = b"".join(
+        payload.replace(" ", "").encode("ascii")[:2 * width].ljust(2 * width, b"0")
+        for payload in payloads
+    )
+    nibbles = _HEX_LUT[np.frombuffer(padded, dtype=np.uint8)].reshape(len(payloads), width, 2)
+    return (nibbles[:, :, 0] << 4) | nibbles[:, :, 1]
+
+
+class CANLogReader:
+    """
+    Chunked CAN trace reader
+
+    Iterating yields record arrays of at most ``chunk_size`` frames with
+    the dtype from :func:`can_frame_dtype`.
+    """
+
+    def __init__(self, path: str, log_format: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_data_length: int = 8):
+        self.path = Path(path)
+        self.log_format = (log_format or self._detect_format(self.path)).lower()
+        self.chunk_size = chunk_size
+        self.dtype = can_frame_dtype(max_data_length)
+        self.max_data_length = max_data_length
+
+    @staticmethod
+    def _detect_format(path: Path) -> str:
+        suffix = path.suffix.lower().lstrip(".")
+        if suffix in ("log", "candump"):
+            return "candump"
+        return suffix or "csv"
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self.log_format == "csv":
+            return self._read_csv()
+        if self.log_format == "candump":
+            return self._read_candump()
+        return self._read_python_can()
+
+    def _build_chunk(self, timestamps: List[float], ids: List[int], dlcs: List[int],
+                     extended: List[bool], fd: List[bool], payloads: List[str]) -> np.ndarray:
+        chunk = np.zeros(len(ids), dtype=self.dtype)
+        chunk["timestamp"] = timestamps
+        chunk["id"] = ids
+        # A frame logged with fewer bytes than its DLC only carries what was received
+        received = [len(payload.replace(" ", "")) // 2 for payload in payloads]
+        chunk["dlc"] = np.minimum(np.minimum(dlcs, received), self.max_data_length)
+        chunk["extended"] = extended
+        chunk["fd"] = fd
+        chunk["data"] = _hex_payloads(payloads, self.max_data_length)
+        return chunk
+
+    def _read_csv(self) -> Iterator[np.ndarray]:
+        """CSV with a header naming timestamp, id, dlc and data (hex) columns"""
+        with open(self.path, newline="") as handle:
+            reader = csv.reader(handle)
+            header = [column.strip().lower() for column in next(reader, [])]
+            try:
+                columns = [header.index(name) for name in ("timestamp", "id", "data")]
+            except ValueError:
+                raise ValueError(f"{self.path}: CSV logs need timestamp, id and data columns")
+            dlc_column = header.index("dlc") if "dlc" in header else None
+
+            batch = ([], [], [], [], [], [])
+            for row in reader:
+                if not row:
+                    continue
+                try:
+                    payload = row[columns[2]].replace(" ", "")
+                    frame_id = int(row[columns[1]], 16)
+                    dlc = int(row[dlc_column]) if dlc_column is not None else len(payload) // 2
+                    timestamp = float(row[columns[0]])
+                except (IndexError, ValueError) as e:
+                    raise ValueError(f"{self.path}:{reader.line_num}: malformed CAN frame row") from e
+                batch[0].append(timestamp)
+                batch[1].append(frame_id)
+                batch[2].append(dlc)
+                batch[3].append(frame_id > 0x7FF)
+                batch[4].append(dlc > 8)
+                batch[5].append(payload)
+                if len(batch[1]) >= self.chunk_size:
+                    yield self._build_chunk(*batch)
+                    batch = ([], [], [], [], [], [])
+            if batch[1]:
+                yield self._build_chunk(*batch)
+
+    def _read_candump(self) -> Iterator[np.ndarray]:
+        """candump -l format: '(1436509052.249713) can0 123#DEADBEEF'"""
+        with open(self.path) as handle:
+            batch = ([], [], [], [], [], [])
+            for line_number, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line.startswith("("):
+                    continue
+                stamp, _, rest = line.partition(")")
+                try:
+                    frame = rest.split()[-1]
+                    identifier, _, payload = frame.partition("#")
+                    if payload.startswith("R"):
+                        continue  # remote frames carry no signal data
+                    is_fd = payload.startswith("#")
+                    if is_fd:
+                        payload = payload[2:]  # skip the FD flags nibble
+                    timestamp = float(stamp[1:])
+                    frame_id = int(identifier, 16)
+                except (IndexError, ValueError) as e:
+                    raise ValueError(f"{self.path}:{line_number}: malformed candump line") from e
+                batch[0].append(timestamp)
+                batch[1].append(frame_id)
+                batch[2].append(len(payload) // 2)
+                batch[3].append(len(identifier) > 3)
+                batch[4].append(is_fd)
+                batch[5].append(payload)
+                if len(batch[1]) >= self.chunk_size:
+                    yield self._build_chunk(*batch)
+                    batch = ([], [], [], [], [], [])
+            if batch[1]:
+                yield self._build_chunk(*batch)
+
+    def _read_python_can(self) -> Iterator[np.ndarray]:
+        """ASC, BLF and other formats supported by python-can"""
+        try:
+            import can
+        except ImportError as e:
+            raise ImportError(
+                f"python-can is required to read .{self.log_format} logs (pip install python-can)"
+            ) from e
+
+        chunk = np.zeros(self.chunk_size, dtype=self.dtype)
+        count = 0
+        for message in can.LogReader(str(self.path)):
+            if message.is_error_frame or message.is_remote_frame:
+                continue
+            length = min(len(message.data), self.max_data_length)
+            record = chunk[count]
+            record["timestamp"] = message.timestamp
+            record["id"] = message.arbitration_id
+            record["dlc"] = length
+            record["extended"] = message.is_extended_id
+            record["fd"] = getattr(message, "is_fd", False)
+            record["data"][:length] = message.data[:length]
+            count += 1
+            if count == self.chunk_size:
+                yield chunk
+                chunk = np.zeros(self.chunk_size, dtype=self.dtype)
+                count = 0
+        if count:
+            yield chunk[:count]
+
+
+@dataclass
+class _MessageLayout:
+    """Precomputed decode plan for one database message"""
+    signal_indices: np.ndarray
+    positions: np.ndarray
+    weights: np.ndarray
+    starts: np.ndarray
+    lengths: np.ndarray
+    signed: np.ndarray
+    is_float: np.ndarray
+    scale: np.ndarray
+    offset: np.ndarray
+    mux: np.ndarray
+    selector: Optional[int]
+    payload_bytes: np.ndarray
+
+
+class SignalDecoder:
+    """
+    Vectorized signal decoder for chunks of raw frames
+
+    Frames are grouped by message; each group is unpacked to a bit matrix
+    and all signals of the message are assembled with one gather and one
+    segmented sum.
+    """
+
+    def __init__(self, database: SignalDatabase):
+        self.database = database
+        self._layouts: Dict[int, _MessageLayout] = {}
+
+    def layout(self, message_index: int) -> _MessageLayout:
+        layout = self._layouts.get(message_index)
+        if layout is None:
+            database = self.database
+            signal_indices = database.message_signals(message_index)
+            signals = database.signals[signal_indices]
+            _, value_bit, positions = database.bit_positions(signal_indices)
+            lengths = signals["length"].astype(np.int64)
+            selector = np.flatnonzero(signals["mux"] == MUX_SELECTOR)
+
+            layout = _MessageLayout(
+                signal_indices=signal_indices,
+                positions=positions,
+                weights=np.left_shift(np.uint64(1), value_bit.astype(np.uint64)),
+                starts=np.cumsum(lengths) - lengths,
+                lengths=lengths,
+                signed=signals["signed"].copy(),
+                is_float=signals["is_float"].copy(),
+                scale=signals["scale"].copy(),
+                offset=signals["offset"].copy(),
+                mux=signals["mux"].copy(),
+                selector=int(selector[0]) if len(selector) else None,
+                payload_bytes=(np.maximum.reduceat(positions, np.cumsum(lengths) - lengths) // 8 + 1
+                               if len(lengths) else np.zeros(0, dtype=np.int64)),
+            )
+            self._layouts[message_index] = layout
+        return layout
+
+    def decode(self, data: np.ndarray, message_index: int,
+               dlc: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Decode frames of one message
+
+        Args:
+            data: (frames, bytes) payload matrix
+            message_index: Database message index
+            dlc: Received payload length of each frame (default: all of data)
+
+        Returns:
+            Tuple of (signal indices, physical values (frames, signals),
+            validity mask (frames, signals) for multiplexed signals and
+            signals that end beyond the received payload)
+        """
+        layout = self.layout(message_index)
+        frames = len(data)
+        if not len(layout.signal_indices):
+            empty = np.zeros((frames, 0))
+            return layout.signal_indices, empty, empty.astype(bool)
+
+        bits = np.unpackbits(data, axis=1, bitorder="little")
+        # Bits beyond the payload read as zero (and are flagged by validate())
+        positions = np.minimum(layout.positions, bits.shape[1] - 1)
+        in_payload = layout.positions < bits.shape[1]
+        gathered = bits[:, positions].astype(np.uint64) * (layout.weights * in_payload)
+        raw = np.add.reduceat(gathered, layout.starts, axis=1)
+
+        values = raw.astype(np.float64)
+        signed = np.flatnonzero(layout.signed & ~layout.is_float)
+        if len(signed):
+            lengths = layout.lengths[signed]
+            negative = (raw[:, signed] >> (lengths - 1).astype(np.uint64)) & np.uint64(1)
+            values[:, signed] -= negative * np.ldexp(1.0, lengths)
+
+        for column in np.flatnonzero(layout.is_float):
+            if layout.lengths[column] == 32:
+                values[:, column] = raw[:, column].astype(np.uint32).view(np.float32)
+            else:
+                values[:, column] = raw[:, column].view(np.float64)
+
+        values = values * layout.scale + layout.offset
+
+        valid = np.ones(values.shape, dtype=bool)
+        if layout.selector is not None:
+            muxed = np.flatnonzero(layout.mux >= 0)
+            selector = raw[:, layout.selector]
+            valid[:, muxed] = selector[:, None] == layout.mux[muxed].astype(np.uint64)[None, :]
+        if dlc is not None:
+            valid &= dlc[:, None] >= layout.payload_bytes[None, :]
+
+        return layout.signal_indices, values, valid
+
+
+class _WindowTotals:
+    """
+    Bus time and frame count per time window
+
+    Only windows that received frames are stored. Windows more than
+    REORDER_WINDOWS behind the newest one are flushed to compact lists
+    after each chunk, so the open set stays small and frames that arrive
+    for a flushed window can be flagged as out of order.
+    """
+
+    def __init__(self):
+        self.open: Dict[int, List[float]] = {}
+        self.flushed: List[Tuple[int, float, int]] = []
+        self.flushed_through = -1
+
+    def add(self, window: np.ndarray, busy_s: np.ndarray) -> None:
+        if not len(window):
+            return
+        indices, inverse = np.unique(window, return_inverse=True)
+        busy = np.bincount(inverse, weights=busy_s)
+        frames = np.bincount(inverse)
+        for index, seconds, count in zip(indices.tolist(), busy.tolist(), frames.tolist()):
+            entry = self.open.setdefault(index, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+
+    def flush(self, before: int) -> None:
+        for index in sorted(index for index in self.open if index < before):
+            seconds, count = self.open.pop(index)
+            self.flushed.append((index, seconds, count))
+        self.flushed_through = max(self.flushed_through, before - 1)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense (busy seconds, frame count) arrays from window 0 to the last one used"""
+        self.flush(max(self.open, default=-1) + 1)
+        size = self.flushed[-1][0] + 1 if self.flushed else 0
+        busy = np.zeros(size)
+        frames = np.zeros(size, dtype=np.int64)
+        for index, seconds, count in self.flushed:
+            busy[index] = seconds
+            frames[index] = count
+        return busy, frames
+
+
+@dataclass
+class LogAnalysis:
+    """Aggregated results of a log replay"""
+    frame_count: int
+    unknown_frame_count: int
+    start_time: float
+    end_time: float
+    window_s: float
+    baudrate: int
+    window_bus_load: np.ndarray
+    window_frame_count: np.ndarray
+    signal_stats: Dict[str, Dict[str, Any]]
+    message_counts: Dict[str, int] = field(default_factory=dict)
+    out_of_order_frame_count: int = 0
+    out_of_range_frame_count: int = 0
+
+    @property
+    def duration_s(self) -> float:
+        return max(self.end_time - self.start_time, 0.0)
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly summary"""
+        load = self.window_bus_load
+        return {
+            "frame_count": self.frame_count,
+            "unknown_frame_count": self.unknown_frame_count,
+            "out_of_order_frame_count": self.out_of_order_frame_count,
+            "out_of_range_frame_count": self.out_of_range_frame_count,
+            "duration_s": round(self.duration_s, 6),
+            "baudrate": self.baudrate,
+            "window_s": self.window_s,
+            "bus_load_percent": {
+                "mean": round(100.0 * float(load.mean()), 2) if len(load) else 0.0,
+                "peak": round(100.0 * float(load.max()), 2) if len(load) else 0.0,
+                "windows": [round(100.0 * float(value), 2) for value in load],
+            },
+            "message_counts": self.message_counts,
+            "signals": self.signal_stats,
+        }
+
+
+class CANLogAnalyzer:
+    """
+    Streams a CAN trace through the decoder and aggregates statistics
+
+    Per-signal count/min/max/mean/std are merged chunk by chunk (parallel
+    variance), and frame bits (including worst-case stuffing) are summed
+    per time window to give bus load over time. Frames stamped before the
+    first frame, beyond ``max_windows`` windows after it, or not finite are
+    counted as out of range; frames older than the newest frame are counted
+    as out of order. Out-of-range frames add no bus load, and neither do
+    out-of-order frames whose window has already been flushed.
+    """
+
+    def __init__(self, database: SignalDatabase, protocol_specs: Dict[str, Dict[str, Any]],
+                 baudrate: Optional[int] = None, data_baudrate: Optional[int] = None,
+                 window_s: float = 1.0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_windows: int = MAX_WINDOWS):
+        self.database = database
+        self.decoder = SignalDecoder(database)
+        self.simulator = CANBusSimulator(protocol_specs)
+        self.protocol_specs = protocol_specs
+        self.baudrate = baudrate or 500000
+        fd_spec = protocol_specs.get("CAN-FD", {})
+        self.data_baudrate = data_baudrate or max(fd_spec.get("data_baudrates", [2000000]))
+        self.window_s = window_s
+        self.chunk_size = chunk_size
+        self.max_windows = max_windows
+
+    def analyze(self, log_path: str, log_format: Optional[str] = None,
+                signals: Optional[Sequence[str]] = None) -> LogAnalysis:
+        """
+        Replay a log file
+
+        Args:
+            log_path: Trace file path
+            log_format: 'csv', 'candump', 'asc', 'blf' (default: from the suffix)
+            signals: Signal names to report (default: all signals seen)
+
+        Returns:
+            LogAnalysis with bus load per window and signal statistics
+        """
+        database = self.database
+        # Frames are stored at the widest payload the database decodes
+        max_length = 8
+        if database.message_count and int(database.messages["dlc"].max()) > 8:
+            max_length = 64
+        reader = CANLogReader(log_path, log_format, self.chunk_size, max_data_length=max_length)
+
+        signal_count = database.signal_count
+        count = np.zeros(signal_count, dtype=np.int64)
+        mean = np.zeros(signal_count)
+        m2 = np.zeros(signal_count)
+        minimum = np.full(signal_count, np.inf)
+        maximum = np.full(signal_count, -np.inf)
+        message_counts = np.zeros(database.message_count, dtype=np.int64)
+
+        windows = _WindowTotals()
+        frame_count = 0
+        unknown = 0
+        out_of_order = 0
+        out_of_range = 0
+        start_time = None
+        end_time = -np.inf
+
+        for chunk in reader:
+            if not len(chunk):
+                continue
+            timestamps = chunk["timestamp"]
+            frame_count += len(chunk)
+            if start_time is None:
+                finite = np.flatnonzero(np.isfinite(timestamps))
+                if len(finite):
+                    start_time = float(timestamps[finite[0]])
+
+            # Bus time per frame, binned into windows within the trace span
+            with np.errstate(invalid="ignore"):
+                offset = (timestamps - start_time) / self.window_s if start_time is not None else timestamps
+                in_range = np.isfinite(offset) & (offset >= 0) & (offset < self.max_windows)
+            out_of_range += int(len(chunk) - in_range.sum())
+            window = np.where(in_range, offset, 0).astype(np.int64)
+            latest = np.maximum.accumulate(np.where(in_range, timestamps, -np.inf))
+            previous = np.concatenate(([end_time], latest[:-1]))
+            backwards = in_range & (timestamps < previous)
+            late = in_range & (window <= windows.flushed_through)
+            out_of_order += int((backwards | late).sum())
+            binned = np.flatnonzero(in_range & ~late)
+            if binned.size:
+                windows.add(window[binned], self._frame_time_s(chunk[binned]))
+                end_time = max(end_time, float(latest[-1]))
+                windows.flush(int(window[binned].max()) - REORDER_WINDOWS)
+
+            # Group frames by message and decode each group at once
+            message_index = database.message_indices(chunk["id"])
+            unknown += int((message_index < 0).sum())
+            known = np.flatnonzero(message_index >= 0)
+            order = known[np.argsort(message_index[known], kind="stable")]
+            groups, group_starts, group_sizes = np.unique(
+                message_index[order], return_index=True, return_counts=True
+            )
+            message_counts[groups] += group_sizes
+
+            for message, start, size in zip(groups, group_starts, group_sizes):
+                rows = order[start:start + size]
+                signal_indices, values, valid = self.decoder.decode(
+                    chunk["data"][rows], int(message), chunk["dlc"][rows]
+                )
+                if not len(signal_indices):
+                    continue
+                self._merge_stats(signal_indices, values, valid, count, mean, m2, minimum, maximum)
+
+        window_busy_s, window_frames = windows.arrays()
+        utilization = window_busy_s / self.window_s
+
+        if signals is not None:
+            selected = [index for name in signals for index in database.find_signals(name)]
+        else:
+            selected = np.flatnonzero(count > 0)
+
+        signal_stats = {}
+        for signal_index in selected:
+            signal_index = int(signal_index)
+            message_name = database.message_name(int(database.signals["message"][signal_index]))
+            name = database.signal_name(signal_index)
+            key = name if name not in signal_stats else f"{message_name}.{name}"
+            samples = int(count[signal_index])
+            signal_stats[key] = {
+                "message": message_name,
+                "unit": database.string(int(database.signals["unit"][signal_index])),
+                "count": samples,
+                "min": float(minimum[signal_index]) if samples else None,
+                "max": float(maximum[signal_index]) if samples else None,
+                "mean": float(mean[signal_index]) if samples else None,
+                "std": float(np.sqrt(m2[signal_index] / samples)) if samples else None,
+            }
+
+        return LogAnalysis(
+            frame_count=frame_count,
+            unknown_frame_count=unknown,
+            start_time=start_time or 0.0,
+            end_time=end_time if np.isfinite(end_time) else start_time or 0.0,
+            window_s=self.window_s,
+            baudrate=self.baudrate,
+            window_bus_load=utilization,
+            window_frame_count=window_frames,
+            signal_stats=signal_stats,
+            message_counts={
+                database.message_name(int(index)): int(message_counts[index])
+                for index in np.flatnonzero(message_counts)
+            },
+            out_of_order_frame_count=out_of_order,
+            out_of_range_frame_count=out_of_range,
+        )
+
+    def _frame_time_s(self, chunk: np.ndarray) -> np.ndarray:
+        """Worst-case on-bus time of each logged frame"""
+        frames = CANMessageSet(
+            ids=chunk["id"].astype(np.int64),
+            payload_bytes=chunk["dlc"].astype(np.int64),
+            period_ms=np.ones(len(chunk)),
+            extended=chunk["extended"],
+            jitter_ms=np.zeros(len(chunk)),
+            deadline_ms=np.ones(len(chunk)),
+        )
+        classical = self.simulator.frame_bits(frames, "CAN")["nominal"] / self.baudrate
+        fd = chunk["fd"]
+        if not fd.any():
+            return classical
+        fd_bits = self.simulator.frame_bits(frames, "CAN-FD")
+        fd_time = fd_bits["nominal"] / self.baudrate + fd_bits["data"] / self.data_baudrate
+        return np.where(fd, fd_time, classical)
+
+    @staticmethod
+    def _merge_stats(signal_indices, values, valid, count, mean, m2, minimum, maximum) -> None:
+        """Merge chunk statistics into running totals (Chan et al. parallel variance)"""
+        chunk_count = valid.sum(axis=0)
+        present = chunk_count > 0
+        if not present.any():
+            return
+        if not valid.all():
+            masked = np.where(valid, values, np.nan)
+            chunk_mean = np.nanmean(masked[:, present], axis=0)
+            chunk_m2 = np.nansum((masked[:, present] - chunk_mean) ** 2, axis=0)
+            chunk_min = np.nanmin(masked[:, present], axis=0)
+            chunk_max = np.nanmax(masked[:, present], axis=0)
+        else:
+            chunk_mean = values.mean(axis=0)
+            chunk_m2 = ((values - chunk_mean) ** 2).sum(axis=0)
+            chunk_min = values.min(axis=0)
+            chunk_max = values.max(axis=0)
+
+        target = signal_indices[present]
+        n_a = count[target].astype(np.float64)
+        n_b = chunk_count[present].astype(np.float64)
+        total = n_a + n_b
+        delta = chunk_mean - mean[target]
+        mean[target] += delta * n_b / total
+        m2[target] += chunk_m2 + delta ** 2 * n_a * n_b / total
+        count[target] += chunk_count[present]
+        np.minimum.at(minimum, target, chunk_min)
+        np.maximum.at(maximum, target, chunk_max)
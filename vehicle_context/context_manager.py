@@ -334,18 +334,19 @@ class VehicleContextManager:
             "suggestions": []
         }
         
-        # Check AUTOSAR compliance
-        autosar_results = await self.standards_checker.check_autosar_compliance(code)
-        compliance_results["autosar_compliance"] = autosar_results
-        
-        # Check ISO 26262 compliance
-        iso26262_results = await self.standards_checker.check_iso26262_compliance(code)
-        compliance_results["iso26262_compliance"] = iso26262_results
+        # One evaluation of the AUTOSAR, ISO 26262 and protocol rules
+        protocols = self._identify_protocols(code)
+        known = [protocol for protocol in protocols if protocol in self.protocol_manager.protocols]
+        results = await self.standards_checker.check_compliance(code, ["AUTOSAR", "ISO26262"] + known)
+        compliance_results["autosar_compliance"] = results["AUTOSAR"]
+        compliance_results["iso26262_compliance"] = results["ISO26262"]
         
         # Check protocol-specific compliance
-        protocols = self._identify_protocols(code)
         for protocol in protocols:
-            protocol_results = await self.protocol_manager.check_protocol_compliance(code, protocol)
+            if protocol in results:
+                protocol_results = results[protocol]
+            else:
+                protocol_results = await self.protocol_manager.check_protocol_compliance(code, protocol)
             compliance_results["protocol_compliance"].append({
                 "protocol": protocol,
                 "results": protocol_results
@@ -0,0 +1,260 @@
+"""
+FlexRay static-segment schedule synthesis
+
+Packs periodic frames into static slots using cycle multiplexing (base
+cycle + power-of-two cycle repetition over the 64-cycle matrix), reports
+slot utilization and sampling jitter, and emits the schedule as C tables.
+"""
+
+import re
+from typing import Dict, List, Optional, Any, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+CYCLE_COUNT = 64
+REPETITIONS = np.array([1, 2, 4, 8, 16, 32, 64])
+
+# Frame overhead: 5-byte header, 3-byte trailer, 10 bits per byte with the
+# byte start sequence, plus TSS, FSS, FES and channel idle delimiter bits
+_HEADER_TRAILER_BYTES = 8
+_FRAME_FRAMING_BITS = 5 + 1 + 2 + 11
+_ACTION_POINT_US = 1.0
+
+# Bit-reversal of 6-bit cycle offsets: an aligned block of 64/r offsets maps
+# to the cycles {c : c % r == base} for that block
+_BIT_REVERSE = np.array([int(f"{value:06b}"[::-1], 2) for value in range(CYCLE_COUNT)])
+
+
+@dataclass
+class FlexRaySchedule:
+    """Synthesized static-segment schedule (arrays in input frame order)"""
+    names: List[str]
+    senders: List[str]
+    payload_bytes: np.ndarray
+    period_ms: np.ndarray
+    slot: np.ndarray
+    base_cycle: np.ndarray
+    repetition: np.ndarray
+    cycle_ms: float
+    slot_payload_bytes: int
+    slot_duration_us: float
+    static_slots: int
+    violations: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def used_slots(self) -> int:
+        return int(self.slot.max()) if len(self.slot) else 0
+
+    @property
+    def actual_period_ms(self) -> np.ndarray:
+        return self.repetition * self.cycle_ms
+
+    @property
+    def jitter_ms(self) -> np.ndarray:
+        """
+        Worst-case sampling jitter of a producer running at the requested
+        period against the slot's transmission period
+        """
+        requested = np.round(self.period_ms * 1000).astype(np.int64)
+        actual = np.round(self.actual_period_ms * 1000).astype(np.int64)
+        return (actual - np.gcd(requested, actual)) / 1000.0
+
+    def slot_utilization(self) -> np.ndarray:
+        """Fraction of the 64 cycles used in each slot"""
+        used = np.bincount(self.slot - 1, weights=CYCLE_COUNT / self.repetition,
+                           minlength=self.used_slots)
+        return used / CYCLE_COUNT
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly summary"""
+        utilization = self.slot_utilization()
+        payload_used = (self.payload_bytes * (CYCLE_COUNT / self.repetition)).sum()
+        payload_capacity = self.slot_payload_bytes * CYCLE_COUNT * max(self.used_slots, 1)
+        static_segment_us = self.used_slots * self.slot_duration_us
+        jitter = self.jitter_ms
+
+        return {
+            "frame_count": len(self.names),
+            "cycle_ms": self.cycle_ms,
+            "used_slots": self.used_slots,
+            "static_slots": self.static_slots,
+            "slot_payload_bytes": self.slot_payload_bytes,
+            "slot_duration_us": round(self.slot_duration_us, 3),
+            "static_segment_us": round(static_segment_us, 3),
+            "cycle_utilization_percent": round(100.0 * static_segment_us / (self.cycle_ms * 1000.0), 2),
+            "slot_utilization_percent": round(100.0 * float(utilization.mean()), 2) if len(utilization) else 0.0,
+            "payload_utilization_percent": (
+                round(100.0 * float(payload_used) / payload_capacity, 2) if payload_capacity else 0.0
+            ),
+            "max_jitter_ms": round(float(jitter.max()), 3) if len(jitter) else 0.0,
+            "frames": [
+                {
+                    "name": self.names[i],
+                    "sender": self.senders[i],
+                    "slot": int(self.slot[i]),
+                    "base_cycle": int(self.base_cycle[i]),
+                    "repetition": int(self.repetition[i]),
+                    "period_ms": float(self.actual_period_ms[i]),
+                    "jitter_ms": round(float(jitter[i]), 3),
+                }
+                for i in np.lexsort((self.base_cycle, self.slot))
+            ],
+        }
+
+    def to_c(self, prefix: str = "flexray") -> str:
+        """Emit the schedule as C tables, one per sending ECU"""
+        macro = prefix.upper()
+        lines = [
+            "#include <stdint.h>",
+            "",
+            f"#define {macro}_CYCLE_US ({int(round(self.cycle_ms * 1000))}u)",
+            f"#define {macro}_STATIC_SLOTS ({self.used_slots}u)",
+            f"#define {macro}_PAYLOAD_WORDS ({self.slot_payload_bytes // 2}u)",
+            "",
+            "typedef struct {",
+            "    uint16_t slot_id;",
+            "    uint8_t base_cycle;",
+            "    uint8_t cycle_repetition;",
+            "    uint8_t payload_words;",
+            f"}} {prefix}_slot_config_t;",
+        ]
+
+        for sender in sorted(set(self.senders)):
+            rows = [i for i, name in enumerate(self.senders) if name == sender]
+            rows.sort(key=lambda i: (int(self.slot[i]), int(self.base_cycle[i])))
+            table = f"{prefix}_{re.sub(r'[^0-9a-zA-Z]+', '_', sender).strip('_').lower()}_schedule"
+            lines.append("")
+            lines.append(f"static const {prefix}_slot_config_t {table}[{len(rows)}] = {{")
+            for i in rows:
+                lines.append(
+                    f"    {{{int(self.slot[i])}u, {int(self.base_cycle[i])}u, "
+                    f"{int(self.repetition[i])}u, {-(-int(self.payload_bytes[i]) // 2)}u}}, "
+                    f"/* {self.names[i]} */"
+                )
+            lines.append("};")
+
+        return "\n".join(lines) + "\n"
+
+
+class FlexRayScheduler:
+    """
+    Static-segment scheduler with cycle multiplexing
+
+    Each frame needs 64 / r of the 64 cycles of a slot, where the cycle
+    repetition r is the largest power of two with r * cycle <= period.
+    Slots are owned by one sender. Within a sender, frames are packed
+    first-fit decreasing in the offset space of a slot; with power-of-two
+    demands this is a buddy allocation, so every sender uses exactly
+    ceil(sum(1 / r)) slots. Offsets map to base cycles by bit reversal.
+    """
+
+    def __init__(self, protocol_specs: Dict[str, Dict[str, Any]]):
+        self.spec = protocol_specs.get("FlexRay", {})
+
+    def synthesize(self, frames: Sequence[Dict[str, Any]], cycle_ms: float = 5.0,
+                   static_slots: Optional[int] = None,
+                   slot_payload_bytes: Optional[int] = None,
+                   static_segment_fraction: Optional[float] = None) -> FlexRaySchedule:
+        """
+        Build a static-segment schedule
+
+        Args:
+            frames: Frames with 'name', 'sender', 'payload_bytes' and 'period_ms'
+            cycle_ms: Communication cycle length
+            static_slots: Configured number of static slots (default: as needed)
+            slot_payload_bytes: Static slot payload (default: largest frame, even)
+            static_segment_fraction: Share of the cycle available to the static segment
+
+        Returns:
+            FlexRaySchedule
+        """
+        max_payload = self.spec.get("max_data_length", 254)
+        bitrate = max(self.spec.get("typical_baudrates", [10000000]))
+        fraction = static_segment_fraction or self.spec.get("static_segment_fraction", 0.6)
+        violations = []
+        warnings = []
+
+        names = [frame.get("name", f"frame_{i}") for i, frame in enumerate(frames)]
+        senders = [str(frame.get("sender", "ECU")) for frame in frames]
+        payload = np.array([frame["payload_bytes"] for frame in frames], dtype=np.int64)
+        period_ms = np.array([frame["period_ms"] for frame in frames], dtype=np.float64)
+
+        oversized = payload > max_payload
+        for i in np.flatnonzero(oversized):
+            violations.append(f"{names[i]}: payload {payload[i]} bytes exceeds the FlexRay limit of {max_payload}")
+        too_fast = period_ms < cycle_ms
+        for i in np.flatnonzero(too_fast):
+            violations.append(f"{names[i]}: period {period_ms[i]} ms is shorter than the {cycle_ms} ms cycle")
+
+        # Largest power-of-two repetition that keeps the requested period
+        ratio = np.maximum(period_ms / cycle_ms, 1.0)
+        repetition = REPETITIONS[np.searchsorted(REPETITIONS, ratio + 1e-9, side="right") - 1]
+        demand = CYCLE_COUNT // repetition
+
+        # Pack per sender, largest demand first
+        sender_names, sender_index = np.unique(np.array(senders, dtype=object), return_inverse=True)
+        order = np.lexsort((-demand, sender_index))
+        sorted_sender = sender_index[order]
+        sorted_demand = demand[order]
+
+        cumulative = np.cumsum(sorted_demand) - sorted_demand
+        first = np.searchsorted(sorted_sender, np.arange(len(sender_names)))
+        group_start = cumulative[first] if len(order) else np.zeros(0, dtype=np.int64)
+        offset = cumulative - group_start[sorted_sender]
+
+        slots_per_sender = -(-np.bincount(sorted_sender, weights=sorted_demand,
+                                          minlength=len(sender_names)).astype(np.int64) // CYCLE_COUNT)
+        first_slot = np.cumsum(slots_per_sender) - slots_per_sender + 1
+
+        slot = np.empty(len(frames), dtype=np.int64)
+        base_cycle = np.empty(len(frames), dtype=np.int64)
+        slot[order] = first_slot[sorted_sender] + offset // CYCLE_COUNT
+        base_cycle[order] = _BIT_REVERSE[offset % CYCLE_COUNT] % repetition[order]
+
+        if slot_payload_bytes is None:
+            slot_payload_bytes = int(min(payload.max(), max_payload)) if len(payload) else 0
+        slot_payload_bytes += slot_payload_bytes % 2
+        short = payload > slot_payload_bytes
+        for i in np.flatnonzero(short & ~oversized):
+            violations.append(f"{names[i]}: payload {payload[i]} bytes exceeds the {slot_payload_bytes}-byte static slot")
+
+        frame_bits = 10 * (_HEADER_TRAILER_BYTES + slot_payload_bytes) + _FRAME_FRAMING_BITS
+        slot_duration_us = frame_bits * 1e6 / bitrate + 2 * _ACTION_POINT_US
+        used_slots = int(slot.max()) if len(slot) else 0
+
+        max_slots = self.spec.get("max_static_slots", 1023)
+        available = static_slots or max_slots
+        if used_slots > available:
+            violations.append(f"Schedule needs {used_slots} static slots but only {available} are configured")
+
+        static_segment_us = used_slots * slot_duration_us
+        if static_segment_us > fraction * cycle_ms * 1000.0:
+            violations.append(
+                f"Static segment of {static_segment_us:.1f} us exceeds {fraction:.0%} of the {cycle_ms} ms cycle"
+            )
+
+        oversampled = np.flatnonzero(repetition * cycle_ms < period_ms - 1e-9)
+        if len(oversampled):
+            warnings.append(
+                f"{len(oversampled)} frames are sent faster than requested because their periods "
+                f"are not power-of-two multiples of the {cycle_ms} ms cycle"
+            )
+
+        return FlexRaySchedule(
+            names=names,
+            senders=senders,
+            payload_bytes=payload,
+            period_ms=period_ms,
+            slot=slot,
+            base_cycle=base_cycle,
+            repetition=repetition,
+            cycle_ms=cycle_ms,
+            slot_payload_bytes=slot_payload_bytes,
+            slot_duration_us=slot_duration_us,
+            static_slots=static_slots or used_slots,
+            violations=violations,
+            warnings=warnings,
+        )
@@ -0,0 +1,312 @@
+"""
+LIN schedule-table generation
+
+Computes frame slot times (header, response and the 40 % inter-byte /
+response space allowance of LIN 2.x), builds a schedule table over the
+hyperperiod with strictly periodic (fixed offset) placement,
+verifies per-frame periods and emits the master's schedule as C tables.
+"""
+
+import re
+from typing import Dict, List, Optional, Any, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# Break (13) + break delimiter (1) + sync byte (10) + protected ID (10)
+LIN_HEADER_BITS = 34
+# Each data byte and the checksum: start bit, 8 data bits, stop bit
+LIN_BYTE_BITS = 10
+# T_frame_max = 1.4 * T_frame_nominal (header and response space)
+LIN_FRAME_TOLERANCE = 1.4
+# Signal-carrying frame IDs; 60-63 are diagnostic and reserved
+MAX_SIGNAL_FRAME_ID = 59
+# Hyperperiods longer than this (in time-base ticks) fall back to harmonic periods
+MAX_HYPERPERIOD_TICKS = 100000
+
+
+def protected_ids(frame_ids: np.ndarray) -> np.ndarray:
+    """Protected identifiers (ID plus parity bits P0 and P1)"""
+    ids = np.asarray(frame_ids, dtype=np.int64) & 0x3F
+    bit = [(ids >> n) & 1 for n in range(6)]
+    p0 = bit[0] ^ bit[1] ^ bit[2] ^ bit[4]
+    p1 = 1 - (bit[1] ^ bit[3] ^ bit[4] ^ bit[5])
+    return ids | (p0 << 6) | (p1 << 7)
+
+
+@dataclass
+class LINSchedule:
+    """Generated LIN schedule table"""
+    names: List[str]
+    frame_ids: np.ndarray
+    publishers: List[str]
+    lengths: np.ndarray
+    period_ms: np.ndarray
+    baudrate: int
+    time_base_ms: float
+    frame_time_ms: np.ndarray
+    slot_ms: np.ndarray
+    cycle_ms: float
+    entry_frames: np.ndarray
+    entry_delay_ms: np.ndarray
+    max_gap_ms: np.ndarray
+    frame_time_by_baudrate: Dict[int, np.ndarray] = field(default_factory=dict)
+    violations: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def utilization(self) -> float:
+        return float((self.slot_ms / self.period_ms).sum()) if len(self.slot_ms) else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly summary"""
+        return {
+            "baudrate": self.baudrate,
+            "time_base_ms": self.time_base_ms,
+            "cycle_ms": self.cycle_ms,
+            "entry_count": len(self.entry_frames),
+            "utilization_percent": round(100.0 * self.utilization, 2),
+            "frames": [
+                {
+                    "name": self.names[i],
+                    "id": int(self.frame_ids[i]),
+                    "publisher": self.publishers[i],
+                    "frame_time_ms": round(float(self.frame_time_ms[i]), 3),
+                    "slot_ms": float(self.slot_ms[i]),
+                    "period_ms": float(self.period_ms[i]),
+                    "max_gap_ms": float(self.max_gap_ms[i]),
+                    "frame_time_by_baudrate": {
+                        baudrate: round(float(times[i]), 3)
+                        for baudrate, times in self.frame_time_by_baudrate.items()
+                    },
+                }
+                for i in range(len(self.names))
+            ],
+            "table": [
+                {"frame": self.names[int(frame)], "delay_ms": float(delay)}
+                for frame, delay in zip(self.entry_frames, self.entry_delay_ms)
+            ],
+        }
+
+    def to_c(self, table_name: str = "normal") -> str:
+        """Emit the master schedule table as C"""
+        table = re.sub(r'\W+', '_', table_name).lower()
+        macro = table.upper()
+        pids = protected_ids(self.frame_ids)
+        lines = [
+            "#include <stdint.h>",
+            "",
+            f"#define LIN_{macro}_BAUDRATE ({self.baudrate}u)",
+            f"#define LIN_{macro}_CYCLE_MS ({int(round(self.cycle_ms))}u)",
+            f"#define LIN_{macro}_ENTRIES ({len(self.entry_frames)}u)",
+            "",
+            "typedef struct {",
+            "    uint8_t pid;         /* protected identifier */",
+            "    uint8_t length;      /* data bytes */",
+            "    uint16_t delay_ms;   /* slot length until the next entry */",
+            "} lin_schedule_entry_t;",
+            "",
+            f"static const lin_schedule_entry_t lin_schedule_{table}[{len(self.entry_frames)}] = {{",
+        ]
+        for frame, delay in zip(self.entry_frames, self.entry_delay_ms):
+            lines.append(
+                f"    {{0x{int(pids[frame]):02X}u, {int(self.lengths[frame])}u, "
+                f"{int(round(delay))}u}}, /* {self.names[int(frame)]} (ID {int(self.frame_ids[frame])}) */"
+            )
+        lines.append("};")
+        return "\n".join(lines) + "\n"
+
+
+class LINScheduleGenerator:
+    """
+    LIN master schedule-table generator
+
+    Frame and slot times are computed for all frames (and all typical baud
+    rates) with array arithmetic. The table spans the hyperperiod of the
+    frame periods in time-base ticks (the shortest cycle in which every
+    frame repeats exactly), entries are placed at fixed offsets so that
+    each frame is strictly periodic, and the cyclic distance between
+    consecutive transmissions of every frame is checked against its period.
+    """
+
+    def __init__(self, protocol_specs: Dict[str, Dict[str, Any]]):
+        self.spec = protocol_specs.get("LIN", {})
+
+    def frame_times_ms(self, lengths: np.ndarray, baudrates: Sequence[int]) -> np.ndarray:
+        """Maximum frame times (frames x baud rates) in milliseconds"""
+        nominal_bits = LIN_HEADER_BITS + LIN_BYTE_BITS * (np.asarray(lengths) + 1)
+        return LIN_FRAME_TOLERANCE * nominal_bits[:, None] * (1000.0 / np.asarray(baudrates, dtype=np.float64))[None, :]
+
+    def generate(self, frames: Sequence[Dict[str, Any]], nodes: Optional[Sequence[str]] = None,
+                 baudrate: Optional[int] = None, time_base_ms: Optional[float] = None) -> LINSchedule:
+        """
+        Generate a schedule table
+
+        Args:
+            frames: Frames with 'name', 'id', 'length', 'period_ms' and 'publisher'
+            nodes: Slave node names ('master' is always present)
+            baudrate: Bus baud rate (default: fastest typical rate)
+            time_base_ms: Schedule time base (default: spec value)
+
+        Returns:
+            LINSchedule
+        """
+        typical = self.spec.get("typical_baudrates", [9600, 19200])
+        baudrate = baudrate or max(typical)
+        time_base_ms = time_base_ms or self.spec.get("time_base_ms", 1.0)
+        max_length = self.spec.get("max_data_length", 8)
+        violations = []
+        warnings = []
+
+        names = [frame.get("name", f"frame_{i}") for i, frame in enumerate(frames)]
+        frame_ids = np.array([frame["id"] for frame in frames], dtype=np.int64)
+        lengths = np.array([frame.get("length", 8) for frame in frames], dtype=np.int64)
+        period_ms = np.array([frame["period_ms"] for frame in frames], dtype=np.float64)
+        publishers = [str(frame.get("publisher", "master")) for frame in frames]
+
+        if baudrate not in typical:
+            warnings.append(f"Baud rate {baudrate} is not a typical LIN rate ({typical})")
+        for i in np.flatnonzero((lengths < 1) | (lengths > max_length)):
+            violations.append(f"{names[i]}: length {lengths[i]} outside 1..{max_length} bytes")
+        for i in np.flatnonzero((frame_ids < 0) | (frame_ids > MAX_SIGNAL_FRAME_ID)):
+            violations.append(f"{names[i]}: frame ID {frame_ids[i]} outside the signal range 0..{MAX_SIGNAL_FRAME_ID}")
+        unique_ids, id_counts = np.unique(frame_ids, return_counts=True)
+        for frame_id in unique_ids[id_counts > 1]:
+            violations.append(f"Frame ID {frame_id} is used by more than one frame")
+        if nodes is not None:
+            known = {"master"} | set(nodes)
+            for name, publisher in zip(names, publishers):
+                if publisher not in known:
+                    violations.append(f"{name}: publisher {publisher} is not a node on this cluster")
+
+        rates = sorted(set(typical) | {baudrate})
+        all_times = self.frame_times_ms(lengths, rates)
+        frame_time_ms = all_times[:, rates.index(baudrate)]
+        slot_ticks = np.ceil(frame_time_ms / time_base_ms - 1e-9).astype(np.int64)
+        period_ticks = np.floor(period_ms / time_base_ms + 1e-9).astype(np.int64)
+
+        for i in np.flatnonzero(slot_ticks > period_ticks):
+            violations.append(f"{names[i]}: slot of {slot_ticks[i] * time_base_ms} ms exceeds its period")
+        period_ticks = np.maximum(period_ticks, slot_ticks)
+
+        utilization = float((slot_ticks / period_ticks).sum()) if len(frames) else 0.0
+        if utilization > 1.0:
+            violations.append(f"Schedule utilization {utilization:.0%} exceeds the bus capacity")
+
+        hyperperiod = int(np.lcm.reduce(period_ticks)) if len(frames) else 0
+        if hyperperiod > MAX_HYPERPERIOD_TICKS:
+            # Round periods down to power-of-two multiples of the shortest one
+            base = int(period_ticks.min())
+            period_ticks = base * 2 ** np.floor(np.log2(period_ticks / base)).astype(np.int64)
+            hyperperiod = int(period_ticks.max())
+            warnings.append("Frame periods were rounded down to harmonic values to bound the table length")
+
+        entry_frames, entry_start, cycle_ticks = self._place(slot_ticks, period_ticks, hyperperiod)
+        # Idle time is folded into the preceding entry (cyclically)
+        if len(entry_start):
+            entry_delay = np.diff(np.append(entry_start, entry_start[0] + cycle_ticks))
+        else:
+            entry_delay = entry_start
+
+        max_gap = self._max_gaps(entry_frames, entry_start, cycle_ticks, len(frames))
+        placed = np.bincount(entry_frames, minlength=len(frames)) > 0
+        for i in np.flatnonzero(~placed):
+            violations.append(f"{names[i]}: no free {slot_ticks[i] * time_base_ms} ms slot left in the schedule")
+        late = np.flatnonzero(placed & (max_gap * time_base_ms > period_ms + 1e-9))
+        for i in late:
+            violations.append(
+                f"{names[i]}: transmissions up to {max_gap[i] * time_base_ms} ms apart, period is {period_ms[i]} ms"
+            )
+
+        return LINSchedule(
+            names=names,
+            frame_ids=frame_ids,
+            publishers=publishers,
+            lengths=lengths,
+            period_ms=period_ms,
+            baudrate=int(baudrate),
+            time_base_ms=time_base_ms,
+            frame_time_ms=frame_time_ms,
+            slot_ms=slot_ticks * time_base_ms,
+            cycle_ms=cycle_ticks * time_base_ms,
+            entry_frames=entry_frames,
+            entry_delay_ms=entry_delay * time_base_ms,
+            max_gap_ms=max_gap * time_base_ms,
+            frame_time_by_baudrate={int(rate): all_times[:, column] for column, rate in enumerate(rates)},
+            violations=violations,
+            warnings=warnings,
+        )
+
+    @staticmethod
+    def _place(slot_ticks: np.ndarray, period_ticks: np.ndarray, hyperperiod: int):
+        """
+        Strictly periodic placement over one hyperperiod
+
+        Frames are placed shortest period first. For each frame the busy
+        ticks covered by a slot starting at every tick are summed with a
+        circular prefix sum and folded by period, giving the conflict count
+        of every candidate offset at once; the first conflict-free offset
+        wins. Frames with no free offset fall back to the first free slot
+        after each release.
+        """
+        count = len(slot_ticks)
+        if count == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0
+
+        occupied = np.zeros(hyperperiod, dtype=np.int64)
+        frames = []
+        starts = []
+
+        def window_load(length: int) -> np.ndarray:
+            extended = np.concatenate((occupied, occupied[:length]))
+            cumulative = np.concatenate(([0], np.cumsum(extended)))
+            return cumulative[length:length + hyperperiod] - cumulative[:hyperperiod]
+
+        for index in np.lexsort((-slot_ticks, period_ticks)):
+            period = int(period_ticks[index])
+            length = min(int(slot_ticks[index]), hyperperiod)
+            releases = np.arange(0, hyperperiod, period)
+
+            conflicts = window_load(length).reshape(-1, period).sum(axis=0)
+            free = np.flatnonzero(conflicts == 0)
+            if len(free):
+                frame_starts = releases + free[0]
+            else:
+                frame_starts = []
+                for release in releases:
+                    candidates = np.flatnonzero(np.roll(window_load(length), -release) == 0)
+                    if not len(candidates):
+                        break
+                    start = (release + candidates[0]) % hyperperiod
+                    occupied[(start + np.arange(length)) % hyperperiod] = 1
+                    frame_starts.append(start)
+                frame_starts = np.array(frame_starts, dtype=np.int64)
+
+            occupied[(frame_starts[:, None] + np.arange(length)[None, :]) % hyperperiod] = 1
+            frames.append(np.full(len(frame_starts), index))
+            starts.append(frame_starts)
+
+        frames = np.concatenate(frames)
+        starts = np.concatenate(starts)
+        order = np.argsort(starts, kind="stable")
+        return frames[order], starts[order], hyperperiod
+
+    @staticmethod
+    def _max_gaps(entry_frames: np.ndarray, entry_start: np.ndarray, cycle: int, count: int) -> np.ndarray:
+        """Largest cyclic distance between consecutive transmissions of each frame"""
+        if not len(entry_frames):
+            return np.zeros(count, dtype=np.int64)
+        order = np.lexsort((entry_start, entry_frames))
+        frames = entry_frames[order]
+        starts = entry_start[order]
+
+        first = np.flatnonzero(np.r_[True, frames[1:] != frames[:-1]])
+        last = np.r_[first[1:], len(frames)] - 1
+        gaps = np.diff(starts, append=0)
+        # Wrap-around gap from the last transmission to the first one of the next cycle
+        gaps[last] = starts[first] + cycle - starts[last]
+
+        max_gap = np.zeros(count, dtype=np.int64)
+        max_gap[frames[first]] = np.maximum.reduceat(gaps, first)
+        return max_gap
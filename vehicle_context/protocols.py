@@ -2,8 +2,27 @@
 Automotive protocol manager
 """
 
-from typing import Dict, List, Optional, Any
+import re
+from typing import Dict, List, Optional, Any, Sequence, Union
 from ai_copilot.config import CopilotConfig
+from embedded_integration.rule_engine import compliance_report, plan_for_config
+from .can_bus import CANBusSimulator, CANMessageSet, load_dbc_messages
+from .can_log import CANLogAnalyzer
+from .flexray import FlexRayScheduler
+from .lin import LINScheduleGenerator
+from .signal_db import SignalDatabase, load_signal_database
+
+
+# Frame IDs and lengths named in code, e.g. '#define ENGINE_DATA_ID 0x100',
+# 'msg.id = 0x100;' or 'frame->dlc = 8;'
+_ID_PATTERN = re.compile(
+    r'(?:#\s*define\s+(?P<macro>\w*ID)\s+\(?\s*'
+    r'|\b(?P<field>(?:\w+(?:\.|->))?(?:id|can_id|frame_id|msg_id))\s*=\s*)'
+    r'(?P<value>0[xX][0-9a-fA-F]+)'
+)
+_LENGTH_PATTERN = re.compile(
+    r'(?:#\s*define\s+\w*(?:_DLC|_LENGTH)\s+\(?\s*|\b(?:\w+(?:\.|->))?dlc\s*=\s*)(\d+)'
+)
 
 
 class ProtocolManager:
@@ -14,6 +33,9 @@ class ProtocolManager:
     def __init__(self, config: CopilotConfig):
         self.config = config
         self.protocols = self._load_protocol_specs()
+        self.can_simulator = CANBusSimulator(self.protocols)
+        self.flexray_scheduler = FlexRayScheduler(self.protocols)
+        self.lin_scheduler = LINScheduleGenerator(self.protocols)
     
     def _load_protocol_specs(self) -> Dict[str, Dict[str, Any]]:
         """Load protocol specifications"""
@@ -24,10 +46,28 @@ class ProtocolManager:
                 "frame_format": "standard_extended",
                 "error_detection": ["CRC", "ACK", "form_check"],
                 "typical_baudrates": [125000, 250000, 500000, 1000000],
+                "max_bus_load_percent": 70,
                 "compliance_checks": [
                     "message_id_range",
                     "data_length_check",
-                    "baudrate_validation"
+                    "baudrate_validation",
+                    "bus_load",
+                    "response_time"
+                ]
+            },
+            "CAN-FD": {
+                "name": "CAN with Flexible Data-Rate",
+                "max_data_length": 64,
+                "frame_format": "standard_extended",
+                "error_detection": ["CRC17", "CRC21", "stuff_count"],
+                "typical_baudrates": [500000, 1000000],
+                "data_baudrates": [2000000, 5000000],
+                "max_bus_load_percent": 70,
+                "compliance_checks": [
+                    "message_id_range",
+                    "data_length_check",
+                    "bus_load",
+                    "response_time"
                 ]
             },
             "LIN": {
@@ -36,6 +76,7 @@ class ProtocolManager:
                 "frame_format": "lin_frame",
                 "error_detection": ["checksum"],
                 "typical_baudrates": [9600, 19200],
+                "time_base_ms": 1.0,
                 "compliance_checks": [
                     "master_slave_topology",
                     "schedule_table_compliance"
@@ -47,6 +88,9 @@ class ProtocolManager:
                 "frame_format": "flexray_frame",
                 "error_detection": ["CRC", "header_crc"],
                 "typical_baudrates": [10000000],
+                "cycle_count": 64,
+                "max_static_slots": 1023,
+                "static_segment_fraction": 0.6,
                 "compliance_checks": [
                     "static_dynamic_segment",
                     "slot_allocation",
@@ -71,86 +115,268 @@ class ProtocolManager:
         if not protocol_spec:
             return {"error": f"Unknown protocol: {protocol}"}
         
-        compliance_results = {
-            "protocol": protocol,
-            "compliant": True,
-            "violations": [],
-            "warnings": [],
-            "suggestions": []
-        }
-        
-        # Perform protocol-specific checks
-        if protocol == "CAN":
-            can_results = self._check_can_compliance(code, protocol_spec)
-            compliance_results.update(can_results)
-        elif protocol == "LIN":
-            lin_results = self._check_lin_compliance(code, protocol_spec)
-            compliance_results.update(lin_results)
-        elif protocol == "FlexRay":
-            flexray_results = self._check_flexray_compliance(code, protocol_spec)
-            compliance_results.update(flexray_results)
+        compliance_results = {"protocol": protocol}
+        # Protocol rules (CAN, LIN, FlexRay) come from the declarative rule sets
+        findings = plan_for_config(self.config, [protocol]).evaluate(code)
+        compliance_results.update(compliance_report(findings))
         
         return compliance_results
     
-    def _check_can_compliance(self, code: str, spec: Dict[str, Any]) -> Dict[str, Any]:
-        """Check CAN protocol compliance"""
+    async def check_bus_load(self, messages: List[Dict[str, Any]], protocol: str = "CAN",
+                             baudrate: Optional[int] = None,
+                             data_baudrate: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Check bus load and worst-case response times of a CAN message set
+        
+        Args:
+            messages: Messages with 'id', 'dlc' and 'period_ms'
+            protocol: 'CAN' or 'CAN-FD'
+            baudrate: Nominal bit rate
+            data_baudrate: CAN FD data-phase bit rate
+            
+        Returns:
+            Compliance results with a 'bus_load' summary
+        """
+        
+        protocol_spec = self.protocols.get(protocol)
+        if not protocol_spec or protocol not in ("CAN", "CAN-FD"):
+            return {"error": f"Bus load analysis not supported for protocol: {protocol}"}
+        
         violations = []
         warnings = []
         suggestions = []
         
-        # Check for proper data length validation
-        if "dlc" in code.lower():
-            if "dlc > 8" not in code and "dlc <= 8" not in code:
-                violations.append("Missing DLC validation (should check dlc <= 8)")
-                suggestions.append("Add DLC validation: if (dlc > 8) return error;")
+        message_set = CANMessageSet.from_messages(messages)
+        
+        # Malformed messages are reported and left out of the timing analysis
+        valid, issues = message_set.validate(protocol_spec["max_data_length"])
+        violations.extend(issues)
+        if not valid.all():
+            message_set = message_set.select(valid)
         
-        # Check for message ID validation
-        if "id" in code.lower() and "can" in code.lower():
-            if "0x7FF" not in code and "2047" not in code:
-                warnings.append("Consider validating CAN ID range (0-0x7FF for standard)")
-                suggestions.append("Add ID validation for standard CAN frames")
+        result = self.can_simulator.simulate(message_set, protocol, baudrate, data_baudrate)
+        summary = result.summary()
+        
+        if summary["utilization_percent"] > 100:
+            violations.append(
+                f"Bus utilization {summary['utilization_percent']}% exceeds the bus capacity "
+                f"at {result.baudrate} bit/s"
+            )
+        elif summary["utilization_percent"] > protocol_spec.get("max_bus_load_percent", 100):
+            warnings.append(
+                f"Bus utilization {summary['utilization_percent']}% exceeds the recommended "
+                f"{protocol_spec['max_bus_load_percent']}%"
+            )
+            suggestions.append("Increase message periods or move traffic to another bus")
+        
+        if not result.all_schedulable:
+            violations.append(
+                f"{summary['unschedulable_count']} messages miss their deadlines "
+                "under worst-case response-time analysis"
+            )
+            suggestions.append(
+                "Raise the priority (lower the ID) of late messages or reduce higher-priority traffic"
+            )
         
         return {
+            "protocol": protocol,
+            "compliant": len(violations) == 0,
             "violations": violations,
             "warnings": warnings,
             "suggestions": suggestions,
-            "compliant": len(violations) == 0
+            "bus_load": summary
         }
     
-    def _check_lin_compliance(self, code: str, spec: Dict[str, Any]) -> Dict[str, Any]:
-        """Check LIN protocol compliance"""
-        violations = []
+    async def check_bus_constraints(self, bus_constraints: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check the CAN message set described in request constraints
+        
+        Args:
+            bus_constraints: Dictionary with 'messages' and/or 'dbc', plus
+                optional 'protocol', 'baudrate' and 'data_baudrate'
+        """
+        messages = list(bus_constraints.get("messages", []))
+        if bus_constraints.get("dbc"):
+            messages.extend(load_dbc_messages(bus_constraints["dbc"]))
+        
+        return await self.check_bus_load(
+            messages,
+            protocol=bus_constraints.get("protocol", "CAN"),
+            baudrate=bus_constraints.get("baudrate"),
+            data_baudrate=bus_constraints.get("data_baudrate")
+        )
+    
+    async def check_database_compliance(self, code: str, database: SignalDatabase) -> Dict[str, Any]:
+        """
+        Check code and message definitions against a CAN signal database
+        
+        Args:
+            code: Source code to check
+            database: SignalDatabase (see load_signal_database)
+            
+        Returns:
+            Compliance results for frame IDs and lengths used in the code
+        """
+        
+        violations = list(database.validate())
         warnings = []
         suggestions = []
         
-        # Check for master/slave architecture
-        if "lin" in code.lower():
-            if "master" not in code.lower() and "slave" not in code.lower():
-                warnings.append("LIN master/slave role not clearly defined")
-                suggestions.append("Clearly define LIN master or slave role")
+        used_ids = {}
+        for match in _ID_PATTERN.finditer(code):
+            used_ids.setdefault(int(match.group("value"), 0), match.group("macro") or match.group("field"))
+        
+        if used_ids:
+            frame_ids = list(used_ids)
+            indices = database.message_indices(frame_ids)
+            for frame_id, index in zip(frame_ids, indices):
+                if index < 0:
+                    violations.append(
+                        f"{used_ids[frame_id]} uses frame ID 0x{frame_id:X} which is not defined in the DBC"
+                    )
+            
+            known = indices[indices >= 0]
+            lengths = {int(value) for value in _LENGTH_PATTERN.findall(code)}
+            if lengths and len(known) == 1:
+                dlc = int(database.messages["dlc"][known[0]])
+                if dlc not in lengths:
+                    warnings.append(
+                        f"Frame length does not match DLC {dlc} of "
+                        f"{database.message_name(int(known[0]))}"
+                    )
+        
+        if violations:
+            suggestions.append("Generate frame handling from the DBC to keep IDs and layouts in sync")
         
         return {
+            "protocol": "CAN",
             "violations": violations,
             "warnings": warnings,
             "suggestions": suggestions,
             "compliant": len(violations) == 0
         }
     
-    def _check_flexray_compliance(self, code: str, spec: Dict[str, Any]) -> Dict[str, Any]:
-        """Check FlexRay protocol compliance"""
-        violations = []
+    async def check_dbc_compliance(self, code: str, dbc_path: str) -> Dict[str, Any]:
+        """Check code against a DBC file (parsed once and cached)"""
+        return await self.check_database_compliance(code, load_signal_database(dbc_path))
+    
+    async def analyze_can_log(self, log_path: str, database: Union[str, SignalDatabase],
+                              baudrate: Optional[int] = None, window_s: float = 1.0,
+                              log_format: Optional[str] = None,
+                              signals: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Replay a CAN trace, decoding signals and measuring bus load over time
+        
+        Args:
+            log_path: Trace file (CSV, candump log, or ASC/BLF with python-can)
+            database: SignalDatabase or DBC file path
+            baudrate: Nominal bit rate of the logged bus
+            window_s: Bus load window length in seconds
+            log_format: Trace format (default: from the file suffix)
+            signals: Signal names to report (default: all decoded signals)
+            
+        Returns:
+            Log summary with warnings for overloaded windows
+        """
+        
+        if not isinstance(database, SignalDatabase):
+            database = load_signal_database(database)
+        
+        analyzer = CANLogAnalyzer(database, self.protocols, baudrate=baudrate, window_s=window_s)
+        summary = analyzer.analyze(log_path, log_format, signals).summary()
+        
         warnings = []
         suggestions = []
+        limit = self.protocols["CAN"].get("max_bus_load_percent", 100)
+        windows = summary["bus_load_percent"]["windows"]
+        overloaded = sum(1 for load in windows if load > limit)
+        if overloaded:
+            warnings.append(
+                f"Bus load exceeds {limit}% in {overloaded} of {len(windows)} windows "
+                f"(peak {summary['bus_load_percent']['peak']}%)"
+            )
+            suggestions.append("Check for bursty senders or reduce cycle times on this bus")
+        if summary["unknown_frame_count"]:
+            warnings.append(f"{summary['unknown_frame_count']} frames have IDs not defined in the DBC")
+        if summary["out_of_range_frame_count"] or summary["out_of_order_frame_count"]:
+            warnings.append(
+                f"{summary['out_of_range_frame_count']} frames have timestamps outside the trace and "
+                f"{summary['out_of_order_frame_count']} go backwards in time; bus load excludes late frames"
+            )
+        
+        summary.update({"warnings": warnings, "suggestions": suggestions})
+        return summary
+    
+    async def check_flexray_schedule(self, frames: List[Dict[str, Any]], cycle_ms: float = 5.0,
+                                     static_slots: Optional[int] = None,
+                                     slot_payload_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Synthesize and check a FlexRay static-segment schedule
+        
+        Args:
+            frames: Frames with 'name', 'sender', 'payload_bytes' and 'period_ms'
+            cycle_ms: Communication cycle length
+            static_slots: Configured number of static slots
+            slot_payload_bytes: Configured static slot payload length
+            
+        Returns:
+            Compliance results with the schedule summary and C tables
+        """
+        
+        schedule = self.flexray_scheduler.synthesize(
+            frames, cycle_ms=cycle_ms, static_slots=static_slots,
+            slot_payload_bytes=slot_payload_bytes
+        )
+        
+        suggestions = []
+        if schedule.warnings:
+            suggestions.append("Align frame periods to power-of-two multiples of the cycle to avoid oversampling")
+        if schedule.violations:
+            suggestions.append("Lengthen the cycle, enlarge the static segment or move frames to the dynamic segment")
+        
+        return {
+            "protocol": "FlexRay",
+            "compliant": len(schedule.violations) == 0,
+            "violations": list(schedule.violations),
+            "warnings": list(schedule.warnings),
+            "suggestions": suggestions,
+            "schedule": schedule.summary(),
+            "c_code": schedule.to_c()
+        }
+    
+    async def check_lin_schedule(self, frames: List[Dict[str, Any]],
+                                 nodes: Optional[List[str]] = None,
+                                 baudrate: Optional[int] = None,
+                                 time_base_ms: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Generate and verify a LIN master schedule table
         
-        # Check for slot allocation
-        if "flexray" in code.lower():
-            if "slot" not in code.lower():
-                warnings.append("FlexRay slot allocation not evident")
-                suggestions.append("Ensure proper FlexRay slot allocation")
+        Args:
+            frames: Frames with 'name', 'id', 'length', 'period_ms' and 'publisher'
+            nodes: Slave node names on the cluster
+            baudrate: Bus baud rate (9600 or 19200 typical)
+            time_base_ms: Schedule time base
+            
+        Returns:
+            Compliance results with the schedule summary and C table
+        """
+        
+        schedule = self.lin_scheduler.generate(
+            frames, nodes=nodes, baudrate=baudrate, time_base_ms=time_base_ms
+        )
+        
+        suggestions = []
+        if schedule.violations:
+            suggestions.append(
+                "Use harmonic frame periods, a higher baud rate or shorter frames to fit the schedule"
+            )
         
         return {
-            "violations": violations,
-            "warnings": warnings,
+            "protocol": "LIN",
+            "compliant": len(schedule.violations) == 0,
+            "violations": list(schedule.violations),
+            "warnings": list(schedule.warnings),
             "suggestions": suggestions,
-            "compliant": len(violations) == 0
+            "schedule": schedule.summary(),
+            "c_code": schedule.to_c()
         }
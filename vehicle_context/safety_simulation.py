@@ -0,0 +1,572 @@
+"""
+Monte Carlo safety-scenario simulation
+
+Vectorized kinematic and thermal models evaluate a chunk of randomized runs
+at once; chunks are spread over a process pool with independent seeds, so
+results do not depend on the worker count. Each run is judged by its
+utilization (demand / capacity) scaled by the ASIL safety margin, and the
+campaign verdict compares the confidence interval of the failure
+probability with the ASIL target from StandardsChecker.
+"""
+
+import math
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+import numpy as np
+
+from ai_copilot.config import CopilotConfig
+from .standards import StandardsChecker
+
+
+GRAVITY = 9.81
+MAX_RUNS = 1_000_000
+MAX_JOBS = 100
+# Background campaigns run at a time, and queued or running before submit() refuses more
+JOB_WORKERS = 2
+MAX_PENDING_JOBS = 8
+# Integration steps (duration_s / dt_s) allowed for time-stepped models
+MAX_STEPS = 100_000
+
+# Road surfaces as (share of runs, friction low, friction high)
+DEFAULT_SURFACES = {"dry": (0.85, 0.7, 0.9), "wet": (0.15, 0.4, 0.6)}
+
+
+# Accepted range of each scalar parameter and of both values of a pair
+# parameter ((low, high) for uniform, (mean, std) for normal draws)
+PARAM_BOUNDS: Dict[str, Tuple[float, float]] = {
+    "speed_kmh": (0.0, 400.0),
+    "latency_s": (0.0, 10.0),
+    "brake_buildup_s": (1e-3, 10.0),
+    "brake_efficiency": (0.01, 1.0),
+    "detection_range_m": (0.0, 1000.0),
+    "headway_s": (0.0, 60.0),
+    "lead_decel": (0.0, 20.0),
+    "duration_s": (1e-3, 3600.0),
+    "dt_s": (1e-4, 60.0),
+    "ambient_c": (-60.0, 100.0),
+    "current_a": (0.0, 2000.0),
+    "resistance_mohm": (0.0, 1000.0),
+    "heat_capacity_j_per_k": (0.1, 1e6),
+    "cooling_w_per_k": (0.0, 1000.0),
+    "cooling_fault_probability": (0.0, 1.0),
+    "fault_cooling_factor": (0.0, 1.0),
+    "derate_c": (-60.0, 200.0),
+    "derate_factor": (0.0, 1.0),
+    "cutoff_c": (-60.0, 200.0),
+    "detection_latency_s": (0.0, 3600.0),
+    "limit_c": (-60.0, 200.0),
+}
+# Surface friction coefficients (low, high)
+FRICTION_BOUNDS = (0.05, 1.5)
+
+
+class SimulatorBusy(RuntimeError):
+    """Too many campaigns are queued or running to accept another"""
+
+
+def _friction(rng: np.random.Generator, runs: int, surfaces: Dict[str, Any]) -> np.ndarray:
+    shares = np.array([share for share, _, _ in surfaces.values()], dtype=np.float64)
+    low = np.array([low for _, low, _ in surfaces.values()])
+    high = np.array([high for _, _, high in surfaces.values()])
+    surface = rng.choice(len(shares), size=runs, p=shares / shares.sum())
+    return rng.uniform(low[surface], high[surface])
+
+
+def simulate_emergency_braking(rng: np.random.Generator, runs: int,
+                               params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    AEB stop in front of a static obstacle detected at sensor range
+
+    Stopping distance covers the perception/actuation latency, half of the
+    brake pressure build-up and the full-deceleration braking distance.
+    """
+    speed = rng.uniform(*params["speed_kmh"], runs) / 3.6
+    deceleration = _friction(rng, runs, params["surfaces"]) * GRAVITY * params["brake_efficiency"]
+    latency = np.maximum(rng.normal(*params["latency_s"], runs), 0.0)
+    buildup = rng.uniform(*params["brake_buildup_s"], runs)
+
+    stopping_distance = speed * (latency + 0.5 * buildup) + speed * speed / (2.0 * deceleration)
+    detection_range = np.maximum(rng.normal(*params["detection_range_m"], runs), 1.0)
+    return {"demand": stopping_distance, "capacity": detection_range, "metric": stopping_distance}
+
+
+def simulate_collision_avoidance(rng: np.random.Generator, runs: int,
+                                 params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Following a lead vehicle that brakes hard; the ego vehicle reacts after a
+    latency with a linear brake ramp. Integrated with a fixed time step
+    until every ego vehicle has stopped.
+    """
+    speed = rng.uniform(*params["speed_kmh"], runs) / 3.6
+    gap = speed * rng.uniform(*params["headway_s"], runs)
+    friction = _friction(rng, runs, params["surfaces"])
+    lead_deceleration = np.minimum(rng.uniform(*params["lead_decel"], runs), friction * GRAVITY)
+    ego_deceleration = friction * GRAVITY * params["brake_efficiency"]
+    latency = np.maximum(rng.normal(*params["latency_s"], runs), 0.0)
+    buildup = rng.uniform(*params["brake_buildup_s"], runs)
+
+    dt = params["dt_s"]
+    initial_gap = gap.copy()
+    lead_speed = speed.copy()
+    ego_speed = speed.copy()
+    min_gap = gap.copy()
+    for step in range(int(params["duration_s"] / dt)):
+        t = step * dt
+        ramp = np.clip((t - latency) / buildup, 0.0, 1.0)
+        lead_speed = np.maximum(lead_speed - lead_deceleration * dt, 0.0)
+        ego_speed = np.maximum(ego_speed - ramp * ego_deceleration * dt, 0.0)
+        gap += (lead_speed - ego_speed) * dt
+        np.minimum(min_gap, gap, out=min_gap)
+        if not ego_speed.any():
+            break
+
+    return {"demand": initial_gap - min_gap, "capacity": initial_gap, "metric": min_gap}
+
+
+def simulate_battery_thermal(rng: np.random.Generator, runs: int,
+                             params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Lumped cell thermal model under a high-current load
+
+    C dT/dt = I^2 R - hA (T - T_ambient). The BMS derates the current above
+    the derate temperature and cuts it above the cutoff temperature, each
+    after a detection latency; a cooling fault scales hA down.
+    """
+    ambient = rng.uniform(*params["ambient_c"], runs)
+    current = rng.uniform(*params["current_a"], runs)
+    resistance = np.maximum(rng.normal(*params["resistance_mohm"], runs), 0.1) * 1e-3
+    cooling = rng.uniform(*params["cooling_w_per_k"], runs)
+    faulted = rng.random(runs) < params["cooling_fault_probability"]
+    cooling = np.where(faulted, cooling * params["fault_cooling_factor"], cooling)
+    latency = rng.uniform(*params["detection_latency_s"], runs)
+
+    dt = params["dt_s"]
+    heat_capacity = params["heat_capacity_j_per_k"]
+    heating = current * current * resistance
+    temperature = ambient.copy()
+    peak = ambient.copy()
+    derate_since = np.full(runs, np.inf)
+    cutoff_since = np.full(runs, np.inf)
+    for step in range(int(params["duration_s"] / dt)):
+        t = step * dt
+        derate_since = np.where(np.isinf(derate_since) & (temperature > params["derate_c"]), t, derate_since)
+        cutoff_since = np.where(np.isinf(cutoff_since) & (temperature > params["cutoff_c"]), t, cutoff_since)
+        scale = np.where(t - derate_since >= latency, params["derate_factor"], 1.0)
+        scale = np.where(t - cutoff_since >= latency, 0.0, scale)
+        temperature += dt * (heating * scale * scale - cooling * (temperature - ambient)) / heat_capacity
+        np.maximum(peak, temperature, out=peak)
+
+    return {"demand": peak - ambient, "capacity": params["limit_c"] - ambient, "metric": peak}
+
+
+@dataclass(frozen=True)
+class SafetyScenario:
+    """A simulated safety scenario and its default parameters"""
+    name: str
+    title: str
+    description: str
+    asil_level: str
+    metric: str
+    model: Callable[[np.random.Generator, int, Dict[str, Any]], Dict[str, np.ndarray]]
+    defaults: Dict[str, Any]
+
+
+SCENARIOS: Dict[str, SafetyScenario] = {
+    scenario.name: scenario for scenario in (
+        SafetyScenario(
+            "emergency_braking", "Emergency Braking Test",
+            "AEB stop for a static obstacle within sensor detection range",
+            "ASIL-D", "stopping_distance_m", simulate_emergency_braking,
+            {
+                "speed_kmh": (30.0, 100.0),
+                "surfaces": DEFAULT_SURFACES,
+                "latency_s": (0.2, 0.05),
+                "brake_buildup_s": (0.1, 0.3),
+                "brake_efficiency": 0.9,
+                "detection_range_m": (160.0, 10.0),
+            },
+        ),
+        SafetyScenario(
+            "collision_avoidance", "Collision Avoidance",
+            "Forward collision mitigation when the lead vehicle brakes hard",
+            "ASIL-D", "min_gap_m", simulate_collision_avoidance,
+            {
+                "speed_kmh": (50.0, 120.0),
+                "headway_s": (1.8, 3.0),
+                "lead_decel": (4.0, 8.0),
+                "surfaces": DEFAULT_SURFACES,
+                "latency_s": (0.3, 0.05),
+                "brake_buildup_s": (0.1, 0.2),
+                "brake_efficiency": 0.95,
+                "duration_s": 12.0,
+                "dt_s": 0.01,
+            },
+        ),
+        SafetyScenario(
+            "battery_thermal", "Battery Thermal Protection",
+            "EV cell temperature under fast-charge load with BMS derating",
+            "ASIL-C", "peak_temperature_c", simulate_battery_thermal,
+            {
+                "ambient_c": (10.0, 45.0),
+                "current_a": (50.0, 200.0),
+                "resistance_mohm": (1.5, 0.2),
+                "heat_capacity_j_per_k": 63.0,
+                "cooling_w_per_k": (0.8, 2.0),
+                "cooling_fault_probability": 0.005,
+                "fault_cooling_factor": 0.1,
+                "derate_c": 45.0,
+                "derate_factor": 0.3,
+                "cutoff_c": 55.0,
+                "detection_latency_s": (0.5, 2.0),
+                "limit_c": 60.0,
+                "duration_s": 900.0,
+                "dt_s": 1.0,
+            },
+        ),
+    )
+}
+
+
+def _number(name: str, value: Any) -> float:
+    low, high = PARAM_BOUNDS[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Parameter {name} must be a number")
+    value = float(value)
+    if not low <= value <= high:
+        raise ValueError(f"Parameter {name} must be between {low:g} and {high:g}")
+    return value
+
+
+def _surfaces(value: Any) -> Dict[str, Tuple[float, float, float]]:
+    if not isinstance(value, dict) or not value:
+        raise ValueError("Parameter surfaces must map surface names to (share, friction low, friction high)")
+    surfaces = {}
+    for name, entry in value.items():
+        if not isinstance(entry, (list, tuple)) or len(entry) != 3 or any(
+                isinstance(item, bool) or not isinstance(item, (int, float)) for item in entry):
+            raise ValueError(f"Surface {name} must be (share, friction low, friction high)")
+        share, low, high = (float(item) for item in entry)
+        if not (0.0 <= share <= 1.0 and FRICTION_BOUNDS[0] <= low <= high <= FRICTION_BOUNDS[1]):
+            raise ValueError(f"Surface {name} needs a share in 0..1 and {FRICTION_BOUNDS[0]:g} <= "
+                             f"friction low <= friction high <= {FRICTION_BOUNDS[1]:g}")
+        surfaces[str(name)] = (share, low, high)
+    if sum(share for share, _, _ in surfaces.values()) <= 0.0:
+        raise ValueError("Surface shares must not all be zero")
+    return surfaces
+
+
+def scenario_params(scenario: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    A scenario's defaults merged with validated overrides
+
+    Overrides must be known parameters of the scenario with the default's
+    shape, within PARAM_BOUNDS, and time-stepped models are limited to
+    MAX_STEPS integration steps.
+
+    Raises:
+        ValueError: On an unknown scenario or an invalid parameter
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    defaults = SCENARIOS[scenario].defaults
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+
+    merged = dict(defaults)
+    for name, value in params.items():
+        if name not in defaults:
+            raise ValueError(f"Unknown parameter for {scenario}: {name}")
+        if name == "surfaces":
+            merged[name] = _surfaces(value)
+        elif isinstance(defaults[name], tuple):
+            if not isinstance(value, (list, tuple)) or len(value) != 2:
+                raise ValueError(f"Parameter {name} must be a pair of numbers")
+            merged[name] = tuple(_number(name, item) for item in value)
+        else:
+            merged[name] = _number(name, value)
+
+    if "dt_s" in merged and merged["duration_s"] / merged["dt_s"] > MAX_STEPS:
+        raise ValueError(f"duration_s / dt_s must not exceed {MAX_STEPS} steps")
+    return merged
+
+
+def _run_chunk(scenario: str, runs: int, seed: np.random.SeedSequence,
+               params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Process-pool entry point: simulate one chunk of runs"""
+    return SCENARIOS[scenario].model(np.random.default_rng(seed), runs, params)
+
+
+def wilson_interval(failures: int, runs: int, confidence: float) -> Dict[str, float]:
+    """Two-sided Wilson score interval for a failure probability"""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    p = failures / runs
+    denominator = 1.0 + z * z / runs
+    centre = (p + z * z / (2.0 * runs)) / denominator
+    half_width = z * math.sqrt(p * (1.0 - p) / runs + z * z / (4.0 * runs * runs)) / denominator
+    lower = 0.0 if failures == 0 else max(0.0, centre - half_width)
+    upper = 1.0 if failures == runs else min(1.0, centre + half_width)
+    return {"lower": lower, "upper": upper}
+
+
+def summarize_runs(results: Dict[str, np.ndarray], targets: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pass/fail statistics of a campaign against ASIL targets
+
+    A run fails when demand * safety_margin exceeds capacity. The campaign
+    passes when the upper bound of the failure-probability interval is
+    within the target, fails when the lower bound exceeds it, and is
+    inconclusive otherwise.
+    """
+    runs = len(results["demand"])
+    utilization = results["demand"] / results["capacity"]
+    failed = utilization * targets["safety_margin"] > 1.0
+    failures = int(np.count_nonzero(failed))
+    interval = wilson_interval(failures, runs, targets["confidence"])
+    target = targets["max_failure_probability"]
+
+    if interval["upper"] <= target:
+        verdict = "PASS"
+    elif interval["lower"] > target:
+        verdict = "FAIL"
+    else:
+        verdict = "INCONCLUSIVE"
+
+    # Zero-failure campaign length that would demonstrate the target
+    z = NormalDist().inv_cdf(0.5 + targets["confidence"] / 2.0)
+    runs_required = math.ceil(z * z * (1.0 / target - 1.0))
+
+    metric = results["metric"]
+    mean = float(metric.mean())
+    half_width = 1.96 * float(metric.std(ddof=1)) / math.sqrt(runs) if runs > 1 else 0.0
+    p50, p95, p99 = np.percentile(metric, [50, 95, 99])
+
+    return {
+        "runs": runs,
+        "failures": failures,
+        "failure_probability": failures / runs,
+        "failure_probability_interval": interval,
+        "confidence": targets["confidence"],
+        "target_failure_probability": target,
+        "safety_margin": targets["safety_margin"],
+        "asil_level": targets["asil_level"],
+        "verdict": verdict,
+        "runs_required_for_target": runs_required,
+        "metric": {
+            "mean": round(mean, 4),
+            "mean_ci95": [round(mean - half_width, 4), round(mean + half_width, 4)],
+            "min": round(float(metric.min()), 4),
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(metric.max()), 4),
+        },
+        "utilization": {
+            "mean": round(float(utilization.mean()), 4),
+            "p99": round(float(np.percentile(utilization, 99)), 4),
+            "max": round(float(utilization.max()), 4),
+        },
+    }
+
+
+class SafetySimulator:
+    """
+    Runs Monte Carlo scenario campaigns, synchronously or as background jobs
+
+    Args:
+        standards_checker: Source of ASIL targets (default: built from CopilotConfig)
+        workers: Process-pool size; 0 or 1 simulates in the calling process
+        chunk_runs: Runs per chunk (one vectorized model call per chunk)
+    """
+
+    def __init__(self, standards_checker: Optional[StandardsChecker] = None,
+                 workers: Optional[int] = None, chunk_runs: int = 2000):
+        self.standards = standards_checker or StandardsChecker(CopilotConfig())
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.chunk_runs = chunk_runs
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._job_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Guards self.jobs and the job entries worker threads update
+        self._jobs_lock = threading.Lock()
+
+    def scenarios(self) -> List[Dict[str, Any]]:
+        """Available scenarios with their latest campaign result"""
+        return [
+            {
+                "name": scenario.name,
+                "title": scenario.title,
+                "description": scenario.description,
+                "asil_level": scenario.asil_level,
+                "metric": scenario.metric,
+                "last_result": self.last_results.get(scenario.name),
+            }
+            for scenario in SCENARIOS.values()
+        ]
+
+    def run(self, scenario: str, runs: int = 5000, seed: Optional[int] = None,
+            asil_level: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+            progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Run a campaign and wait for the result
+
+        Args:
+            scenario: Scenario name (see SCENARIOS)
+            runs: Number of randomized runs
+            seed: Seed for reproducible campaigns (default: fresh entropy)
+            asil_level: ASIL level to verify against (default: the scenario's)
+            params: Overrides of the scenario's default parameters
+            progress: Called with (completed runs, total runs) per chunk
+
+        Returns:
+            Campaign statistics (see summarize_runs) plus scenario details
+        """
+        merged = scenario_params(scenario, params)
+        if not 1 <= runs <= MAX_RUNS:
+            raise ValueError(f"runs must be between 1 and {MAX_RUNS}")
+
+        definition = SCENARIOS[scenario]
+        targets = self.standards.get_asil_targets(asil_level or definition.asil_level)
+
+        seed_sequence = np.random.SeedSequence(seed)
+        sizes = [min(self.chunk_runs, runs - start) for start in range(0, runs, self.chunk_runs)]
+        seeds = seed_sequence.spawn(len(sizes))
+        parts: List[Optional[Dict[str, np.ndarray]]] = [None] * len(sizes)
+        started = time.perf_counter()
+        completed = 0
+
+        if self.workers > 1 and len(sizes) > 1:
+            executor = self._pool()
+            futures = {
+                executor.submit(_run_chunk, scenario, size, chunk_seed, merged): index
+                for index, (size, chunk_seed) in enumerate(zip(sizes, seeds))
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                parts[index] = future.result()
+                completed += sizes[index]
+                if progress:
+                    progress(completed, runs)
+        else:
+            for index, (size, chunk_seed) in enumerate(zip(sizes, seeds)):
+                parts[index] = _run_chunk(scenario, size, chunk_seed, merged)
+                completed += size
+                if progress:
+                    progress(completed, runs)
+
+        results = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        summary = summarize_runs(results, targets)
+        summary.update({
+            "scenario": scenario,
+            "title": definition.title,
+            "metric_name": definition.metric,
+            "seed": seed_sequence.entropy,
+            "duration_s": round(time.perf_counter() - started, 3),
+        })
+        self.last_results[scenario] = summary
+        return summary
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _job_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._job_executor is None:
+                self._job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="safety-sim")
+            return self._job_executor
+
+    def submit(self, scenario: str, runs: int = 5000, seed: Optional[int] = None,
+               asil_level: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Start a campaign in the background
+
+        Returns:
+            Job ID for polling with job()
+
+        Raises:
+            ValueError: On invalid arguments or parameters
+            SimulatorBusy: If MAX_PENDING_JOBS campaigns are queued or running
+        """
+        params = scenario_params(scenario, params)
+        if not 1 <= runs <= MAX_RUNS:
+            raise ValueError(f"runs must be between 1 and {MAX_RUNS}")
+
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "job_id": job_id,
+            "scenario": scenario,
+            "runs": runs,
+            "status": "queued",
+            "progress": 0.0,
+            "completed_runs": 0,
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        with self._jobs_lock:
+            pending = sum(1 for entry in self.jobs.values() if entry["finished_at"] is None)
+            if pending >= MAX_PENDING_JOBS:
+                raise SimulatorBusy(f"{pending} simulations are already queued or running; try again later")
+            self._prune_jobs()
+            self.jobs[job_id] = job
+
+        def update(completed: int, total: int) -> None:
+            with self._jobs_lock:
+                job["completed_runs"] = completed
+                job["progress"] = round(completed / total, 4)
+
+        def work() -> None:
+            with self._jobs_lock:
+                job["status"] = "running"
+            try:
+                result = self.run(scenario, runs, seed, asil_level, params, progress=update)
+                outcome = {"result": result, "status": "completed"}
+            except Exception as e:
+                outcome = {"error": str(e), "status": "failed"}
+            with self._jobs_lock:
+                job.update(outcome, finished_at=time.time())
+
+        self._job_pool().submit(work)
+        return job_id
+
+    def _prune_jobs(self) -> None:
+        # Called with self._jobs_lock held
+        finished = [job_id for job_id, job in self.jobs.items() if job["finished_at"] is not None]
+        for job_id in finished[:max(0, len(self.jobs) - MAX_JOBS + 1)]:
+            del self.jobs[job_id]
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job's status, progress and (when completed) result"""
+        with self._jobs_lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def recent_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Snapshots of the latest submitted jobs, newest first"""
+        with self._jobs_lock:
+            jobs = [dict(job) for job in self.jobs.values()]
+        jobs.sort(key=lambda job: job["submitted_at"], reverse=True)
+        return jobs[:limit]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._job_executor is not None:
+                self._job_executor.shutdown(wait=False, cancel_futures=True)
+                self._job_executor = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,648 @@
+"""
+Compact CAN signal database
+
+Imports DBC files (via the optional ``cantools`` package) into columnar
+NumPy tables with a shared string pool. Imported databases are cached on
+disk in a single binary file that is memory-mapped on load, so large
+vehicle DBCs are parsed once per content change instead of per request.
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
+from pathlib import Path
+
+import numpy as np
+from numpy.lib import format as npformat
+
+
+FORMAT_VERSION = 1
+_MAGIC = b"AICSDB01"
+_ALIGNMENT = 8
+
+DEFAULT_CACHE_DIR = Path.home() / ".ai_copilot" / "signal_db"
+
+# Largest DBC file read; production vehicle DBCs are a few MB
+MAX_DBC_BYTES = 32 << 20
+
+# Multiplexing markers in the 'mux' column; values >= 0 are multiplexer IDs
+MUX_NONE = -1
+MUX_SELECTOR = -2
+
+MESSAGE_DTYPE = np.dtype([
+    ("frame_id", "<u4"),
+    ("name", "<u4"),
+    ("dlc", "u1"),
+    ("extended", "?"),
+    ("sender", "<i2"),
+    ("cycle_time_ms", "<f4"),
+    ("signal_start", "<u4"),
+    ("signal_count", "<u2"),
+])
+
+SIGNAL_DTYPE = np.dtype([
+    ("message", "<u4"),
+    ("name", "<u4"),
+    ("unit", "<u4"),
+    ("start_bit", "<u2"),
+    ("length", "u1"),
+    ("big_endian", "?"),
+    ("signed", "?"),
+    ("is_float", "?"),
+    ("mux", "<i4"),
+    ("scale", "<f8"),
+    ("offset", "<f8"),
+    ("minimum", "<f8"),
+    ("maximum", "<f8"),
+])
+
+
+class _StringPoolBuilder:
+    """Interns strings into a single UTF-8 blob"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.chunks: List[bytes] = []
+
+    def add(self, text: Optional[str]) -> int:
+        text = text or ""
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = len(self.chunks)
+            self.ids[text] = string_id
+            self.chunks.append(text.encode("utf-8"))
+        return string_id
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        lengths = np.fromiter((len(chunk) for chunk in self.chunks), dtype=np.uint32,
+                              count=len(self.chunks))
+        offsets = np.zeros(len(self.chunks) + 1, dtype=np.uint32)
+        np.cumsum(lengths, out=offsets[1:])
+        blob = np.frombuffer(b"".join(self.chunks), dtype=np.uint8)
+        return offsets, blob
+
+
+class SignalDatabase:
+    """
+    Array-backed message/signal database
+
+    Messages and signals are stored as structured arrays in message order,
+    with signals of one message contiguous. Strings (names, units, nodes)
+    live in a shared pool and are referenced by ID. Indexes by frame ID,
+    signal name and ECU node are sorted arrays searched with
+    ``np.searchsorted``.
+    """
+
+    ARRAY_NAMES = (
+        "messages", "signals", "string_offsets", "string_blob", "nodes",
+        "receiver_offsets", "receiver_nodes", "message_order", "signal_order",
+    )
+
+    def __init__(self, arrays: Dict[str, np.ndarray], source: str = "",
+                 source_hash: str = "", buffer: Optional[mmap.mmap] = None):
+        self.arrays = arrays
+        self.source = source
+        self.source_hash = source_hash
+        self._buffer = buffer
+        self._string_ids: Optional[Dict[str, int]] = None
+
+        self.messages = arrays["messages"]
+        self.signals = arrays["signals"]
+        self.nodes = arrays["nodes"]
+        self.receiver_offsets = arrays["receiver_offsets"]
+        self.receiver_nodes = arrays["receiver_nodes"]
+        self.message_order = arrays["message_order"]
+        self.signal_order = arrays["signal_order"]
+        self._string_offsets = arrays["string_offsets"]
+        self._string_blob = arrays["string_blob"]
+        self._sorted_frame_ids = self.messages["frame_id"][self.message_order]
+        self._sorted_signal_names = self.signals["name"][self.signal_order]
+
+    @property
+    def message_count(self) -> int:
+        return len(self.messages)
+
+    @property
+    def signal_count(self) -> int:
+        return len(self.signals)
+
+    # ------------------------------------------------------------------
+    # Construction
+
+    @classmethod
+    def from_messages(cls, messages: Sequence[Dict[str, Any]], source: str = "") -> "SignalDatabase":
+        """
+        Build a database from message dictionaries
+
+        Each message has 'id', 'name', 'dlc' and 'signals', and optionally
+        'extended', 'cycle_time_ms' and 'senders'. Each signal has 'name',
+        'start', 'length' and optionally 'byte_order' ('little_endian' or
+        'big_endian'), 'is_signed', 'is_float', 'scale', 'offset',
+        'minimum', 'maximum', 'unit', 'receivers', 'is_multiplexer' and
+        'multiplexer_id'. Start bits follow DBC numbering.
+        """
+        pool = _StringPoolBuilder()
+        node_ids: Dict[str, int] = {}
+
+        def node_index(name: str) -> int:
+            if name not in node_ids:
+                node_ids[name] = len(node_ids)
+                pool.add(name)
+            return node_ids[name]
+
+        signal_total = sum(len(message.get("signals", [])) for message in messages)
+        message_rows = np.zeros(len(messages), dtype=MESSAGE_DTYPE)
+        signal_rows = np.zeros(signal_total, dtype=SIGNAL_DTYPE)
+        receiver_counts = np.zeros(signal_total, dtype=np.uint32)
+        receiver_nodes: List[int] = []
+
+        row = 0
+        for index, message in enumerate(messages):
+            frame_id = message["id"]
+            if isinstance(frame_id, str):
+                frame_id = int(frame_id, 0)
+            senders = message.get("senders") or []
+            signals = message.get("signals", [])
+
+            message_rows[index] = (
+                frame_id,
+                pool.add(message.get("name", f"MSG_{frame_id:X}")),
+                message["dlc"],
+                message.get("extended", frame_id > 0x7FF),
+                node_index(senders[0]) if senders else -1,
+                message.get("cycle_time_ms") or 0.0,
+                row,
+                len(signals),
+            )
+
+            for signal in signals:
+                if signal.get("is_multiplexer"):
+                    mux = MUX_SELECTOR
+                elif signal.get("multiplexer_id") is not None:
+                    mux = int(signal["multiplexer_id"])
+                else:
+                    mux = MUX_NONE
+
+                minimum = signal.get("minimum")
+                maximum = signal.get("maximum")
+                signal_rows[row] = (
+                    index,
+                    pool.add(signal["name"]),
+                    pool.add(signal.get("unit")),
+                    signal["start"],
+                    signal["length"],
+                    signal.get("byte_order", "little_endian") == "big_endian",
+                    bool(signal.get("is_signed", False)),
+                    bool(signal.get("is_float", False)),
+                    mux,
+                    signal.get("scale", 1.0),
+                    signal.get("offset", 0.0),
+                    np.nan if minimum is None else minimum,
+                    np.nan if maximum is None else maximum,
+                )
+
+                receivers = signal.get("receivers") or []
+                receiver_counts[row] = len(receivers)
+                receiver_nodes.extend(node_index(name) for name in receivers)
+                row += 1
+
+        receiver_offsets = np.zeros(signal_total + 1, dtype=np.uint32)
+        np.cumsum(receiver_counts, out=receiver_offsets[1:])
+        string_offsets, string_blob = pool.arrays()
+
+        arrays = {
+            "messages": message_rows,
+            "signals": signal_rows,
+            "string_offsets": string_offsets,
+            "string_blob": string_blob,
+            "nodes": np.array([pool.ids[name] for name in node_ids], dtype=np.uint32),
+            "receiver_offsets": receiver_offsets,
+            "receiver_nodes": np.array(receiver_nodes, dtype=np.uint16),
+            "message_order": np.argsort(message_rows["frame_id"], kind="stable").astype(np.uint32),
+            "signal_order": np.argsort(signal_rows["name"], kind="stable").astype(np.uint32),
+        }
+        return cls(arrays, source=source)
+
+    @classmethod
+    def from_cantools(cls, database, source: str = "") -> "SignalDatabase":
+        """Build a database from a loaded ``cantools`` database"""
+        messages = []
+        for message in database.messages:
+            signals = []
+            for signal in message.signals:
+                multiplexer_ids = getattr(signal, "multiplexer_ids", None)
+                conversion = getattr(signal, "conversion", None)
+                signals.append({
+                    "name": signal.name,
+                    "start": signal.start,
+                    "length": signal.length,
+                    "byte_order": signal.byte_order,
+                    "is_signed": signal.is_signed,
+                    "is_float": getattr(signal, "is_float", False),
+                    "scale": conversion.scale if conversion is not None else signal.scale,
+                    "offset": conversion.offset if conversion is not None else signal.offset,
+                    "minimum": signal.minimum,
+                    "maximum": signal.maximum,
+                    "unit": signal.unit,
+                    "receivers": list(signal.receivers),
+                    "is_multiplexer": signal.is_multiplexer,
+                    "multiplexer_id": multiplexer_ids[0] if multiplexer_ids else None,
+                })
+            messages.append({
+                "id": message.frame_id,
+                "name": message.name,
+                "dlc": message.length,
+                "extended": bool(message.is_extended_frame),
+                "cycle_time_ms": message.cycle_time,
+                "senders": list(message.senders),
+                "signals": signals,
+            })
+        return cls.from_messages(messages, source=source)
+
+    # ------------------------------------------------------------------
+    # Binary cache
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the database to a memory-mappable binary file"""
+        path = Path(path)
+        layout = []
+        offset = 0
+        for name in self.ARRAY_NAMES:
+            array = np.ascontiguousarray(self.arrays[name])
+            layout.append({
+                "name": name,
+                "dtype": npformat.dtype_to_descr(array.dtype),
+                "count": int(array.shape[0]),
+                "offset": offset,
+            })
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "source": self.source,
+            "source_hash": self.source_hash,
+            "arrays": layout,
+        }).encode("utf-8")
+        data_start = -(-(len(_MAGIC) + 4 + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(_MAGIC)
+                handle.write(len(header).to_bytes(4, "little"))
+                handle.write(header)
+                for entry in layout:
+                    handle.seek(data_start + entry["offset"])
+                    handle.write(np.ascontiguousarray(self.arrays[entry["name"]]).tobytes())
+            # Concurrent writers produce identical files, so last rename wins
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SignalDatabase":
+        """Memory-map a database written by :meth:`save`"""
+        with open(path, "rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if buffer[:len(_MAGIC)] != _MAGIC:
+            buffer.close()
+            raise ValueError(f"Not a signal database file: {path}")
+
+        header_length = int.from_bytes(buffer[len(_MAGIC):len(_MAGIC) + 4], "little")
+        header_end = len(_MAGIC) + 4 + header_length
+        header = json.loads(buffer[len(_MAGIC) + 4:header_end].decode("utf-8"))
+        if header.get("version") != FORMAT_VERSION:
+            buffer.close()
+            raise ValueError(f"Unsupported signal database version in {path}")
+
+        data_start = -(-header_end // _ALIGNMENT) * _ALIGNMENT
+        arrays = {}
+        for entry in header["arrays"]:
+            arrays[entry["name"]] = np.frombuffer(
+                buffer, dtype=npformat.descr_to_dtype(entry["dtype"]),
+                count=entry["count"], offset=data_start + entry["offset"]
+            )
+
+        return cls(arrays, source=header.get("source", ""),
+                   source_hash=header.get("source_hash", ""), buffer=buffer)
+
+    # ------------------------------------------------------------------
+    # Lookups
+
+    def string(self, string_id: int) -> str:
+        """Decode a pooled string"""
+        start = int(self._string_offsets[string_id])
+        end = int(self._string_offsets[string_id + 1])
+        return self._string_blob[start:end].tobytes().decode("utf-8")
+
+    def string_id(self, text: str) -> Optional[int]:
+        """Find the pool ID of a string (the reverse map is built on first use)"""
+        if self._string_ids is None:
+            blob = self._string_blob.tobytes()
+            offsets = self._string_offsets.tolist()
+            self._string_ids = {
+                blob[offsets[i]:offsets[i + 1]].decode("utf-8"): i
+                for i in range(len(offsets) - 1)
+            }
+        return self._string_ids.get(text)
+
+    def message_index(self, key: Union[int, str]) -> Optional[int]:
+        """Find a message by frame ID or name"""
+        if isinstance(key, str):
+            if key.lower().startswith("0x") or key.isdigit():
+                key = int(key, 0)
+            else:
+                name_id = self.string_id(key)
+                if name_id is None:
+                    return None
+                matches = np.flatnonzero(self.messages["name"] == name_id)
+                return int(matches[0]) if len(matches) else None
+
+        position = np.searchsorted(self._sorted_frame_ids, key)
+        if position < len(self._sorted_frame_ids) and self._sorted_frame_ids[position] == key:
+            return int(self.message_order[position])
+        return None
+
+    def message_indices(self, frame_ids: Sequence[int]) -> np.ndarray:
+        """Vectorized frame ID lookup; unknown IDs map to -1"""
+        frame_ids = np.asarray(frame_ids, dtype=np.int64)
+        if not len(self._sorted_frame_ids):
+            return np.full(len(frame_ids), -1, dtype=np.int64)
+        positions = np.clip(np.searchsorted(self._sorted_frame_ids, frame_ids),
+                            0, len(self._sorted_frame_ids) - 1)
+        found = self._sorted_frame_ids[positions] == frame_ids
+        return np.where(found, self.message_order[positions].astype(np.int64), -1)
+
+    def message_signals(self, message_index: int) -> np.ndarray:
+        """Indices of the signals carried by a message"""
+        row = self.messages[message_index]
+        start = int(row["signal_start"])
+        return np.arange(start, start + int(row["signal_count"]))
+
+    def find_signals(self, name: str) -> np.ndarray:
+        """Indices of all signals with the given name"""
+        name_id = self.string_id(name)
+        if name_id is None:
+            return np.zeros(0, dtype=np.int64)
+        left = np.searchsorted(self._sorted_signal_names, name_id, side="left")
+        right = np.searchsorted(self._sorted_signal_names, name_id, side="right")
+        return self.signal_order[left:right].astype(np.int64)
+
+    def node_index(self, name: str) -> Optional[int]:
+        """Find an ECU node by name"""
+        name_id = self.string_id(name)
+        if name_id is None:
+            return None
+        matches = np.flatnonzero(self.nodes == name_id)
+        return int(matches[0]) if len(matches) else None
+
+    def node_messages(self, node: str, direction: str = "tx") -> np.ndarray:
+        """
+        Messages sent ('tx') or received ('rx') by an ECU node
+
+        A node receives a message when it receives any of its signals.
+        """
+        index = self.node_index(node)
+        if index is None:
+            return np.zeros(0, dtype=np.int64)
+        if direction == "tx":
+            return np.flatnonzero(self.messages["sender"] == index)
+
+        entries = np.flatnonzero(self.receiver_nodes == index)
+        signal_indices = np.searchsorted(self.receiver_offsets, entries, side="right") - 1
+        return np.unique(self.signals["message"][signal_indices]).astype(np.int64)
+
+    def message_name(self, message_index: int) -> str:
+        return self.string(int(self.messages["name"][message_index]))
+
+    def signal_name(self, signal_index: int) -> str:
+        return self.string(int(self.signals["name"][signal_index]))
+
+    def node_name(self, node_index: int) -> str:
+        return self.string(int(self.nodes[node_index]))
+
+    def to_message_list(self) -> List[Dict[str, Any]]:
+        """Periodic messages in the format used by the CAN bus simulator"""
+        messages = []
+        for index in np.flatnonzero(self.messages["cycle_time_ms"] > 0):
+            row = self.messages[index]
+            messages.append({
+                "id": int(row["frame_id"]),
+                "name": self.message_name(index),
+                "dlc": int(row["dlc"]),
+                "period_ms": float(row["cycle_time_ms"]),
+                "extended": bool(row["extended"]),
+            })
+        return messages
+
+    # ------------------------------------------------------------------
+    # Bit layout and validation
+
+    def bit_positions(self, signal_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Frame bit positions of every value bit
+
+        Returns:
+            Tuple of (signal index, value bit index with 0 = LSB, frame bit
+            position with byte = pos // 8 and bit = pos % 8), one entry per
+            signal bit
+        """
+        if signal_indices is None:
+            signal_indices = np.arange(self.signal_count)
+        signals = self.signals[signal_indices]
+        lengths = signals["length"].astype(np.int64)
+
+        owners = np.repeat(np.asarray(signal_indices, dtype=np.int64), lengths)
+        value_bit = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        start = np.repeat(signals["start_bit"].astype(np.int64), lengths)
+        big_endian = np.repeat(signals["big_endian"], lengths)
+        length = np.repeat(lengths, lengths)
+
+        # Motorola start bits address the MSB in sawtooth numbering; walk in
+        # big-endian linear numbering and convert back
+        msb_linear = (start // 8) * 8 + 7 - start % 8
+        linear = msb_linear + (length - 1 - value_bit)
+        motorola = (linear // 8) * 8 + 7 - linear % 8
+        positions = np.where(big_endian, motorola, start + value_bit)
+
+        return owners, value_bit, positions
+
+    def validate(self) -> List[str]:
+        """Check the database for layout errors"""
+        issues = []
+
+        frame_ids = self.messages["frame_id"][self.message_order]
+        duplicates = np.unique(frame_ids[1:][frame_ids[1:] == frame_ids[:-1]])
+        for frame_id in duplicates:
+            issues.append(f"Duplicate frame ID 0x{int(frame_id):X}")
+
+        if not self.signal_count:
+            return issues
+
+        owners, _, positions = self.bit_positions()
+        message_of = self.signals["message"][owners].astype(np.int64)
+        frame_bits = self.messages["dlc"][message_of].astype(np.int64) * 8
+
+        outside = np.unique(owners[positions >= frame_bits])
+        for signal_index in outside:
+            message_index = int(self.signals["message"][signal_index])
+            issues.append(
+                f"Signal {self.signal_name(signal_index)} exceeds the "
+                f"{int(self.messages['dlc'][message_index])}-byte payload of "
+                f"{self.message_name(message_index)}"
+            )
+
+        mux = self.signals["mux"][owners]
+        keys = message_of * 512 + positions
+        always = mux < 0
+        overlapping = set(self._overlapping(owners[always], keys[always]).tolist())
+
+        # Multiplexed signals collide within their own multiplexer value
+        # and with signals present in every frame
+        muxed = ~always
+        mux_keys = keys[muxed] * 4096 + mux[muxed]
+        overlapping.update(self._overlapping(owners[muxed], mux_keys).tolist())
+        clash = np.isin(keys[muxed], keys[always])
+        overlapping.update(owners[muxed][clash].tolist())
+
+        for signal_index in sorted(overlapping):
+            issues.append(
+                f"Signal {self.signal_name(signal_index)} overlaps another signal in "
+                f"{self.message_name(int(self.signals['message'][signal_index]))}"
+            )
+
+        return issues
+
+    @staticmethod
+    def _overlapping(owners: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Signals that share a key with another signal"""
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        repeated = np.zeros(len(keys), dtype=bool)
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        repeated[1:] |= same
+        repeated[:-1] |= same
+        return np.unique(owners[order][repeated])
+
+    def signal_segments(self, signal_index: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Byte segments of a signal for pack/unpack code generation
+
+        Returns:
+            List of (byte index, bit shift in byte, value bit shift, width)
+        """
+        _, value_bit, positions = self.bit_positions(np.array([signal_index]))
+        segments = []
+        for byte in np.unique(positions // 8):
+            in_byte = positions // 8 == byte
+            segments.append((
+                int(byte),
+                int(positions[in_byte].min() % 8),
+                int(value_bit[in_byte].min()),
+                int(in_byte.sum()),
+            ))
+        return segments
+
+
+_loaded: Dict[str, Tuple[int, int, SignalDatabase]] = {}
+
+
+class DBCPathError(ValueError):
+    """DBC path that may not be read (outside the DBC directory, not a file, too large)"""
+
+
+def _dbc_stat(path: Path) -> os.stat_result:
+    stat = path.stat()
+    if not path.is_file():
+        raise DBCPathError(f"DBC path is not a regular file: {path.name}")
+    if stat.st_size > MAX_DBC_BYTES:
+        raise DBCPathError(f"DBC file {path.name} exceeds {MAX_DBC_BYTES} bytes")
+    return stat
+
+
+def resolve_dbc_path(name: Union[str, Path], dbc_dir: Union[str, Path]) -> Path:
+    """
+    Resolve a DBC file named in a request inside the configured DBC directory
+
+    Relative names are taken from ``dbc_dir``; after resolving symlinks
+    the file must still be inside it, be a regular file and be no larger
+    than MAX_DBC_BYTES.
+
+    Raises:
+        DBCPathError: If the name points outside ``dbc_dir`` or at anything
+            other than a readable DBC file
+    """
+    root = Path(dbc_dir).resolve()
+    path = (root / name).resolve()
+    if path != root and root not in path.parents:
+        raise DBCPathError(f"DBC file {name} is outside the DBC directory")
+    try:
+        _dbc_stat(path)
+    except OSError:
+        raise DBCPathError(f"DBC file {name} not found in the DBC directory") from None
+    return path
+
+
+def load_signal_database(dbc_path: Union[str, Path],
+                         cache_dir: Optional[Union[str, Path]] = None) -> SignalDatabase:
+    """
+    Load a DBC file through the binary cache
+
+    The DBC is parsed with ``cantools`` only when no cached image exists for
+    its content; otherwise the cached file is memory-mapped. Databases are
+    also kept per process until the DBC file changes.
+
+    Args:
+        dbc_path: Path to the DBC file
+        cache_dir: Cache directory (defaults to ~/.ai_copilot/signal_db)
+
+    Returns:
+        SignalDatabase for the file
+
+    Raises:
+        DBCPathError: If the path is not a regular file or exceeds MAX_DBC_BYTES
+    """
+    path = Path(dbc_path).resolve()
+    stat = _dbc_stat(path)
+    key = str(path)
+
+    loaded = _loaded.get(key)
+    if loaded and loaded[0] == stat.st_mtime_ns and loaded[1] == stat.st_size:
+        return loaded[2]
+
+    content = path.read_bytes()
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    cache_path = Path(cache_dir or DEFAULT_CACHE_DIR) / f"{path.stem}-{digest}-v{FORMAT_VERSION}.sdb"
+
+    database = None
+    if cache_path.exists():
+        try:
+            database = SignalDatabase.load(cache_path)
+        except (ValueError, OSError):
+            database = None
+
+    if database is None:
+        try:
+            import cantools
+        except ImportError as e:
+            raise ImportError("cantools is required to import DBC files (pip install cantools)") from e
+
+        parsed = cantools.database.load_string(content.decode("latin-1"), database_format="dbc")
+        database = SignalDatabase.from_cantools(parsed, source=str(path))
+        database.source_hash = digest
+        try:
+            database.save(cache_path)
+        except OSError:
+            pass  # read-only home directories fall back to the parsed copy
+
+    _loaded[key] = (stat.st_mtime_ns, stat.st_size, database)
+    return database
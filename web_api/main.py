@@ -3,17 +3,27 @@ FastAPI web application for AI Co-pilot
 """
 
 import asyncio
+import json
 from typing import Dict, List, Optional, Any
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import logging
+import time
+from pathlib import Path
 
 from ai_copilot import AICopilot, CopilotConfig
 from ai_copilot.core import CodeRequest
+from ai_copilot.metrics import get_http_metrics
+from code_generation.project import ProjectGenerator, ARCHIVE_FORMATS
+from embedded_integration.reporting import get_encoder, encode_findings
+from telemetry import TelemetryStore, MaintenanceScorer, DeviceRegistry, ingest_http_body
+from collaboration import CollaborationService, SnapshotStore
+from vehicle_context import DBCPathError
+from embedded_integration import EmbeddedAnalyzer, IncrementalAnalyzer
 
 
 # Pydantic models for API
@@ -27,6 +37,7 @@ class CodeGenerationRequest(BaseModel):
 class CodeAnalysisRequest(BaseModel):
     code: str
     language: str = "c"
+    path: Optional[str] = None  # Reported as the artifact location in jsonl/sarif output
 
 
 class CodeGenerationResponse(BaseModel):
@@ -44,6 +55,20 @@ class CodeAnalysisResponse(BaseModel):
     is_valid: bool
 
 
+class TelemetryRecord(BaseModel):
+    vehicle_id: str
+    timestamp: Optional[float] = None
+    signals: Dict[str, float]
+    name: Optional[str] = None
+    type: Optional[str] = None
+    location: Optional[str] = None
+    status: Optional[str] = None
+
+
+class TelemetryBatch(BaseModel):
+    records: List[TelemetryRecord]
+
+
 class StatusResponse(BaseModel):
     status: str
     message: str
@@ -71,6 +96,42 @@ app.add_middleware(
 # Global AI Co-pilot instance
 copilot: Optional[AICopilot] = None
 
+# Digital twin telemetry (same store as the standalone demo servers)
+telemetry_store = TelemetryStore()
+maintenance_scorer = MaintenanceScorer(telemetry_store)
+iot_registry = DeviceRegistry()
+
+# Collaborative editing sessions with snapshots under the output directory
+collaboration = CollaborationService(
+    IncrementalAnalyzer(EmbeddedAnalyzer(CopilotConfig())),
+    SnapshotStore(Path(CopilotConfig().output_dir) / "collaboration"),
+)
+
+# Request and process metrics for /metrics and /api/analytics
+http_metrics = get_http_metrics()
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count and time every request by its route template"""
+    started = time.perf_counter()
+    status = 500
+    http_metrics.in_flight.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        http_metrics.in_flight.dec()
+        route = request.scope.get("route")
+        http_metrics.observe(
+            request.method,
+            getattr(route, "path", None),
+            status,
+            time.perf_counter() - started,
+            request.client.host if request.client else None,
+        )
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -96,6 +157,7 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     global copilot
     
+    await collaboration.shutdown()
     if copilot:
         copilot.shutdown()
         logging.info("AI Co-pilot web API shutdown complete")
@@ -139,18 +201,68 @@ async def generate_code(request: CodeGenerationRequest):
             metadata=response.metadata
         )
         
+    except DBCPathError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid DBC file: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
 
 
+@app.post("/api/generate-project")
+async def generate_project(request: CodeGenerationRequest, archive_format: str = "tar.gz"):
+    """Generate a multi-file ECU module project, streamed as a tar.gz, tar or zip archive"""
+    global copilot
+    
+    if not copilot or not copilot.is_initialized:
+        raise HTTPException(status_code=503, detail="AI Co-pilot not initialized")
+    if archive_format not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported archive format: {archive_format}")
+    
+    code_request = CodeRequest(
+        description=request.description,
+        language=request.language,
+        target_platform=request.target_platform,
+        constraints=request.constraints
+    )
+    chunks = copilot.generate_project(code_request, archive_format)
+    
+    # Fail before the response starts if the project cannot be planned
+    try:
+        first = await chunks.__anext__()
+    except DBCPathError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid DBC file: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Project generation failed: {str(e)}")
+    
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+    
+    filename = f"{ProjectGenerator.module_name(code_request)}.{archive_format}"
+    return StreamingResponse(
+        body(),
+        media_type=ARCHIVE_FORMATS[archive_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @app.post("/api/analyze", response_model=CodeAnalysisResponse)
-async def analyze_code(request: CodeAnalysisRequest):
-    """Analyze existing code"""
+async def analyze_code(request: CodeAnalysisRequest, format: str = "json"):
+    """Analyze existing code; format=jsonl or sarif streams findings with source locations"""
     global copilot
     
     if not copilot or not copilot.is_initialized:
         raise HTTPException(status_code=503, detail="AI Co-pilot not initialized")
     
+    if format != "json":
+        try:
+            encoder = get_encoder(format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        path = request.path or f"input.{request.language}"
+        findings = copilot.stream_findings([(path, request.code)])
+        return StreamingResponse(encode_findings(encoder, findings), media_type=encoder.media_type)
+    
     try:
         # Analyze code
         analysis = await copilot.analyze_existing_code(request.code, request.language)
@@ -214,6 +326,100 @@ async def get_platforms():
         raise HTTPException(status_code=500, detail=f"Failed to get platforms: {str(e)}")
 
 
+@app.post("/api/telemetry", status_code=202)
+async def ingest_telemetry(batch: TelemetryBatch):
+    """Ingest a batch of vehicle telemetry records"""
+    records = [record.model_dump(exclude_none=True) for record in batch.records]
+    return telemetry_store.ingest(records)
+
+
+@app.get("/api/digital-twin")
+async def get_digital_twin():
+    """Per-vehicle telemetry aggregates"""
+    return telemetry_store.snapshot()
+
+
+@app.get("/api/digital-twin/history")
+async def get_digital_twin_history(vehicle_id: str, signal: Optional[str] = None,
+                                   start: Optional[float] = None, end: Optional[float] = None,
+                                   max_points: int = 1000):
+    """Signal history downsampled to at most max_points per signal"""
+    signals = signal.split(",") if signal else None
+    try:
+        return telemetry_store.history(vehicle_id, signals, start, end, max_points)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"No telemetry found: {e}")
+
+
+@app.get("/api/predictive-maintenance")
+async def get_predictive_maintenance(limit: int = 20):
+    """Components predicted to reach their failure threshold soonest"""
+    return maintenance_scorer.report(limit)
+
+
+@app.post("/api/iot/messages", status_code=202)
+async def ingest_iot_messages(request: Request):
+    """Ingest CAN/ECU messages: binary packets (application/octet-stream) or JSON"""
+    body = await request.body()
+    try:
+        return ingest_http_body(body, request.headers.get("content-type", ""), iot_registry)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid message batch: {e}")
+
+
+@app.get("/api/iot-devices")
+async def get_iot_devices():
+    """Registered devices with live message rates and ingestion statistics"""
+    return iot_registry.snapshot()
+
+
+@app.get("/api/collaboration")
+async def get_collaboration():
+    """Active editing sessions and their participants"""
+    return collaboration.stats()
+
+
+@app.websocket("/ws/collaboration/{session_id}")
+async def collaboration_socket(websocket: WebSocket, session_id: str,
+                               user: str = "anonymous", project: str = ""):
+    """Delta-sync editing session (protocol in collaboration.service)"""
+    await websocket.accept()
+    participant = await collaboration.join(session_id, user, websocket.send_text, project)
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                await websocket.send_text(json.dumps({"type": "error", "message": "Invalid JSON"}))
+                continue
+            await collaboration.handle(session_id, participant, message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await collaboration.leave(session_id, participant)
+
+
+@app.get("/api/analytics")
+async def get_analytics():
+    """Request, latency and process metrics of this API server"""
+    analytics = http_metrics.analytics()
+    usage = analytics["usage_statistics"]
+    usage["total_code_generated"] = http_metrics.count("/api/generate", "POST")
+    usage["analyses_run"] = http_metrics.count("/api/analyze", "POST")
+    usage["telemetry_batches"] = http_metrics.count("/api/telemetry", "POST")
+    return analytics
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of all metrics"""
+    return PlainTextResponse(
+        http_metrics.registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 # Serve static files (React app) - only if directory exists
 import os
 if os.path.exists("web_frontend/build/static"):